@@ -11,7 +11,6 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 from sklearn.feature_selection import SelectKBest, f_regression
 import xgboost as xgb
-import json
 import pickle
 import logging
 from datetime import datetime, timedelta
@@ -19,6 +18,8 @@ from typing import Dict, List, Tuple, Optional, Any
 import warnings
 warnings.filterwarnings('ignore')
 
+from ml_feature_store import get_feature_store
+
 logger = logging.getLogger(__name__)
 
 class AdvancedMLEngine:
@@ -70,78 +71,58 @@ class AdvancedMLEngine:
         }
     
     def get_training_data(self, days_back: int = 90) -> pd.DataFrame:
-        """Get comprehensive training data from database"""
+        """Get comprehensive training data from the shared feature store"""
         try:
-            cursor = self.db.conn.cursor()
-            
-            # Get all signals with market context and outcomes
-            cursor.execute("""
-                SELECT st.bias, st.session, st.signal_type, st.date, st.time,
-                       COALESCE(st.mfe_none, st.mfe, 0) as mfe,
-                       COALESCE(st.be1_hit, false) as be1_hit,
-                       COALESCE(st.be2_hit, false) as be2_hit,
-                       st.market_context, st.context_quality_score,
-                       EXTRACT(HOUR FROM st.time::time) as hour,
-                       EXTRACT(DOW FROM st.date) as day_of_week,
-                       st.entry_price
-                FROM signal_lab_trades st
-                WHERE st.date > CURRENT_DATE - INTERVAL '%s days'
-                AND COALESCE(st.mfe_none, st.mfe, 0) != 0
-                ORDER BY st.date DESC, st.time DESC
-            """, (days_back,))
-            
-            trades = cursor.fetchall()
-            
-            if len(trades) < 20:
-                logger.warning(f"Insufficient training data: {len(trades)} samples")
+            frame = get_feature_store(self.db).frame()
+            
+            # 1M signals from the last days_back days with an outcome, newest first
+            since = np.datetime64(datetime.now().date() - timedelta(days=days_back))
+            dates = frame['ts'].astype('datetime64[D]')
+            mask = (frame['source'] == 0) & (dates > since) & (frame['mfe'] != 0)
+            rows = np.flatnonzero(mask)
+            rows = rows[np.argsort(frame['ts'][rows], kind='stable')[::-1]]
+            
+            if len(rows) < 20:
+                logger.warning(f"Insufficient training data: {len(rows)} samples")
                 return pd.DataFrame()
             
-            # Convert to DataFrame
-            data = []
-            for trade in trades:
-                try:
-                    if isinstance(trade['market_context'], str):
-                        market_ctx = json.loads(trade['market_context'])
-                    elif isinstance(trade['market_context'], dict):
-                        market_ctx = trade['market_context']
-                    else:
-                        market_ctx = {}
-                    
-                    row = {
-                        # Target variable
-                        'mfe': float(trade['mfe']),
-                        
-                        # Basic features
-                        'bias': trade['bias'],
-                        'session': trade['session'],
-                        'signal_type': trade['signal_type'],
-                        'hour': int(trade['hour']) if trade['hour'] else 12,
-                        'day_of_week': int(trade['day_of_week']) if trade['day_of_week'] else 1,
-                        'entry_price': float(trade['entry_price']) if trade['entry_price'] else 15000,
-                        'be1_hit': bool(trade['be1_hit']),
-                        'be2_hit': bool(trade['be2_hit']),
-                        
-                        # Market context features
-                        'vix': float(market_ctx.get('vix', 20)),
-                        'spy_volume': float(market_ctx.get('spy_volume', 50000000)),
-                        'qqq_volume': float(market_ctx.get('qqq_volume', 30000000)),
-                        'dxy_price': float(market_ctx.get('dxy_price', 103.5)),
-                        'dxy_change': float(market_ctx.get('dxy_change', 0)),
-                        'nq_price': float(market_ctx.get('nq_price', 15000)),
-                        'nq_change': float(market_ctx.get('nq_change', 0)),
-                        'correlation_nq_es': float(market_ctx.get('correlation_nq_es', 0.85)),
-                        'trend_strength': float(market_ctx.get('trend_strength', 0.5)),
-                        'volatility_regime': market_ctx.get('volatility_regime', 'NORMAL'),
-                        'sector_rotation': market_ctx.get('sector_rotation', 'BALANCED'),
-                        'market_session': market_ctx.get('market_session', 'Unknown')
-                    }
-                    data.append(row)
-                    
-                except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
-                    logger.warning(f"Error processing trade data: {str(e)}")
-                    continue
+            def column(name, default, fill_zero=False):
+                values = frame[name][rows]
+                missing = np.isnan(values) | (values == 0) if fill_zero else np.isnan(values)
+                return np.where(missing, default, values)
             
-            df = pd.DataFrame(data)
+            def category(name, default):
+                values = frame[name][rows]
+                return np.where(values == '', default, values)
+            
+            df = pd.DataFrame({
+                # Target variable
+                'mfe': frame['mfe'][rows],
+                
+                # Basic features
+                'bias': frame['bias'][rows],
+                'session': frame['session'][rows],
+                'signal_type': frame['signal_type'][rows],
+                'hour': column('hour', 12, fill_zero=True).astype(int),
+                'day_of_week': column('day_of_week', 1, fill_zero=True).astype(int),
+                'entry_price': column('entry_price', 15000, fill_zero=True),
+                'be1_hit': frame['be1_hit'][rows].astype(bool),
+                'be2_hit': frame['be2_hit'][rows].astype(bool),
+                
+                # Market context features
+                'vix': column('vix', 20),
+                'spy_volume': column('spy_volume', 50000000),
+                'qqq_volume': column('qqq_volume', 30000000),
+                'dxy_price': column('dxy_price', 103.5),
+                'dxy_change': column('dxy_change', 0),
+                'nq_price': column('nq_price', 15000),
+                'nq_change': column('nq_change', 0),
+                'correlation_nq_es': column('correlation_nq_es', 0.85),
+                'trend_strength': column('trend_strength', 0.5),
+                'volatility_regime': category('volatility_regime', 'NORMAL'),
+                'sector_rotation': category('sector_rotation', 'BALANCED'),
+                'market_session': category('market_session', 'Unknown')
+            })
             logger.info(f"Loaded {len(df)} training samples with {len(df.columns)} features")
             return df
             
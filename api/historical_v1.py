@@ -81,7 +81,15 @@ def get_world():
 
 @hist_v1_bp.route('/bars', methods=['GET'])
 def get_bars():
-    """Get OHLCV bars for a time range"""
+    """
+    Get OHLCV bars for a time range.
+    
+    tf=1m reads the clean 1m bars. 5m/15m/60m/240m/1d (and 1H/4H/1D spellings) read
+    the precomputed UTC-bucketed rollups (services/bar_rollups.py); bar ts is the
+    bucket open and bar_count the number of 1m bars in it.
+    """
+    from services.bar_rollups import TIMEFRAMES, fetch_rollup_bars, normalize_timeframe
+    
     symbol = request.args.get('symbol')
     tf = request.args.get('tf', '1m')
     start_str = request.args.get('start')
@@ -91,8 +99,9 @@ def get_bars():
     if not symbol or not start_str or not end_str:
         return jsonify({"error": "symbol, start, and end are required"}), 400
     
-    if tf != '1m':
-        return jsonify({"error": "only 1m timeframe implemented"}), 400
+    rollup_tf = normalize_timeframe(tf)
+    if tf not in ('1m', '1M', '1') and rollup_tf is None:
+        return jsonify({"error": f"unsupported timeframe: {tf}", "supported": ['1m'] + list(TIMEFRAMES)}), 400
     
     try:
         start_ts = parse_ts(start_str)
@@ -103,10 +112,16 @@ def get_bars():
     conn = get_db_conn()
     cursor = conn.cursor()
     
-    cursor.execute("SELECT ts, open, high, low, close, volume FROM market_bars_ohlcv_1m_clean WHERE symbol = %s AND ts >= %s AND ts <= %s ORDER BY ts ASC LIMIT %s", (symbol, start_ts, end_ts, limit))
-    
-    rows = cursor.fetchall()
-    bars = [{"ts": row[0].isoformat(), "open": float(row[1]), "high": float(row[2]), "low": float(row[3]), "close": float(row[4]), "volume": int(row[5]) if row[5] else 0} for row in rows]
+    if rollup_tf is None:
+        cursor.execute("SELECT ts, open, high, low, close, volume FROM market_bars_ohlcv_1m_clean WHERE symbol = %s AND ts >= %s AND ts <= %s ORDER BY ts ASC LIMIT %s", (symbol, start_ts, end_ts, limit))
+        
+        rows = cursor.fetchall()
+        bars = [{"ts": row[0].isoformat(), "open": float(row[1]), "high": float(row[2]), "low": float(row[3]), "close": float(row[4]), "volume": int(row[5]) if row[5] else 0} for row in rows]
+        tf = '1m'
+    else:
+        rows = fetch_rollup_bars(cursor, symbol, rollup_tf, start_ts, end_ts, limit)
+        bars = [{"ts": row[0].isoformat(), "open": float(row[1]), "high": float(row[2]), "low": float(row[3]), "close": float(row[4]), "volume": int(row[5]) if row[5] else 0, "bar_count": row[6]} for row in rows]
+        tf = rollup_tf
     
     cursor.close()
     conn.close()
@@ -333,25 +348,8 @@ def quality_alignment():
     
     return jsonify({"symbol": symbol, "start": start_str, "end": end_str, "checks": checks, "pass": overall_pass})
 
-@hist_v1_bp.route('/quality/determinism', methods=['GET'])
-def quality_determinism():
-    """Verify deterministic dataset hash for repeatability"""
-    symbol = request.args.get('symbol')
-    start_str = request.args.get('start')
-    end_str = request.args.get('end')
-    
-    if not symbol or not start_str or not end_str:
-        return jsonify({"error": "symbol, start, and end are required"}), 400
-    
-    try:
-        start_ts = parse_ts(start_str)
-        end_ts = parse_ts(end_str)
-    except:
-        return jsonify({"error": "invalid timestamp format"}), 400
-    
-    conn = get_db_conn()
-    cursor = conn.cursor()
-    
+def legacy_dataset_hash(cursor, symbol, start_ts, end_ts):
+    """Row hash over up to 10k clean bars joined with bias (pre-index determinism check)"""
     cursor.execute("""
         SELECT b.ts, b.open, b.high, b.low, b.close, 
                bs.bias_5m, bs.bias_15m, bs.bias_1h, bs.bias_4h, bs.bias_1d
@@ -368,10 +366,73 @@ def quality_determinism():
     for row in rows:
         canonical_data.append(f"{row[0].isoformat()}|{row[1]}|{row[2]}|{row[3]}|{row[4]}|{row[5] or 'NULL'}|{row[6] or 'NULL'}|{row[7] or 'NULL'}|{row[8] or 'NULL'}|{row[9] or 'NULL'}")
     
-    cursor.close()
-    conn.close()
-    
     canonical_str = "\n".join(canonical_data)
-    dataset_hash = hashlib.sha256(canonical_str.encode()).hexdigest()[:16]
+    return hashlib.sha256(canonical_str.encode()).hexdigest()[:16], len(canonical_data)
+
+@hist_v1_bp.route('/quality/determinism', methods=['GET'])
+def quality_determinism():
+    """
+    Verify deterministic dataset hash for repeatability.
+    
+    Served from the bar Merkle index (services/bar_merkle_index.py) when it holds
+    the requested version (default: the clean overlay): the hash is a Merkle root
+    read from a handful of day/month/year nodes. Optional params:
+      expected=<hash>     pass only if the root (or its 16-char prefix) matches
+      verify=1            recompute the range's day leaves and report drifted bars
+      compare_to=<ver>    report the days/bars where another version differs
+    Falls back to the full row hash (bars + bias) when the index is not built.
+    """
+    from services.bar_merkle_index import diff_versions, has_index, range_hash, verify_range
+    
+    symbol = request.args.get('symbol')
+    start_str = request.args.get('start')
+    end_str = request.args.get('end')
+    version = request.args.get('version', 'clean')
+    expected = request.args.get('expected')
     
-    return jsonify({"symbol": symbol, "start": start_str, "end": end_str, "dataset_hash": dataset_hash, "row_count": len(canonical_data), "pass": True})
+    if not symbol or not start_str or not end_str:
+        return jsonify({"error": "symbol, start, and end are required"}), 400
+    
+    try:
+        start_ts = parse_ts(start_str)
+        end_ts = parse_ts(end_str)
+    except:
+        return jsonify({"error": "invalid timestamp format"}), 400
+    
+    conn = get_db_conn()
+    cursor = conn.cursor()
+    
+    try:
+        if not has_index(conn, symbol, version):
+            dataset_hash, row_count = legacy_dataset_hash(cursor, symbol, start_ts, end_ts)
+            passed = expected is None or expected == dataset_hash
+            return jsonify({"symbol": symbol, "start": start_str, "end": end_str, "dataset_hash": dataset_hash, "row_count": row_count, "index": "rows", "pass": passed})
+        
+        root = range_hash(conn, symbol, version, start_ts, end_ts)
+        result = {
+            "symbol": symbol,
+            "start": start_str,
+            "end": end_str,
+            "dataset_version_id": version,
+            "dataset_hash": root['merkle_root'][:16],
+            "merkle_root": root['merkle_root'],
+            "row_count": root['bar_count'],
+            "index": "merkle",
+            "nodes_read": root['nodes_read'],
+        }
+        passed = expected is None or root['merkle_root'].startswith(expected)
+        
+        if request.args.get('verify') in ('1', 'true'):
+            result['mismatches'] = verify_range(conn, symbol, version, start_ts, end_ts)
+            passed = passed and not result['mismatches']
+        
+        compare_to = request.args.get('compare_to')
+        if compare_to:
+            result['compare_to'] = compare_to
+            result['differences'] = diff_versions(conn, symbol, compare_to, version, start_ts, end_ts)
+        
+        result['pass'] = passed
+        return jsonify(result)
+    finally:
+        cursor.close()
+        conn.close()
@@ -1,5 +1,7 @@
 ﻿from flask import Blueprint, request, jsonify
 import psycopg2, os, logging
+from datetime import datetime
+from signals_feed import CachedTotals, InvalidCursor, decode_cursor, encode_cursor
 
 signals_v1_bp = Blueprint("signals_v1_bp", __name__, url_prefix="/api/signals/v1")
 print("[BOOT] api.signals_v1 loaded OK")
@@ -21,60 +23,138 @@ def normalize_direction(direction):
         return 'Bearish'
     return direction
 
+# Per-trade symbol / sort key / status, used when automated_signals_feed is not
+# installed; mirrors automated_signals_feed_upsert() in database/signals_feed_keyset.sql.
+# The symbol predicate is applied before aggregation so only that symbol's trades are grouped.
+FEED_FALLBACK_SOURCE = """
+    (SELECT
+        trade_id,
+        MAX(symbol) FILTER (WHERE symbol IS NOT NULL) as symbol,
+        COALESCE(
+            MIN(signal_bar_open_ts) FILTER (WHERE event_type='SIGNAL_CREATED' AND signal_bar_open_ts IS NOT NULL),
+            MIN(entry_bar_open_ts) FILTER (WHERE event_type='ENTRY' AND entry_bar_open_ts IS NOT NULL),
+            MAX(exit_bar_open_ts) FILTER (WHERE event_type LIKE 'EXIT%%' AND exit_bar_open_ts IS NOT NULL),
+            MAX(timestamp),
+            '-infinity'::timestamptz
+        ) as sort_ts,
+        CASE
+            WHEN BOOL_OR(event_type = 'CANCELLED') THEN 'CANCELLED'
+            WHEN BOOL_OR(event_type LIKE 'EXIT%%') THEN 'EXITED'
+            WHEN BOOL_OR(event_type IN ('ENTRY', 'MFE_UPDATE', 'BE_TRIGGERED')) THEN 'CONFIRMED'
+            ELSE 'PENDING'
+        END as status
+    FROM automated_signals
+    WHERE trade_id IN (SELECT trade_id FROM automated_signals WHERE symbol = %(symbol)s)
+    GROUP BY trade_id) feed
+"""
+
+feed_totals = CachedTotals()
+
+def _is_sort_ts(value):
+    """True for a feed cursor's sort key: an ISO timestamp, or Postgres' -infinity/infinity"""
+    if not isinstance(value, str):
+        return False
+    if value in ('infinity', '-infinity'):
+        return True
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    return True
+
 @signals_v1_bp.route('/all', methods=['GET'])
 def get_all_signals():
+    """
+    One page of trades for a symbol, newest first.
+    
+    Pass the returned next_cursor as ?cursor= for the following page; since/until
+    (ISO timestamps) bound the sort time. total is cached for TOTALS_TTL_SECONDS.
+    """
     symbol = request.args.get('symbol', 'GLBX.MDP3:NQ')
     status_filter = request.args.get('status', '')
     limit = min(int(request.args.get('limit', 500)), 2000)
     offset = int(request.args.get('offset', 0))
+    since = request.args.get('since')
+    until = request.args.get('until')
+    try:
+        after = decode_cursor(request.args.get('cursor'))
+        if after and not _is_sort_ts(after[0]):
+            raise InvalidCursor("Cursor is not from /api/signals/v1/all")
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     
     conn = get_db_conn()
     cursor = conn.cursor()
     
     status_list = [s.strip().upper() for s in status_filter.split(',') if s.strip()] if status_filter else []
     
-    base_query = """
-        WITH lifecycle_summary AS (
-            SELECT 
-                trade_id,
-                MAX(symbol) FILTER (WHERE symbol IS NOT NULL) as symbol,
-                MAX(id) as latest_event_id,
-                (ARRAY_AGG(event_type ORDER BY id DESC))[1] as latest_event_type,
-                (ARRAY_AGG(direction ORDER BY id DESC) FILTER (WHERE direction IS NOT NULL))[1] as direction,
-                MIN(signal_bar_open_ts) FILTER (WHERE event_type='SIGNAL_CREATED' AND signal_bar_open_ts IS NOT NULL) as signal_bar_open_ts,
-                MIN(entry_bar_open_ts) FILTER (WHERE event_type='ENTRY' AND entry_bar_open_ts IS NOT NULL) as entry_bar_open_ts,
-                MAX(exit_bar_open_ts) FILTER (WHERE event_type LIKE 'EXIT%%' AND exit_bar_open_ts IS NOT NULL) as exit_bar_open_ts,
-                (ARRAY_AGG(entry_price ORDER BY id DESC) FILTER (WHERE entry_price IS NOT NULL))[1] as entry_price,
-                (ARRAY_AGG(stop_loss ORDER BY id DESC) FILTER (WHERE stop_loss IS NOT NULL))[1] as stop_loss,
-                (ARRAY_AGG(no_be_mfe ORDER BY id DESC) FILTER (WHERE no_be_mfe IS NOT NULL))[1] as no_be_mfe,
-                (ARRAY_AGG(be_mfe ORDER BY id DESC) FILTER (WHERE be_mfe IS NOT NULL))[1] as be_mfe,
-                (ARRAY_AGG(mae_global_r ORDER BY id DESC) FILTER (WHERE mae_global_r IS NOT NULL))[1] as mae_global_r,
-                MAX(timestamp) as latest_timestamp,
-                CASE 
-                    WHEN BOOL_OR(event_type = 'CANCELLED') THEN 'CANCELLED'
-                    WHEN BOOL_OR(event_type LIKE 'EXIT%%') THEN 'EXITED'
-                    WHEN BOOL_OR(event_type IN ('ENTRY', 'MFE_UPDATE', 'BE_TRIGGERED')) THEN 'CONFIRMED'
-                    ELSE 'PENDING'
-                END as status
-            FROM automated_signals
-            GROUP BY trade_id
-        )
-        SELECT l.*, m.no_be_mfe as computed_no_be_mfe, m.be_mfe as computed_be_mfe, m.mae_global_r as computed_mae
-        FROM lifecycle_summary l
-        LEFT JOIN signal_metrics_v1 m ON l.trade_id = m.trade_id
-        WHERE l.symbol = %(symbol)s
-    """
-    
-    params = {"symbol": symbol, "limit": limit, "offset": offset}
+    cursor.execute("SELECT to_regclass('automated_signals_feed') IS NOT NULL")
+    source = "automated_signals_feed feed" if cursor.fetchone()[0] else FEED_FALLBACK_SOURCE
     
+    params = {"symbol": symbol, "limit": limit + 1, "offset": offset}
+    where = " WHERE feed.symbol = %(symbol)s"
     if status_list:
-        base_query += " AND l.status = ANY(%(status_list)s)"
+        where += " AND feed.status = ANY(%(status_list)s)"
         params["status_list"] = status_list
+    if since:
+        where += " AND feed.sort_ts >= %(since)s::timestamptz"
+        params["since"] = since
+    if until:
+        where += " AND feed.sort_ts < %(until)s::timestamptz"
+        params["until"] = until
+    
+    total = feed_totals.get((symbol, tuple(status_list), since, until), lambda: _count(source, where, dict(params)))
     
-    base_query += " ORDER BY COALESCE(l.signal_bar_open_ts, l.entry_bar_open_ts, l.exit_bar_open_ts, l.latest_timestamp) DESC NULLS LAST LIMIT %(limit)s OFFSET %(offset)s"
+    # Keyset page: index range scan on (symbol, sort_ts, trade_id) starting after the cursor
+    page_where = where
+    if after:
+        page_where += " AND (feed.sort_ts, feed.trade_id) < (%(after_ts)s::timestamptz, %(after_id)s)"
+        params["after_ts"], params["after_id"] = after
+    cursor.execute(
+        f"SELECT feed.trade_id, feed.sort_ts::text FROM {source}{page_where}"
+        " ORDER BY feed.sort_ts DESC, feed.trade_id DESC LIMIT %(limit)s OFFSET %(offset)s",
+        params
+    )
+    page = cursor.fetchall()
+    next_cursor = encode_cursor(page[limit - 1][1], page[limit - 1][0]) if len(page) > limit else None
+    trade_ids = [r[0] for r in page[:limit]]
     
-    cursor.execute(base_query, params)
-    rows = cursor.fetchall()
+    # Lifecycle summary of this page's trades only
+    rows = []
+    if trade_ids:
+        cursor.execute("""
+            WITH lifecycle_summary AS (
+                SELECT 
+                    trade_id,
+                    MAX(symbol) FILTER (WHERE symbol IS NOT NULL) as symbol,
+                    MAX(id) as latest_event_id,
+                    (ARRAY_AGG(event_type ORDER BY id DESC))[1] as latest_event_type,
+                    (ARRAY_AGG(direction ORDER BY id DESC) FILTER (WHERE direction IS NOT NULL))[1] as direction,
+                    MIN(signal_bar_open_ts) FILTER (WHERE event_type='SIGNAL_CREATED' AND signal_bar_open_ts IS NOT NULL) as signal_bar_open_ts,
+                    MIN(entry_bar_open_ts) FILTER (WHERE event_type='ENTRY' AND entry_bar_open_ts IS NOT NULL) as entry_bar_open_ts,
+                    MAX(exit_bar_open_ts) FILTER (WHERE event_type LIKE 'EXIT%%' AND exit_bar_open_ts IS NOT NULL) as exit_bar_open_ts,
+                    (ARRAY_AGG(entry_price ORDER BY id DESC) FILTER (WHERE entry_price IS NOT NULL))[1] as entry_price,
+                    (ARRAY_AGG(stop_loss ORDER BY id DESC) FILTER (WHERE stop_loss IS NOT NULL))[1] as stop_loss,
+                    (ARRAY_AGG(no_be_mfe ORDER BY id DESC) FILTER (WHERE no_be_mfe IS NOT NULL))[1] as no_be_mfe,
+                    (ARRAY_AGG(be_mfe ORDER BY id DESC) FILTER (WHERE be_mfe IS NOT NULL))[1] as be_mfe,
+                    (ARRAY_AGG(mae_global_r ORDER BY id DESC) FILTER (WHERE mae_global_r IS NOT NULL))[1] as mae_global_r,
+                    MAX(timestamp) as latest_timestamp,
+                    CASE 
+                        WHEN BOOL_OR(event_type = 'CANCELLED') THEN 'CANCELLED'
+                        WHEN BOOL_OR(event_type LIKE 'EXIT%%') THEN 'EXITED'
+                        WHEN BOOL_OR(event_type IN ('ENTRY', 'MFE_UPDATE', 'BE_TRIGGERED')) THEN 'CONFIRMED'
+                        ELSE 'PENDING'
+                    END as status
+                FROM automated_signals
+                WHERE trade_id = ANY(%(trade_ids)s)
+                GROUP BY trade_id
+            )
+            SELECT l.*, m.no_be_mfe as computed_no_be_mfe, m.be_mfe as computed_be_mfe, m.mae_global_r as computed_mae
+            FROM lifecycle_summary l
+            LEFT JOIN signal_metrics_v1 m ON l.trade_id = m.trade_id
+            ORDER BY array_position(%(trade_ids)s, l.trade_id::text)
+        """, {"trade_ids": trade_ids})
+        rows = cursor.fetchall()
     
     # Batch check for bar existence
     all_ts = []
@@ -127,4 +207,14 @@ def get_all_signals():
     cursor.close()
     conn.close()
     
-    return jsonify({"count": len(result_rows), "rows": result_rows})
+    return jsonify({"count": len(result_rows), "rows": result_rows, "next_cursor": next_cursor, "total": total})
+
+
+def _count(source, where, params):
+    conn = get_db_conn()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {source}{where}", params)
+        return cursor.fetchone()[0]
+    finally:
+        conn.close()
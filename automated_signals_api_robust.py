@@ -8,11 +8,16 @@ from datetime import datetime, timedelta
 import pytz
 import logging
 
+from signals_feed import CachedTotals, InvalidCursor, decode_cursor, encode_cursor
+
 logger = logging.getLogger(__name__)
 
 # Deployment marker for all-signals endpoints
 ALL_SIGNALS_MARKER = "ALL_SIGNALS_FIX_MARKER_20251224_B"
 
+# /api/all-signals/data totals, refreshed at most once per TOTALS_TTL_SECONDS
+ledger_totals = CachedTotals()
+
 def _migrate_all_signals_status_constraint():
     """
     Migrate all_signals_ledger status constraint to include 'TRIANGLE'.
@@ -59,6 +64,10 @@ def register_automated_signals_api_robust(app, db):
     # Run migration on startup
     _migrate_all_signals_status_constraint()
     
+    # /stats reads counters through the app's connection
+    from automated_signals_stats import bind_stats_db
+    bind_stats_db(db)
+    
     # Register repair endpoints FIRST to ensure they're always available
     @app.route('/api/automated-signals/integrity-repair/lifecycle', methods=['POST'])
     def repair_lifecycle():
@@ -225,29 +234,17 @@ def register_automated_signals_api_robust(app, db):
         Returns basic stats for health checks and quick overview
         """
         try:
-            cursor = db.conn.cursor()
+            from automated_signals_stats import stats_cache
             
-            # Check if table exists
-            cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'automated_signals'
-                );
-            """)
-            table_exists = cursor.fetchone()[0]
-            
-            if not table_exists:
+            # STEP 1: Counters + most recent webhook timestamp (shared single-flight cache)
+            snapshot = stats_cache.get()
+            if snapshot is None:
                 return jsonify({
                     'success': True,
                     'stats': _get_empty_stats(),
                     'message': 'Table not initialized'
                 }), 200
-            
-            # STEP 1: Query most recent webhook timestamp
-            cursor.execute("""
-                SELECT MAX(timestamp) FROM automated_signals;
-            """)
-            last_ts = cursor.fetchone()[0]
+            last_ts = snapshot['last_event_at']
             
             # STEP 2: Compute webhook_healthy status
             if last_ts is not None:
@@ -261,24 +258,13 @@ def register_automated_signals_api_robust(app, db):
                 webhook_healthy = False
                 delta_sec = None
             
-            # Get basic counts
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    COUNT(DISTINCT trade_id) as unique_trades,
-                    COUNT(CASE WHEN event_type = 'ENTRY' THEN 1 END) as entries,
-                    COUNT(CASE WHEN event_type LIKE 'EXIT_%' THEN 1 END) as exits
-                FROM automated_signals;
-            """)
-            row = cursor.fetchone()
-            
             stats = {
-                'total_signals': row[0] if row else 0,
-                'unique_trades': row[1] if row else 0,
-                'entries': row[2] if row else 0,
-                'exits': row[3] if row else 0,
-                'active_count': (row[2] - row[3]) if row else 0,
-                'completed_count': row[3] if row else 0,
+                'total_signals': snapshot['total_events'],
+                'unique_trades': snapshot['trade_count'],
+                'entries': snapshot['entry_count'],
+                'exits': snapshot['exit_count'],
+                'active_count': snapshot['entry_count'] - snapshot['exit_count'],
+                'completed_count': snapshot['exit_count'],
                 'webhook_healthy': webhook_healthy,
                 'last_webhook_timestamp': last_ts.isoformat() if last_ts else None,
                 'seconds_since_last_webhook': round(delta_sec, 1) if delta_sec is not None else None
@@ -1755,12 +1741,21 @@ def register_indicator_export_routes(app):
         from datetime import datetime
         from flask import request
         
-        # Parse pagination params
+        # Parse pagination params: keyset cursor (next_cursor of the previous page),
+        # optional triangle_time_ms window; offset is kept for older callers
         limit = min(request.args.get('limit', 1000, type=int), 5000)
         offset = request.args.get('offset', 0, type=int)
+        since_ms = request.args.get('since_ms', type=int)
+        until_ms = request.args.get('until_ms', type=int)
+        try:
+            after = decode_cursor(request.args.get('cursor'))
+            if after and not isinstance(after[0], int):
+                raise InvalidCursor("Cursor is not from /api/all-signals/data")
+        except InvalidCursor as e:
+            return jsonify({'success': False, 'error': str(e), 'marker': ALL_SIGNALS_MARKER}), 400
         
         logger.info("[ALL_SIGNALS_DATA] marker=%s", ALL_SIGNALS_MARKER)
-        logger.info("[ALL_SIGNALS_DATA] start limit=%s offset=%s", limit, offset)
+        logger.info("[ALL_SIGNALS_DATA] start limit=%s offset=%s cursor=%s", limit, offset, after)
         
         conn = None
         cursor = None
@@ -1770,10 +1765,35 @@ def register_indicator_export_routes(app):
             conn = psycopg2.connect(DATABASE_URL)
             cursor = conn.cursor(cursor_factory=RealDictCursor)
             
-            # Get total count
-            cursor.execute("SELECT COUNT(*) AS total FROM all_signals_ledger")
-            total_row = cursor.fetchone()
-            total = total_row['total'] if total_row and 'total' in total_row else 0
+            conditions = []
+            params = []
+            if since_ms is not None:
+                conditions.append("a.triangle_time_ms >= %s")
+                params.append(since_ms)
+            if until_ms is not None:
+                conditions.append("a.triangle_time_ms < %s")
+                params.append(until_ms)
+            window_where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+            
+            # Total count, cached for TOTALS_TTL_SECONDS instead of a COUNT(*) per page
+            def count_ledger(count_sql="SELECT COUNT(*) FROM all_signals_ledger a" + window_where,
+                             count_params=tuple(params)):
+                count_conn = psycopg2.connect(DATABASE_URL)
+                try:
+                    count_cursor = count_conn.cursor()
+                    count_cursor.execute(count_sql, count_params)
+                    return count_cursor.fetchone()[0]
+                finally:
+                    count_conn.close()
+            total = ledger_totals.get((since_ms, until_ms), count_ledger)
+            
+            # Keyset page on (triangle_time_ms, trade_id) starting after the cursor
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if after:
+                page_conditions.append("(a.triangle_time_ms, a.trade_id) < (%s, %s)")
+                page_params.extend(after)
+            page_where = (" WHERE " + " AND ".join(page_conditions)) if page_conditions else ""
             
             # Query all_signals_ledger with pagination, enriching CONFIRMED rows from confirmed_signals_ledger
             cursor.execute("""
@@ -1804,11 +1824,16 @@ def register_indicator_export_routes(app):
                     a.updated_at
                 FROM all_signals_ledger a
                 LEFT JOIN confirmed_signals_ledger c ON a.trade_id = c.trade_id
-                ORDER BY a.triangle_time_ms DESC
+            """ + page_where + """
+                ORDER BY a.triangle_time_ms DESC, a.trade_id DESC
                 LIMIT %s OFFSET %s
-            """, (limit, offset))
+            """, page_params + [limit + 1, offset])
             
             rows = cursor.fetchall()
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1]['triangle_time_ms'], rows[-1]['trade_id'])
             logger.info("[ALL_SIGNALS_DATA] rows=%d", len(rows))
             
             # Convert to JSON-serializable format
@@ -1871,6 +1896,7 @@ def register_indicator_export_routes(app):
                 'total': total,
                 'limit': limit,
                 'offset': offset,
+                'next_cursor': next_cursor,
                 'max_triangle_time_ms': max_triangle_time_ms,
                 'max_updated_at': max_updated_at,
                 'source_table': 'all_signals_ledger',
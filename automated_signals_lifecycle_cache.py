@@ -0,0 +1,181 @@
+"""
+Automated Signals Lifecycle State Cache
+Per-trade lifecycle state for webhook validation without re-reading trade history.
+
+- State per trade_id: first/last event, distinct event types (has_entry / has_exit)
+  and sequence number (row count), loaded on a miss with one aggregate query
+- Handlers call record() after each committed insert, so hits stay exact for
+  writes made by this process; EXIT evicts the trade, idle entries expire
+- Bounded LRU: the oldest trades are dropped once max_trades is reached
+- A load that races a record() for the same trade is returned but not cached,
+  so a concurrent webhook can never leave a stale entry behind
+- Callers re-check rejections with refresh=True, so writes from other
+  processes can only delay a rejection, never cause a false one
+"""
+
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+
+DEFAULT_MAX_TRADES = 5000
+DEFAULT_IDLE_TTL_SECONDS = 1800
+
+STATE_SQL = """
+    SELECT COUNT(*),
+           (ARRAY_AGG(event_type ORDER BY id ASC))[1],
+           (ARRAY_AGG(event_type ORDER BY id DESC))[1],
+           ARRAY_AGG(DISTINCT event_type)
+    FROM automated_signals
+    WHERE trade_id = %s
+"""
+
+
+class TradeLifecycleState:
+    """Compact lifecycle summary of one trade_id"""
+
+    __slots__ = ('first_event', 'last_event', 'event_types', 'seq', 'touched', 'cached')
+
+    def __init__(self, first_event=None, last_event=None, event_types=(), seq=0):
+        self.first_event = first_event
+        self.last_event = last_event
+        self.event_types = set(event_types)
+        self.seq = seq
+        self.touched = time.monotonic()
+        self.cached = False
+
+    @property
+    def exists(self):
+        return self.seq > 0
+
+    @property
+    def has_entry(self):
+        return 'ENTRY' in self.event_types
+
+    @property
+    def has_exit(self):
+        return any(et.startswith('EXIT_') for et in self.event_types)
+
+    def apply(self, event_type, removed=0):
+        if self.first_event is None:
+            self.first_event = event_type
+        self.last_event = event_type
+        self.event_types.add(event_type)
+        self.seq = max(self.seq - removed, 0) + 1
+        self.touched = time.monotonic()
+
+    def copy(self, cached):
+        state = TradeLifecycleState(self.first_event, self.last_event, self.event_types, self.seq)
+        state.cached = cached
+        return state
+
+    def __repr__(self):
+        return (f"TradeLifecycleState(first={self.first_event}, last={self.last_event}, "
+                f"seq={self.seq}, types={sorted(self.event_types)})")
+
+
+def load_lifecycle_state(trade_id, cursor):
+    """Read one trade's lifecycle summary (single index-backed aggregate)"""
+    cursor.execute(STATE_SQL, (trade_id,))
+    row = cursor.fetchone()
+    if not row or not row[0]:
+        return TradeLifecycleState()
+    event_types = [et for et in (row[3] or []) if et is not None]
+    return TradeLifecycleState(row[1], row[2], event_types, int(row[0]))
+
+
+class LifecycleStateCache:
+    """Bounded, thread-safe LRU of TradeLifecycleState keyed by trade_id"""
+
+    def __init__(self, max_trades=DEFAULT_MAX_TRADES, idle_ttl=DEFAULT_IDLE_TTL_SECONDS):
+        self.max_trades = max_trades
+        self.idle_ttl = idle_ttl
+        self._lock = Lock()
+        self._states = OrderedDict()
+        self._loading = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0, 'raced': 0}
+
+    def peek(self, trade_id):
+        """Cached state (as a copy) or None; never touches the database"""
+        with self._lock:
+            state = self._states.get(trade_id)
+            if state is None:
+                return None
+            if time.monotonic() - state.touched > self.idle_ttl:
+                del self._states[trade_id]
+                self.stats['expired'] += 1
+                return None
+            self._states.move_to_end(trade_id)
+            self.stats['hits'] += 1
+            return state.copy(cached=True)
+
+    def get(self, trade_id, cursor, refresh=False):
+        """Cached state, or load it with cursor on a miss (or when refresh=True)"""
+        if not refresh:
+            state = self.peek(trade_id)
+            if state is not None:
+                return state
+
+        # [in-flight loads, raced]; record()/invalidate() flag loads they overtake
+        with self._lock:
+            self.stats['misses'] += 1
+            loading = self._loading.setdefault(trade_id, [0, False])
+            loading[0] += 1
+
+        try:
+            state = load_lifecycle_state(trade_id, cursor)
+        finally:
+            with self._lock:
+                raced = loading[1]
+                loading[0] -= 1
+                if not loading[0]:
+                    del self._loading[trade_id]
+
+        with self._lock:
+            if raced:
+                self.stats['raced'] += 1
+            elif state.exists and not state.has_exit:
+                self._states[trade_id] = state
+                self._states.move_to_end(trade_id)
+                while len(self._states) > self.max_trades:
+                    self._states.popitem(last=False)
+                    self.stats['evictions'] += 1
+        return state.copy(cached=False)
+
+    def record(self, trade_id, event_type, removed=0):
+        """Apply a committed insert (removed = rows the same transaction deleted)"""
+        with self._lock:
+            if trade_id in self._loading:
+                self._loading[trade_id][1] = True
+            state = self._states.get(trade_id)
+            if state is None:
+                return
+            if event_type and event_type.startswith('EXIT_'):
+                del self._states[trade_id]
+                return
+            state.apply(event_type, removed)
+            self._states.move_to_end(trade_id)
+
+    def invalidate(self, trade_ids=None):
+        """Drop the given trade_ids (or everything) after out-of-band writes"""
+        with self._lock:
+            if trade_ids is None:
+                self._states.clear()
+                for loading in self._loading.values():
+                    loading[1] = True
+                return
+            if isinstance(trade_ids, str):
+                trade_ids = [trade_ids]
+            for trade_id in trade_ids:
+                self._states.pop(trade_id, None)
+                if trade_id in self._loading:
+                    self._loading[trade_id][1] = True
+
+    def __len__(self):
+        return len(self._states)
+
+
+lifecycle_state_cache = LifecycleStateCache(
+    max_trades=int(os.environ.get('LIFECYCLE_CACHE_MAX_TRADES', DEFAULT_MAX_TRADES)),
+    idle_ttl=float(os.environ.get('LIFECYCLE_CACHE_IDLE_TTL_SECONDS', DEFAULT_IDLE_TTL_SECONDS))
+)
@@ -979,7 +979,14 @@ def enforce_strict_lifecycle_rules(events, new_event_type):
     """
     # Extract event types in chronological order
     types = [e.get("event_type") for e in events if e.get("event_type")]
-    
+    return check_strict_lifecycle_transition("ENTRY" in types, new_event_type)
+
+
+def check_strict_lifecycle_transition(has_entry, new_event_type):
+    """
+    Same rules as enforce_strict_lifecycle_rules(), from a lifecycle summary
+    (e.g. the webhook's cached TradeLifecycleState) instead of the full history.
+    """
     # SIGNAL_CREATED can always be first (triangle appears)
     if new_event_type == "SIGNAL_CREATED":
         return True, None
@@ -989,15 +996,15 @@ def enforce_strict_lifecycle_rules(events, new_event_type):
         return True, None
     
     # If EXIT arrives before ENTRY → reject
-    if new_event_type in ("EXIT_BE","EXIT_SL") and "ENTRY" not in types:
+    if new_event_type in ("EXIT_BE","EXIT_SL") and not has_entry:
         return False, "EXIT received before ENTRY — strict enforcement."
     
     # MFE_UPDATE before ENTRY → reject
-    if new_event_type == "MFE_UPDATE" and "ENTRY" not in types:
+    if new_event_type == "MFE_UPDATE" and not has_entry:
         return False, "MFE_UPDATE received before ENTRY — strict enforcement."
     
     # Second ENTRY not allowed
-    if new_event_type == "ENTRY" and "ENTRY" in types:
+    if new_event_type == "ENTRY" and has_entry:
         return False, "Duplicate ENTRY event — strict enforcement."
     
     return True, None
@@ -0,0 +1,287 @@
+"""
+Automated Signals Stats Counters
+Constant-time stats for /api/automated-signals/stats.
+
+- Counters live in automated_signals_stats_counters and are maintained by statement
+  triggers (database/automated_signals_stats_counters.sql), so they change in the
+  same transaction as every webhook insert
+- SingleFlightTTLCache keeps one in-process copy read through the app's db
+  connection (bind_stats_db); concurrent pollers share a single refresh instead of
+  each hitting Postgres
+- reconcile_stats_counters() recounts automated_signals and repairs drift;
+  StatsCounterReconciler runs it on a schedule
+"""
+
+import logging
+import os
+import time
+from threading import Condition, Thread
+
+import psycopg2
+import psycopg2.extras
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_SQL = """
+    SELECT COALESCE(SUM(total_events), 0),
+           COALESCE(SUM(trade_count), 0),
+           COALESCE(SUM(entry_count), 0),
+           COALESCE(SUM(exit_count), 0),
+           COALESCE(SUM(final_mfe_count), 0),
+           COALESCE(SUM(final_mfe_sum), 0)
+    FROM automated_signals_stats_counters
+"""
+
+RECOUNT_SQL = """
+    SELECT COUNT(*),
+           COUNT(DISTINCT trade_id),
+           COUNT(*) FILTER (WHERE event_type = 'ENTRY'),
+           COUNT(*) FILTER (WHERE event_type LIKE 'EXIT_%'),
+           COUNT(final_mfe),
+           COALESCE(SUM(final_mfe), 0)
+    FROM automated_signals
+"""
+
+COUNTER_FIELDS = ('total_events', 'trade_count', 'entry_count', 'exit_count', 'final_mfe_count', 'final_mfe_sum')
+
+DEFAULT_CACHE_TTL_SECONDS = 2.0
+DEFAULT_RECONCILE_INTERVAL_SECONDS = 900
+
+
+def _as_counts(row):
+    counts = dict(zip(COUNTER_FIELDS, row))
+    for key in COUNTER_FIELDS[:-1]:
+        counts[key] = int(counts[key])
+    counts['final_mfe_sum'] = float(counts['final_mfe_sum'])
+    return counts
+
+
+def counters_installed(cursor):
+    cursor.execute("SELECT to_regclass('automated_signals_stats_counters')")
+    return cursor.fetchone()[0] is not None
+
+
+def read_counter_stats(cursor):
+    """Trigger-maintained counters (16 rows at most); None if the migration hasn't run"""
+    if not counters_installed(cursor):
+        return None
+    cursor.execute(COUNTERS_SQL)
+    return _as_counts(cursor.fetchone())
+
+
+def recount_stats(cursor):
+    """Exact values from a full scan of automated_signals"""
+    cursor.execute(RECOUNT_SQL)
+    return _as_counts(cursor.fetchone())
+
+
+def load_stats_snapshot(conn):
+    """
+    Counters (or a full recount if the migration hasn't run) plus the latest event
+    time; None if automated_signals doesn't exist yet
+    """
+    # End the read's transaction afterwards unless the caller already had one open,
+    # so the shared app connection isn't left idle in transaction
+    owns_transaction = conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    # Tuple rows whatever the connection's default cursor_factory is
+    cursor = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+    try:
+        cursor.execute("SELECT to_regclass('automated_signals')")
+        if cursor.fetchone()[0] is None:
+            return None
+        counts = read_counter_stats(cursor)
+        if counts is None:
+            counts = recount_stats(cursor)
+        cursor.execute("SELECT MAX(timestamp) FROM automated_signals")
+        counts['last_event_at'] = cursor.fetchone()[0]
+        return counts
+    finally:
+        cursor.close()
+        if owns_transaction:
+            conn.rollback()
+
+
+def build_dashboard_stats(snapshot):
+    """Shape used by the stats endpoint (unchanged from the per-request COUNT version)"""
+    entries = snapshot['entry_count']
+    exits = snapshot['exit_count']
+    avg_mfe = snapshot['final_mfe_sum'] / snapshot['final_mfe_count'] if snapshot['final_mfe_count'] else 0.0
+    return {
+        "total_signals": snapshot['total_events'],
+        "active_count": entries - exits,
+        "completed_count": exits,
+        "pending_count": 0,
+        "win_count": 0,
+        "win_rate": 0.0,
+        "avg_mfe": round(avg_mfe, 2),
+        "success_rate": 0.0
+    }
+
+
+class SingleFlightTTLCache:
+    """
+    Caches loader() for ttl seconds. Only one caller refreshes at a time: others
+    get the previous value while a refresh is in flight, or wait for it if there
+    is no value yet. A failed refresh is raised to the refreshing caller only.
+    """
+
+    def __init__(self, loader, ttl=DEFAULT_CACHE_TTL_SECONDS):
+        self.loader = loader
+        self.ttl = ttl
+        self._cond = Condition()
+        self._value = None
+        self._has_value = False
+        self._expires = 0.0
+        self._refreshing = False
+        self.stats = {'hits': 0, 'refreshes': 0, 'stale_served': 0, 'waits': 0}
+
+    def get(self):
+        with self._cond:
+            while True:
+                if self._has_value and time.monotonic() < self._expires:
+                    self.stats['hits'] += 1
+                    return self._value
+                if not self._refreshing:
+                    self._refreshing = True
+                    break
+                if self._has_value:
+                    self.stats['stale_served'] += 1
+                    return self._value
+                self.stats['waits'] += 1
+                self._cond.wait()
+
+        try:
+            value = self.loader()
+        except Exception:
+            with self._cond:
+                self._refreshing = False
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._value = value
+            self._has_value = True
+            self._expires = time.monotonic() + self.ttl
+            self._refreshing = False
+            self.stats['refreshes'] += 1
+            self._cond.notify_all()
+        return value
+
+    def invalidate(self):
+        with self._cond:
+            self._expires = 0.0
+
+
+# Shared by both stats endpoints (web_server and the robust API); yields None until
+# bind_stats_db() points it at the app's database
+stats_cache = SingleFlightTTLCache(
+    lambda: None,
+    ttl=float(os.environ.get('STATS_CACHE_TTL_SECONDS', DEFAULT_CACHE_TTL_SECONDS))
+)
+
+
+def bind_stats_db(db):
+    """Read the shared stats cache through db.conn (the app's RailwayDB)"""
+    stats_cache.loader = lambda: load_stats_snapshot(db.conn) if db is not None else None
+    stats_cache.invalidate()
+
+
+def reconcile_stats_counters(database_url, repair=True):
+    """
+    Compare counters with a full recount and (optionally) repair the difference.
+
+    Both reads run in one REPEATABLE READ snapshot; since the triggers update the
+    counters in the writer's transaction, counters and rows are consistent inside
+    that snapshot. The drift is then added to slot 0 as an increment, which stays
+    correct even if webhooks committed in the meantime.
+    """
+    started = time.perf_counter()
+    conn = psycopg2.connect(database_url)
+    try:
+        conn.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ)
+        cursor = conn.cursor()
+        counters = read_counter_stats(cursor)
+        if counters is None:
+            conn.rollback()
+            logger.warning("Stats counters not installed - run database/run_automated_signals_stats_counters_migration.py")
+            return None
+        recount = recount_stats(cursor)
+        conn.commit()
+
+        drift = {key: recount[key] - counters[key] for key in COUNTER_FIELDS}
+        in_sync = all(abs(v) < 1e-6 for v in drift.values())
+        repaired = False
+
+        conn.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_READ_COMMITTED)
+        if not in_sync and repair:
+            cursor.execute("""
+                INSERT INTO automated_signals_stats_counters AS c
+                    (slot, total_events, trade_count, entry_count, exit_count, final_mfe_count, final_mfe_sum)
+                VALUES (0, %(total_events)s, %(trade_count)s, %(entry_count)s, %(exit_count)s, %(final_mfe_count)s, %(final_mfe_sum)s)
+                ON CONFLICT (slot) DO UPDATE SET
+                    total_events = c.total_events + EXCLUDED.total_events,
+                    trade_count = c.trade_count + EXCLUDED.trade_count,
+                    entry_count = c.entry_count + EXCLUDED.entry_count,
+                    exit_count = c.exit_count + EXCLUDED.exit_count,
+                    final_mfe_count = c.final_mfe_count + EXCLUDED.final_mfe_count,
+                    final_mfe_sum = c.final_mfe_sum + EXCLUDED.final_mfe_sum,
+                    updated_at = NOW()
+            """, drift)
+            repaired = True
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        cursor.execute("""
+            INSERT INTO automated_signals_stats_reconciliation
+                (in_sync, repaired, counters, recount, duration_ms)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (in_sync, repaired, psycopg2.extras.Json(counters), psycopg2.extras.Json(recount), duration_ms))
+        conn.commit()
+        cursor.close()
+
+        if in_sync:
+            logger.info(f"Stats counters in sync ({recount['total_events']} events, {duration_ms}ms)")
+        else:
+            logger.warning(f"Stats counters drifted {drift} - {'repaired' if repaired else 'not repaired'}")
+        return {'in_sync': in_sync, 'repaired': repaired, 'drift': drift,
+                'counters': counters, 'recount': recount, 'duration_ms': duration_ms}
+    finally:
+        conn.close()
+
+
+class StatsCounterReconciler:
+    """Background thread running reconcile_stats_counters() every interval seconds"""
+
+    def __init__(self, database_url, interval=DEFAULT_RECONCILE_INTERVAL_SECONDS, on_reconciled=None):
+        self.database_url = database_url
+        self.interval = interval
+        self.on_reconciled = on_reconciled
+        self.running = False
+        self.last_result = None
+
+    def run(self):
+        self.running = True
+        while self.running:
+            time.sleep(self.interval)
+            try:
+                self.last_result = reconcile_stats_counters(self.database_url)
+                if self.on_reconciled and self.last_result and self.last_result['repaired']:
+                    self.on_reconciled()
+            except Exception as e:
+                logger.error(f"Stats counter reconciliation failed: {e}")
+
+    def start(self):
+        Thread(target=self.run, name="stats-counter-reconciler", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+
+if __name__ == '__main__':
+    import json
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+    result = reconcile_stats_counters(os.environ['DATABASE_URL'])
+    print(json.dumps(result, indent=2, default=str))
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+BAR RANGE INDEX - In-memory range queries over a symbol's 1m OHLC bars
+
+Answers "highest high / lowest low between two bars" and "first bar that
+touched a price" without rescanning bars per trade or issuing SQL per trade:
+
+- Static history: sparse tables (pivot_index.SparseTable), O(1) range max/min
+- Live tail: appendable segment trees, O(log n) append and query; the tail is
+  folded into the static part once it reaches compact_at bars
+- First touch (high >= price / low <= price): binary search over range
+  extremes, O(log n) per query
+- Timestamps map to bar positions by binary search (gaps in the series are fine)
+
+compute_trade_excursion() reproduces the signal_metrics_v1 MFE/MAE rules on
+top of these queries so excursions for thousands of trades come from one load.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pivot_index import SparseTable
+
+DEFAULT_COMPACT_AT = 1440
+
+
+class _AppendableExtrema:
+    """Segment tree over a growing array; leftmost index on ties"""
+
+    def __init__(self, mode: str, capacity: int = 64):
+        self.mode = mode
+        self.size = 0
+        self.capacity = capacity
+        self.fill = float('-inf') if mode == 'max' else float('inf')
+        self.tree_values = [self.fill] * (2 * capacity)
+        self.tree_index = [-1] * (2 * capacity)
+
+    def _better(self, value_a, index_a, value_b, index_b):
+        """(a) beats (b): strictly more extreme, or equal and further left"""
+        if index_b < 0:
+            return index_a >= 0
+        if index_a < 0:
+            return False
+        if value_a == value_b:
+            return index_a < index_b
+        return value_a > value_b if self.mode == 'max' else value_a < value_b
+
+    def _grow(self):
+        values = [self.tree_values[self.capacity + i] for i in range(self.size)]
+        self.__init__(self.mode, self.capacity * 2)
+        for value in values:
+            self.append(value)
+
+    def append(self, value: float):
+        if self.size == self.capacity:
+            self._grow()
+        self.set(self.size, value)
+        self.size += 1
+
+    def set(self, position: int, value: float):
+        node = self.capacity + position
+        self.tree_values[node] = value
+        self.tree_index[node] = position
+        node //= 2
+        while node:
+            left, right = 2 * node, 2 * node + 1
+            if self._better(self.tree_values[right], self.tree_index[right],
+                            self.tree_values[left], self.tree_index[left]):
+                self.tree_values[node], self.tree_index[node] = self.tree_values[right], self.tree_index[right]
+            else:
+                self.tree_values[node], self.tree_index[node] = self.tree_values[left], self.tree_index[left]
+            node //= 2
+
+    def argquery(self, lo: int, hi: int) -> int:
+        """Position of the extreme value in [lo, hi] (inclusive)"""
+        best_value, best_index = self.fill, -1
+        lo += self.capacity
+        hi += self.capacity + 1
+        while lo < hi:
+            if lo & 1:
+                if self._better(self.tree_values[lo], self.tree_index[lo], best_value, best_index):
+                    best_value, best_index = self.tree_values[lo], self.tree_index[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if self._better(self.tree_values[hi], self.tree_index[hi], best_value, best_index):
+                    best_value, best_index = self.tree_values[hi], self.tree_index[hi]
+            lo //= 2
+            hi //= 2
+        return best_index
+
+    def values(self) -> List[float]:
+        return [self.tree_values[self.capacity + i] for i in range(self.size)]
+
+
+class BarRangeIndex:
+    """Range max/min and first-touch queries over one symbol's 1m bars"""
+
+    def __init__(self, ts, highs, lows, compact_at: int = DEFAULT_COMPACT_AT):
+        self.compact_at = compact_at
+        self.ts = list(ts)
+        if any(b <= a for a, b in zip(self.ts, self.ts[1:])):
+            raise ValueError("Bar timestamps must be strictly increasing")
+        self._build_static(np.array(highs, dtype=np.float64), np.array(lows, dtype=np.float64))
+
+    @classmethod
+    def from_rows(cls, rows, compact_at: int = DEFAULT_COMPACT_AT) -> 'BarRangeIndex':
+        """Rows of (ts, high, low) as fetched from market_bars_ohlcv_1m_clean"""
+        rows = list(rows)
+        return cls([r[0] for r in rows], [float(r[1]) for r in rows], [float(r[2]) for r in rows], compact_at)
+
+    @classmethod
+    def load(cls, cursor, symbol: str, start_ts: datetime, end_ts: datetime,
+             table: str = 'market_bars_ohlcv_1m_clean') -> 'BarRangeIndex':
+        """One query for the whole [start_ts, end_ts] window"""
+        cursor.execute(f"""
+            SELECT ts, high, low FROM {table}
+            WHERE symbol = %s AND ts >= %s AND ts <= %s
+            ORDER BY ts
+        """, (symbol, start_ts, end_ts))
+        return cls.from_rows(cursor.fetchall())
+
+    def _build_static(self, highs, lows):
+        self.static_highs = highs
+        self.static_lows = lows
+        self.static_size = len(highs)
+        self.high_table = SparseTable(highs, 'max')
+        self.low_table = SparseTable(lows, 'min')
+        self.tail_highs = _AppendableExtrema('max')
+        self.tail_lows = _AppendableExtrema('min')
+
+    def __len__(self):
+        return len(self.ts)
+
+    # ------------------------------------------------------------------ live tail
+
+    def append(self, ts, high: float, low: float):
+        """Add a bar after the last one; the same ts again updates the last bar"""
+        if self.ts and ts == self.ts[-1]:
+            position = len(self.ts) - 1
+            if position < self.static_size:
+                # Only reachable with an empty tail, so a rebuild loses nothing
+                self.static_highs[position] = high
+                self.static_lows[position] = low
+                self._build_static(self.static_highs, self.static_lows)
+            else:
+                self.tail_highs.set(position - self.static_size, float(high))
+                self.tail_lows.set(position - self.static_size, float(low))
+            return
+        if self.ts and ts < self.ts[-1]:
+            raise ValueError(f"Bar {ts} is older than the last indexed bar {self.ts[-1]}")
+        self.ts.append(ts)
+        self.tail_highs.append(float(high))
+        self.tail_lows.append(float(low))
+        if self.tail_highs.size >= self.compact_at:
+            self.compact()
+
+    def compact(self):
+        """Fold the live tail into the static sparse tables"""
+        if not self.tail_highs.size:
+            return
+        highs = np.concatenate([self.static_highs, np.asarray(self.tail_highs.values())])
+        lows = np.concatenate([self.static_lows, np.asarray(self.tail_lows.values())])
+        self._build_static(highs, lows)
+
+    # ------------------------------------------------------------------ positions
+
+    def high_at(self, position: int) -> float:
+        if position < self.static_size:
+            return float(self.static_highs[position])
+        return self.tail_highs.tree_values[self.tail_highs.capacity + position - self.static_size]
+
+    def low_at(self, position: int) -> float:
+        if position < self.static_size:
+            return float(self.static_lows[position])
+        return self.tail_lows.tree_values[self.tail_lows.capacity + position - self.static_size]
+
+    def position_range(self, start_ts, end_ts) -> Optional[Tuple[int, int]]:
+        """Inclusive positions of bars with start_ts <= ts <= end_ts, or None if empty"""
+        lo = bisect_left(self.ts, start_ts)
+        hi = bisect_right(self.ts, end_ts) - 1
+        return (lo, hi) if lo <= hi else None
+
+    # ------------------------------------------------------------------ range extremes
+
+    def _argquery(self, lo, hi, mode):
+        if lo < 0 or hi >= len(self.ts) or hi < lo:
+            raise IndexError(f"Invalid bar range [{lo}, {hi}] for {len(self.ts)} bars")
+        table = self.high_table if mode == 'max' else self.low_table
+        tail = self.tail_highs if mode == 'max' else self.tail_lows
+        value_at = self.high_at if mode == 'max' else self.low_at
+        best = None
+        if lo < self.static_size:
+            best = table.argquery(lo, min(hi, self.static_size - 1))
+        if hi >= self.static_size:
+            candidate = self.static_size + tail.argquery(max(lo, self.static_size) - self.static_size,
+                                                         hi - self.static_size)
+            if best is None:
+                best = candidate
+            else:
+                a, b = value_at(best), value_at(candidate)
+                if (b > a) if mode == 'max' else (b < a):
+                    best = candidate
+        return best
+
+    def argmax_high(self, lo: int, hi: int) -> int:
+        return self._argquery(lo, hi, 'max')
+
+    def argmin_low(self, lo: int, hi: int) -> int:
+        return self._argquery(lo, hi, 'min')
+
+    def max_high(self, lo: int, hi: int) -> float:
+        return self.high_at(self.argmax_high(lo, hi))
+
+    def min_low(self, lo: int, hi: int) -> float:
+        return self.low_at(self.argmin_low(lo, hi))
+
+    def max_high_many(self, lo, hi) -> np.ndarray:
+        """Vectorized max high over static-history ranges"""
+        return self.static_highs[self.high_table.argquery_many(lo, hi)]
+
+    def min_low_many(self, lo, hi) -> np.ndarray:
+        """Vectorized min low over static-history ranges"""
+        return self.static_lows[self.low_table.argquery_many(lo, hi)]
+
+    # ------------------------------------------------------------------ first touch
+
+    def first_high_at_or_above(self, lo: int, hi: int, price: float) -> Optional[int]:
+        """First position in [lo, hi] whose high >= price"""
+        if hi < lo or self.max_high(lo, hi) < price:
+            return None
+        left, right = lo, hi
+        while left < right:
+            mid = (left + right) // 2
+            if self.max_high(lo, mid) >= price:
+                right = mid
+            else:
+                left = mid + 1
+        return left
+
+    def first_low_at_or_below(self, lo: int, hi: int, price: float) -> Optional[int]:
+        """First position in [lo, hi] whose low <= price"""
+        if hi < lo or self.min_low(lo, hi) > price:
+            return None
+        left, right = lo, hi
+        while left < right:
+            mid = (left + right) // 2
+            if self.min_low(lo, mid) <= price:
+                right = mid
+            else:
+                left = mid + 1
+        return left
+
+
+def _scan_excursion(index, lo, hi, bullish, entry_price, stop_loss, risk, state):
+    """signal_metrics_v1 bar loop over [lo, hi], continuing from state"""
+    highest, lowest, mae, be_position = state
+    for position in range(lo, hi + 1):
+        high, low = index.high_at(position), index.low_at(position)
+        if (low <= stop_loss) if bullish else (high >= stop_loss):
+            continue
+        highest = max(highest, high)
+        lowest = min(lowest, low)
+        if bullish:
+            mae = min(mae, (lowest - entry_price) / risk)
+            if be_position is None and highest >= entry_price + risk:
+                be_position = position
+        else:
+            mae = min(mae, (entry_price - highest) / risk)
+            if be_position is None and lowest <= entry_price - risk:
+                be_position = position
+    return highest, lowest, mae, be_position
+
+
+def compute_trade_excursion(index: BarRangeIndex, direction: str, entry_ts, exit_ts,
+                            entry_price: float, stop_loss: float) -> Optional[Dict]:
+    """
+    signal_metrics_v1 excursion for one trade over bars entry_ts..exit_ts
+
+    Bars that touch the stop are excluded. Everything before the first stop
+    touch comes from range queries; only the bars after it (usually none, the
+    touch is the exit bar) go through the bar loop. Returns None when no bars
+    fall in the window.
+    """
+    window = index.position_range(entry_ts, exit_ts)
+    if window is None:
+        return None
+    lo, hi = window
+    bullish = direction == 'Bullish'
+    risk = abs(entry_price - stop_loss)
+
+    if bullish:
+        touch = index.first_low_at_or_below(lo, hi, stop_loss)
+    else:
+        touch = index.first_high_at_or_above(lo, hi, stop_loss)
+    last = hi if touch is None else touch - 1
+
+    highest = lowest = entry_price
+    be_position = None
+    if last >= lo:
+        # Running extremes only move past entry on a bar that does, so the
+        # first BE bar is the first touch of entry +/- 1R
+        highest = max(highest, index.max_high(lo, last))
+        lowest = min(lowest, index.min_low(lo, last))
+        if bullish:
+            be_position = index.first_high_at_or_above(lo, last, entry_price + risk)
+        else:
+            be_position = index.first_low_at_or_below(lo, last, entry_price - risk)
+    mae = min(0.0, (lowest - entry_price) / risk if bullish else (entry_price - highest) / risk)
+
+    if touch is not None and touch < hi:
+        highest, lowest, mae, be_position = _scan_excursion(
+            index, touch + 1, hi, bullish, entry_price, stop_loss, risk,
+            (highest, lowest, mae, be_position))
+
+    mfe_no_be = (highest - entry_price) / risk if bullish else (entry_price - lowest) / risk
+    return {
+        'no_be_mfe': mfe_no_be,
+        'be_mfe': mfe_no_be,
+        'mae_global_r': mae,
+        'highest_high': highest,
+        'lowest_low': lowest,
+        'be_triggered': be_position is not None,
+        'be_trigger_bar_open_ts': index.ts[be_position] if be_position is not None else None,
+        'bars': hi - lo + 1,
+    }
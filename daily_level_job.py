@@ -5,12 +5,16 @@ Run this script daily to:
 1. Capture today's predicted levels
 2. Analyze yesterday's level hits
 3. Update accuracy scores
+
+Backfill level accuracy history for a date range (all levels in one pass):
+    python daily_level_job.py --backfill 2023-01-01 2025-12-31
 """
 
+import argparse
 import schedule
 import time
-from datetime import datetime
-from level_tracker import run_daily_level_tracking
+from datetime import date, datetime
+from level_tracker import LevelTracker, run_daily_level_tracking
 
 def daily_job():
     """Daily level tracking job"""
@@ -27,7 +31,22 @@ def daily_job():
     except Exception as e:
         print(f"Error in daily level tracking: {e}")
 
+def backfill_job(start_date, end_date):
+    """Resolve every stored level in the range against the local 1m bars, then rescore"""
+    tracker = LevelTracker()
+    summary = tracker.evaluate_level_range(start_date, end_date)
+    tracker.update_accuracy_scores()
+    print(f"Evaluated {summary['evaluated']}/{summary['levels']} levels "
+          f"({summary['hits']} hits) in {summary['seconds']}s")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily level tracking job")
+    parser.add_argument('--backfill', nargs=2, metavar=('START', 'END'), help="Backfill level hits for START..END (YYYY-MM-DD)")
+    args = parser.parse_args()
+    if args.backfill:
+        backfill_job(*(date.fromisoformat(d) for d in args.backfill))
+        raise SystemExit(0)
+    
     # Schedule daily job at 6 AM EST (before market open)
     schedule.every().day.at("06:00").do(daily_job)
     
@@ -0,0 +1,46 @@
+-- Automated Signals - Hot Path Indexes
+-- Composite / covering / partial indexes for the read paths that poll automated_signals.
+-- Idempotent: safe to re-run, and safe to run again after automated_signals_partitioning.sql
+-- (indexes created on the partitioned parent cascade to every month partition).
+
+-- _fetch_events_for_range (automated_signals_state.py)
+--   WHERE signal_date BETWEEN .. ORDER BY trade_id, timestamp, id
+CREATE INDEX IF NOT EXISTS idx_automated_signals_date_trade_ts
+    ON automated_signals (signal_date, trade_id, timestamp, id);
+
+-- Stats endpoint: COUNT(*) WHERE event_type = 'ENTRY'
+-- Gap detection: ENTRY rows driving the per-trade NOT EXISTS / LATERAL lookups
+CREATE INDEX IF NOT EXISTS idx_automated_signals_event_trade
+    ON automated_signals (event_type, trade_id);
+
+-- Stats endpoint: COUNT(*) WHERE event_type LIKE 'EXIT_%'
+-- Gap detection: NOT EXISTS (... trade_id = e.trade_id AND event_type LIKE 'EXIT_%')
+-- (predicate must match the query text exactly for the planner to use it)
+CREATE INDEX IF NOT EXISTS idx_automated_signals_exit_trades
+    ON automated_signals (trade_id)
+    WHERE event_type LIKE 'EXIT_%';
+
+-- Open trades: ENTRY rows carry everything the active-trade readers need, so
+-- "open" = this partial index anti-joined against idx_automated_signals_exit_trades
+CREATE INDEX IF NOT EXISTS idx_automated_signals_open_entries
+    ON automated_signals (trade_id)
+    INCLUDE (direction, entry_price, stop_loss, signal_date)
+    WHERE event_type = 'ENTRY';
+
+-- Gap detection per-trade lookups: EXISTS (... trade_id = ? AND event_type = ?)
+-- and MAX(timestamp) of MFE_UPDATE per trade
+CREATE INDEX IF NOT EXISTS idx_automated_signals_trade_event_ts
+    ON automated_signals (trade_id, event_type, timestamp);
+
+-- Stats endpoint: AVG(final_mfe) WHERE final_mfe IS NOT NULL
+CREATE INDEX IF NOT EXISTS idx_automated_signals_final_mfe
+    ON automated_signals (final_mfe)
+    WHERE final_mfe IS NOT NULL;
+
+-- load_v2_trades (time_analyzer.py): full pull ORDER BY trade_id, timestamp.
+-- Covering so the scan is index-only and already in output order (no sort).
+CREATE INDEX IF NOT EXISTS idx_automated_signals_trade_ts_cover
+    ON automated_signals (trade_id, timestamp)
+    INCLUDE (event_type, direction, entry_price, stop_loss, be_mfe, no_be_mfe, session);
+
+ANALYZE automated_signals;
@@ -0,0 +1,151 @@
+-- Automated Signals - Monthly Range Partitioning
+-- Converts automated_signals into a table partitioned by RANGE (signal_date), one partition per month.
+-- Run once, then re-run automated_signals_hot_path_indexes.sql to build the indexes on the parent.
+--
+-- - The original heap is kept as automated_signals_unpartitioned (drop it after verification)
+-- - Rows with NULL signal_date are backfilled from timestamp where possible;
+--   anything still NULL (or outside created months) lands in automated_signals_default
+-- - The id sequence is re-owned by the new table so inserts continue unchanged
+-- - CHECK constraints are copied; triggers (stats counters, signals feed, integrity
+--   dirty marks) are moved to the new parent after the copy, so the copy itself does
+--   not re-count rows the derived tables already hold
+-- - ensure_automated_signals_partition() moves a month's rows out of the default
+--   partition before attaching it, so a late partition never fails on rows that
+--   landed there while the month was uncovered
+-- - Idempotent: exits early if automated_signals is already partitioned
+
+CREATE OR REPLACE FUNCTION ensure_automated_signals_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::date;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::date;
+    part_name TEXT := format('automated_signals_y%sm%s', to_char(month_start, 'YYYY'), to_char(month_start, 'MM'));
+BEGIN
+    IF to_regclass(part_name) IS NOT NULL THEN
+        RETURN part_name;
+    END IF;
+
+    IF to_regclass('automated_signals_default') IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF automated_signals FOR VALUES FROM (%L) TO (%L)',
+            part_name, month_start, month_end
+        );
+        RETURN part_name;
+    END IF;
+
+    -- Attaching validates that the default partition holds no rows of the new range,
+    -- so move them first. Direct DML on partitions does not fire the parent's
+    -- statement triggers, so derived tables see no change.
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE automated_signals INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        part_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM automated_signals_default
+                        WHERE signal_date >= %L AND signal_date < %L RETURNING *)
+         INSERT INTO %I SELECT * FROM moved',
+        month_start, month_end, part_name
+    );
+    EXECUTE format(
+        'ALTER TABLE automated_signals ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        part_name, month_start, month_end
+    );
+    RETURN part_name;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    ts_type TEXT;
+    min_month DATE;
+    max_month DATE;
+    m DATE;
+    idx RECORD;
+    trg RECORD;
+    seq_name TEXT;
+BEGIN
+    IF (SELECT c.relkind FROM pg_class c
+        WHERE c.oid = to_regclass('automated_signals')) = 'p' THEN
+        RAISE NOTICE 'automated_signals is already partitioned - skipping';
+        RETURN;
+    END IF;
+
+    -- Backfill signal_date so rows route to month partitions instead of the default one
+    SELECT data_type INTO ts_type
+    FROM information_schema.columns
+    WHERE table_schema = current_schema()
+      AND table_name = 'automated_signals'
+      AND column_name = 'timestamp';
+
+    IF ts_type IN ('bigint', 'integer') THEN
+        -- Epoch milliseconds from TradingView
+        UPDATE automated_signals
+        SET signal_date = (to_timestamp(timestamp / 1000.0) AT TIME ZONE 'America/New_York')::date
+        WHERE signal_date IS NULL AND timestamp IS NOT NULL;
+    ELSIF ts_type IS NOT NULL THEN
+        UPDATE automated_signals
+        SET signal_date = timestamp::date
+        WHERE signal_date IS NULL AND timestamp IS NOT NULL;
+    END IF;
+
+    -- Keep the old heap as a backup; free its index names for the new parent
+    ALTER TABLE automated_signals RENAME TO automated_signals_unpartitioned;
+    FOR idx IN
+        SELECT i.relname AS index_name, con.conname AS constraint_name
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        LEFT JOIN pg_constraint con ON con.conindid = x.indexrelid
+        WHERE x.indrelid = 'automated_signals_unpartitioned'::regclass
+    LOOP
+        IF idx.constraint_name IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE automated_signals_unpartitioned RENAME CONSTRAINT %I TO %I',
+                           idx.constraint_name, left(idx.constraint_name || '_unpartitioned', 63));
+        ELSE
+            EXECUTE format('DROP INDEX %I', idx.index_name);
+        END IF;
+    END LOOP;
+
+    -- Same columns/defaults/CHECKs; id uniqueness comes from the sequence (a partitioned
+    -- primary key would have to include signal_date, which is nullable)
+    CREATE TABLE automated_signals
+        (LIKE automated_signals_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)
+        PARTITION BY RANGE (signal_date);
+    ALTER TABLE automated_signals ALTER COLUMN id SET NOT NULL;
+
+    seq_name := pg_get_serial_sequence('automated_signals_unpartitioned', 'id');
+    IF seq_name IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY automated_signals.id', seq_name);
+    END IF;
+
+    CREATE TABLE automated_signals_default PARTITION OF automated_signals DEFAULT;
+
+    SELECT date_trunc('month', MIN(signal_date))::date, date_trunc('month', MAX(signal_date))::date
+    INTO min_month, max_month
+    FROM automated_signals_unpartitioned;
+
+    min_month := COALESCE(min_month, date_trunc('month', CURRENT_DATE)::date);
+    max_month := GREATEST(COALESCE(max_month, CURRENT_DATE), CURRENT_DATE);
+    -- Three months of headroom; the runner extends this on every deploy
+    max_month := (date_trunc('month', max_month) + INTERVAL '3 months')::date;
+
+    m := min_month;
+    WHILE m <= max_month LOOP
+        PERFORM ensure_automated_signals_partition(m);
+        m := (m + INTERVAL '1 month')::date;
+    END LOOP;
+
+    INSERT INTO automated_signals SELECT * FROM automated_signals_unpartitioned;
+
+    -- Move user triggers over only now, so the copy above is not counted twice
+    FOR trg IN
+        SELECT t.tgname, pg_get_triggerdef(t.oid) AS def
+        FROM pg_trigger t
+        WHERE t.tgrelid = 'automated_signals_unpartitioned'::regclass AND NOT t.tgisinternal
+    LOOP
+        EXECUTE regexp_replace(trg.def, ' ON (\S+\.)?automated_signals_unpartitioned ', ' ON automated_signals ');
+        EXECUTE format('DROP TRIGGER %I ON automated_signals_unpartitioned', trg.tgname);
+    END LOOP;
+
+    CREATE INDEX IF NOT EXISTS idx_automated_signals_id ON automated_signals (id);
+END;
+$$;
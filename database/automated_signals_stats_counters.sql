@@ -0,0 +1,167 @@
+-- Automated Signals - Incremental Stats Counters
+-- Backs /api/automated-signals/stats with counters maintained by statement-level
+-- triggers (transition tables), so the endpoint reads 16 small rows instead of
+-- scanning automated_signals on every poll.
+--
+-- - Every INSERT / UPDATE / DELETE statement on automated_signals adjusts the counters
+--   in the same transaction (rolled-back webhook inserts never touch them)
+-- - Counters are striped over 16 slots by backend pid so concurrent webhooks don't
+--   serialize on one row lock; readers SUM the slots
+-- - trade_count (distinct trade_id) moves when a trade's first row is inserted or its
+--   last row deleted; two concurrent first events for one trade can miscount,
+--   which the scheduled reconciliation (automated_signals_stats.py) repairs
+-- - TRUNCATE resets the counters
+-- - Idempotent; re-running re-seeds the counters from a full recount
+
+CREATE TABLE IF NOT EXISTS automated_signals_stats_counters (
+    slot SMALLINT PRIMARY KEY,
+    total_events BIGINT NOT NULL DEFAULT 0,
+    trade_count BIGINT NOT NULL DEFAULT 0,
+    entry_count BIGINT NOT NULL DEFAULT 0,
+    exit_count BIGINT NOT NULL DEFAULT 0,
+    final_mfe_count BIGINT NOT NULL DEFAULT 0,
+    final_mfe_sum NUMERIC NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS automated_signals_stats_reconciliation (
+    id BIGSERIAL PRIMARY KEY,
+    checked_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    in_sync BOOLEAN NOT NULL,
+    repaired BOOLEAN NOT NULL DEFAULT FALSE,
+    counters JSONB NOT NULL,
+    recount JSONB NOT NULL,
+    duration_ms INTEGER
+);
+
+-- Adds one statement's deltas to this backend's slot
+CREATE OR REPLACE FUNCTION automated_signals_stats_add(
+    d_total BIGINT, d_trades BIGINT, d_entry BIGINT, d_exit BIGINT,
+    d_mfe_count BIGINT, d_mfe_sum NUMERIC
+) RETURNS VOID AS $$
+BEGIN
+    IF d_total <> 0 OR d_trades <> 0 OR d_entry <> 0 OR d_exit <> 0 OR d_mfe_count <> 0 OR d_mfe_sum <> 0 THEN
+        INSERT INTO automated_signals_stats_counters AS c
+            (slot, total_events, trade_count, entry_count, exit_count, final_mfe_count, final_mfe_sum)
+        VALUES (pg_backend_pid() % 16, d_total, d_trades, d_entry, d_exit, d_mfe_count, d_mfe_sum)
+        ON CONFLICT (slot) DO UPDATE SET
+            total_events = c.total_events + EXCLUDED.total_events,
+            trade_count = c.trade_count + EXCLUDED.trade_count,
+            entry_count = c.entry_count + EXCLUDED.entry_count,
+            exit_count = c.exit_count + EXCLUDED.exit_count,
+            final_mfe_count = c.final_mfe_count + EXCLUDED.final_mfe_count,
+            final_mfe_sum = c.final_mfe_sum + EXCLUDED.final_mfe_sum,
+            updated_at = NOW();
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level triggers read the transition tables, so a multi-row INSERT or DELETE
+-- costs one counter upsert. A trade is new when no row older than its first inserted
+-- row exists, and gone when a DELETE leaves no rows for it.
+CREATE OR REPLACE FUNCTION automated_signals_stats_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM automated_signals_stats_add(
+        (SELECT COUNT(*) FROM new_rows),
+        (SELECT COUNT(*) FROM (
+            SELECT n.trade_id, MIN(n.id) AS first_id FROM new_rows n
+            WHERE n.trade_id IS NOT NULL GROUP BY n.trade_id
+         ) t
+         WHERE NOT EXISTS (
+            SELECT 1 FROM automated_signals a WHERE a.trade_id = t.trade_id AND a.id < t.first_id
+         )),
+        (SELECT COUNT(*) FROM new_rows WHERE event_type = 'ENTRY'),
+        (SELECT COUNT(*) FROM new_rows WHERE event_type LIKE 'EXIT_%'),
+        (SELECT COUNT(final_mfe) FROM new_rows),
+        (SELECT COALESCE(SUM(final_mfe), 0) FROM new_rows)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION automated_signals_stats_on_delete() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM automated_signals_stats_add(
+        -(SELECT COUNT(*) FROM old_rows),
+        -(SELECT COUNT(*) FROM (
+            SELECT DISTINCT o.trade_id FROM old_rows o WHERE o.trade_id IS NOT NULL
+         ) t
+         WHERE NOT EXISTS (SELECT 1 FROM automated_signals a WHERE a.trade_id = t.trade_id)),
+        -(SELECT COUNT(*) FROM old_rows WHERE event_type = 'ENTRY'),
+        -(SELECT COUNT(*) FROM old_rows WHERE event_type LIKE 'EXIT_%'),
+        -(SELECT COUNT(final_mfe) FROM old_rows),
+        -(SELECT COALESCE(SUM(final_mfe), 0) FROM old_rows)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- UPDATEs can reclassify event_type / final_mfe; re-keying trade_id is left to reconciliation
+CREATE OR REPLACE FUNCTION automated_signals_stats_on_update() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM automated_signals_stats_add(
+        0,
+        0,
+        (SELECT COUNT(*) FROM new_rows WHERE event_type = 'ENTRY')
+            - (SELECT COUNT(*) FROM old_rows WHERE event_type = 'ENTRY'),
+        (SELECT COUNT(*) FROM new_rows WHERE event_type LIKE 'EXIT_%')
+            - (SELECT COUNT(*) FROM old_rows WHERE event_type LIKE 'EXIT_%'),
+        (SELECT COUNT(final_mfe) FROM new_rows) - (SELECT COUNT(final_mfe) FROM old_rows),
+        (SELECT COALESCE(SUM(final_mfe), 0) FROM new_rows) - (SELECT COALESCE(SUM(final_mfe), 0) FROM old_rows)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION automated_signals_stats_truncate() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM automated_signals_stats_counters;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- trade_count probes and the stats endpoint's MAX(timestamp) freshness check
+CREATE INDEX IF NOT EXISTS idx_automated_signals_trade_id ON automated_signals (trade_id);
+CREATE INDEX IF NOT EXISTS idx_automated_signals_timestamp ON automated_signals (timestamp);
+
+DROP TRIGGER IF EXISTS trg_automated_signals_stats_insert ON automated_signals;
+CREATE TRIGGER trg_automated_signals_stats_insert
+    AFTER INSERT ON automated_signals
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_stats_on_insert();
+
+DROP TRIGGER IF EXISTS trg_automated_signals_stats_update ON automated_signals;
+CREATE TRIGGER trg_automated_signals_stats_update
+    AFTER UPDATE ON automated_signals
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_stats_on_update();
+
+DROP TRIGGER IF EXISTS trg_automated_signals_stats_delete ON automated_signals;
+CREATE TRIGGER trg_automated_signals_stats_delete
+    AFTER DELETE ON automated_signals
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_stats_on_delete();
+
+DROP TRIGGER IF EXISTS trg_automated_signals_stats_truncate ON automated_signals;
+CREATE TRIGGER trg_automated_signals_stats_truncate
+    AFTER TRUNCATE ON automated_signals
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_stats_truncate();
+
+-- Seed from a full recount. SHARE mode blocks writers only for the duration of the
+-- recount, so no insert can land between the count and the counter reset.
+DO $$
+BEGIN
+    LOCK TABLE automated_signals IN SHARE MODE;
+    DELETE FROM automated_signals_stats_counters;
+    INSERT INTO automated_signals_stats_counters
+        (slot, total_events, trade_count, entry_count, exit_count, final_mfe_count, final_mfe_sum)
+    SELECT 0,
+           COUNT(*),
+           COUNT(DISTINCT trade_id),
+           COUNT(*) FILTER (WHERE event_type = 'ENTRY'),
+           COUNT(*) FILTER (WHERE event_type LIKE 'EXIT_%'),
+           COUNT(final_mfe),
+           COALESCE(SUM(final_mfe), 0)
+    FROM automated_signals;
+END;
+$$;
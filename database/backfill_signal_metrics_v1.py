@@ -6,6 +6,9 @@ import os, sys, psycopg2, argparse
 from dotenv import load_dotenv
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bar_range_index import BarRangeIndex, compute_trade_excursion
+
 load_dotenv()
 
 parser = argparse.ArgumentParser()
@@ -51,6 +54,13 @@ if args.dry_run:
     conn.close()
     sys.exit(0)
 
+# One bar load per symbol covering every trade window, queried in memory per trade
+bar_indexes = {}
+for symbol in sorted({t[1] for t in trades if t[1] and t[3] is not None and t[4] is not None}):
+    windows = [(t[3], t[4]) for t in trades if t[1] == symbol and t[3] is not None and t[4] is not None]
+    bar_indexes[symbol] = BarRangeIndex.load(cursor, symbol, min(w[0] for w in windows), max(w[1] for w in windows))
+    print(f"Loaded {len(bar_indexes[symbol])} bars for {symbol}")
+
 computed = 0
 skipped = 0
 for trade in trades:
@@ -88,13 +98,14 @@ for trade in trades:
         skipped += 1
         continue
     
-    # Fetch bars
+    # Locate bars
+    index = bar_indexes.get(symbol)
+    window = index.position_range(entry_ts, exit_ts) if index is not None else None
+    bars_found = window[1] - window[0] + 1 if window else 0
     print(f"FETCH {trade_id}: entry_bar_open_ts={entry_ts}, exit_bar_open_ts={exit_ts}")
-    cursor.execute("SELECT ts, high, low FROM market_bars_ohlcv_1m_clean WHERE symbol = %s AND ts >= %s AND ts <= %s ORDER BY ts", (symbol, entry_ts, exit_ts))
-    bars = cursor.fetchall()
-    print(f"  bars_found_count={len(bars)}")
+    print(f"  bars_found_count={bars_found}")
     
-    if len(bars) == 0:
+    if bars_found == 0:
         print(f"SKIP {trade_id} reason=no_bars_found")
         skipped += 1
         continue
@@ -109,54 +120,14 @@ for trade in trades:
         skipped += 1
         continue
     
-    if direction == 'Bullish':
-        highest = entry_price
-        lowest = entry_price
-        mae = 0.0
-        be_triggered = False
-        be_trigger_ts = None
-        
-        for i, bar in enumerate(bars):
-            bar_ts, high, low = bar[0], float(bar[1]), float(bar[2])
-            
-            # Check stop hit
-            stop_hit = low <= stop_loss
-            
-            if not stop_hit:
-                highest = max(highest, high)
-                lowest = min(lowest, low)
-                mae = min(mae, (lowest - entry_price) / risk)
-                
-                # BE check
-                if not be_triggered and highest >= entry_price + risk:
-                    be_triggered = True
-                    be_trigger_ts = bar_ts
-        
-        mfe_no_be = (highest - entry_price) / risk
-        mfe_be = min(mfe_no_be, (highest - entry_price) / risk) if be_triggered else mfe_no_be
-    else:
-        highest = entry_price
-        lowest = entry_price
-        mae = 0.0
-        be_triggered = False
-        be_trigger_ts = None
-        
-        for i, bar in enumerate(bars):
-            bar_ts, high, low = bar[0], float(bar[1]), float(bar[2])
-            
-            stop_hit = high >= stop_loss
-            
-            if not stop_hit:
-                highest = max(highest, high)
-                lowest = min(lowest, low)
-                mae = min(mae, (entry_price - highest) / risk)
-                
-                if not be_triggered and lowest <= entry_price - risk:
-                    be_triggered = True
-                    be_trigger_ts = bar_ts
-        
-        mfe_no_be = (entry_price - lowest) / risk
-        mfe_be = min(mfe_no_be, (entry_price - lowest) / risk) if be_triggered else mfe_no_be
+    metrics = compute_trade_excursion(index, direction, entry_ts, exit_ts, entry_price, stop_loss)
+    mfe_no_be = metrics['no_be_mfe']
+    mfe_be = metrics['be_mfe']
+    mae = metrics['mae_global_r']
+    highest = metrics['highest_high']
+    lowest = metrics['lowest_low']
+    be_triggered = metrics['be_triggered']
+    be_trigger_ts = metrics['be_trigger_bar_open_ts']
     
     # Upsert
     try:
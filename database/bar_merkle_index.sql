@@ -0,0 +1,41 @@
+-- Bar Merkle Index
+-- Persisted day/month/year hash tree over 1m bars, behind /api/hist/v1/quality/determinism
+-- and services/deterministic_replay.
+--
+-- - bar_merkle_days holds one leaf per (symbol, dataset_version_id, UTC day). bar_digests is
+--   the day's bars in ts order, 10 bytes each: minute-of-day (int2, big endian) followed by
+--   the first 8 bytes of sha256 over the canonical bar encoding
+--   'YYYY-MM-DDTHH:MI:SS|open|high|low|close|volume' (UTC, prices to 6 dp, volume truncated).
+--   leaf_hash = sha256('YYYY-MM-DD' || bar_digests).
+-- - bar_merkle_nodes rolls leaves up: month = sha256('YYYY-MM' || day leaves by day),
+--   year = sha256('YYYY' || month nodes by month).
+-- - market_bars_ohlcv_1m bars are keyed by their dataset_version_id ('' while unstamped);
+--   market_bars_ohlcv_1m_clean bars use the dataset_version_id 'clean'.
+-- - Maintained by services/bar_merkle_index.refresh_range() from the ingest, clean and
+--   version-stamping scripts. Idempotent.
+
+CREATE TABLE IF NOT EXISTS bar_merkle_days (
+    symbol TEXT NOT NULL,
+    dataset_version_id TEXT NOT NULL,
+    day DATE NOT NULL,
+    bar_count INTEGER NOT NULL,
+    leaf_hash BYTEA NOT NULL,
+    bar_digests BYTEA NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (symbol, dataset_version_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS bar_merkle_nodes (
+    symbol TEXT NOT NULL,
+    dataset_version_id TEXT NOT NULL,
+    level TEXT NOT NULL CHECK (level IN ('month', 'year')),
+    period DATE NOT NULL,
+    node_hash BYTEA NOT NULL,
+    child_count INTEGER NOT NULL,
+    bar_count BIGINT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (symbol, dataset_version_id, level, period)
+);
+
+COMMENT ON TABLE bar_merkle_days IS 'Per-day Merkle leaves over canonical 1m bar encodings';
+COMMENT ON TABLE bar_merkle_nodes IS 'Month and year Merkle nodes rolled up from bar_merkle_days';
@@ -0,0 +1,26 @@
+-- Multi-timeframe OHLCV rollups
+-- Precomputed 5m/15m/60m/240m/1d bars built from market_bars_ohlcv_1m_clean, served by
+-- /api/hist/v1/bars?tf=...
+--
+-- - Buckets are UTC-aligned and keyed by their open time, matching the HTF bar boundaries
+--   of market_parity.htf_bias (5m/15m/hour/4h from 00:00 UTC, 1d = UTC day).
+-- - 5m rolls up from the 1m clean bars; each higher timeframe rolls up from the one below.
+-- - bar_count is the number of 1m bars in the bucket (partial buckets have fewer).
+-- - Maintained by services/bar_rollups.refresh_rollups() from the clean ingest scripts.
+--   Idempotent.
+
+CREATE TABLE IF NOT EXISTS market_bars_ohlcv_rollup (
+    symbol TEXT NOT NULL,
+    tf TEXT NOT NULL CHECK (tf IN ('5m', '15m', '60m', '240m', '1d')),
+    ts TIMESTAMPTZ NOT NULL,
+    open NUMERIC NOT NULL,
+    high NUMERIC NOT NULL,
+    low NUMERIC NOT NULL,
+    close NUMERIC NOT NULL,
+    volume BIGINT NOT NULL DEFAULT 0,
+    bar_count INTEGER NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (symbol, tf, ts)
+);
+
+COMMENT ON TABLE market_bars_ohlcv_rollup IS 'UTC-bucketed OHLCV rollups of market_bars_ohlcv_1m_clean';
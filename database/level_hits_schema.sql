@@ -0,0 +1,58 @@
+-- Level Tracking - upsert keys for level_hits / level_accuracy
+-- level_hit_evaluator.backfill_level_hits writes level_hits with one upsert per run
+-- and LevelTracker.update_accuracy_scores writes level_accuracy with one upsert per
+-- rescore. Both need unique keys that the tables created by LevelTracker.setup_tables
+-- lack, so this adds them here rather than on every LevelTracker construction.
+--
+-- - Creates the level tracking tables if LevelTracker hasn't yet
+-- - Adds level_hits.overshoot
+-- - Drops duplicate rows left by the old per-level INSERTs, keeping the newest per key
+-- - Idempotent
+
+CREATE TABLE IF NOT EXISTS daily_levels (
+    id SERIAL PRIMARY KEY,
+    date DATE UNIQUE,
+    support_levels JSON,
+    resistance_levels JSON,
+    pivot_level DECIMAL(10,2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS level_hits (
+    id SERIAL PRIMARY KEY,
+    date DATE,
+    level_type VARCHAR(20),
+    predicted_level DECIMAL(10,2),
+    actual_hit BOOLEAN,
+    hit_time TIME,
+    price_at_hit DECIMAL(10,2),
+    distance_from_level DECIMAL(10,2),
+    overshoot DECIMAL(10,2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS level_accuracy (
+    id SERIAL PRIMARY KEY,
+    level_type VARCHAR(20),
+    total_predictions INTEGER,
+    total_hits INTEGER,
+    accuracy_percentage DECIMAL(5,2),
+    confidence_score DECIMAL(5,2),
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE level_hits ADD COLUMN IF NOT EXISTS overshoot DECIMAL(10,2);
+
+DELETE FROM level_hits a
+USING level_hits b
+WHERE a.date = b.date AND a.level_type = b.level_type AND a.predicted_level = b.predicted_level
+  AND a.id < b.id;
+
+DELETE FROM level_accuracy a
+USING level_accuracy b
+WHERE a.level_type = b.level_type AND a.id < b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_level_hits_date_type_level
+    ON level_hits (date, level_type, predicted_level);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_level_accuracy_level_type
+    ON level_accuracy (level_type);
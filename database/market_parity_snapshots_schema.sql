@@ -0,0 +1,27 @@
+-- Market Parity Engine Snapshots
+-- Purpose: Resume BiasEngineFvgIfvg / HTFBiasEngine range computations from the
+-- nearest day boundary instead of replaying warmup history
+
+CREATE TABLE IF NOT EXISTS market_parity_snapshots_v1 (
+    symbol TEXT NOT NULL,
+    ts TIMESTAMPTZ NOT NULL,
+    logic_version TEXT NOT NULL,
+    format_version SMALLINT NOT NULL,
+    state BYTEA NOT NULL,
+    bars_processed BIGINT NOT NULL,
+    origin_ts TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (symbol, ts, logic_version)
+);
+
+-- Nearest-snapshot lookup: latest ts <= target for (symbol, logic_version)
+CREATE INDEX IF NOT EXISTS idx_market_parity_snapshots_lookup
+    ON market_parity_snapshots_v1(symbol, logic_version, ts DESC);
+
+COMMENT ON TABLE market_parity_snapshots_v1 IS 'Binary engine state snapshots (market_parity/snapshot.py) taken at UTC day boundaries';
+COMMENT ON COLUMN market_parity_snapshots_v1.ts IS 'OPEN time of the first 1m bar not yet applied (resume fetches ts >= this)';
+COMMENT ON COLUMN market_parity_snapshots_v1.logic_version IS 'Git hash or version of bias calculation logic';
+COMMENT ON COLUMN market_parity_snapshots_v1.format_version IS 'Snapshot binary format version (SNAPSHOT_FORMAT_VERSION)';
+COMMENT ON COLUMN market_parity_snapshots_v1.state IS 'Versioned binary snapshot (MPSN header + zlib body)';
+COMMENT ON COLUMN market_parity_snapshots_v1.origin_ts IS 'First bar of the replay chain the state was built from';
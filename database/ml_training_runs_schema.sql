@@ -0,0 +1,31 @@
+-- ML Training Runs Log
+-- Purpose: Wall-clock and CPU cost of every ML training cycle (warm starts, full refits,
+-- hyperparameter searches) so the modes can be compared over time
+
+CREATE TABLE IF NOT EXISTS ml_training_runs (
+    id BIGSERIAL PRIMARY KEY,
+    engine TEXT NOT NULL,
+    mode TEXT NOT NULL CHECK (mode IN ('warm_start', 'full_refit', 'hyperparameter_search')),
+    reason TEXT,
+    samples_total INTEGER NOT NULL DEFAULT 0,
+    samples_new INTEGER NOT NULL DEFAULT 0,
+    wall_seconds NUMERIC(10, 3),
+    cpu_seconds NUMERIC(10, 3),
+    metrics JSONB,
+    status TEXT NOT NULL DEFAULT 'success' CHECK (status IN ('success', 'failed')),
+    error TEXT,
+    run_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Index for latest-run lookups per engine and mode
+CREATE INDEX IF NOT EXISTS idx_ml_training_runs_engine_mode ON ml_training_runs(engine, mode, run_at DESC);
+
+COMMENT ON TABLE ml_training_runs IS 'Cost and outcome of each ML training cycle';
+COMMENT ON COLUMN ml_training_runs.engine IS 'Trained engine (e.g., unified_ml, hyperparameter_optimizer)';
+COMMENT ON COLUMN ml_training_runs.mode IS 'warm_start, full_refit, or hyperparameter_search';
+COMMENT ON COLUMN ml_training_runs.reason IS 'Scheduler trigger that selected the mode';
+COMMENT ON COLUMN ml_training_runs.samples_total IS 'Labeled trades available to the cycle';
+COMMENT ON COLUMN ml_training_runs.samples_new IS 'Labeled trades the models had not been fit on';
+COMMENT ON COLUMN ml_training_runs.wall_seconds IS 'Wall-clock duration of the cycle';
+COMMENT ON COLUMN ml_training_runs.cpu_seconds IS 'CPU time of the server process during the cycle (excludes worker processes)';
+COMMENT ON COLUMN ml_training_runs.metrics IS 'Evaluation metrics reported by the cycle';
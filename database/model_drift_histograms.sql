@@ -0,0 +1,134 @@
+-- Model Drift - Streaming Feature Histograms
+-- Backs /api/model-drift with per-day fixed-bin histograms of the encoded model
+-- features, maintained by statement-level triggers (transition tables) on
+-- signal_lab_trades. The endpoint sums the day buckets of each window instead of
+-- re-reading the trades on every request.
+--
+-- - One row per (day, feature, bin); a window's histogram is the SUM over its days,
+--   so any set of days merges by addition
+-- - Bins are the model encodings (model_drift_bins); model_drift_detector.DRIFT_BINS
+--   must list the same features and bin counts
+-- - Rows without created_at are not counted (no window would include them)
+-- - TRUNCATE resets the histograms
+-- - Idempotent; re-running re-seeds the histograms from a full recount
+
+CREATE TABLE IF NOT EXISTS model_drift_histograms (
+    bucket_date DATE NOT NULL,
+    feature TEXT NOT NULL,
+    bin SMALLINT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (bucket_date, feature, bin)
+);
+
+-- Feature encodings used by ModelDriftDetector (bias: Bullish=1, session: NY AM=1,
+-- NY PM=2, London=3, anything else 0)
+CREATE OR REPLACE FUNCTION model_drift_bins(p_bias TEXT, p_session TEXT)
+RETURNS TABLE (feature TEXT, bin SMALLINT) AS $$
+    VALUES
+        ('bias', (CASE WHEN p_bias = 'Bullish' THEN 1 ELSE 0 END)::SMALLINT),
+        ('session', (CASE
+            WHEN p_session = 'NY AM' THEN 1
+            WHEN p_session = 'NY PM' THEN 2
+            WHEN p_session = 'London' THEN 3
+            ELSE 0
+        END)::SMALLINT)
+$$ LANGUAGE SQL IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION model_drift_histograms_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO model_drift_histograms AS h (bucket_date, feature, bin, count)
+    SELECT n.created_at::date, b.feature, b.bin, COUNT(*)
+    FROM new_rows n CROSS JOIN LATERAL model_drift_bins(n.bias, n.session) b
+    WHERE n.created_at IS NOT NULL
+    GROUP BY 1, 2, 3
+    ON CONFLICT (bucket_date, feature, bin) DO UPDATE SET
+        count = h.count + EXCLUDED.count,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION model_drift_histograms_on_delete() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE model_drift_histograms h SET count = h.count - d.removed, updated_at = NOW()
+    FROM (
+        SELECT o.created_at::date AS bucket_date, b.feature, b.bin, COUNT(*) AS removed
+        FROM old_rows o CROSS JOIN LATERAL model_drift_bins(o.bias, o.session) b
+        WHERE o.created_at IS NOT NULL
+        GROUP BY 1, 2, 3
+    ) d
+    WHERE h.bucket_date = d.bucket_date AND h.feature = d.feature AND h.bin = d.bin;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Most UPDATEs (MFE / BE tracking) leave bias, session and created_at alone; their
+-- old and new rows cancel out and no histogram row is touched
+CREATE OR REPLACE FUNCTION model_drift_histograms_on_update() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO model_drift_histograms AS h (bucket_date, feature, bin, count)
+    SELECT bucket_date, feature, bin, SUM(delta)
+    FROM (
+        SELECT n.created_at::date AS bucket_date, b.feature, b.bin, 1 AS delta
+        FROM new_rows n CROSS JOIN LATERAL model_drift_bins(n.bias, n.session) b
+        WHERE n.created_at IS NOT NULL
+        UNION ALL
+        SELECT o.created_at::date, b.feature, b.bin, -1
+        FROM old_rows o CROSS JOIN LATERAL model_drift_bins(o.bias, o.session) b
+        WHERE o.created_at IS NOT NULL
+    ) d
+    GROUP BY 1, 2, 3
+    HAVING SUM(delta) <> 0
+    ON CONFLICT (bucket_date, feature, bin) DO UPDATE SET
+        count = h.count + EXCLUDED.count,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION model_drift_histograms_truncate() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM model_drift_histograms;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_model_drift_histograms_insert ON signal_lab_trades;
+CREATE TRIGGER trg_model_drift_histograms_insert
+    AFTER INSERT ON signal_lab_trades
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION model_drift_histograms_on_insert();
+
+DROP TRIGGER IF EXISTS trg_model_drift_histograms_update ON signal_lab_trades;
+CREATE TRIGGER trg_model_drift_histograms_update
+    AFTER UPDATE ON signal_lab_trades
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION model_drift_histograms_on_update();
+
+DROP TRIGGER IF EXISTS trg_model_drift_histograms_delete ON signal_lab_trades;
+CREATE TRIGGER trg_model_drift_histograms_delete
+    AFTER DELETE ON signal_lab_trades
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION model_drift_histograms_on_delete();
+
+DROP TRIGGER IF EXISTS trg_model_drift_histograms_truncate ON signal_lab_trades;
+CREATE TRIGGER trg_model_drift_histograms_truncate
+    AFTER TRUNCATE ON signal_lab_trades
+    FOR EACH STATEMENT EXECUTE FUNCTION model_drift_histograms_truncate();
+
+-- Seed from a full recount under SHARE mode so no write lands between the recount
+-- and the reset
+DO $$
+BEGIN
+    LOCK TABLE signal_lab_trades IN SHARE MODE;
+    DELETE FROM model_drift_histograms;
+    INSERT INTO model_drift_histograms (bucket_date, feature, bin, count)
+    SELECT t.created_at::date, b.feature, b.bin, COUNT(*)
+    FROM signal_lab_trades t CROSS JOIN LATERAL model_drift_bins(t.bias, t.session) b
+    WHERE t.created_at IS NOT NULL
+    GROUP BY 1, 2, 3;
+END;
+$$;
+
+COMMENT ON TABLE model_drift_histograms IS 'Per-day fixed-bin histograms of model features for /api/model-drift (trigger-maintained)';
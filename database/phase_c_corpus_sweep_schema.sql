@@ -0,0 +1,26 @@
+-- Phase C Corpus Sweep Schema
+-- One signal_corpus_runs row per (symbol, filter config); this table groups the
+-- runs of a sweep and keeps each config's filter settings and summary stats
+
+CREATE TABLE IF NOT EXISTS signal_corpus_sweep_results (
+    sweep_id UUID NOT NULL,
+    run_id UUID NOT NULL REFERENCES signal_corpus_runs(run_id) ON DELETE CASCADE,
+    symbol TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    config JSONB NOT NULL,
+    total_triangles BIGINT NOT NULL,
+    bull_count BIGINT NOT NULL,
+    bear_count BIGINT NOT NULL,
+    min_ts TIMESTAMPTZ NULL,
+    max_ts TIMESTAMPTZ NULL,
+    bars_evaluated BIGINT NOT NULL,
+    triangles_per_1k_bars NUMERIC(12, 3) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (sweep_id, symbol, config_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_corpus_sweep_results_run
+    ON signal_corpus_sweep_results(run_id);
+
+COMMENT ON TABLE signal_corpus_sweep_results IS 'Per-config summary of a Phase C filter sweep (scripts/phase_c_sweep_corpus_runs.py)';
+COMMENT ON COLUMN signal_corpus_sweep_results.config_name IS 'HTF subset and engulfing mode, e.g. h1+m15|sweep or no_htf|none';
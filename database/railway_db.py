@@ -18,8 +18,8 @@ else:
 if not DATABASE_URL:
     raise Exception("❌ DATABASE_URL is missing — Railway DB cannot be reached.")
 
-# Connect to Railway PostgreSQL with SSL
-conn = psycopg2.connect(DATABASE_URL, sslmode='require', cursor_factory=RealDictCursor)
+# Connect to Railway PostgreSQL with SSL (DATABASE_SSLMODE=disable for a local Postgres)
+conn = psycopg2.connect(DATABASE_URL, sslmode=environ.get("DATABASE_SSLMODE", "require"), cursor_factory=RealDictCursor)
 conn.set_isolation_level(extensions.ISOLATION_LEVEL_READ_COMMITTED)
 conn.rollback()
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Run Automated Signals Performance Migration
+Adds hot-path composite/covering/partial indexes to automated_signals and,
+with --partition, converts the table to monthly RANGE (signal_date) partitions.
+
+Usage:
+    python database/run_automated_signals_performance_migration.py
+    python database/run_automated_signals_performance_migration.py --partition
+
+--partition can run before or after the migrations that put triggers on
+automated_signals (stats counters, signals feed, signal integrity): existing
+triggers are moved to the partitioned table. Months that fell behind the
+partition headroom are created on the next run; their rows are moved out of
+automated_signals_default as the partition is created.
+"""
+
+import argparse
+import os
+from datetime import date
+
+import psycopg2
+from dotenv import load_dotenv
+
+INDEX_SQL = 'database/automated_signals_hot_path_indexes.sql'
+PARTITION_SQL = 'database/automated_signals_partitioning.sql'
+PARTITION_HEADROOM_MONTHS = 3
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def is_partitioned(cursor):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('automated_signals')")
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def ensure_future_partitions(cursor, months=PARTITION_HEADROOM_MONTHS):
+    """
+    Create month partitions from the current month through `months` ahead, plus any
+    month whose rows landed in the default partition while it was uncovered
+    """
+    today = date.today()
+    wanted = set()
+    for offset in range(months + 1):
+        year = today.year + (today.month - 1 + offset) // 12
+        month = (today.month - 1 + offset) % 12 + 1
+        wanted.add(date(year, month, 1))
+    cursor.execute("""
+        SELECT DISTINCT date_trunc('month', signal_date)::date
+        FROM automated_signals_default
+        WHERE signal_date IS NOT NULL
+    """)
+    wanted.update(row[0] for row in cursor.fetchall())
+
+    created = []
+    for month in sorted(wanted):
+        cursor.execute("SELECT ensure_automated_signals_partition(%s)", (month,))
+        created.append(cursor.fetchone()[0])
+    return created
+
+
+def run_migration(conn, partition=False):
+    cursor = conn.cursor()
+
+    if partition:
+        print("Partitioning automated_signals by month (signal_date)...")
+        cursor.execute(_read(PARTITION_SQL))
+        conn.commit()
+
+    print("Creating hot-path indexes...")
+    cursor.execute(_read(INDEX_SQL))
+    conn.commit()
+
+    if is_partitioned(cursor):
+        parts = ensure_future_partitions(cursor)
+        conn.commit()
+        print(f"   Partitions ensured through {parts[-1]}")
+
+    cursor.execute("""
+        SELECT indexname FROM pg_indexes
+        WHERE tablename = 'automated_signals'
+        ORDER BY indexname
+    """)
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return indexes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="automated_signals performance migration")
+    parser.add_argument('--partition', action='store_true', help="Convert to monthly partitions first")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Automated Signals Performance Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    indexes = run_migration(conn, partition=args.partition)
+    conn.close()
+
+    print(f"\n✅ automated_signals indexes ({len(indexes)}):")
+    for name in indexes:
+        print(f"   {name}")
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
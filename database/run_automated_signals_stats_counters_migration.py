@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Run Automated Signals Stats Counters Migration
+Installs the trigger-maintained counters behind /api/automated-signals/stats,
+seeds them from a full recount and verifies them against a second recount.
+"""
+
+import os
+import sys
+
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from automated_signals_stats import read_counter_stats, recount_stats
+
+MIGRATION_SQL = 'database/automated_signals_stats_counters.sql'
+
+
+def run_migration(conn):
+    cursor = conn.cursor()
+    with open(MIGRATION_SQL, 'r') as f:
+        cursor.execute(f.read())
+    conn.commit()
+
+    counters = read_counter_stats(cursor)
+    recount = recount_stats(cursor)
+    conn.commit()
+    cursor.close()
+    return counters, recount
+
+
+def main():
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Automated Signals Stats Counters Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    counters, recount = run_migration(conn)
+    conn.close()
+
+    print(f"\nCounters: {counters}")
+    print(f"Recount:  {recount}")
+    if counters != recount:
+        print("\n⚠️ Counters differ from recount (writes during verification?) - "
+              "run: python automated_signals_stats.py")
+    else:
+        print("\n✅ Counters match a full recount")
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
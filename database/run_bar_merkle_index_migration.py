@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Run Bar Merkle Index Migration
+Creates bar_merkle_days / bar_merkle_nodes and, with --build, builds the index for
+every symbol in the raw and clean bar tables.
+
+Usage:
+    python database/run_bar_merkle_index_migration.py
+    python database/run_bar_merkle_index_migration.py --build
+    python database/run_bar_merkle_index_migration.py --build --symbol GLBX.MDP3:NQ
+"""
+
+import argparse
+import os
+import sys
+
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bar_merkle_index import SOURCES, refresh_range
+
+MIGRATION_SQL = 'database/bar_merkle_index.sql'
+
+
+def run_migration(conn):
+    cursor = conn.cursor()
+    with open(MIGRATION_SQL, 'r') as f:
+        cursor.execute(f.read())
+    conn.commit()
+    cursor.close()
+
+
+def build(conn, symbols=None):
+    """Full build per (symbol, source), one commit each; returns [(symbol, source, days)]"""
+    built = []
+    for source, (table, _) in sorted(SOURCES.items()):
+        cursor = conn.cursor()
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+        if not cursor.fetchone()[0]:
+            cursor.close()
+            continue
+        if symbols:
+            source_symbols = symbols
+        else:
+            cursor.execute(f"SELECT DISTINCT symbol FROM {table} ORDER BY symbol")
+            source_symbols = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        for symbol in source_symbols:
+            days = refresh_range(conn, symbol, source)
+            conn.commit()
+            built.append((symbol, source, days))
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bar Merkle index migration")
+    parser.add_argument('--build', action='store_true', help="Build the index from the bar tables")
+    parser.add_argument('--symbol', action='append', help="Limit --build to these symbols")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Bar Merkle Index Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    run_migration(conn)
+    print("✅ bar_merkle_days / bar_merkle_nodes ready")
+
+    if args.build:
+        for symbol, source, days in build(conn, args.symbol):
+            print(f"   {symbol} [{source}]: {days} day leaves written")
+    conn.close()
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
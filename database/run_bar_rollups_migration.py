@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Run Bar Rollups Migration
+Creates market_bars_ohlcv_rollup and, with --build, rolls up every symbol in
+market_bars_ohlcv_1m_clean into 5m/15m/60m/240m/1d bars.
+
+Usage:
+    python database/run_bar_rollups_migration.py
+    python database/run_bar_rollups_migration.py --build
+    python database/run_bar_rollups_migration.py --build --symbol GLBX.MDP3:NQ
+"""
+
+import argparse
+import os
+import sys
+
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bar_rollups import SOURCE_TABLE, refresh_rollups
+
+MIGRATION_SQL = 'database/bar_rollups_schema.sql'
+
+
+def run_migration(conn):
+    cursor = conn.cursor()
+    with open(MIGRATION_SQL, 'r') as f:
+        cursor.execute(f.read())
+    conn.commit()
+    cursor.close()
+
+
+def build(conn, symbols=None):
+    """Full rollup per symbol, one commit each; returns [(symbol, {tf: rows})]"""
+    if not symbols:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT DISTINCT symbol FROM {SOURCE_TABLE} ORDER BY symbol")
+        symbols = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    built = []
+    for symbol in symbols:
+        changed = refresh_rollups(conn, symbol)
+        conn.commit()
+        built.append((symbol, changed))
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="multi-timeframe bar rollups migration")
+    parser.add_argument('--build', action='store_true', help="Build rollups from the 1m clean bars")
+    parser.add_argument('--symbol', action='append', help="Limit --build to these symbols")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Bar Rollups Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    run_migration(conn)
+    print("✅ market_bars_ohlcv_rollup ready")
+
+    if args.build:
+        for symbol, changed in build(conn, args.symbol):
+            print(f"   {symbol}: {changed}")
+    conn.close()
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
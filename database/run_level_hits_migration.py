@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Run Level Hits Migration
+Adds the unique keys the level_hits / level_accuracy upserts need (and
+level_hits.overshoot), removing duplicate rows first.
+"""
+
+import os
+
+import psycopg2
+from dotenv import load_dotenv
+
+MIGRATION_SQL = 'database/level_hits_schema.sql'
+
+
+def run_migration(conn):
+    cursor = conn.cursor()
+    with open(MIGRATION_SQL, 'r') as f:
+        cursor.execute(f.read())
+    conn.commit()
+
+    cursor.execute("SELECT COUNT(*) FROM level_hits")
+    hits = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM level_accuracy")
+    accuracy = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return hits, accuracy
+
+
+def main():
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Level Hits Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    hits, accuracy = run_migration(conn)
+    conn.close()
+
+    print(f"\nlevel_hits rows: {hits}, level_accuracy rows: {accuracy}")
+    print("\n✅ level_hits / level_accuracy upsert keys ready")
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Run Model Drift Histograms Migration
+Installs the trigger-maintained feature histograms behind /api/model-drift,
+seeds them from a full recount and verifies them against a second recount.
+"""
+
+import os
+
+import psycopg2
+from dotenv import load_dotenv
+
+MIGRATION_SQL = 'database/model_drift_histograms.sql'
+
+
+def run_migration(conn):
+    cursor = conn.cursor()
+    with open(MIGRATION_SQL, 'r') as f:
+        cursor.execute(f.read())
+    conn.commit()
+
+    cursor.execute("""
+        SELECT bucket_date, feature, bin, count FROM model_drift_histograms WHERE count <> 0
+    """)
+    histograms = {r[:3]: r[3] for r in cursor.fetchall()}
+    cursor.execute("""
+        SELECT t.created_at::date, b.feature, b.bin, COUNT(*)
+        FROM signal_lab_trades t CROSS JOIN LATERAL model_drift_bins(t.bias, t.session) b
+        WHERE t.created_at IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+    recount = {r[:3]: r[3] for r in cursor.fetchall()}
+    conn.commit()
+    cursor.close()
+    return histograms, recount
+
+
+def main():
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Model Drift Histograms Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    histograms, recount = run_migration(conn)
+    conn.close()
+
+    print(f"\nHistogram rows: {len(histograms)} ({len({k[0] for k in histograms})} days)")
+    if histograms != recount:
+        print("\n⚠️ Histograms differ from recount (writes during verification?) - re-run this migration")
+    else:
+        print("\n✅ Histograms match a full recount")
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
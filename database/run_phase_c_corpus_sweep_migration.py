@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Run Phase C Corpus Sweep Migration
+Creates signal_corpus_sweep_results table for filter sweep summaries
+"""
+
+import os
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+if not DATABASE_URL:
+    print("ERROR: DATABASE_URL not set")
+    exit(1)
+
+print("Connecting to database...")
+conn = psycopg2.connect(DATABASE_URL)
+cursor = conn.cursor()
+
+print("Reading schema file...")
+with open('database/phase_c_corpus_sweep_schema.sql', 'r') as f:
+    schema_sql = f.read()
+
+print("Executing migration...")
+cursor.execute(schema_sql)
+conn.commit()
+
+print("Verifying table creation...")
+cursor.execute("""
+    SELECT COUNT(*) FROM information_schema.tables 
+    WHERE table_name = 'signal_corpus_sweep_results'
+""")
+count = cursor.fetchone()[0]
+
+if count == 1:
+    print("✅ Table signal_corpus_sweep_results created successfully")
+else:
+    print("❌ Table creation failed")
+
+cursor.close()
+conn.close()
+
+print("\nMigration complete")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Run Signal Integrity Migration
+Creates signal_integrity_violations and the dirty-trade triggers on automated_signals,
+then runs a full verification so incremental runs have a baseline.
+
+Usage:
+    python database/run_signal_integrity_migration.py
+    python database/run_signal_integrity_migration.py --skip-verify
+"""
+
+import argparse
+import os
+import sys
+
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signal_integrity_verifier import integrity_violation_summary, verify_all_signals
+
+MIGRATION_SQL = 'database/signal_integrity_schema.sql'
+
+
+def run_migration(conn):
+    cursor = conn.cursor()
+    with open(MIGRATION_SQL, 'r') as f:
+        cursor.execute(f.read())
+    conn.commit()
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="signal integrity violation table migration")
+    parser.add_argument('--skip-verify', action='store_true', help="Install only; skip the full verification")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Signal Integrity Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    run_migration(conn)
+    print("✅ signal_integrity_violations and triggers ready")
+
+    if not args.skip_verify:
+        run = verify_all_signals(conn)
+        print(f"   Verified {run['trades_checked']} trades in {run['duration_ms']} ms: "
+              f"{run['violations']} violations")
+        cursor = conn.cursor()
+        for rule, entry in integrity_violation_summary(cursor)['rules'].items():
+            print(f"   {rule} ({entry['severity']}): {entry['violations']} in {entry['trades']} trades")
+        cursor.close()
+    conn.close()
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
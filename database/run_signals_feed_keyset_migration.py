@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Run Signals Feed Keyset Migration
+Installs the trigger-maintained automated_signals_feed behind /api/signals/v1/all and
+the all_signals_ledger keyset index, seeds the feed from a full recount and verifies
+it against a second recount.
+"""
+
+import os
+
+import psycopg2
+from dotenv import load_dotenv
+
+MIGRATION_SQL = 'database/signals_feed_keyset.sql'
+
+RECOUNT_SQL = """
+    SELECT
+        trade_id,
+        MAX(symbol) FILTER (WHERE symbol IS NOT NULL),
+        COALESCE(
+            MIN(signal_bar_open_ts) FILTER (WHERE event_type = 'SIGNAL_CREATED' AND signal_bar_open_ts IS NOT NULL),
+            MIN(entry_bar_open_ts) FILTER (WHERE event_type = 'ENTRY' AND entry_bar_open_ts IS NOT NULL),
+            MAX(exit_bar_open_ts) FILTER (WHERE event_type LIKE 'EXIT%%' AND exit_bar_open_ts IS NOT NULL),
+            MAX(timestamp),
+            '-infinity'::timestamptz
+        ),
+        CASE
+            WHEN BOOL_OR(event_type = 'CANCELLED') THEN 'CANCELLED'
+            WHEN BOOL_OR(event_type LIKE 'EXIT%%') THEN 'EXITED'
+            WHEN BOOL_OR(event_type IN ('ENTRY', 'MFE_UPDATE', 'BE_TRIGGERED')) THEN 'CONFIRMED'
+            ELSE 'PENDING'
+        END
+    FROM automated_signals
+    WHERE trade_id IS NOT NULL
+    GROUP BY trade_id
+"""
+
+
+def read_feed(cursor):
+    cursor.execute("SELECT trade_id, symbol, sort_ts, status FROM automated_signals_feed")
+    return {r[0]: tuple(r[1:]) for r in cursor.fetchall()}
+
+
+def recount_feed(cursor):
+    cursor.execute(RECOUNT_SQL, {})
+    return {r[0]: tuple(r[1:]) for r in cursor.fetchall()}
+
+
+def run_migration(conn):
+    cursor = conn.cursor()
+    with open(MIGRATION_SQL, 'r') as f:
+        cursor.execute(f.read())
+    conn.commit()
+
+    feed = read_feed(cursor)
+    recount = recount_feed(cursor)
+    conn.commit()
+    cursor.close()
+    return feed, recount
+
+
+def main():
+    load_dotenv()
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not set")
+        exit(1)
+
+    print("Signals Feed Keyset Migration")
+    print("=" * 80)
+    conn = psycopg2.connect(database_url)
+    feed, recount = run_migration(conn)
+    conn.close()
+
+    print(f"\nFeed rows: {len(feed)}")
+    if feed != recount:
+        print("\n⚠️ Feed differs from recount (writes during verification?) - re-run this migration")
+    else:
+        print("\n✅ Feed matches a full recount")
+    print("\nMigration complete")
+
+
+if __name__ == '__main__':
+    main()
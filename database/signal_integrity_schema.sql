@@ -0,0 +1,108 @@
+-- Signal Integrity Verification - whole-history violation table
+-- Backs signal_integrity_verifier.verify_all_signals(), which evaluates every
+-- integrity rule for every trade in automated_signals in one set-based statement.
+--
+-- - signal_integrity_violations holds one row per rule violation (trade, rule,
+--   severity, offending event); a full run replaces it, an incremental run replaces
+--   only the rows of the trades it re-verifies
+-- - signal_integrity_dirty_trades is maintained by statement triggers: every INSERT /
+--   UPDATE / DELETE on automated_signals marks the trades it touched, in the same
+--   transaction, so an incremental run re-verifies exactly those trades. Re-marking
+--   a marked trade updates its row, so a run clears (after it commits) only the marks
+--   no write has touched since the run read them
+-- - TRUNCATE of automated_signals clears the violations and the marks
+-- - signal_integrity_runs keeps one row per verification run
+-- - Idempotent
+
+CREATE TABLE IF NOT EXISTS signal_integrity_violations (
+    id BIGSERIAL PRIMARY KEY,
+    trade_id VARCHAR(100) NOT NULL,
+    rule VARCHAR(40) NOT NULL,
+    severity VARCHAR(10) NOT NULL,
+    event_id BIGINT,
+    detail TEXT,
+    verified_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_signal_integrity_violations_trade
+    ON signal_integrity_violations (trade_id);
+CREATE INDEX IF NOT EXISTS idx_signal_integrity_violations_rule
+    ON signal_integrity_violations (rule, severity);
+
+CREATE TABLE IF NOT EXISTS signal_integrity_dirty_trades (
+    trade_id VARCHAR(100) PRIMARY KEY,
+    marked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS signal_integrity_runs (
+    id BIGSERIAL PRIMARY KEY,
+    mode VARCHAR(12) NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    duration_ms INTEGER,
+    trades_checked INTEGER NOT NULL DEFAULT 0,
+    violations INTEGER NOT NULL DEFAULT 0
+);
+
+-- DO UPDATE gives an already-marked trade's row a new version (xmin), which tells a
+-- verification run that the trade changed after it read the mark
+CREATE OR REPLACE FUNCTION signal_integrity_mark_inserted() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO signal_integrity_dirty_trades (trade_id)
+    SELECT DISTINCT trade_id FROM new_rows WHERE trade_id IS NOT NULL
+    ON CONFLICT (trade_id) DO UPDATE SET marked_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Both sides, so re-keying a row re-verifies the trade it left and the one it joined
+CREATE OR REPLACE FUNCTION signal_integrity_mark_updated() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO signal_integrity_dirty_trades (trade_id)
+    SELECT trade_id FROM new_rows WHERE trade_id IS NOT NULL
+    UNION
+    SELECT trade_id FROM old_rows WHERE trade_id IS NOT NULL
+    ON CONFLICT (trade_id) DO UPDATE SET marked_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION signal_integrity_mark_deleted() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO signal_integrity_dirty_trades (trade_id)
+    SELECT DISTINCT trade_id FROM old_rows WHERE trade_id IS NOT NULL
+    ON CONFLICT (trade_id) DO UPDATE SET marked_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION signal_integrity_truncate() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM signal_integrity_violations;
+    DELETE FROM signal_integrity_dirty_trades;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_signal_integrity_insert ON automated_signals;
+CREATE TRIGGER trg_signal_integrity_insert
+    AFTER INSERT ON automated_signals
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION signal_integrity_mark_inserted();
+
+DROP TRIGGER IF EXISTS trg_signal_integrity_update ON automated_signals;
+CREATE TRIGGER trg_signal_integrity_update
+    AFTER UPDATE ON automated_signals
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION signal_integrity_mark_updated();
+
+DROP TRIGGER IF EXISTS trg_signal_integrity_delete ON automated_signals;
+CREATE TRIGGER trg_signal_integrity_delete
+    AFTER DELETE ON automated_signals
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION signal_integrity_mark_deleted();
+
+DROP TRIGGER IF EXISTS trg_signal_integrity_truncate ON automated_signals;
+CREATE TRIGGER trg_signal_integrity_truncate
+    AFTER TRUNCATE ON automated_signals
+    FOR EACH STATEMENT EXECUTE FUNCTION signal_integrity_truncate();
+
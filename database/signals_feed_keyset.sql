@@ -0,0 +1,165 @@
+-- Signals Feed Keyset Pagination
+-- Backs /api/signals/v1/all and /api/all-signals/data with index-driven keyset pages.
+--
+-- - automated_signals_feed holds one row per trade (symbol, sort_ts, status), kept in
+--   step with automated_signals by statement triggers. A page is an index range scan
+--   on (symbol, sort_ts, trade_id); only the page's trades are then aggregated.
+-- - sort_ts and status use the same expressions as the lifecycle summary in
+--   api/signals_v1.py; trades with no timestamp sort last via '-infinity'.
+-- - Triggers take a per-trade advisory lock before recomputing, so two concurrent
+--   events for one trade cannot leave the row computed without one of them.
+-- - all_signals_ledger gets a (triangle_time_ms, trade_id) index for its keyset order.
+-- - Idempotent; re-running re-seeds the feed from a full recount.
+
+CREATE TABLE IF NOT EXISTS automated_signals_feed (
+    trade_id TEXT PRIMARY KEY,
+    symbol TEXT,
+    sort_ts TIMESTAMPTZ NOT NULL,
+    status TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_automated_signals_feed_symbol_sort
+    ON automated_signals_feed (symbol, sort_ts DESC, trade_id DESC);
+CREATE INDEX IF NOT EXISTS idx_automated_signals_feed_symbol_status_sort
+    ON automated_signals_feed (symbol, status, sort_ts DESC, trade_id DESC);
+
+-- Recompute the feed rows of the given trades from their events
+CREATE OR REPLACE FUNCTION automated_signals_feed_upsert(p_trade_ids TEXT[]) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO automated_signals_feed AS f (trade_id, symbol, sort_ts, status, updated_at)
+    SELECT
+        trade_id,
+        MAX(symbol) FILTER (WHERE symbol IS NOT NULL),
+        COALESCE(
+            MIN(signal_bar_open_ts) FILTER (WHERE event_type = 'SIGNAL_CREATED' AND signal_bar_open_ts IS NOT NULL),
+            MIN(entry_bar_open_ts) FILTER (WHERE event_type = 'ENTRY' AND entry_bar_open_ts IS NOT NULL),
+            MAX(exit_bar_open_ts) FILTER (WHERE event_type LIKE 'EXIT%' AND exit_bar_open_ts IS NOT NULL),
+            MAX(timestamp),
+            '-infinity'
+        ),
+        CASE
+            WHEN BOOL_OR(event_type = 'CANCELLED') THEN 'CANCELLED'
+            WHEN BOOL_OR(event_type LIKE 'EXIT%') THEN 'EXITED'
+            WHEN BOOL_OR(event_type IN ('ENTRY', 'MFE_UPDATE', 'BE_TRIGGERED')) THEN 'CONFIRMED'
+            ELSE 'PENDING'
+        END,
+        NOW()
+    FROM automated_signals
+    WHERE trade_id = ANY(p_trade_ids)
+    GROUP BY trade_id
+    ON CONFLICT (trade_id) DO UPDATE SET
+        symbol = EXCLUDED.symbol,
+        sort_ts = EXCLUDED.sort_ts,
+        status = EXCLUDED.status,
+        updated_at = EXCLUDED.updated_at
+    WHERE (f.symbol, f.sort_ts, f.status) IS DISTINCT FROM (EXCLUDED.symbol, EXCLUDED.sort_ts, EXCLUDED.status);
+
+    DELETE FROM automated_signals_feed f
+    WHERE f.trade_id = ANY(p_trade_ids)
+      AND NOT EXISTS (SELECT 1 FROM automated_signals a WHERE a.trade_id = f.trade_id);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trigger entry point: serializes recomputes per trade. Each statement after the lock
+-- takes a fresh snapshot, so it sees the events of the transaction it waited for.
+CREATE OR REPLACE FUNCTION automated_signals_feed_refresh(p_trade_ids TEXT[]) RETURNS VOID AS $$
+BEGIN
+    IF p_trade_ids IS NULL OR cardinality(p_trade_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    -- Sorted so concurrent statements lock shared trades in the same order
+    PERFORM pg_advisory_xact_lock(hashtext('automated_signals_feed'), hashtext(t))
+    FROM unnest(p_trade_ids) AS t ORDER BY t;
+
+    PERFORM automated_signals_feed_upsert(p_trade_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION automated_signals_feed_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM automated_signals_feed_refresh(ARRAY(
+        SELECT DISTINCT trade_id FROM new_rows WHERE trade_id IS NOT NULL
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION automated_signals_feed_on_update() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM automated_signals_feed_refresh(ARRAY(
+        SELECT trade_id FROM new_rows WHERE trade_id IS NOT NULL
+        UNION
+        SELECT trade_id FROM old_rows WHERE trade_id IS NOT NULL
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION automated_signals_feed_on_delete() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM automated_signals_feed_refresh(ARRAY(
+        SELECT DISTINCT trade_id FROM old_rows WHERE trade_id IS NOT NULL
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION automated_signals_feed_truncate() RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM automated_signals_feed;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Per-trade recompute and page detail lookups
+CREATE INDEX IF NOT EXISTS idx_automated_signals_trade_id ON automated_signals (trade_id);
+
+DROP TRIGGER IF EXISTS trg_automated_signals_feed_insert ON automated_signals;
+CREATE TRIGGER trg_automated_signals_feed_insert
+    AFTER INSERT ON automated_signals
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_feed_on_insert();
+
+DROP TRIGGER IF EXISTS trg_automated_signals_feed_update ON automated_signals;
+CREATE TRIGGER trg_automated_signals_feed_update
+    AFTER UPDATE ON automated_signals
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_feed_on_update();
+
+DROP TRIGGER IF EXISTS trg_automated_signals_feed_delete ON automated_signals;
+CREATE TRIGGER trg_automated_signals_feed_delete
+    AFTER DELETE ON automated_signals
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_feed_on_delete();
+
+DROP TRIGGER IF EXISTS trg_automated_signals_feed_truncate ON automated_signals;
+CREATE TRIGGER trg_automated_signals_feed_truncate
+    AFTER TRUNCATE ON automated_signals
+    FOR EACH STATEMENT EXECUTE FUNCTION automated_signals_feed_truncate();
+
+-- Seed from a full recount. SHARE mode blocks writers only for the duration of the
+-- recount, so no event can land between the recount and the feed reset (and no
+-- per-trade advisory locks are needed).
+DO $$
+BEGIN
+    LOCK TABLE automated_signals IN SHARE MODE;
+    DELETE FROM automated_signals_feed;
+    PERFORM automated_signals_feed_upsert(ARRAY(
+        SELECT DISTINCT trade_id FROM automated_signals WHERE trade_id IS NOT NULL
+    ));
+END;
+$$;
+
+-- /api/all-signals/data keyset order (the ledger comes from indicator_export_schema.sql)
+DO $$
+BEGIN
+    IF to_regclass('all_signals_ledger') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_all_signals_ledger_keyset
+            ON all_signals_ledger (triangle_time_ms DESC, trade_id DESC);
+    END IF;
+END;
+$$;
+
+ANALYZE automated_signals_feed;
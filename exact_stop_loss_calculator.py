@@ -7,6 +7,7 @@ Implements your EXACT stop loss rules with NO shortcuts or approximations
 import logging
 from typing import List, Dict, Optional
 from pivot_detector import PivotDetector
+from pivot_index import PivotIndex
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,7 @@ class ExactStopLossCalculator:
     def __init__(self):
         self.pivot_detector = PivotDetector()
         self.buffer_points = 25.0  # NASDAQ 25-point buffer
+        self.left_search_candles = 5
     
     def calculate_stop_loss(self, signal_type: str, signal_candle: Dict, confirmation_candle: Dict, 
                           candle_range: List[Dict], signal_index: int = 0) -> Optional[float]:
@@ -58,16 +60,55 @@ class ExactStopLossCalculator:
         logger.info(f"   Confirmation candle: H={confirmation_candle['high']} L={confirmation_candle['low']}")
         logger.info(f"   Range has {len(candle_range)} candles")
         
+        if not candle_range:
+            logger.error("❌ Empty candle range")
+            return None
+        
+        index = PivotIndex.from_candles(candle_range)
+        stop_loss = self.stop_loss_at(index, signal_type, 0, len(candle_range) - 1, signal_index, signal_candle)
+        if stop_loss is not None:
+            logger.info(f"✅ {signal_type} stop loss: {stop_loss}")
+        return stop_loss
+    
+    def calculate_stop_losses(self, candles, signals) -> List[Optional[float]]:
+        """
+        Stop losses for many signals over one bar series (historical backfills)
+        
+        Args:
+            candles: List of candle dictionaries or a prebuilt PivotIndex
+            signals: Iterable of (signal_type, signal_index, confirmation_index) into candles
+        
+        Returns:
+            Stop loss per signal (None where the signal is invalid)
+        
+        The pivot index is built once, so each signal costs a few O(1)/O(log n)
+        lookups. The left pivot search can see candles before the signal here.
+        """
+        
+        index = candles if isinstance(candles, PivotIndex) else PivotIndex.from_candles(candles)
+        results = []
+        for signal_type, signal_index, confirmation_index in signals:
+            if not (0 <= signal_index <= confirmation_index < len(index)):
+                logger.error(f"❌ Invalid signal range [{signal_index}, {confirmation_index}]")
+                results.append(None)
+                continue
+            results.append(self.stop_loss_at(index, signal_type, signal_index, confirmation_index, signal_index))
+        return results
+    
+    def stop_loss_at(self, index: PivotIndex, signal_type: str, start: int, end: int,
+                     signal_index: int, signal_candle: Optional[Dict] = None) -> Optional[float]:
+        """Stop loss for the signal range [start, end] of a PivotIndex"""
+        
         if signal_type == 'Bullish':
-            return self._calculate_bullish_stop_loss(signal_candle, confirmation_candle, candle_range, signal_index)
+            return self._calculate_bullish_stop_loss(index, start, end, signal_index, signal_candle)
         elif signal_type == 'Bearish':
-            return self._calculate_bearish_stop_loss(signal_candle, confirmation_candle, candle_range, signal_index)
+            return self._calculate_bearish_stop_loss(index, start, end, signal_index, signal_candle)
         else:
             logger.error(f"❌ Invalid signal type: {signal_type}")
             return None
     
-    def _calculate_bullish_stop_loss(self, signal_candle: Dict, confirmation_candle: Dict, 
-                                   candle_range: List[Dict], signal_index: int) -> Optional[float]:
+    def _calculate_bullish_stop_loss(self, index: PivotIndex, start: int, end: int, signal_index: int,
+                                   signal_candle: Optional[Dict]) -> Optional[float]:
         """
         EXACT bullish stop loss calculation
         
@@ -78,71 +119,55 @@ class ExactStopLossCalculator:
         4. If lowest point is signal candle (not pivot) → Search left 5 candles for pivot
         """
         
-        logger.info("📉 Calculating bullish stop loss...")
+        signal_low = float(signal_candle['low']) if signal_candle else float(index.lows[signal_index])
         
-        # Step 1: Find lowest point in the range
-        lowest_point = self.pivot_detector.find_lowest_point_in_range(candle_range)
+        # Step 1: Find lowest point in the range (pivot = both neighbours inside the range)
+        lowest_index = index.lowest(start, end)
+        lowest_value = float(index.lows[lowest_index])
+        is_pivot = index.is_pivot_low(lowest_index, start, end)
         
-        if not lowest_point:
-            logger.error("❌ Could not find lowest point in range")
-            return None
-        
-        lowest_candle = lowest_point['candle']
-        lowest_index = lowest_point['index']
-        lowest_value = lowest_point['value']
-        is_pivot = lowest_point['is_pivot']
-        
-        logger.info(f"📍 Lowest point: {lowest_value} at index {lowest_index} (Is pivot: {is_pivot})")
+        logger.debug(f"📍 Lowest point: {lowest_value} at index {lowest_index} (Is pivot: {is_pivot})")
         
         # Step 2: If lowest point is a 3-candle pivot
         if is_pivot:
             stop_loss = lowest_value - self.buffer_points
-            logger.info(f"✅ SCENARIO A: Lowest point is pivot → SL = {lowest_value} - {self.buffer_points} = {stop_loss}")
+            logger.debug(f"SCENARIO A: Lowest point is pivot → SL = {lowest_value} - {self.buffer_points} = {stop_loss}")
             return stop_loss
         
         # Step 3: If lowest point is signal candle
         if lowest_index == signal_index:
-            logger.info("📍 Lowest point is the signal candle")
-            
             # Check if signal candle is a pivot
-            if self.pivot_detector.is_candle_pivot_low(candle_range, signal_index):
-                stop_loss = signal_candle['low'] - self.buffer_points
-                logger.info(f"✅ SCENARIO B: Signal candle is pivot → SL = {signal_candle['low']} - {self.buffer_points} = {stop_loss}")
+            if index.is_pivot_low(signal_index, start, end):
+                stop_loss = signal_low - self.buffer_points
+                logger.debug(f"SCENARIO B: Signal candle is pivot → SL = {signal_low} - {self.buffer_points} = {stop_loss}")
                 return stop_loss
-            else:
-                logger.info("📍 Signal candle is NOT a pivot - searching left for pivot")
-                
-                # Step 4: Search left 5 candles for pivot
-                left_pivot = self._search_left_for_pivot_low(candle_range, signal_index)
-                
-                if left_pivot:
-                    stop_loss = left_pivot['pivot_value'] - self.buffer_points
-                    logger.info(f"✅ SCENARIO C1: Found left pivot → SL = {left_pivot['pivot_value']} - {self.buffer_points} = {stop_loss}")
-                    return stop_loss
-                else:
-                    logger.info("📍 No left pivot found - using first bearish candle")
-                    
-                    # Use first bearish candle low after 5-candle search
-                    bearish_candle = self._find_first_bearish_candle_after_search(candle_range, signal_index)
-                    
-                    if bearish_candle:
-                        stop_loss = bearish_candle['low'] - self.buffer_points
-                        logger.info(f"✅ SCENARIO C2: First bearish candle → SL = {bearish_candle['low']} - {self.buffer_points} = {stop_loss}")
-                        return stop_loss
-                    else:
-                        logger.warning("⚠️ Could not find bearish candle - using signal candle low")
-                        stop_loss = signal_candle['low'] - self.buffer_points
-                        return stop_loss
+            
+            # Step 4: Search left 5 candles for pivot
+            left_pivot = index.nearest_pivot_low_left(signal_index, self.left_search_candles)
+            if left_pivot is not None:
+                pivot_value = float(index.lows[left_pivot])
+                stop_loss = pivot_value - self.buffer_points
+                logger.debug(f"SCENARIO C1: Found left pivot → SL = {pivot_value} - {self.buffer_points} = {stop_loss}")
+                return stop_loss
+            
+            # Use first bearish candle low after 5-candle search
+            bearish_index = index.first_bearish_in(start, end)
+            if bearish_index is not None:
+                bearish_low = float(index.lows[bearish_index])
+                stop_loss = bearish_low - self.buffer_points
+                logger.debug(f"SCENARIO C2: First bearish candle → SL = {bearish_low} - {self.buffer_points} = {stop_loss}")
+                return stop_loss
+            
+            logger.warning("⚠️ Could not find bearish candle - using signal candle low")
+            return signal_low - self.buffer_points
         
         # If lowest point is neither pivot nor signal candle, use it directly
-        else:
-            logger.info("📍 Lowest point is neither pivot nor signal candle")
-            stop_loss = lowest_value - self.buffer_points
-            logger.info(f"✅ SCENARIO D: Using lowest point → SL = {lowest_value} - {self.buffer_points} = {stop_loss}")
-            return stop_loss
+        stop_loss = lowest_value - self.buffer_points
+        logger.debug(f"SCENARIO D: Using lowest point → SL = {lowest_value} - {self.buffer_points} = {stop_loss}")
+        return stop_loss
     
-    def _calculate_bearish_stop_loss(self, signal_candle: Dict, confirmation_candle: Dict, 
-                                   candle_range: List[Dict], signal_index: int) -> Optional[float]:
+    def _calculate_bearish_stop_loss(self, index: PivotIndex, start: int, end: int, signal_index: int,
+                                   signal_candle: Optional[Dict]) -> Optional[float]:
         """
         EXACT bearish stop loss calculation
         
@@ -153,140 +178,52 @@ class ExactStopLossCalculator:
         4. If highest point is signal candle (not pivot) → Search left 5 candles for pivot
         """
         
-        logger.info("📈 Calculating bearish stop loss...")
+        signal_high = float(signal_candle['high']) if signal_candle else float(index.highs[signal_index])
         
-        # Step 1: Find highest point in the range
-        highest_point = self.pivot_detector.find_highest_point_in_range(candle_range)
+        # Step 1: Find highest point in the range (pivot = both neighbours inside the range)
+        highest_index = index.highest(start, end)
+        highest_value = float(index.highs[highest_index])
+        is_pivot = index.is_pivot_high(highest_index, start, end)
         
-        if not highest_point:
-            logger.error("❌ Could not find highest point in range")
-            return None
-        
-        highest_candle = highest_point['candle']
-        highest_index = highest_point['index']
-        highest_value = highest_point['value']
-        is_pivot = highest_point['is_pivot']
-        
-        logger.info(f"📍 Highest point: {highest_value} at index {highest_index} (Is pivot: {is_pivot})")
+        logger.debug(f"📍 Highest point: {highest_value} at index {highest_index} (Is pivot: {is_pivot})")
         
         # Step 2: If highest point is a 3-candle pivot
         if is_pivot:
             stop_loss = highest_value + self.buffer_points
-            logger.info(f"✅ SCENARIO A: Highest point is pivot → SL = {highest_value} + {self.buffer_points} = {stop_loss}")
+            logger.debug(f"SCENARIO A: Highest point is pivot → SL = {highest_value} + {self.buffer_points} = {stop_loss}")
             return stop_loss
         
         # Step 3: If highest point is signal candle
         if highest_index == signal_index:
-            logger.info("📍 Highest point is the signal candle")
-            
             # Check if signal candle is a pivot
-            if self.pivot_detector.is_candle_pivot_high(candle_range, signal_index):
-                stop_loss = signal_candle['high'] + self.buffer_points
-                logger.info(f"✅ SCENARIO B: Signal candle is pivot → SL = {signal_candle['high']} + {self.buffer_points} = {stop_loss}")
+            if index.is_pivot_high(signal_index, start, end):
+                stop_loss = signal_high + self.buffer_points
+                logger.debug(f"SCENARIO B: Signal candle is pivot → SL = {signal_high} + {self.buffer_points} = {stop_loss}")
+                return stop_loss
+            
+            # Step 4: Search left 5 candles for pivot
+            left_pivot = index.nearest_pivot_high_left(signal_index, self.left_search_candles)
+            if left_pivot is not None:
+                pivot_value = float(index.highs[left_pivot])
+                stop_loss = pivot_value + self.buffer_points
+                logger.debug(f"SCENARIO C1: Found left pivot → SL = {pivot_value} + {self.buffer_points} = {stop_loss}")
+                return stop_loss
+            
+            # Use first bullish candle high after 5-candle search
+            bullish_index = index.first_bullish_in(start, end)
+            if bullish_index is not None:
+                bullish_high = float(index.highs[bullish_index])
+                stop_loss = bullish_high + self.buffer_points
+                logger.debug(f"SCENARIO C2: First bullish candle → SL = {bullish_high} + {self.buffer_points} = {stop_loss}")
                 return stop_loss
-            else:
-                logger.info("📍 Signal candle is NOT a pivot - searching left for pivot")
-                
-                # Step 4: Search left 5 candles for pivot
-                left_pivot = self._search_left_for_pivot_high(candle_range, signal_index)
-                
-                if left_pivot:
-                    stop_loss = left_pivot['pivot_value'] + self.buffer_points
-                    logger.info(f"✅ SCENARIO C1: Found left pivot → SL = {left_pivot['pivot_value']} + {self.buffer_points} = {stop_loss}")
-                    return stop_loss
-                else:
-                    logger.info("📍 No left pivot found - using first bullish candle")
-                    
-                    # Use first bullish candle high after 5-candle search
-                    bullish_candle = self._find_first_bullish_candle_after_search(candle_range, signal_index)
-                    
-                    if bullish_candle:
-                        stop_loss = bullish_candle['high'] + self.buffer_points
-                        logger.info(f"✅ SCENARIO C2: First bullish candle → SL = {bullish_candle['high']} + {self.buffer_points} = {stop_loss}")
-                        return stop_loss
-                    else:
-                        logger.warning("⚠️ Could not find bullish candle - using signal candle high")
-                        stop_loss = signal_candle['high'] + self.buffer_points
-                        return stop_loss
+            
+            logger.warning("⚠️ Could not find bullish candle - using signal candle high")
+            return signal_high + self.buffer_points
         
         # If highest point is neither pivot nor signal candle, use it directly
-        else:
-            logger.info("📍 Highest point is neither pivot nor signal candle")
-            stop_loss = highest_value + self.buffer_points
-            logger.info(f"✅ SCENARIO D: Using highest point → SL = {highest_value} + {self.buffer_points} = {stop_loss}")
-            return stop_loss
-    
-    def _search_left_for_pivot_low(self, candle_range: List[Dict], signal_index: int) -> Optional[Dict]:
-        """
-        Search left 5 candles from signal candle for pivot low
-        """
-        
-        logger.info("🔍 Searching left 5 candles for pivot low...")
-        
-        # This requires historical data beyond the current range
-        # For now, simulate the search
-        
-        # In production, this would:
-        # 1. Get 5 candles to the left of signal candle
-        # 2. Search for 3-candle pivot lows in that range
-        # 3. Return the pivot if found
-        
-        # Simulated result for testing
-        return None
-    
-    def _search_left_for_pivot_high(self, candle_range: List[Dict], signal_index: int) -> Optional[Dict]:
-        """
-        Search left 5 candles from signal candle for pivot high
-        """
-        
-        logger.info("🔍 Searching left 5 candles for pivot high...")
-        
-        # This requires historical data beyond the current range
-        # For now, simulate the search
-        
-        # In production, this would:
-        # 1. Get 5 candles to the left of signal candle
-        # 2. Search for 3-candle pivot highs in that range
-        # 3. Return the pivot if found
-        
-        # Simulated result for testing
-        return None
-    
-    def _find_first_bearish_candle_after_search(self, candle_range: List[Dict], signal_index: int) -> Optional[Dict]:
-        """
-        Find first bearish candle after 5-candle search
-        
-        Bearish candle: Close < Open
-        """
-        
-        logger.info("🔍 Finding first bearish candle after search...")
-        
-        # Search through the range for first bearish candle
-        for i, candle in enumerate(candle_range):
-            if candle['close'] < candle['open']:
-                logger.info(f"📉 Found bearish candle at index {i}: O={candle['open']} C={candle['close']}")
-                return candle
-        
-        logger.warning("⚠️ No bearish candle found in range")
-        return None
-    
-    def _find_first_bullish_candle_after_search(self, candle_range: List[Dict], signal_index: int) -> Optional[Dict]:
-        """
-        Find first bullish candle after 5-candle search
-        
-        Bullish candle: Close > Open
-        """
-        
-        logger.info("🔍 Finding first bullish candle after search...")
-        
-        # Search through the range for first bullish candle
-        for i, candle in enumerate(candle_range):
-            if candle['close'] > candle['open']:
-                logger.info(f"📈 Found bullish candle at index {i}: O={candle['open']} C={candle['close']}")
-                return candle
-        
-        logger.warning("⚠️ No bullish candle found in range")
-        return None
+        stop_loss = highest_value + self.buffer_points
+        logger.debug(f"SCENARIO D: Using highest point → SL = {highest_value} + {self.buffer_points} = {stop_loss}")
+        return stop_loss
 
 # Test the exact stop loss calculator
 def test_exact_stop_loss_calculator():
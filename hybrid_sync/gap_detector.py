@@ -29,21 +29,25 @@ class GapDetector:
         cur = conn.cursor()
         
         cur.execute("""
-            SELECT 
+            SELECT DISTINCT
                 e.trade_id,
                 e.entry_price,
                 e.stop_loss,
                 e.direction,
-                MAX(m.timestamp) as last_mfe_update,
-                EXTRACT(EPOCH FROM (NOW() - MAX(m.timestamp)))/60 as minutes_since_update
+                m.last_mfe_update,
+                EXTRACT(EPOCH FROM (NOW() - m.last_mfe_update))/60 as minutes_since_update
             FROM automated_signals e
-            LEFT JOIN automated_signals m ON m.trade_id = e.trade_id AND m.event_type = 'MFE_UPDATE'
+            LEFT JOIN LATERAL (
+                SELECT MAX(timestamp) AS last_mfe_update
+                FROM automated_signals
+                WHERE trade_id = e.trade_id AND event_type = 'MFE_UPDATE'
+            ) m ON TRUE
             WHERE e.event_type = 'ENTRY'
-            AND e.trade_id NOT IN (
-                SELECT DISTINCT trade_id FROM automated_signals WHERE event_type LIKE 'EXIT_%'
+            AND NOT EXISTS (
+                SELECT 1 FROM automated_signals x
+                WHERE x.trade_id = e.trade_id AND x.event_type LIKE 'EXIT_%'
             )
-            GROUP BY e.trade_id, e.entry_price, e.stop_loss, e.direction
-            HAVING MAX(m.timestamp) IS NULL OR MAX(m.timestamp) < NOW() - INTERVAL '2 minutes'
+            AND (m.last_mfe_update IS NULL OR m.last_mfe_update < NOW() - INTERVAL '2 minutes')
         """)
         
         gaps = []
@@ -124,8 +128,9 @@ class GapDetector:
             SELECT DISTINCT e.trade_id, e.entry_price, e.stop_loss, e.direction
             FROM automated_signals e
             WHERE e.event_type = 'ENTRY'
-            AND e.trade_id NOT IN (
-                SELECT DISTINCT trade_id FROM automated_signals WHERE event_type LIKE 'EXIT_%'
+            AND NOT EXISTS (
+                SELECT 1 FROM automated_signals x
+                WHERE x.trade_id = e.trade_id AND x.event_type LIKE 'EXIT_%'
             )
             AND NOT EXISTS (
                 SELECT 1 FROM automated_signals m
@@ -3,6 +3,8 @@ Institutional-Grade ML Trading Engine
 Implements proven quantitative methods used by hedge funds and prop trading firms
 """
 
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
@@ -16,6 +18,8 @@ from scipy.optimize import minimize
 import warnings
 warnings.filterwarnings('ignore')
 
+from regime_feature_kernels import higuchi_fractal_dimension, hurst_exponent, regime_feature_matrix
+
 # Professional ML Libraries
 try:
     import tensorflow as tf
@@ -747,27 +751,7 @@ class InstitutionalMLEngine:
             return 1.5
         
         try:
-            N = len(prices)
-            k_max = min(20, N // 4)
-            
-            lk = []
-            for k in range(1, k_max + 1):
-                lm = []
-                for m in range(k):
-                    ll = 0
-                    for i in range(1, int((N - m) / k)):
-                        ll += abs(prices[m + i * k] - prices[m + (i - 1) * k])
-                    ll = ll * (N - 1) / (k * k * int((N - m) / k))
-                    lm.append(ll)
-                lk.append(np.mean(lm))
-            
-            # Linear regression in log-log space
-            x = np.log(range(1, k_max + 1))
-            y = np.log(lk)
-            slope = np.polyfit(x, y, 1)[0]
-            
-            return max(1.0, min(2.0, 2 - slope))
-            
+            return float(higuchi_fractal_dimension(prices, window=len(prices))[-1])
         except:
             return 1.5
     
@@ -778,28 +762,23 @@ class InstitutionalMLEngine:
             return 0.5
         
         try:
-            returns = np.diff(np.log(prices))
-            n = len(returns)
-            
-            # Calculate R/S statistic
-            mean_return = np.mean(returns)
-            deviations = returns - mean_return
-            cumulative_deviations = np.cumsum(deviations)
-            
-            R = np.max(cumulative_deviations) - np.min(cumulative_deviations)
-            S = np.std(returns)
-            
-            if S == 0:
-                return 0.5
-            
-            rs = R / S
-            hurst = np.log(rs) / np.log(n)
-            
-            return max(0.0, min(1.0, hurst))
-            
+            hurst = float(hurst_exponent(prices, window=len(prices))[-1])
+            return 0.5 if np.isnan(hurst) else hurst
         except:
             return 0.5
     
+    def engineer_regime_feature_matrix(self, market_data: List[Dict]) -> Tuple[List[str], np.ndarray]:
+        """
+        Fractal, Hurst, volatility, tail and moment features for every bar of
+        market_data at once (regime_feature_kernels), for building training sets.
+        Rows line up with market_data sorted by timestamp; bars without a full
+        window are NaN.
+        """
+        df = pd.DataFrame(market_data)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df = df.sort_values('timestamp').reset_index(drop=True)
+        return regime_feature_matrix(df['price'].astype(float).values)
+    
     def _bayesian_loss(self, y_true, y_pred):
         """Bayesian loss function for uncertainty quantification"""
         
@@ -0,0 +1,257 @@
+"""
+Level Hit Evaluator - Bulk hit/miss resolution of daily support/resistance/pivot levels
+
+LevelTracker used to resolve one day at a time: fetch the day's NQ range from Yahoo,
+then one INSERT per level. This module resolves every level of a date range against
+the local 1m bars (market_bars_ohlcv_1m_clean) in one vectorized pass and writes the
+results with a single upsert, so level accuracy history can be backfilled in bulk.
+
+- A level's day is its America/New_York calendar day
+- A support (resistance) is hit when the day's low (high) ends within
+  HIT_TOLERANCE of it, a pivot when the day's range contains it;
+  distance_from_level is the nearer of the day's high and low
+- hit_time / price_at_hit are the first 1m bar that came within tolerance (the bar
+  trading through the pivot), recorded for misses that swept through as well
+- overshoot is how far price traded beyond the level: below a support, above a
+  resistance, and past a pivot on the side away from the day's open
+- The upserts need the unique keys from database/level_hits_schema.sql
+  (python database/run_level_hits_migration.py)
+"""
+
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+HIT_TOLERANCE = 5.0
+LEVEL_TYPES = ('support', 'resistance', 'pivot')
+SESSION_TZ = 'America/New_York'
+DEFAULT_SYMBOL = 'GLBX.MDP3:NQ'
+BAR_TABLE = 'market_bars_ohlcv_1m_clean'
+
+EPOCH = date(1970, 1, 1)
+DAY_SECONDS = 86400
+
+
+UPSERT_SQL = """
+    INSERT INTO level_hits (date, level_type, predicted_level, actual_hit, hit_time, price_at_hit,
+                            distance_from_level, overshoot)
+    VALUES %s
+    ON CONFLICT (date, level_type, predicted_level) DO UPDATE SET
+        actual_hit = EXCLUDED.actual_hit,
+        hit_time = EXCLUDED.hit_time,
+        price_at_hit = EXCLUDED.price_at_hit,
+        distance_from_level = EXCLUDED.distance_from_level,
+        overshoot = EXCLUDED.overshoot
+"""
+
+
+def level_tables_installed(cursor) -> bool:
+    """True once database/run_level_hits_migration.py has added the upsert keys"""
+    cursor.execute("""
+        SELECT to_regclass('ux_level_hits_date_type_level') IS NOT NULL
+           AND to_regclass('ux_level_accuracy_level_type') IS NOT NULL
+    """)
+    return cursor.fetchone()[0]
+
+
+def require_level_tables(cursor):
+    if not level_tables_installed(cursor):
+        raise RuntimeError("level_hits upsert keys missing - run database/run_level_hits_migration.py")
+
+
+def _day_ordinal(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def _level_values(raw) -> List[float]:
+    """Prices of a daily_levels JSON column (text or already decoded); non-numbers skipped"""
+    if isinstance(raw, str):
+        raw = json.loads(raw)
+    values = []
+    for value in raw or []:
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            continue
+    return values
+
+
+def load_levels(cursor, start: date, end: date) -> List[Tuple[date, str, float]]:
+    """(date, level_type, level) for every daily_levels row in [start, end], deduplicated at cent precision"""
+    cursor.execute("""
+        SELECT date, support_levels, resistance_levels, pivot_level
+        FROM daily_levels
+        WHERE date BETWEEN %s AND %s
+        ORDER BY date
+    """, (start, end))
+    levels, seen = [], set()
+    for day, support, resistance, pivot in cursor.fetchall():
+        candidates = [('support', v) for v in _level_values(support)]
+        candidates += [('resistance', v) for v in _level_values(resistance)]
+        if pivot is not None and float(pivot) > 0:
+            candidates.append(('pivot', float(pivot)))
+        for level_type, value in candidates:
+            key = (day, level_type, round(value, 2))
+            if key not in seen:
+                seen.add(key)
+                levels.append(key)
+    return levels
+
+
+def load_bars(cursor, start: date, end: date, symbol: str = DEFAULT_SYMBOL) -> Dict[str, np.ndarray]:
+    """
+    1m bars of the New York days [start, end] in time order: 'time' is the local
+    wall-clock time in epoch seconds (day = time // 86400), plus open/high/low.
+    """
+    cursor.execute(f"""
+        SELECT date_part('epoch', ts AT TIME ZONE %(tz)s)::bigint, open::float8, high::float8, low::float8
+        FROM {BAR_TABLE}
+        WHERE symbol = %(symbol)s
+          AND ts >= %(start)s::timestamp AT TIME ZONE %(tz)s
+          AND ts < (%(end)s::date + 1)::timestamp AT TIME ZONE %(tz)s
+        ORDER BY ts
+    """, {'tz': SESSION_TZ, 'symbol': symbol, 'start': start, 'end': end})
+    rows = cursor.fetchall()
+    columns = np.array(rows, dtype=np.float64).reshape(len(rows), 4)
+    return {
+        'time': columns[:, 0].astype(np.int64),
+        'open': columns[:, 1],
+        'high': columns[:, 2],
+        'low': columns[:, 3],
+    }
+
+
+def evaluate_level_hits(level_day: np.ndarray, level_type: np.ndarray, level: np.ndarray,
+                        bars: Dict[str, np.ndarray], tolerance: float = HIT_TOLERANCE) -> Dict[str, np.ndarray]:
+    """
+    Resolve every level against the bars of its day at once.
+
+    level_day is the day ordinal (days since 1970-01-01) of each level. Returns per
+    level: evaluated (its day has bars), actual_hit, touch (bar index of the first
+    touch, -1 if none), price_at_hit, distance, overshoot; NaN / False where not
+    evaluated.
+    """
+    level_day = np.asarray(level_day, dtype=np.int64)
+    level_type = np.asarray(level_type)
+    level = np.asarray(level, dtype=np.float64)
+    bar_time, bar_open, bar_high, bar_low = bars['time'], bars['open'], bars['high'], bars['low']
+    n = len(level)
+    result = {
+        'evaluated': np.zeros(n, dtype=bool),
+        'actual_hit': np.zeros(n, dtype=bool),
+        'touch': np.full(n, -1, dtype=np.int64),
+        'price_at_hit': np.full(n, np.nan),
+        'distance': np.full(n, np.nan),
+        'overshoot': np.full(n, np.nan),
+    }
+    if n == 0 or len(bar_time) == 0:
+        return result
+
+    days, starts = np.unique(bar_time // DAY_SECONDS, return_index=True)
+    ends = np.append(starts[1:], len(bar_time))
+    segment = np.minimum(np.searchsorted(days, level_day), len(days) - 1)
+    evaluated = days[segment] == level_day
+    day_low = np.minimum.reduceat(bar_low, starts)[segment]
+    day_high = np.maximum.reduceat(bar_high, starts)[segment]
+    day_open = bar_open[starts][segment]
+    end = ends[segment]
+
+    # Running low/high within each day from one accumulate over all bars: day k is
+    # shifted by k * span, wider than every price and level, so earlier days never
+    # reach a later day's target. The running low is then non-increasing (running high
+    # non-decreasing) over the whole series and a first touch is one searchsorted.
+    span = np.ceil(max(bar_high.max(), level.max()) - min(bar_low.min(), level.min())) + 2 * tolerance + 1
+    shift = np.repeat(np.arange(len(days)), ends - starts) * span
+    running_low = np.minimum.accumulate(bar_low - shift)
+    running_high = np.maximum.accumulate(bar_high + shift)
+    level_shift = segment * span
+
+    def first_low_at_or_below(target):
+        return np.searchsorted(-running_low, -(target - level_shift), side='left')
+
+    def first_high_at_or_above(target):
+        return np.searchsorted(running_high, target + level_shift, side='left')
+
+    support = level_type == 'support'
+    resistance = level_type == 'resistance'
+
+    touch = np.where(support, first_low_at_or_below(level + tolerance),
+                     np.where(resistance, first_high_at_or_above(level - tolerance),
+                              np.maximum(first_low_at_or_below(level), first_high_at_or_above(level))))
+    touched = evaluated & (touch < end)
+    touch_bar = np.where(touched, touch, 0)
+    price_at_hit = np.where(support, bar_low[touch_bar], np.where(resistance, bar_high[touch_bar], level))
+
+    hit = np.where(support, (day_low <= level + tolerance) & (day_low >= level - tolerance),
+                   np.where(resistance, (day_high >= level - tolerance) & (day_high <= level + tolerance),
+                            (day_low <= level) & (level <= day_high)))
+    below = np.maximum(0.0, level - day_low)
+    above = np.maximum(0.0, day_high - level)
+    overshoot = np.where(support, below, np.where(resistance, above, np.where(day_open >= level, below, above)))
+
+    result['evaluated'] = evaluated & np.isin(level_type, LEVEL_TYPES)
+    valid = result['evaluated']
+    result['actual_hit'] = valid & hit
+    result['touch'] = np.where(valid & touched, touch, -1)
+    result['price_at_hit'] = np.where(valid & touched, price_at_hit, np.nan)
+    result['distance'] = np.where(valid, np.minimum(np.abs(day_high - level), np.abs(day_low - level)), np.nan)
+    result['overshoot'] = np.where(valid, overshoot, np.nan)
+    return result
+
+
+def level_hit_rows(levels: List[Tuple[date, str, float]], bars: Dict[str, np.ndarray],
+                   tolerance: float = HIT_TOLERANCE) -> List[tuple]:
+    """level_hits rows (date, type, level, hit, hit_time, price_at_hit, distance, overshoot) for the evaluated levels"""
+    if not levels:
+        return []
+    days, types, values = zip(*levels)
+    result = evaluate_level_hits([_day_ordinal(d) for d in days], list(types), list(values), bars, tolerance)
+    rows = []
+    for i in np.flatnonzero(result['evaluated']):
+        touch = result['touch'][i]
+        hit_time, price_at_hit = None, None
+        if touch >= 0:
+            hit_time = (datetime.min + timedelta(seconds=int(bars['time'][touch] % DAY_SECONDS))).time()
+            price_at_hit = round(float(result['price_at_hit'][i]), 2)
+        rows.append((days[i], types[i], values[i], bool(result['actual_hit'][i]), hit_time, price_at_hit,
+                     round(float(result['distance'][i]), 2), round(float(result['overshoot'][i]), 2)))
+    return rows
+
+
+def write_level_hits(cursor, rows: List[tuple]) -> int:
+    """Upsert level_hits rows in one statement"""
+    if rows:
+        execute_values(cursor, UPSERT_SQL, rows, page_size=len(rows))
+    return len(rows)
+
+
+def backfill_level_hits(conn, start: date, end: date, symbol: str = DEFAULT_SYMBOL) -> Dict[str, float]:
+    """Evaluate and store every daily_levels level in [start, end] against the local 1m bars"""
+    started = time.perf_counter()
+    # Tuple rows whatever the connection's default cursor_factory is (RailwayDB: RealDictCursor)
+    cursor = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+    try:
+        require_level_tables(cursor)
+        levels = load_levels(cursor, start, end)
+        rows = []
+        if levels:
+            bars = load_bars(cursor, levels[0][0], levels[-1][0], symbol)
+            rows = level_hit_rows(levels, bars)
+            write_level_hits(cursor, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return {
+        'levels': len(levels),
+        'evaluated': len(rows),
+        'hits': sum(1 for row in rows if row[3]),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
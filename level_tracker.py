@@ -1,8 +1,9 @@
 import json
 from datetime import datetime, timedelta
+import psycopg2
+from psycopg2.extras import execute_values
 from database.railway_db import RailwayDB
-from news_api import get_real_nq_levels
-import requests
+from level_hit_evaluator import DEFAULT_SYMBOL, backfill_level_hits, require_level_tables
 
 class LevelTracker:
     def __init__(self):
@@ -36,6 +37,7 @@ class LevelTracker:
                 hit_time TIME,
                 price_at_hit DECIMAL(10,2),
                 distance_from_level DECIMAL(10,2),
+                overshoot DECIMAL(10,2),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
@@ -64,6 +66,7 @@ class LevelTracker:
             levels = ai_levels
         else:
             # Fallback to basic technical levels
+            from news_api import get_real_nq_levels
             levels = get_real_nq_levels()
         
         cursor = self.db.conn.cursor()
@@ -151,139 +154,45 @@ class LevelTracker:
         return levels
     
     def check_level_hits(self, date=None):
-        """Check if levels were hit on given date"""
+        """Check if levels were hit on given date (against the local 1m bars)"""
         if not date:
             date = datetime.now().date()
         
-        # Get NQ price data for the day
-        nq_data = self.get_nq_daily_data(date)
-        if not nq_data:
-            return
-        
-        # Get predicted levels for that date
-        cursor = self.db.conn.cursor()
-        cursor.execute("SELECT * FROM daily_levels WHERE date = %s", (date,))
-        level_data = cursor.fetchone()
-        
-        if not level_data:
-            return
-        
-        support_levels = json.loads(level_data[2])
-        resistance_levels = json.loads(level_data[3])
-        pivot_level = float(level_data[4])
-        
-        # Check hits
-        self.analyze_level_hits(date, nq_data, support_levels, resistance_levels, pivot_level)
+        return self.evaluate_level_range(date, date)
     
-    def get_nq_daily_data(self, date):
-        """Get NQ OHLC data for specific date"""
-        try:
-            # Yahoo Finance API for historical data
-            end_date = date + timedelta(days=1)
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/NQ=F?period1={int(date.timestamp())}&period2={int(end_date.timestamp())}&interval=5m"
-            
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                result = data.get('chart', {}).get('result', [])
-                
-                if result:
-                    quote = result[0]
-                    indicators = quote.get('indicators', {}).get('quote', [{}])[0]
-                    
-                    return {
-                        'high': max([h for h in indicators.get('high', []) if h]),
-                        'low': min([l for l in indicators.get('low', []) if l]),
-                        'open': indicators.get('open', [None])[0],
-                        'close': indicators.get('close', [])[-1]
-                    }
-        except Exception as e:
-            print(f"Error getting NQ data: {e}")
-        
-        return None
-    
-    def analyze_level_hits(self, date, price_data, support_levels, resistance_levels, pivot_level):
-        """Analyze which levels were hit with ICT-specific logic"""
-        day_high = price_data['high']
-        day_low = price_data['low']
-        
-        cursor = self.db.conn.cursor()
-        
-        # ICT-specific hit detection (within 5 points for liquidity sweeps)
-        hit_tolerance = 5.0
-        
-        # Check support levels (liquidity sweeps below)
-        for level in support_levels:
-            # Hit if price swept below or touched within tolerance
-            hit = (day_low <= level + hit_tolerance) and (day_low >= level - hit_tolerance)
-            distance = min(abs(day_high - level), abs(day_low - level))
-            
-            cursor.execute("""
-                INSERT INTO level_hits (date, level_type, predicted_level, actual_hit, distance_from_level)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (date, level_type, predicted_level) DO UPDATE SET
-                    actual_hit = EXCLUDED.actual_hit,
-                    distance_from_level = EXCLUDED.distance_from_level
-            """, (date, 'support', level, hit, distance))
-        
-        # Check resistance levels (liquidity sweeps above)
-        for level in resistance_levels:
-            hit = (day_high >= level - hit_tolerance) and (day_high <= level + hit_tolerance)
-            distance = min(abs(day_high - level), abs(day_low - level))
-            
-            cursor.execute("""
-                INSERT INTO level_hits (date, level_type, predicted_level, actual_hit, distance_from_level)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (date, level_type, predicted_level) DO UPDATE SET
-                    actual_hit = EXCLUDED.actual_hit,
-                    distance_from_level = EXCLUDED.distance_from_level
-            """, (date, 'resistance', level, hit, distance))
-        
-        # Check pivot (exact touch within tolerance)
-        if pivot_level > 0:
-            hit = day_low <= pivot_level <= day_high
-            distance = min(abs(day_high - pivot_level), abs(day_low - pivot_level))
-            
-            cursor.execute("""
-                INSERT INTO level_hits (date, level_type, predicted_level, actual_hit, distance_from_level)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (date, level_type, predicted_level) DO UPDATE SET
-                    actual_hit = EXCLUDED.actual_hit,
-                    distance_from_level = EXCLUDED.distance_from_level
-            """, (date, 'pivot', pivot_level, hit, distance))
-        
-        self.db.conn.commit()
+    def evaluate_level_range(self, start_date, end_date, symbol=DEFAULT_SYMBOL):
+        """Resolve every stored level in [start_date, end_date] in one pass and one write"""
+        return backfill_level_hits(self.db.conn, start_date, end_date, symbol)
     
     def update_accuracy_scores(self):
         """Update accuracy scores for all level types"""
-        cursor = self.db.conn.cursor()
+        # Tuple rows: the shared connection hands out RealDictCursors by default
+        cursor = self.db.conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+        require_level_tables(cursor)
+        cursor.execute("""
+            SELECT level_type, COUNT(*) as total, SUM(CASE WHEN actual_hit THEN 1 ELSE 0 END) as hits
+            FROM level_hits
+            WHERE level_type IN ('support', 'resistance', 'pivot')
+            GROUP BY level_type
+        """)
         
-        for level_type in ['support', 'resistance', 'pivot']:
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN actual_hit THEN 1 ELSE 0 END) as hits
-                FROM level_hits 
-                WHERE level_type = %s
-            """, (level_type,))
-            
-            result = cursor.fetchone()
-            total, hits = result[0], result[1]
-            
-            if total > 0:
-                accuracy = (hits / total) * 100
-                confidence = self.calculate_confidence_score(level_type, accuracy, total)
-                
-                cursor.execute("""
-                    INSERT INTO level_accuracy (level_type, total_predictions, total_hits, accuracy_percentage, confidence_score)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON CONFLICT (level_type) DO UPDATE SET
-                        total_predictions = EXCLUDED.total_predictions,
-                        total_hits = EXCLUDED.total_hits,
-                        accuracy_percentage = EXCLUDED.accuracy_percentage,
-                        confidence_score = EXCLUDED.confidence_score,
-                        last_updated = CURRENT_TIMESTAMP
-                """, (level_type, total, hits, accuracy, confidence))
+        rows = []
+        for level_type, total, hits in cursor.fetchall():
+            accuracy = (hits / total) * 100
+            confidence = self.calculate_confidence_score(level_type, accuracy, total)
+            rows.append((level_type, total, hits, accuracy, confidence))
+        
+        if rows:
+            execute_values(cursor, """
+                INSERT INTO level_accuracy (level_type, total_predictions, total_hits, accuracy_percentage, confidence_score)
+                VALUES %s
+                ON CONFLICT (level_type) DO UPDATE SET
+                    total_predictions = EXCLUDED.total_predictions,
+                    total_hits = EXCLUDED.total_hits,
+                    accuracy_percentage = EXCLUDED.accuracy_percentage,
+                    confidence_score = EXCLUDED.confidence_score,
+                    last_updated = CURRENT_TIMESTAMP
+            """, rows)
         
         self.db.conn.commit()
     
@@ -302,8 +211,8 @@ class LevelTracker:
         return min(confidence, 100.0)
     
     def get_accuracy_report(self):
-        """Get current accuracy report"""
-        cursor = self.db.conn.cursor()
+        """Get current accuracy report (tuple rows, read by index)"""
+        cursor = self.db.conn.cursor(cursor_factory=psycopg2.extensions.cursor)
         cursor.execute("SELECT * FROM level_accuracy ORDER BY confidence_score DESC")
         return cursor.fetchall()
 
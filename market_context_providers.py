@@ -0,0 +1,388 @@
+"""
+Market Context Providers
+Pluggable data sources behind MarketDataEnricher, fetched concurrently and served
+stale-while-revalidate.
+
+- Each ContextProvider fetches one source (VIX, ETF volume, futures correlation, ...)
+  and has its own timeout and fallback payload.
+- MarketContextCache runs every provider on a shared pool. A request is served from
+  the current snapshot; sources older than fresh_seconds are refreshed in the
+  background, and only a source with nothing usable (never fetched, or older than
+  max_stale_seconds) is fetched inline - concurrently, bounded by its timeout.
+- SnapshotStore shares the snapshot between workers on one host through a JSON file
+  replaced atomically; a non-blocking flock elects one worker per refresh.
+- FakeContextProvider/fake_providers give deterministic offline sources with
+  simulated latency for tests and tools/market_context_benchmark.py.
+"""
+
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: no cross-worker refresh election
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 4.0
+FRESH_SECONDS = 60
+MAX_STALE_SECONDS = 15 * 60
+SNAPSHOT_PATH = os.environ.get(
+    'MARKET_CONTEXT_SNAPSHOT_PATH',
+    os.path.join(tempfile.gettempdir(), 'market_context_snapshot.json'))
+
+
+class ContextProvider(ABC):
+    """One market context source; fetch() may raise, the cache falls back"""
+
+    name = ''
+    fallback: Dict = {}
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    @abstractmethod
+    def fetch(self) -> Dict:
+        """Return this source's current payload"""
+
+
+def _history(symbol, period, interval):
+    import yfinance as yf
+    return yf.Ticker(symbol).history(period=period, interval=interval)
+
+
+class VixProvider(ContextProvider):
+    name = 'vix'
+    fallback = {'current': 20.0, 'change': 0.0, 'change_pct': 0.0}
+
+    def fetch(self) -> Dict:
+        hist = _history("^VIX", "2d", "1m")
+        if hist.empty:
+            return dict(self.fallback)
+        current_vix = float(hist['Close'].iloc[-1])
+        prev_close = float(hist['Close'].iloc[-2])
+        change = current_vix - prev_close
+        return {
+            'current': current_vix,
+            'change': change,
+            'change_pct': (change / prev_close) * 100 if prev_close != 0 else 0
+        }
+
+
+class VolumeProvider(ContextProvider):
+    name = 'volume'
+    fallback = {'spy_volume': 50000000, 'qqq_volume': 30000000}
+
+    def fetch(self) -> Dict:
+        spy_hist = _history("SPY", "1d", "1m")
+        qqq_hist = _history("QQQ", "1d", "1m")
+        return {
+            'spy_volume': int(spy_hist['Volume'].sum()) if not spy_hist.empty else 0,
+            'qqq_volume': int(qqq_hist['Volume'].sum()) if not qqq_hist.empty else 0
+        }
+
+
+class CorrelationProvider(ContextProvider):
+    name = 'correlation'
+    fallback = {'nq_es': 0.85, 'nq_ym': 0.80}
+    symbols = ("NQ=F", "ES=F", "YM=F")
+
+    def fetch(self) -> Dict:
+        import yfinance as yf
+
+        # One batched download; yfinance fetches the symbols on its own threads
+        closes = yf.download(list(self.symbols), period="5d", interval="1h",
+                             progress=False, threads=True)['Close']
+        data = {}
+        for symbol in self.symbols:
+            if symbol in closes and closes[symbol].notna().any():
+                data[symbol] = closes[symbol].dropna().pct_change().dropna()
+        if len(data) < 2:
+            return dict(self.fallback)
+
+        nq_data = data.get("NQ=F")
+        es_data = data.get("ES=F")
+        ym_data = data.get("YM=F")
+        return {
+            'nq_es': float(nq_data.corr(es_data)) if nq_data is not None and es_data is not None else 0.85,
+            'nq_ym': float(nq_data.corr(ym_data)) if nq_data is not None and ym_data is not None else 0.80
+        }
+
+
+class DxyProvider(ContextProvider):
+    name = 'dxy'
+    fallback = {'price': 103.5, 'change': 0.0, 'change_pct': 0.0}
+
+    def fetch(self) -> Dict:
+        hist = _history("DX-Y.NYB", "2d", "1h")
+        if hist.empty:
+            return dict(self.fallback)
+        current_price = float(hist['Close'].iloc[-1])
+        prev_close = float(hist['Close'].iloc[0])
+        change = current_price - prev_close
+        return {
+            'price': current_price,
+            'change': change,
+            'change_pct': (change / prev_close) * 100 if prev_close != 0 else 0
+        }
+
+
+class TrendProvider(ContextProvider):
+    name = 'trend'
+    fallback = {'strength': 0.5}
+
+    def fetch(self) -> Dict:
+        # Slope of SPY's 20-period moving average as the market proxy
+        hist = _history("SPY", "5d", "1h")
+        if not hist.empty:
+            ma20 = hist['Close'].rolling(20).mean()
+            if len(ma20) >= 2:
+                slope = (ma20.iloc[-1] - ma20.iloc[-2]) / ma20.iloc[-2]
+                return {'strength': abs(float(slope)) * 1000}
+        return dict(self.fallback)
+
+
+class SectorRotationProvider(ContextProvider):
+    name = 'sector'
+    fallback = {'rotation': 'BALANCED'}
+
+    def fetch(self) -> Dict:
+        # Tech (QQQ) against the broad market (SPY)
+        qqq_hist = _history("QQQ", "5d", "1d")
+        spy_hist = _history("SPY", "5d", "1d")
+        if qqq_hist.empty or spy_hist.empty:
+            return dict(self.fallback)
+        qqq_return = (qqq_hist['Close'].iloc[-1] / qqq_hist['Close'].iloc[0] - 1) * 100
+        spy_return = (spy_hist['Close'].iloc[-1] / spy_hist['Close'].iloc[0] - 1) * 100
+        if qqq_return > spy_return + 0.5:
+            return {'rotation': 'TECH_LEADERSHIP'}
+        if spy_return > qqq_return + 0.5:
+            return {'rotation': 'VALUE_ROTATION'}
+        return {'rotation': 'BALANCED'}
+
+
+def default_providers() -> List[ContextProvider]:
+    return [VixProvider(), VolumeProvider(), CorrelationProvider(), DxyProvider(),
+            TrendProvider(), SectorRotationProvider()]
+
+
+class FakeContextProvider(ContextProvider):
+    """Deterministic offline source: returns `payload` after `latency` seconds, or raises"""
+
+    def __init__(self, name: str, payload: Dict, latency: float = 0.0,
+                 timeout: float = DEFAULT_TIMEOUT, fail: bool = False, fallback: Optional[Dict] = None):
+        super().__init__(timeout)
+        self.name = name
+        self.payload = payload
+        self.fallback = payload if fallback is None else fallback
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def fetch(self) -> Dict:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f"{self.name} provider unavailable")
+        return dict(self.payload)
+
+
+def fake_providers(seed: int = 0, latency: float = 0.0, timeout: float = DEFAULT_TIMEOUT) -> List[FakeContextProvider]:
+    """The default provider set with seeded values, for benchmarks and tests"""
+    rng = random.Random(seed)
+    payloads = {
+        'vix': {'current': round(rng.uniform(12, 32), 2), 'change': round(rng.uniform(-2, 2), 2), 'change_pct': 0.0},
+        'volume': {'spy_volume': rng.randrange(40_000_000, 120_000_000), 'qqq_volume': rng.randrange(20_000_000, 80_000_000)},
+        'correlation': {'nq_es': round(rng.uniform(0.6, 0.98), 3), 'nq_ym': round(rng.uniform(0.5, 0.95), 3)},
+        'dxy': {'price': round(rng.uniform(99, 108), 2), 'change': round(rng.uniform(-0.8, 0.8), 2), 'change_pct': 0.0},
+        'trend': {'strength': round(rng.uniform(0, 2), 3)},
+        'sector': {'rotation': rng.choice(['TECH_LEADERSHIP', 'VALUE_ROTATION', 'BALANCED'])},
+    }
+    return [FakeContextProvider(name, payload, latency=latency, timeout=timeout) for name, payload in payloads.items()]
+
+
+class SnapshotStore:
+    """Snapshot file shared by the workers on a host"""
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._mtime = None
+        self._cached: Dict[str, Dict] = {}
+
+    def load(self) -> Dict[str, Dict]:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime != self._mtime:
+                with open(self.path) as f:
+                    self._cached = json.load(f)
+                self._mtime = mtime
+        except (OSError, ValueError):
+            pass
+        return self._cached
+
+    def save(self, snapshot: Dict[str, Dict]):
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write market context snapshot: {e}")
+
+    def try_lock(self):
+        """Lock handle if this worker may refresh now, else None"""
+        if fcntl is None:
+            return True
+        handle = open(f"{self.path}.lock", 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except OSError:
+            handle.close()
+            return None
+
+    def unlock(self, handle):
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+
+
+class MarketContextCache:
+    """Per-source snapshot of provider results, refreshed stale-while-revalidate"""
+
+    def __init__(self, providers: List[ContextProvider], store: Optional[SnapshotStore] = None,
+                 fresh_seconds: float = FRESH_SECONDS, max_stale_seconds: float = MAX_STALE_SECONDS):
+        self.providers = {p.name: p for p in providers}
+        self.store = store
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._snapshot: Dict[str, Dict] = {}
+        self._inflight = {}
+        self._refreshing = False
+        self._executor = ThreadPoolExecutor(max_workers=len(self.providers), thread_name_prefix='market-context')
+
+    def get(self) -> Dict[str, Dict]:
+        """Latest payload per source; waits only for sources with nothing usable"""
+        now = time.time()
+        snapshot = self._merge_store() if self._stale(self._snapshot, now) else self._snapshot
+        unusable = [name for name in self.providers
+                    if name not in snapshot or now - snapshot[name]['fetched_at'] > self.max_stale_seconds]
+        if unusable:
+            self.refresh(unusable)
+        elif self._stale(snapshot, now):
+            self._refresh_in_background()
+        snapshot = self._snapshot
+        return {name: snapshot[name]['data'] if name in snapshot else dict(provider.fallback)
+                for name, provider in self.providers.items()}
+
+    def age(self) -> Optional[float]:
+        """Seconds since the oldest source was fetched"""
+        if not self._snapshot:
+            return None
+        return time.time() - min(entry['fetched_at'] for entry in self._snapshot.values())
+
+    def refresh(self, names: Optional[List[str]] = None):
+        """Fetch sources concurrently, waiting at most each provider's timeout"""
+        names = names or list(self.providers)
+        started = time.monotonic()
+        futures = {}
+        with self._lock:
+            for name in names:
+                future = self._inflight.get(name)
+                # A fetch still running from an earlier timeout is awaited, not duplicated
+                if future is None or future.done():
+                    future = self._executor.submit(self._fetch, name)
+                    self._inflight[name] = future
+                futures[name] = future
+
+        for name, future in futures.items():
+            remaining = self.providers[name].timeout - (time.monotonic() - started)
+            try:
+                future.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                # _fetch records the result whenever it does land
+                logger.warning(f"Market context source {name} exceeded {self.providers[name].timeout}s")
+                self._record_fallback(name)
+
+    def _fetch(self, name: str):
+        """Runs on the pool; the snapshot is updated before the future completes"""
+        try:
+            data = self.providers[name].fetch()
+        except Exception as e:
+            logger.error(f"Error fetching market context source {name}: {e}")
+            self._record_fallback(name)
+            return
+        with self._lock:
+            self._snapshot = {**self._snapshot, name: {'data': data, 'fetched_at': time.time()}}
+        if self.store is not None:
+            # Serialized, and always the latest merge, so an older write never lands last
+            with self._save_lock:
+                self.store.save(self._merge_store())
+
+    def _record_fallback(self, name: str):
+        # A source that has never answered serves its fallback, already stale so the
+        # background refresh keeps retrying without making requests wait
+        with self._lock:
+            current = self._snapshot.get(name)
+            if current is None or time.time() - current['fetched_at'] > self.max_stale_seconds:
+                self._snapshot = {**self._snapshot, name: {
+                    'data': dict(self.providers[name].fallback),
+                    'fetched_at': time.time() - self.fresh_seconds,
+                }}
+
+    def _stale(self, snapshot: Dict[str, Dict], now: float) -> bool:
+        return any(name not in snapshot or now - snapshot[name]['fetched_at'] >= self.fresh_seconds
+                   for name in self.providers)
+
+    def _merge_store(self) -> Dict[str, Dict]:
+        """Take any source another worker fetched more recently"""
+        if self.store is None:
+            return self._snapshot
+        shared = self.store.load()
+        with self._lock:
+            merged = dict(self._snapshot)
+            for name, entry in shared.items():
+                if name in self.providers and entry['fetched_at'] > merged.get(name, {}).get('fetched_at', 0):
+                    merged[name] = entry
+            self._snapshot = merged
+        return merged
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name='market-context-refresh', daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            handle = self.store.try_lock() if self.store is not None else True
+            if handle is None:
+                return  # another worker is refreshing; its results arrive via the store
+            try:
+                now = time.time()
+                snapshot = self._merge_store()
+                stale = [name for name in self.providers
+                         if name not in snapshot or now - snapshot[name]['fetched_at'] >= self.fresh_seconds]
+                if stale:
+                    self.refresh(stale)
+            finally:
+                if handle is not True:
+                    self.store.unlock(handle)
+        except Exception as e:
+            logger.error(f"Market context background refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
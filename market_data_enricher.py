@@ -3,14 +3,14 @@ Real-time market data enrichment for trading signals
 Captures VIX, volume, market conditions, and other valuable context data
 """
 
-import requests
-import json
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 import logging
 from dataclasses import dataclass
-import yfinance as yf
-import pandas as pd
+
+from market_context_providers import (
+    FRESH_SECONDS, ContextProvider, MarketContextCache, SnapshotStore, default_providers
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,186 +35,51 @@ class MarketContext:
 class MarketDataEnricher:
     """Real-time market data enrichment engine"""
     
-    def __init__(self):
-        self.cache = {}
-        self.cache_duration = 60  # Cache for 60 seconds
+    def __init__(self, providers: Optional[List[ContextProvider]] = None, store: Optional[SnapshotStore] = None):
+        self.cache_duration = FRESH_SECONDS  # Serve without refreshing for 60 seconds
+        if providers is None:
+            providers = default_providers()
+            store = store or SnapshotStore()
+        self.context_cache = MarketContextCache(providers, store=store, fresh_seconds=self.cache_duration)
         
     def get_market_context(self) -> MarketContext:
         """Get comprehensive market context"""
         try:
-            # Check cache first
-            cache_key = "market_context"
-            now = datetime.now()
-            
-            if (cache_key in self.cache and 
-                now - self.cache[cache_key]['timestamp'] < timedelta(seconds=self.cache_duration)):
-                return self.cache[cache_key]['data']
-            
-            # Fetch fresh data
-            context = self._fetch_market_context()
-            
-            # Cache the result
-            self.cache[cache_key] = {
-                'data': context,
-                'timestamp': now
-            }
-            
-            return context
+            # Stale sources are refreshed in the background; see market_context_providers
+            return self._build_context(self.context_cache.get())
             
         except Exception as e:
             logger.error(f"Error getting market context: {str(e)}")
             return self._get_fallback_context()
     
     def _fetch_market_context(self) -> MarketContext:
-        """Fetch real-time market context data"""
-        
-        # Get VIX data
-        vix_data = self._get_vix_data()
-        
-        # Get volume data
-        volume_data = self._get_volume_data()
-        
-        # Get correlation data
-        correlation_data = self._get_correlation_data()
-        
-        # Get DXY data
-        dxy_data = self._get_dxy_data()
-        
-        # Determine market session
-        market_session = self._get_current_session()
-        
-        # Calculate volatility regime
-        volatility_regime = self._calculate_volatility_regime(vix_data['current'])
-        
-        # Get trend strength
-        trend_strength = self._calculate_trend_strength()
-        
-        # Get sector rotation
-        sector_rotation = self._get_sector_rotation()
-        
-        # Get news sentiment
-        news_sentiment = self._get_news_sentiment()
-        
-        # Get economic events
-        economic_events = self._get_economic_events()
+        """Fetch real-time market context data, waiting for every source"""
+        self.context_cache.refresh()
+        return self._build_context(self.context_cache.get())
+    
+    def _build_context(self, sources: Dict[str, Dict]) -> MarketContext:
+        vix_data = sources['vix']
+        volume_data = sources['volume']
+        correlation_data = sources['correlation']
+        dxy_data = sources['dxy']
         
         return MarketContext(
             vix=vix_data['current'],
             spy_volume=volume_data['spy_volume'],
             qqq_volume=volume_data['qqq_volume'],
-            market_session=market_session,
-            volatility_regime=volatility_regime,
-            trend_strength=trend_strength,
+            market_session=self._get_current_session(),
+            volatility_regime=self._calculate_volatility_regime(vix_data['current']),
+            trend_strength=sources['trend']['strength'],
             correlation_nq_es=correlation_data['nq_es'],
             correlation_nq_ym=correlation_data['nq_ym'],
             dxy_price=dxy_data['price'],
             dxy_change=dxy_data['change'],
-            sector_rotation=sector_rotation,
-            news_sentiment=news_sentiment,
-            economic_events=economic_events,
+            sector_rotation=sources['sector']['rotation'],
+            news_sentiment=self._get_news_sentiment(vix_data),
+            economic_events=self._get_economic_events(),
             timestamp=datetime.now()
         )
     
-    def _get_vix_data(self) -> Dict[str, float]:
-        """Get VIX data"""
-        try:
-            vix = yf.Ticker("^VIX")
-            hist = vix.history(period="2d", interval="1m")
-            
-            if not hist.empty:
-                current_vix = float(hist['Close'].iloc[-1])
-                prev_close = float(hist['Close'].iloc[-2])
-                change = current_vix - prev_close
-                
-                return {
-                    'current': current_vix,
-                    'change': change,
-                    'change_pct': (change / prev_close) * 100 if prev_close != 0 else 0
-                }
-        except Exception as e:
-            logger.error(f"Error fetching VIX data: {str(e)}")
-        
-        return {'current': 20.0, 'change': 0.0, 'change_pct': 0.0}
-    
-    def _get_volume_data(self) -> Dict[str, int]:
-        """Get volume data for major ETFs"""
-        try:
-            # Get SPY and QQQ volume
-            spy = yf.Ticker("SPY")
-            qqq = yf.Ticker("QQQ")
-            
-            spy_hist = spy.history(period="1d", interval="1m")
-            qqq_hist = qqq.history(period="1d", interval="1m")
-            
-            spy_volume = int(spy_hist['Volume'].sum()) if not spy_hist.empty else 0
-            qqq_volume = int(qqq_hist['Volume'].sum()) if not qqq_hist.empty else 0
-            
-            return {
-                'spy_volume': spy_volume,
-                'qqq_volume': qqq_volume
-            }
-        except Exception as e:
-            logger.error(f"Error fetching volume data: {str(e)}")
-        
-        return {'spy_volume': 50000000, 'qqq_volume': 30000000}
-    
-    def _get_correlation_data(self) -> Dict[str, float]:
-        """Calculate correlations between futures"""
-        try:
-            # Get recent price data for NQ, ES, YM
-            symbols = ["NQ=F", "ES=F", "YM=F"]
-            data = {}
-            
-            for symbol in symbols:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="5d", interval="1h")
-                if not hist.empty:
-                    data[symbol] = hist['Close'].pct_change().dropna()
-            
-            if len(data) >= 2:
-                nq_data = data.get("NQ=F")
-                es_data = data.get("ES=F")
-                ym_data = data.get("YM=F")
-                
-                correlations = {}
-                if nq_data is not None and es_data is not None:
-                    correlations['nq_es'] = float(nq_data.corr(es_data))
-                else:
-                    correlations['nq_es'] = 0.85
-                    
-                if nq_data is not None and ym_data is not None:
-                    correlations['nq_ym'] = float(nq_data.corr(ym_data))
-                else:
-                    correlations['nq_ym'] = 0.80
-                
-                return correlations
-                
-        except Exception as e:
-            logger.error(f"Error calculating correlations: {str(e)}")
-        
-        return {'nq_es': 0.85, 'nq_ym': 0.80}
-    
-    def _get_dxy_data(self) -> Dict[str, float]:
-        """Get DXY (Dollar Index) data"""
-        try:
-            dxy = yf.Ticker("DX-Y.NYB")
-            hist = dxy.history(period="2d", interval="1h")
-            
-            if not hist.empty:
-                current_price = float(hist['Close'].iloc[-1])
-                prev_close = float(hist['Close'].iloc[0])
-                change = current_price - prev_close
-                
-                return {
-                    'price': current_price,
-                    'change': change,
-                    'change_pct': (change / prev_close) * 100 if prev_close != 0 else 0
-                }
-        except Exception as e:
-            logger.error(f"Error fetching DXY data: {str(e)}")
-        
-        return {'price': 103.5, 'change': 0.0, 'change_pct': 0.0}
-    
     def _get_current_session(self) -> str:
         """Determine current trading session"""
         from datetime import datetime
@@ -246,69 +111,16 @@ class MarketDataEnricher:
         else:
             return "EXTREME"
     
-    def _calculate_trend_strength(self) -> float:
-        """Calculate overall market trend strength"""
-        try:
-            # Use SPY as market proxy
-            spy = yf.Ticker("SPY")
-            hist = spy.history(period="5d", interval="1h")
-            
-            if not hist.empty:
-                # Calculate 20-period moving average slope
-                ma20 = hist['Close'].rolling(20).mean()
-                if len(ma20) >= 2:
-                    slope = (ma20.iloc[-1] - ma20.iloc[-2]) / ma20.iloc[-2]
-                    return abs(float(slope)) * 1000  # Scale for readability
-            
-        except Exception as e:
-            logger.error(f"Error calculating trend strength: {str(e)}")
-        
-        return 0.5  # Neutral trend strength
-    
-    def _get_sector_rotation(self) -> str:
-        """Determine sector rotation pattern"""
-        try:
-            # Compare tech (QQQ) vs broad market (SPY) performance
-            qqq = yf.Ticker("QQQ")
-            spy = yf.Ticker("SPY")
-            
-            qqq_hist = qqq.history(period="5d", interval="1d")
-            spy_hist = spy.history(period="5d", interval="1d")
-            
-            if not qqq_hist.empty and not spy_hist.empty:
-                qqq_return = (qqq_hist['Close'].iloc[-1] / qqq_hist['Close'].iloc[0] - 1) * 100
-                spy_return = (spy_hist['Close'].iloc[-1] / spy_hist['Close'].iloc[0] - 1) * 100
-                
-                if qqq_return > spy_return + 0.5:
-                    return "TECH_LEADERSHIP"
-                elif spy_return > qqq_return + 0.5:
-                    return "VALUE_ROTATION"
-                else:
-                    return "BALANCED"
-            
-        except Exception as e:
-            logger.error(f"Error determining sector rotation: {str(e)}")
-        
-        return "BALANCED"
-    
-    def _get_news_sentiment(self) -> str:
+    def _get_news_sentiment(self, vix_data: Dict[str, float]) -> str:
         """Get overall news sentiment"""
         # Simplified sentiment based on VIX and market conditions
         # In production, this would integrate with news APIs
-        try:
-            vix_data = self._get_vix_data()
-            
-            if vix_data['current'] > 25:
-                return "BEARISH"
-            elif vix_data['current'] < 15:
-                return "BULLISH"
-            else:
-                return "NEUTRAL"
-                
-        except Exception as e:
-            logger.error(f"Error getting news sentiment: {str(e)}")
-        
-        return "NEUTRAL"
+        if vix_data['current'] > 25:
+            return "BEARISH"
+        elif vix_data['current'] < 15:
+            return "BULLISH"
+        else:
+            return "NEUTRAL"
     
     def _get_economic_events(self) -> list:
         """Get upcoming economic events"""
@@ -5,11 +5,13 @@ from market_parity.get_bias_fvg_ifvg import BiasEngineFvgIfvg
 from market_parity.htf_bias import HTFBiasEngine
 from market_parity.htf_alignment import compute_htf_alignment
 from market_parity.signal_generation import generate_signals
+from market_parity.snapshot import EngineSnapshot, decode_snapshot, encode_snapshot
 
 __all__ = [
     'Bar', 'EngulfingResult', 'detect_engulfing',
     'BiasEngineFvgIfvg',
     'HTFBiasEngine',
     'compute_htf_alignment',
-    'generate_signals'
+    'generate_signals',
+    'EngineSnapshot', 'encode_snapshot', 'decode_snapshot'
 ]
@@ -0,0 +1,277 @@
+"""
+Engine State Snapshots
+Compact, versioned binary snapshots of BiasEngineFvgIfvg / HTFBiasEngine state
+
+Range computations (backfills, corpus runs, live warm start) otherwise replay
+days of warmup bars because the engines only exist in memory. A snapshot holds
+everything the next bar depends on, so resuming from it and feeding the
+remaining bars gives exactly the same output as a full replay:
+
+- 1m engine: bias, ATH/ATL (+ prev), prev/prev-prev high/low, FVG/IFVG zone arrays
+- HTF engine: the same per timeframe plus in-progress HTF bar, last bias and
+  last HTF close
+- Loop state: bias_prev, prev_bar, prev_good_close, bars processed, chain origin
+
+Snapshot ts is the OPEN time of the first bar NOT yet processed (UTC midnight
+for day-boundary snapshots), so a resume fetches bars with ts >= snapshot ts.
+
+Layout (little-endian): b'MPSN' | uint16 format version | uint16 flags | body
+(zlib-compressed when FLAG_ZLIB is set). Floats are float64 with NaN for None,
+datetimes are int64 epoch microseconds (UTC) with INT64_MIN for None.
+"""
+
+import math
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from market_parity.get_bias_fvg_ifvg import BiasEngineFvgIfvg
+from market_parity.htf_bias import HTFBiasEngine
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_MAGIC = b'MPSN'
+FLAG_ZLIB = 0x1
+
+# HTFBiasEngine processing order (fixed for the format)
+HTF_TIMEFRAMES = ('5M', '15M', '1H', '4H', '1D')
+
+BIAS_CODES = {'Neutral': 0, 'Bullish': 1, 'Bearish': 2}
+BIAS_NAMES = {code: name for name, code in BIAS_CODES.items()}
+
+ENGINE_SCALARS = ('ath', 'atl', 'prev_ath', 'prev_atl', 'prev_high', 'prev_low', 'prev_prev_high', 'prev_prev_low')
+ENGINE_ARRAYS = ('bull_fvg_highs', 'bull_fvg_lows', 'bear_fvg_highs', 'bear_fvg_lows',
+                 'bull_ifvg_highs', 'bull_ifvg_lows', 'bear_ifvg_highs', 'bear_ifvg_lows')
+BAR_FIELDS = ('open', 'high', 'low', 'close')
+
+_HEADER = struct.Struct('<4sHH')
+_NONE_TS = -2 ** 63
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class EngineSnapshot:
+    """Decoded snapshot: restored engines plus the bar loop state around them"""
+
+    def __init__(self, ts, bias_engine, htf_engine, bias_prev="Neutral", prev_bar=None,
+                 prev_good_close=None, bars_processed=0, origin_ts=None):
+        self.ts = ts
+        self.bias_engine = bias_engine
+        self.htf_engine = htf_engine
+        self.bias_prev = bias_prev
+        self.prev_bar = prev_bar
+        self.prev_good_close = prev_good_close
+        self.bars_processed = bars_processed
+        self.origin_ts = origin_ts
+
+    def to_bytes(self, compress=True):
+        return encode_snapshot(self.ts, self.bias_engine, self.htf_engine, self.bias_prev, self.prev_bar,
+                               self.prev_good_close, self.bars_processed, self.origin_ts, compress)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return decode_snapshot(data)
+
+    def __repr__(self):
+        return (f"EngineSnapshot(ts={self.ts}, bars_processed={self.bars_processed}, "
+                f"bias={self.bias_engine.bias}, origin={self.origin_ts})")
+
+
+def _ts_to_micros(ts):
+    if ts is None:
+        return _NONE_TS
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return (ts - _EPOCH) // _MICROSECOND
+
+
+def _micros_to_ts(micros):
+    if micros == _NONE_TS:
+        return None
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def _float_or_nan(value):
+    return math.nan if value is None else float(value)
+
+
+def _nan_or_float(value):
+    return None if math.isnan(value) else value
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, fmt, *values):
+        self.parts.append(struct.pack(fmt, *values))
+
+    def bias(self, bias):
+        self.pack('<B', BIAS_CODES[bias])
+
+    def ts(self, ts):
+        self.pack('<q', _ts_to_micros(ts))
+
+    def floats(self, values):
+        self.pack(f'<I{len(values)}d', len(values), *values)
+
+    def bar(self, bar):
+        if bar is None:
+            self.pack('<B', 0)
+            return
+        self.pack('<B', 1)
+        self.ts(bar.get('ts'))
+        self.pack('<4d', *(float(bar[k]) for k in BAR_FIELDS))
+
+    def engine(self, engine):
+        self.bias(engine.bias)
+        self.pack('<8d', *(_float_or_nan(getattr(engine, name)) for name in ENGINE_SCALARS))
+        for name in ENGINE_ARRAYS:
+            self.floats(getattr(engine, name))
+
+    def getvalue(self):
+        return b''.join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def bias(self):
+        code, = self.unpack('<B')
+        if code not in BIAS_NAMES:
+            raise ValueError(f"Invalid bias code in snapshot: {code}")
+        return BIAS_NAMES[code]
+
+    def ts(self):
+        return _micros_to_ts(self.unpack('<q')[0])
+
+    def floats(self):
+        count, = self.unpack('<I')
+        return list(self.unpack(f'<{count}d'))
+
+    def bar(self):
+        present, = self.unpack('<B')
+        if not present:
+            return None
+        bar = {'ts': self.ts()}
+        bar.update(zip(BAR_FIELDS, self.unpack('<4d')))
+        return bar
+
+    def engine(self):
+        engine = BiasEngineFvgIfvg()
+        engine.bias = self.bias()
+        for name, value in zip(ENGINE_SCALARS, self.unpack('<8d')):
+            setattr(engine, name, _nan_or_float(value))
+        for name in ENGINE_ARRAYS:
+            setattr(engine, name, self.floats())
+        return engine
+
+
+def encode_snapshot(ts, bias_engine, htf_engine, bias_prev="Neutral", prev_bar=None,
+                    prev_good_close=None, bars_processed=0, origin_ts=None, compress=True):
+    """Serialize engine + loop state taken just before the bar opening at ts"""
+    w = _Writer()
+    w.ts(ts)
+    w.ts(origin_ts)
+    w.pack('<Q', bars_processed)
+    w.bias(bias_prev)
+    w.pack('<d', _float_or_nan(prev_good_close))
+    w.bar(prev_bar)
+    w.engine(bias_engine)
+    for tf in HTF_TIMEFRAMES:
+        w.engine(htf_engine.engines[tf])
+        w.bias(htf_engine.last_biases[tf])
+        w.ts(htf_engine.last_htf_close[tf])
+        w.bar(htf_engine.current_htf_bars[tf])
+
+    body = w.getvalue()
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 6)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, flags) + body
+
+
+def decode_snapshot(data):
+    """Rebuild an EngineSnapshot; raises ValueError for foreign or newer formats"""
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise ValueError("Snapshot too short")
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("Not a market_parity engine snapshot")
+    if version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {version} (expected {SNAPSHOT_FORMAT_VERSION})")
+    body = data[_HEADER.size:]
+    if flags & FLAG_ZLIB:
+        body = zlib.decompress(body)
+
+    r = _Reader(body)
+    ts = r.ts()
+    origin_ts = r.ts()
+    bars_processed, = r.unpack('<Q')
+    bias_prev = r.bias()
+    prev_good_close = _nan_or_float(r.unpack('<d')[0])
+    prev_bar = r.bar()
+    bias_engine = r.engine()
+
+    htf_engine = HTFBiasEngine()
+    for tf in HTF_TIMEFRAMES:
+        htf_engine.engines[tf] = r.engine()
+        htf_engine.last_biases[tf] = r.bias()
+        htf_engine.last_htf_close[tf] = r.ts()
+        htf_engine.current_htf_bars[tf] = r.bar()
+
+    if r.offset != len(body):
+        raise ValueError(f"Trailing bytes in snapshot ({len(body) - r.offset})")
+    return EngineSnapshot(ts, bias_engine, htf_engine, bias_prev, prev_bar,
+                          prev_good_close, bars_processed, origin_ts)
+
+
+def day_boundary(prev_ts, ts):
+    """UTC midnight crossed between two consecutive bar timestamps, else None"""
+    if prev_ts is None or ts is None:
+        return None
+    day = ts.astimezone(timezone.utc).date()
+    if prev_ts.astimezone(timezone.utc).date() == day:
+        return None
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def save_snapshot(cursor, symbol, logic_version, snapshot):
+    """Upsert an EngineSnapshot into market_parity_snapshots_v1 (caller commits)"""
+    state = snapshot.to_bytes()
+    cursor.execute("""
+        INSERT INTO market_parity_snapshots_v1
+            (symbol, ts, logic_version, format_version, state, bars_processed, origin_ts)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (symbol, ts, logic_version) DO UPDATE SET
+            format_version = EXCLUDED.format_version,
+            state = EXCLUDED.state,
+            bars_processed = EXCLUDED.bars_processed,
+            origin_ts = EXCLUDED.origin_ts,
+            created_at = NOW()
+    """, (symbol, snapshot.ts, logic_version, SNAPSHOT_FORMAT_VERSION, state,
+          snapshot.bars_processed, snapshot.origin_ts))
+    return len(state)
+
+
+def load_nearest_snapshot(cursor, symbol, logic_version, at_or_before):
+    """Latest readable snapshot with ts <= at_or_before, or None"""
+    cursor.execute("""
+        SELECT state
+        FROM market_parity_snapshots_v1
+        WHERE symbol = %s AND logic_version = %s AND format_version = %s AND ts <= %s
+        ORDER BY ts DESC
+        LIMIT 1
+    """, (symbol, logic_version, SNAPSHOT_FORMAT_VERSION, at_or_before))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return decode_snapshot(row[0])
@@ -0,0 +1,209 @@
+"""
+Phase C Parameter Sweep: triangle signals for many filter configs in one pass
+
+The expensive part of triangle generation (1m bias + HTF bias engines) does not
+depend on the filter settings, so it runs once per symbol and is stored as
+aligned arrays. Each filter config (engulfing mode x HTF timeframe subset) is
+then a handful of boolean mask operations over those arrays, with exactly the
+semantics of compute_htf_alignment + generate_signals:
+
+- fvg signal  = bias flip into Bullish/Bearish (and HTF alignment if enabled)
+- HTF subset  = every enabled timeframe agrees; empty subset = no HTF gating
+- engulfing   = none | engulfing | sweep (sweep takes priority, as in Pine)
+"""
+
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from market_parity.get_bias_fvg_ifvg import BiasEngineFvgIfvg
+from market_parity.htf_bias import HTFBiasEngine
+
+NEUTRAL, BULLISH, BEARISH = 0, 1, 2
+BIAS_CODES = {'Neutral': NEUTRAL, 'Bullish': BULLISH, 'Bearish': BEARISH}
+
+# compute_htf_alignment key -> HTFBiasEngine result key
+HTF_KEYS = {'daily': 'daily_bias', 'h4': 'h4_bias', 'h1': 'h1_bias', 'm15': 'm15_bias', 'm5': 'm5_bias'}
+HTF_ORDER = ('daily', 'h4', 'h1', 'm15', 'm5')
+
+ENGULFING_MODES = ('none', 'engulfing', 'sweep')
+
+
+@dataclass(frozen=True)
+class SweepConfig:
+    """One filter combination; htf_tfs empty means htf_aligned_only=False"""
+    htf_tfs: Tuple[str, ...] = ()
+    engulfing: str = 'none'
+
+    def __post_init__(self):
+        if self.engulfing not in ENGULFING_MODES:
+            raise ValueError(f"Unknown engulfing mode: {self.engulfing}")
+        unknown = set(self.htf_tfs) - set(HTF_ORDER)
+        if unknown:
+            raise ValueError(f"Unknown HTF timeframes: {sorted(unknown)}")
+        # Canonical order so equal configs compare/hash equal
+        object.__setattr__(self, 'htf_tfs', tuple(tf for tf in HTF_ORDER if tf in self.htf_tfs))
+
+    @property
+    def htf_aligned_only(self):
+        return bool(self.htf_tfs)
+
+    @property
+    def require_engulfing(self):
+        return self.engulfing == 'engulfing'
+
+    @property
+    def require_sweep_engulfing(self):
+        return self.engulfing == 'sweep'
+
+    @property
+    def use_flags(self):
+        return {tf: tf in self.htf_tfs for tf in HTF_ORDER}
+
+    @property
+    def name(self):
+        htf = '+'.join(self.htf_tfs) if self.htf_tfs else 'no_htf'
+        return f"{htf}|{self.engulfing}"
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'htf_aligned_only': self.htf_aligned_only,
+            'use_flags': self.use_flags,
+            'require_engulfing': self.require_engulfing,
+            'require_sweep_engulfing': self.require_sweep_engulfing,
+        }
+
+
+def build_sweep_configs(engulfing_modes=ENGULFING_MODES, htf_tfs=HTF_ORDER, max_htf=None) -> List[SweepConfig]:
+    """Cartesian grid: engulfing modes x every subset of htf_tfs (incl. the empty subset)"""
+    htf_tfs = tuple(htf_tfs)
+    max_htf = len(htf_tfs) if max_htf is None else max_htf
+    subsets = [subset for size in range(max_htf + 1) for subset in combinations(htf_tfs, size)]
+    return [SweepConfig(subset, mode) for subset in subsets for mode in engulfing_modes]
+
+
+class SignalSeries:
+    """Config-independent per-bar arrays shared by every sweep config"""
+
+    def __init__(self, ts, bias, bias_prev, htf, has_prev, bullish_engulfing, bearish_engulfing,
+                 bullish_sweep, bearish_sweep):
+        self.ts = ts
+        self.bias = bias
+        self.bias_prev = bias_prev
+        self.htf = htf
+        self.has_prev = has_prev
+        self.bullish_engulfing = bullish_engulfing
+        self.bearish_engulfing = bearish_engulfing
+        self.bullish_sweep = bullish_sweep
+        self.bearish_sweep = bearish_sweep
+
+    def __len__(self):
+        return len(self.ts)
+
+
+def compute_signal_series(bars) -> SignalSeries:
+    """
+    Run the bias and HTF engines once over bars (tuples of ts, open, high, low, close[, ...]
+    as fetched, or dicts) and return the arrays every config is evaluated against.
+    """
+    n = len(bars)
+    ts = []
+    opens = np.empty(n)
+    highs = np.empty(n)
+    lows = np.empty(n)
+    closes = np.empty(n)
+    bias = np.empty(n, dtype=np.int8)
+    htf = {tf: np.empty(n, dtype=np.int8) for tf in HTF_ORDER}
+
+    bias_engine = BiasEngineFvgIfvg()
+    htf_engine = HTFBiasEngine()
+    for i, bar in enumerate(bars):
+        if isinstance(bar, dict):
+            bar_dict = {'ts': bar['ts'], 'open': float(bar['open']), 'high': float(bar['high']),
+                        'low': float(bar['low']), 'close': float(bar['close'])}
+        else:
+            bar_dict = {'ts': bar[0], 'open': float(bar[1]), 'high': float(bar[2]),
+                        'low': float(bar[3]), 'close': float(bar[4])}
+        ts.append(bar_dict['ts'])
+        opens[i], highs[i], lows[i], closes[i] = bar_dict['open'], bar_dict['high'], bar_dict['low'], bar_dict['close']
+        bias[i] = BIAS_CODES[bias_engine.update(bar_dict)]
+        htf_biases = htf_engine.update_ltf_bar(bar_dict)
+        for tf in HTF_ORDER:
+            htf[tf][i] = BIAS_CODES[htf_biases[HTF_KEYS[tf]]]
+
+    bias_prev = np.empty(n, dtype=np.int8)
+    if n:
+        bias_prev[0] = NEUTRAL
+        bias_prev[1:] = bias[:-1]
+    has_prev = np.ones(n, dtype=bool)
+    has_prev[:1] = False
+
+    # detect_engulfing over (prev, curr) pairs; index 0 has no prev bar
+    po, pc, ph, pl = (np.roll(a, 1) for a in (opens, closes, highs, lows))
+    bearish = (closes < opens) & (pc > po) & (opens >= pc) & (closes < po) & has_prev
+    bullish = (closes > opens) & (pc < po) & (opens <= pc) & (closes > po) & has_prev
+    bearish_sweep = bearish & (highs > ph) & (closes < pc)
+    bullish_sweep = bullish & (lows < pl) & (closes > pc)
+
+    return SignalSeries(ts, bias, bias_prev, htf, has_prev, bullish, bearish, bullish_sweep, bearish_sweep)
+
+
+def evaluate_sweep(series: SignalSeries, configs) -> Dict[SweepConfig, Tuple[np.ndarray, np.ndarray]]:
+    """(bull_mask, bear_mask) per config; HTF alignment masks are shared across engulfing modes"""
+    flip = series.has_prev & (series.bias != series.bias_prev)
+    fvg_bull = flip & (series.bias == BULLISH)
+    fvg_bear = flip & (series.bias == BEARISH)
+    engulf = {
+        'none': (None, None),
+        'engulfing': (series.bullish_engulfing, series.bearish_engulfing),
+        'sweep': (series.bullish_sweep, series.bearish_sweep),
+    }
+
+    aligned = {}
+    results = {}
+    for config in configs:
+        if config.htf_tfs not in aligned:
+            if not config.htf_tfs:
+                aligned[config.htf_tfs] = (fvg_bull, fvg_bear)
+            else:
+                htf_bull = np.logical_and.reduce([series.htf[tf] == BULLISH for tf in config.htf_tfs])
+                htf_bear = np.logical_and.reduce([series.htf[tf] == BEARISH for tf in config.htf_tfs])
+                aligned[config.htf_tfs] = (fvg_bull & htf_bull, fvg_bear & htf_bear)
+        bull, bear = aligned[config.htf_tfs]
+        eng_bull, eng_bear = engulf[config.engulfing]
+        if eng_bull is not None:
+            bull, bear = bull & eng_bull, bear & eng_bear
+        results[config] = (bull, bear)
+    return results
+
+
+def sweep_triangles(series: SignalSeries, bull_mask, bear_mask, window_start=None, window_end=None):
+    """[(ts, 'BULL'|'BEAR')] in bar order, restricted to [window_start, window_end)"""
+    out = []
+    for i in np.flatnonzero(bull_mask | bear_mask):
+        ts = series.ts[i]
+        if (window_start is not None and ts < window_start) or (window_end is not None and ts >= window_end):
+            continue
+        if bull_mask[i]:
+            out.append((ts, 'BULL'))
+        if bear_mask[i]:
+            out.append((ts, 'BEAR'))
+    return out
+
+
+def summarize_triangles(triangles, bars_evaluated):
+    """Summary stats recorded per sweep config"""
+    bull = sum(1 for _, direction in triangles if direction == 'BULL')
+    timestamps = [ts for ts, _ in triangles]
+    return {
+        'total_triangles': len(triangles),
+        'bull_count': bull,
+        'bear_count': len(triangles) - bull,
+        'min_ts': min(timestamps) if timestamps else None,
+        'max_ts': max(timestamps) if timestamps else None,
+        'bars_evaluated': bars_evaluated,
+        'triangles_per_1k_bars': round(1000.0 * len(triangles) / bars_evaluated, 3) if bars_evaluated else 0.0,
+    }
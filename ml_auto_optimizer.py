@@ -7,6 +7,9 @@ import time
 import logging
 from datetime import datetime, timedelta
 
+from ml_training_scheduler import (OPTIMIZER_ENGINE, CycleTimer, detect_drift, last_training_run,
+                                   log_training_run, plan_search)
+
 logger = logging.getLogger(__name__)
 
 class AutoMLOptimizer:
@@ -17,6 +20,8 @@ class AutoMLOptimizer:
         self.last_sample_count = 0
         self.running = False
         self.first_run = True
+        self.restored = False
+        self.trigger_reason = 'manual'
         
     def should_optimize(self):
         """Check if optimization should run"""
@@ -27,23 +32,23 @@ class AutoMLOptimizer:
             
             logger.info(f"📊 Sample check: {current_count} samples available")
             
-            # First optimization: 500+ samples (run immediately)
-            if self.last_optimization_time is None and current_count >= 500:
-                logger.info(f"🔧 TRIGGER: First optimization with {current_count} samples (threshold: 500)")
-                return True
+            # Pick up the last search from the runs log so a restart doesn't rerun it
+            if not self.restored:
+                self.restored = True
+                last_run = last_training_run(self.db, OPTIMIZER_ENGINE, 'hyperparameter_search')
+                if last_run:
+                    self.last_sample_count = last_run['samples_total']
+                    self.last_optimization_time = last_run['run_at'].astimezone().replace(tzinfo=None)
             
-            # 200+ new samples since last optimization
-            if self.last_sample_count > 0 and current_count - self.last_sample_count >= 200:
-                logger.info(f"🔧 TRIGGER: {current_count - self.last_sample_count} new samples (threshold: 200)")
+            # First search at 500+ samples, then on 200+ new samples or model drift
+            last_count = self.last_sample_count if self.last_optimization_time else None
+            drift = self.last_optimization_time is not None and detect_drift(self.db)
+            plan = plan_search(current_count, last_count, self.last_optimization_time, drift)
+            if plan.mode != 'skip':
+                logger.info(f"🔧 TRIGGER: {plan.reason}")
+                self.trigger_reason = plan.reason
                 return True
             
-            # Monthly optimization
-            if self.last_optimization_time:
-                days_since = (datetime.now() - self.last_optimization_time).days
-                if days_since >= 30:
-                    logger.info(f"🔧 TRIGGER: Monthly optimization ({days_since} days since last run)")
-                    return True
-            
             logger.info(f"⏸️ No optimization needed: {current_count} samples, last_count={self.last_sample_count}, last_run={self.last_optimization_time}")
             return False
         except Exception as e:
@@ -57,9 +62,14 @@ class AutoMLOptimizer:
             import json
             
             logger.info("🚀 Starting automatic hyperparameter optimization...")
-            start_time = time.time()
-            results = optimize_trading_models(self.db)
-            duration = time.time() - start_time
+            cursor = self.db.conn.cursor()
+            cursor.execute("SELECT COUNT(*) as count FROM signal_lab_trades WHERE COALESCE(mfe_none, mfe, 0) != 0")
+            sample_count = cursor.fetchone()['count']
+            with CycleTimer() as timer:
+                results = optimize_trading_models(self.db)
+            duration = timer.wall_seconds
+            reason = self.trigger_reason
+            new_samples = sample_count - self.last_sample_count
             
             if 'error' not in results:
                 rf_imp = results['comparison']['rf_improvement']['accuracy']
@@ -83,11 +93,14 @@ class AutoMLOptimizer:
                 ))
                 self.db.conn.commit()
                 
+                log_training_run(self.db, OPTIMIZER_ENGINE, 'hyperparameter_search', reason, sample_count, new_samples,
+                                 timer, {'rf_improvement': rf_imp, 'gb_improvement': gb_imp})
                 self.last_optimization_time = datetime.now()
-                cursor.execute("SELECT COUNT(*) as count FROM signal_lab_trades WHERE COALESCE(mfe_none, mfe, 0) != 0")
-                self.last_sample_count = cursor.fetchone()['count']
+                self.last_sample_count = sample_count
             else:
                 logger.error(f"❌ Optimization failed: {results['error']}")
+                log_training_run(self.db, OPTIMIZER_ENGINE, 'hyperparameter_search', reason, sample_count, new_samples,
+                                 timer, error=str(results['error']))
                 
         except Exception as e:
             logger.error(f"❌ Optimization error: {str(e)}")
@@ -11,12 +11,22 @@ from scipy import stats
 from scipy.stats import entropy
 import logging
 import json
-from typing import Dict, List, Tuple
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Below this many rows a process pool costs more (model pickling) than it saves
+POOL_MIN_ROWS = 20000
+
+
+def _ensemble_probabilities(models: List, X: np.ndarray) -> np.ndarray:
+    """predict_proba of every model over X, shape (n_models, n_samples, n_classes)"""
+    return np.stack([model.predict_proba(X) for model in models])
+
 
 class MLConfidenceScorer:
     """Confidence interval and uncertainty quantification for ML predictions"""
@@ -43,97 +53,113 @@ class MLConfidenceScorer:
             logger.error(f"Training failed: {e}")
             raise
     
-    def predict_with_confidence(self, X: np.ndarray) -> List[Dict]:
-        """Generate predictions with confidence intervals"""
+    def predict_with_confidence(self, X: np.ndarray, n_jobs: Optional[int] = None) -> List[Dict]:
+        """
+        Generate predictions with confidence intervals
+
+        Each model scores the whole batch once; bootstrap intervals resample the
+        resulting probability matrix. With n_jobs > 1, batches of at least
+        POOL_MIN_ROWS rows are split across a process pool.
+        """
         try:
+            X = np.asarray(X)
+            if len(X) == 0:
+                return []
+
+            model_probs = self._model_probabilities(X, n_jobs)
+
+            # Ensemble prediction (average probabilities)
+            avg_probs = model_probs.mean(axis=0)
+            predicted_classes = np.argmax(avg_probs, axis=1)
+            confidence_scores = avg_probs[np.arange(len(X)), predicted_classes]
+
+            # Bootstrap confidence intervals and uncertainty quantification
+            ci_lower, ci_upper = self._bootstrap_ci(model_probs, predicted_classes)
+            uncertainties = self._calculate_uncertainty(avg_probs)
+
+            # Plain floats for the per-row dicts (numpy scalar access dominates otherwise)
+            rows = zip(predicted_classes.tolist(), avg_probs.tolist(), confidence_scores.tolist(),
+                       ci_lower.tolist(), ci_upper.tolist(), np.asarray(uncertainties).tolist())
+
             predictions = []
-            
-            for i in range(len(X)):
-                sample = X[i:i+1]
-                
-                # Get predictions from all models
-                model_probs = [model.predict_proba(sample)[0] for model in self.models]
-                
-                # Ensemble prediction (average probabilities)
-                avg_probs = np.mean(model_probs, axis=0)
-                predicted_class = np.argmax(avg_probs)
-                confidence_score = avg_probs[predicted_class]
-                
-                # Bootstrap confidence interval
-                ci_lower, ci_upper = self._bootstrap_ci(sample, predicted_class)
-                
-                # Uncertainty quantification
-                uncertainty = self._calculate_uncertainty(avg_probs)
-                
-                # Confidence level
-                confidence_level = self._get_confidence_level(confidence_score)
-                
+            for predicted_class, probs, confidence_score, lower, upper, uncertainty in rows:
                 prediction = {
-                    'prediction': int(predicted_class),
+                    'prediction': predicted_class,
                     'prediction_label': self._get_prediction_label(predicted_class),
-                    'confidence_score': float(confidence_score),
+                    'confidence_score': confidence_score,
                     'confidence_interval': {
-                        'lower': float(ci_lower),
-                        'upper': float(ci_upper),
-                        'width': float(ci_upper - ci_lower)
+                        'lower': lower,
+                        'upper': upper,
+                        'width': upper - lower
                     },
-                    'uncertainty_level': float(uncertainty),
-                    'confidence_level': confidence_level,
+                    'uncertainty_level': uncertainty,
+                    'confidence_level': self._get_confidence_level(confidence_score),
                     'class_probabilities': {
-                        '0R': float(avg_probs[0]) if len(avg_probs) > 0 else 0.0,
-                        '1R': float(avg_probs[1]) if len(avg_probs) > 1 else 0.0,
-                        '2R': float(avg_probs[2]) if len(avg_probs) > 2 else 0.0,
-                        '3R': float(avg_probs[3]) if len(avg_probs) > 3 else 0.0
+                        '0R': float(probs[0]) if len(probs) > 0 else 0.0,
+                        '1R': float(probs[1]) if len(probs) > 1 else 0.0,
+                        '2R': float(probs[2]) if len(probs) > 2 else 0.0,
+                        '3R': float(probs[3]) if len(probs) > 3 else 0.0
                     },
                     'risk_adjusted_size': self._calculate_position_size(confidence_score),
                     'alert': self._generate_alert(confidence_score, uncertainty)
                 }
-                
+
                 predictions.append(prediction)
-            
+
             return predictions
-            
+
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
             raise
-    
-    def _bootstrap_ci(self, X: np.ndarray, predicted_class: int) -> Tuple[float, float]:
-        """Calculate bootstrap confidence interval"""
+
+    def _model_probabilities(self, X: np.ndarray, n_jobs: Optional[int] = None) -> np.ndarray:
+        """Ensemble probabilities for X, shape (n_models, n_samples, n_classes)"""
+        n_jobs = min(n_jobs or 1, os.cpu_count() or 1)
+        if n_jobs <= 1 or len(X) < POOL_MIN_ROWS:
+            return _ensemble_probabilities(self.models, X)
+
+        chunks = np.array_split(X, n_jobs)
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_ensemble_probabilities, [self.models] * len(chunks), chunks))
+        return np.concatenate(parts, axis=1)
+
+    def _bootstrap_ci(self, model_probs: np.ndarray, predicted_classes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Percentile bootstrap CI per sample from the model probability matrix"""
         try:
-            bootstrap_preds = []
-            
-            for _ in range(self.n_bootstrap):
-                # Random model selection with replacement
-                model = np.random.choice(self.models)
-                probs = model.predict_proba(X)[0]
-                bootstrap_preds.append(probs[predicted_class])
-            
+            n_models, n_samples = model_probs.shape[:2]
+
+            # Random model selection with replacement, n_bootstrap draws per sample
+            picks = np.random.randint(0, n_models, size=(n_samples, self.n_bootstrap))
+            class_probs = model_probs[:, np.arange(n_samples), predicted_classes].T
+            bootstrap_preds = np.take_along_axis(class_probs, picks, axis=1)
+
             # Calculate percentile-based CI
             alpha = (1 - self.confidence_level) / 2
-            ci_lower = np.percentile(bootstrap_preds, alpha * 100)
-            ci_upper = np.percentile(bootstrap_preds, (1 - alpha) * 100)
-            
+            ci_lower = np.percentile(bootstrap_preds, alpha * 100, axis=1)
+            ci_upper = np.percentile(bootstrap_preds, (1 - alpha) * 100, axis=1)
+
             return ci_lower, ci_upper
-            
+
         except Exception as e:
             logger.error(f"Bootstrap CI failed: {e}")
-            return 0.0, 1.0
-    
+            n_samples = len(predicted_classes)
+            return np.zeros(n_samples), np.ones(n_samples)
+
     def _calculate_uncertainty(self, probs: np.ndarray) -> float:
-        """Calculate prediction uncertainty using entropy"""
+        """Calculate prediction uncertainty using entropy (one value per row for 2-D input)"""
         try:
             # Normalize probabilities
-            probs = probs / np.sum(probs)
+            probs = probs / np.sum(probs, axis=-1, keepdims=True)
             
             # Shannon entropy (normalized to [0, 1])
-            max_entropy = np.log(len(probs))
-            uncertainty = entropy(probs) / max_entropy if max_entropy > 0 else 0.0
+            max_entropy = np.log(probs.shape[-1])
+            uncertainty = entropy(probs, axis=-1) / max_entropy if max_entropy > 0 else np.zeros(probs.shape[:-1])
             
             return uncertainty
             
         except Exception as e:
             logger.error(f"Uncertainty calculation failed: {e}")
-            return 1.0
+            return np.ones(np.shape(probs)[:-1]) if np.ndim(probs) > 1 else 1.0
     
     def _get_confidence_level(self, confidence_score: float) -> Dict:
         """Determine confidence level with color coding"""
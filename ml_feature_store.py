@@ -0,0 +1,450 @@
+"""
+ML Feature Store - One shared, incrementally refreshed trade frame for the ML engines
+
+The engines used to pull signal_lab_trades themselves and build features row by row
+on every train / predict. The store instead keeps:
+
+- A trade frame: one NumPy column per field (market_context JSON parsed once),
+  persisted to FEATURE_STORE_DIR and extended with only the rows whose id is past the
+  stored watermark. Outcome columns (MFE, BE hits) change after insert, so they are
+  re-read on every refresh with a narrow id/version/outcome query; deleted trades drop
+  out, and trades edited since they were read (their xmin row version moved on) are
+  fetched again.
+- Feature sets: vectorized builders over the frame, registered with a name and a
+  version. Each materialized matrix is persisted per (name, version) and only the
+  rows added or edited since it was saved are computed. Bump a version when its
+  builder changes.
+- A single-row path (feature_row) that runs the same builder over a one-row frame
+  for live predictions, so training and live features cannot drift apart.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURE_STORE_DIR = os.environ.get('ML_FEATURE_STORE_DIR', 'models/feature_store')
+FRAME_VERSION = 2
+
+# (code, timeframe, table); 15M trades carry no market context or entry price
+TRADE_SOURCES = ((0, '1M', 'signal_lab_trades'), (1, '15M', 'signal_lab_15m_trades'))
+
+STRING_COLUMNS = ('bias', 'session', 'signal_type', 'news_proximity',
+                  'volatility_regime', 'sector_rotation', 'market_session')
+CONTEXT_FLOAT_KEYS = ('vix', 'spy_volume', 'qqq_volume', 'dxy_price', 'dxy_change', 'nq_price',
+                      'nq_change', 'correlation_nq_es', 'nq_es_correlation', 'trend_strength')
+CONTEXT_STRING_KEYS = ('volatility_regime', 'sector_rotation', 'market_session')
+FLOAT_COLUMNS = ('hour', 'day_of_week', 'context_quality_score', 'entry_price') + CONTEXT_FLOAT_KEYS
+OUTCOME_COLUMNS = ('mfe', 'be1_hit', 'be2_hit')
+
+# Every column is aliased: RealDictCursor rows collapse duplicate names.
+# row_version is the row's xmin: any UPDATE gives the row a new one
+_FRAME_QUERIES = {
+    '1M': """
+        SELECT id, xmin::text::bigint AS row_version, date, time::time AS time,
+               EXTRACT(HOUR FROM time::time) AS hour, EXTRACT(DOW FROM date) AS day_of_week,
+               bias, session, signal_type, news_proximity,
+               market_context, context_quality_score, entry_price
+        FROM signal_lab_trades
+        WHERE id > %s OR id = ANY(%s)
+        ORDER BY id
+    """,
+    '15M': """
+        SELECT id, xmin::text::bigint AS row_version, date, time::time AS time,
+               EXTRACT(HOUR FROM time::time) AS hour, EXTRACT(DOW FROM date) AS day_of_week,
+               bias, session, signal_type, news_proximity,
+               NULL AS market_context, NULL AS context_quality_score, NULL AS entry_price
+        FROM signal_lab_15m_trades
+        WHERE id > %s OR id = ANY(%s)
+        ORDER BY id
+    """,
+}
+
+_OUTCOME_QUERIES = {
+    '1M': """
+        SELECT id, xmin::text::bigint AS row_version, COALESCE(mfe_none, mfe, 0) AS mfe,
+               COALESCE(be1_hit, false) AS be1_hit, COALESCE(be2_hit, false) AS be2_hit
+        FROM signal_lab_trades
+    """,
+    '15M': """
+        SELECT id, xmin::text::bigint AS row_version, COALESCE(mfe_none, 0) AS mfe,
+               COALESCE(be1_hit, false) AS be1_hit, COALESCE(be2_hit, false) AS be2_hit
+        FROM signal_lab_15m_trades
+    """,
+}
+
+
+def _values(row):
+    """Row values from a tuple or RealDictCursor row"""
+    return list(row.values()) if isinstance(row, dict) else list(row)
+
+
+def _float_or_nan(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _parse_context(raw) -> Dict:
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, str) and raw:
+        try:
+            parsed = json.loads(raw)
+            return parsed if isinstance(parsed, dict) else {}
+        except json.JSONDecodeError:
+            return {}
+    return {}
+
+
+def empty_frame() -> Dict[str, np.ndarray]:
+    frame = {
+        'key': np.zeros(0, dtype=np.int64),
+        'id': np.zeros(0, dtype=np.int64),
+        'version': np.zeros(0, dtype=np.int64),
+        'source': np.zeros(0, dtype=np.int8),
+        'ts': np.zeros(0, dtype='datetime64[s]'),
+        'has_context': np.zeros(0, dtype=bool),
+    }
+    for column in STRING_COLUMNS:
+        frame[column] = np.zeros(0, dtype='<U1')
+    for column in FLOAT_COLUMNS + OUTCOME_COLUMNS:
+        frame[column] = np.zeros(0, dtype=np.float64)
+    return frame
+
+
+def frame_from_records(records: List[Dict], source: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Frame from trade dicts (DB rows or live signal data)
+
+    market_context may be a dict or its JSON text; missing numbers are NaN and
+    missing strings '' so each feature set applies its own defaults.
+    """
+    n = len(records)
+    contexts = [_parse_context(r.get('market_context')) for r in records]
+    frame = {
+        'id': np.array([int(r.get('id') or 0) for r in records], dtype=np.int64),
+        'version': np.array([int(r.get('row_version') or 0) for r in records], dtype=np.int64),
+        'source': np.full(n, source, dtype=np.int8),
+        'has_context': np.array([bool(r.get('market_context')) for r in records], dtype=bool),
+    }
+    frame['key'] = frame['id'] * 2 + source
+    stamps = []
+    for r in records:
+        date, clock = r.get('date'), r.get('time')
+        if date is None:
+            stamps.append(np.datetime64('NaT'))
+        elif clock is None:
+            stamps.append(np.datetime64(str(date)))
+        else:
+            stamps.append(np.datetime64(f"{date}T{clock}"))
+    frame['ts'] = np.array(stamps, dtype='datetime64[s]')
+    for column in STRING_COLUMNS:
+        if column in CONTEXT_STRING_KEYS:
+            values = [c.get(column) for c in contexts]
+        else:
+            values = [r.get(column) for r in records]
+        frame[column] = np.array(['' if v is None else str(v) for v in values], dtype=str) if n else np.zeros(0, dtype='<U1')
+    for column in FLOAT_COLUMNS:
+        if column in CONTEXT_FLOAT_KEYS:
+            values = [c.get(column) for c in contexts]
+        else:
+            values = [r.get(column) for r in records]
+        frame[column] = np.array([_float_or_nan(v) for v in values], dtype=np.float64)
+    for column in OUTCOME_COLUMNS:
+        frame[column] = np.array([_float_or_nan(r.get(column, 0)) for r in records], dtype=np.float64)
+    return frame
+
+
+def concat_frames(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {column: np.concatenate([a[column], b[column]]) for column in a}
+
+
+def take_frame(frame: Dict[str, np.ndarray], index) -> Dict[str, np.ndarray]:
+    return {column: values[index] for column, values in frame.items()}
+
+
+def current_rows(keys: np.ndarray, versions: np.ndarray, frame: Dict[str, np.ndarray]) -> np.ndarray:
+    """Mask of (key, version) pairs that match a row of the key-sorted frame"""
+    if not len(frame['key']):
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.minimum(np.searchsorted(frame['key'], keys), len(frame['key']) - 1)
+    return (frame['key'][positions] == keys) & (frame['version'][positions] == versions)
+
+
+# ---------------------------------------------------------------------- feature sets
+
+class FeatureSet(NamedTuple):
+    name: str
+    version: int
+    columns: Tuple[str, ...]
+    build: Callable[[Dict[str, np.ndarray]], Tuple[np.ndarray, np.ndarray]]  # -> (X, valid)
+
+
+def _unified_features(frame):
+    """UnifiedMLIntelligence features (bias, session, signal type, news, timeframe, context quality)"""
+    session, signal_type, news = frame['session'], frame['signal_type'], frame['news_proximity']
+    quality = frame['context_quality_score'].copy()
+    # 15M trades have no context quality column and default to 0.5; a NULL score on a
+    # 1M trade made the old per-trade extractor skip it, so it stays invalid here
+    quality[frame['source'] == 1] = 0.5
+    X = np.column_stack([
+        frame['bias'] == 'Bullish',
+        session == 'London',
+        session == 'NY AM',
+        session == 'NY PM',
+        np.char.find(signal_type, 'FVG') >= 0,
+        np.char.find(signal_type, 'IFVG') >= 0,
+        news == 'High',
+        news == 'Medium',
+        frame['source'] == 0,
+        quality,
+    ]).astype(np.float64) if len(session) else np.zeros((0, 10))
+    return X, ~np.isnan(quality)
+
+
+def _signal_context_features(frame):
+    """SignalMLPredictor 0-1 condition scores from market context"""
+    vix = np.where(np.isnan(frame['vix']), 20, frame['vix'])
+    vix_regime = np.select([vix < 15, vix < 25, vix < 35], [0.9, 0.7, 0.3], 0.1)
+
+    session_scores = {'London': 0.9, 'NY Regular': 0.8, 'NY AM': 0.8, 'NY Pre Market': 0.4,
+                      'Asia': 0.3, 'After Hours': 0.2}
+    session_quality = np.array([session_scores.get(s, 0.5) for s in frame['session']], dtype=np.float64)
+
+    volume_ratio = np.where(np.isnan(frame['spy_volume']), 80000000, frame['spy_volume']) / 80000000
+    volume_regime = np.select([volume_ratio > 1.2, volume_ratio > 0.8], [0.8, 0.7], 0.4)
+
+    dxy_change = np.where(np.isnan(frame['dxy_change']), 0, frame['dxy_change'])
+    bias = np.where(frame['bias'] == '', 'Bullish', frame['bias'])
+    supportive = ((dxy_change < 0) & (bias == 'Bullish')) | ((dxy_change > 0) & (bias == 'Bearish'))
+    dxy_impact = np.where(np.abs(dxy_change) < 0.2, 0.6, np.where(supportive, 0.8, 0.3))
+
+    correlation = np.where(np.isnan(frame['nq_es_correlation']), 0.85, frame['nq_es_correlation'])
+    trend = np.where(np.isnan(frame['trend_strength']), 0.5, frame['trend_strength'])
+    sector_scores = {'TECH_LEADERSHIP': 0.8, 'BALANCED': 0.6, 'VALUE_ROTATION': 0.4}
+    sector = np.array([sector_scores.get(s or 'BALANCED', 0.5) for s in frame['sector_rotation']], dtype=np.float64)
+
+    X = np.column_stack([
+        vix_regime, session_quality, volume_regime, dxy_impact,
+        np.minimum(1.0, np.abs(correlation)), np.minimum(1.0, trend), sector,
+    ]) if len(vix) else np.zeros((0, 7))
+    return X, np.ones(len(vix), dtype=bool)
+
+
+FEATURE_SETS = {
+    fs.name: fs for fs in (
+        FeatureSet('unified', 1, ('bias_bullish', 'session_london', 'session_ny_am', 'session_ny_pm',
+                                  'signal_fvg', 'signal_ifvg', 'news_high', 'news_medium',
+                                  'timeframe_1m', 'context_quality'), _unified_features),
+        FeatureSet('signal_context', 1, ('vix_regime', 'session_quality', 'volume_regime', 'dxy_impact',
+                                         'correlation_strength', 'trend_strength', 'sector_rotation'),
+                   _signal_context_features),
+    )
+}
+
+
+def feature_row(name: str, record: Dict) -> np.ndarray:
+    """Single-row features for a live signal (same builder as training)"""
+    X, _ = FEATURE_SETS[name].build(frame_from_records([record], int(record.get('source', 0))))
+    return X[0]
+
+
+class FeatureMatrix(NamedTuple):
+    """A feature set's matrix aligned row for row with the frame it was read with"""
+    columns: Tuple[str, ...]
+    X: np.ndarray
+    valid: np.ndarray
+    frame: Dict[str, np.ndarray]
+
+
+# ---------------------------------------------------------------------- store
+
+class FeatureStore:
+    """Shared trade frame and feature matrices for one database"""
+
+    def __init__(self, db, root: Optional[str] = None, refresh_interval: float = 60.0):
+        self.db = db
+        self.root = root or FEATURE_STORE_DIR
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._frame = None
+        self._watermark = {}
+        self._matrices = {}
+        self._refreshed_at = 0.0
+
+    # ---------------------------------------------------------------- persistence
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, f"{name}.npz")
+
+    def _save(self, name: str, arrays: Dict[str, np.ndarray]):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = self._path(name) + '.tmp.npz'
+            np.savez(tmp, **arrays)
+            os.replace(tmp, self._path(name))
+        except OSError as e:
+            logger.warning(f"Feature store save failed ({name}): {e}")
+
+    def _load(self, name: str) -> Optional[Dict[str, np.ndarray]]:
+        try:
+            with np.load(self._path(name), allow_pickle=False) as data:
+                return {key: data[key] for key in data.files}
+        except (OSError, ValueError):
+            return None
+
+    def _load_frame(self):
+        stored = self._load(f"trades_v{FRAME_VERSION}")
+        frame = empty_frame()
+        if stored is not None and set(frame) <= set(stored):
+            frame = {column: stored[column] for column in frame}
+            self._watermark = {int(code): int(mark) for code, mark in stored['watermark']}
+        self._frame = frame
+
+    def _save_frame(self):
+        arrays = dict(self._frame)
+        arrays['watermark'] = np.array(sorted(self._watermark.items()), dtype=np.int64).reshape(-1, 2)
+        self._save(f"trades_v{FRAME_VERSION}", arrays)
+
+    # ---------------------------------------------------------------- refresh
+
+    def _source_exists(self, cursor, table: str) -> bool:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL AS present", (table,))
+        return bool(_values(cursor.fetchone())[0])
+
+    def _fetch_new_rows(self, cursor, code: int, timeframe: str, missing: List[int]) -> Dict[str, np.ndarray]:
+        cursor.execute(_FRAME_QUERIES[timeframe], (self._watermark.get(code, 0), missing))
+        names = ('id', 'row_version', 'date', 'time', 'hour', 'day_of_week', 'bias', 'session', 'signal_type',
+                 'news_proximity', 'market_context', 'context_quality_score', 'entry_price')
+        records = [dict(zip(names, _values(row))) for row in cursor.fetchall()]
+        if records:
+            self._watermark[code] = max(self._watermark.get(code, 0), max(r['id'] for r in records))
+        return frame_from_records(records, code)
+
+    def _fetch_outcomes(self, cursor, code: int, timeframe: str):
+        cursor.execute(_OUTCOME_QUERIES[timeframe])
+        rows = [_values(row) for row in cursor.fetchall()]
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        versions = np.array([row[1] for row in rows], dtype=np.int64)
+        outcomes = np.array([[float(v) for v in row[2:]] for row in rows], dtype=np.float64).reshape(-1, 3)
+        return ids * 2 + code, versions, outcomes
+
+    def refresh(self, force: bool = False) -> Dict[str, np.ndarray]:
+        """Append new trades, re-read edited trades and outcomes, drop deleted trades; returns the frame"""
+        with self._lock:
+            if not force and self._frame is not None and time.time() - self._refreshed_at < self.refresh_interval:
+                return self._frame
+            if self._frame is None:
+                self._load_frame()
+
+            cursor = self.db.conn.cursor()
+            frame = self._frame
+            added = edited = 0
+            keys, outcomes = [], []
+            for code, timeframe, table in TRADE_SOURCES:
+                if not self._source_exists(cursor, table):
+                    continue
+                source_keys, source_versions, source_outcomes = self._fetch_outcomes(cursor, code, timeframe)
+                # Ids at or below the watermark that the frame lacks (late commits, recreated
+                # tables) or holds at an older row version (edited trades)
+                watermark_key = self._watermark.get(code, 0) * 2 + code
+                behind = source_keys <= watermark_key
+                stale = behind & ~current_rows(source_keys, source_versions, self._frame)
+                changed = source_keys[stale & np.isin(source_keys, frame['key'])]
+                frame = take_frame(frame, np.flatnonzero(~np.isin(frame['key'], changed)))
+                new_rows = self._fetch_new_rows(cursor, code, timeframe, (source_keys[stale] // 2).tolist())
+                edited += len(changed)
+                added += len(new_rows['key']) - len(changed)
+                frame = concat_frames(frame, new_rows)
+                keys.append(source_keys)
+                outcomes.append(source_outcomes)
+
+            keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+            outcomes = np.concatenate(outcomes) if outcomes else np.zeros((0, 3))
+            order = np.argsort(keys)
+            keys, outcomes = keys[order], outcomes[order]
+
+            # Keep trades that still exist (sorted by key) and attach current outcomes
+            live = np.isin(frame['key'], keys)
+            frame = take_frame(frame, np.flatnonzero(live))
+            frame = take_frame(frame, np.argsort(frame['key'], kind='stable'))
+            positions = np.searchsorted(keys, frame['key'])
+            for i, column in enumerate(OUTCOME_COLUMNS):
+                frame[column] = outcomes[positions, i]
+
+            removed = int((~live).sum())
+            self._frame = frame
+            self._refreshed_at = time.time()
+            if added or edited or removed:
+                self._save_frame()
+                logger.info(f"Feature store: +{added} / ~{edited} / -{removed} trades ({len(frame['key'])} total)")
+            return frame
+
+    # ---------------------------------------------------------------- reads
+
+    def frame(self) -> Dict[str, np.ndarray]:
+        return self.refresh()
+
+    def matrix(self, name: str) -> FeatureMatrix:
+        """Feature matrix for the current frame, computing only rows not materialized yet"""
+        feature_set = FEATURE_SETS[name]
+        frame = self.refresh()
+        with self._lock:
+            cache_name = f"{name}_v{feature_set.version}"
+            cached = self._matrices.get(cache_name)
+            if cached is None:
+                stored = self._load(cache_name)
+                if (stored is not None and 'version' in stored
+                        and stored['X'].shape[1:] == (len(feature_set.columns),)):
+                    cached = stored
+            if cached is None:
+                cached = {'key': np.zeros(0, dtype=np.int64), 'version': np.zeros(0, dtype=np.int64),
+                          'X': np.zeros((0, len(feature_set.columns))), 'valid': np.zeros(0, dtype=bool)}
+
+            # Rows of deleted or edited trades are dropped and rebuilt from the frame
+            known = current_rows(cached['key'], cached['version'], frame)
+            missing = np.flatnonzero(~np.isin(frame['key'], cached['key'][known]))
+            if missing.size or not known.all():
+                X_new, valid_new = feature_set.build(take_frame(frame, missing))
+                keys = np.concatenate([cached['key'][known], frame['key'][missing]])
+                versions = np.concatenate([cached['version'][known], frame['version'][missing]])
+                X = np.concatenate([cached['X'][known], X_new.reshape(-1, len(feature_set.columns))])
+                valid = np.concatenate([cached['valid'][known], valid_new])
+                order = np.argsort(keys, kind='stable')
+                cached = {'key': keys[order], 'version': versions[order], 'X': X[order], 'valid': valid[order]}
+                self._save(cache_name, cached)
+            self._matrices[cache_name] = cached
+
+        return FeatureMatrix(feature_set.columns, cached['X'], cached['valid'], frame)
+
+    def invalidate(self):
+        """Drop persisted frames and matrices; the next read rebuilds from the database"""
+        with self._lock:
+            for path in os.listdir(self.root) if os.path.isdir(self.root) else []:
+                if path.endswith('.npz'):
+                    os.remove(os.path.join(self.root, path))
+            self._frame = None
+            self._watermark = {}
+            self._matrices = {}
+            self._refreshed_at = 0.0
+
+
+_feature_store = None
+_feature_store_lock = threading.Lock()
+
+
+def get_feature_store(db) -> FeatureStore:
+    """Process-wide feature store shared by the ML engines"""
+    global _feature_store
+    with _feature_store_lock:
+        if _feature_store is None or _feature_store.db is not db:
+            _feature_store = FeatureStore(db)
+        return _feature_store
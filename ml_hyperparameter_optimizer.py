@@ -219,23 +219,15 @@ def optimize_trading_models(db):
     
     try:
         ml_engine = get_unified_ml(db)
-        trades = ml_engine._get_all_trades()
+        X, y, _, trade_count = ml_engine._training_matrix()
         
-        if len(trades) < 100:
-            return {'error': 'Insufficient training data', 'samples': len(trades)}
+        if trade_count < 100:
+            return {'error': 'Insufficient training data', 'samples': trade_count}
         
         MAX_SAMPLES = 3000
-        if len(trades) > MAX_SAMPLES:
-            logger.info(f"📊 Sampling {MAX_SAMPLES} from {len(trades)} trades for optimization")
-            trades = trades[-MAX_SAMPLES:]
-        
-        prep_result = ml_engine._prepare_training_data(trades)
-        if len(prep_result) == 2:
-            X, y = prep_result
-        elif len(prep_result) == 3:
-            X, y, _ = prep_result
-        else:
-            X, y = prep_result[0], prep_result[1]
+        if len(X) > MAX_SAMPLES:
+            logger.info(f"📊 Sampling {MAX_SAMPLES} from {len(X)} trades for optimization")
+            X, y = X[-MAX_SAMPLES:], y[-MAX_SAMPLES:]
         
         # Convert continuous MFE to binary classification (success = MFE > 1R)
         y = (y > 1.0).astype(int)
@@ -0,0 +1,189 @@
+"""
+ML Training Scheduler
+Decides each cycle whether the unified models need nothing, a warm start on the newly
+labeled trades, or a full refit, and when a hyperparameter search is worth rerunning.
+Every cycle that trains is logged to ml_training_runs with its wall-clock and CPU time.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+UNIFIED_ENGINE = 'unified_ml'
+OPTIMIZER_ENGINE = 'hyperparameter_optimizer'
+
+WARM_START_MIN_NEW = 50                   # new labeled trades before trees are added
+WARM_START_TREES = 10                     # trees added to each model per warm start
+MAX_TREES = 300                           # warm starts past this size fall back to a full refit
+FULL_REFIT_FRACTION = 0.25                # growth since the last full refit that forces a new one
+FULL_REFIT_MAX_AGE = timedelta(days=7)
+DRIFT_REFIT_INTERVAL = timedelta(days=1)  # drift persists for days; refit on it at most daily
+
+CYCLE_INTERVAL = 3600                     # seconds between cycles started by run_if_due
+
+SEARCH_MIN_SAMPLES = 500
+SEARCH_MIN_NEW = 200
+DRIFT_SEARCH_INTERVAL = timedelta(days=7)
+
+
+class TrainingPlan(NamedTuple):
+    mode: str      # 'skip', 'warm_start', 'full_refit' or 'hyperparameter_search'
+    reason: str
+
+
+def plan_training(trained: bool, full_fit_samples: int, total_samples: int, new_samples: int,
+                  trees: int, last_full_training: Optional[datetime], drift: bool,
+                  now: Optional[datetime] = None) -> TrainingPlan:
+    """Pick the training mode for one cycle of the unified models"""
+    now = now or datetime.now()
+    if not trained:
+        return TrainingPlan('full_refit', 'no trained models')
+    since_full = now - last_full_training if last_full_training else FULL_REFIT_MAX_AGE
+    if drift and since_full >= DRIFT_REFIT_INTERVAL:
+        return TrainingPlan('full_refit', 'feature or performance drift')
+    growth = total_samples - full_fit_samples
+    if growth >= max(WARM_START_MIN_NEW, FULL_REFIT_FRACTION * full_fit_samples):
+        return TrainingPlan('full_refit', f'{growth} trades since last full refit ({full_fit_samples} fit)')
+    if new_samples > 0 and since_full >= FULL_REFIT_MAX_AGE:
+        return TrainingPlan('full_refit', f'last full refit {since_full.days} days ago')
+    if new_samples >= WARM_START_MIN_NEW:
+        if trees + WARM_START_TREES > MAX_TREES:
+            return TrainingPlan('full_refit', f'{trees} trees (max {MAX_TREES})')
+        return TrainingPlan('warm_start', f'{new_samples} new trades')
+    return TrainingPlan('skip', f'{new_samples} new trades (need {WARM_START_MIN_NEW})')
+
+
+def plan_search(total_samples: int, last_search_samples: Optional[int], last_search_at: Optional[datetime],
+                drift: bool, now: Optional[datetime] = None) -> TrainingPlan:
+    """Decide whether the hyperparameter search should rerun"""
+    now = now or datetime.now()
+    if last_search_samples is None:
+        if total_samples >= SEARCH_MIN_SAMPLES:
+            return TrainingPlan('hyperparameter_search', f'first search with {total_samples} samples')
+        return TrainingPlan('skip', f'{total_samples} samples (need {SEARCH_MIN_SAMPLES})')
+    if total_samples - last_search_samples >= SEARCH_MIN_NEW:
+        return TrainingPlan('hyperparameter_search', f'{total_samples - last_search_samples} new samples')
+    if drift and (last_search_at is None or now - last_search_at >= DRIFT_SEARCH_INTERVAL):
+        return TrainingPlan('hyperparameter_search', 'feature or performance drift')
+    return TrainingPlan('skip', f'{total_samples - last_search_samples} new samples (need {SEARCH_MIN_NEW})')
+
+
+def detect_drift(db) -> bool:
+    """True when the drift detector flags a feature or declining performance"""
+    from model_drift_detector import ModelDriftDetector
+
+    health = ModelDriftDetector(db).get_model_health_score()
+    if health.get('status') == 'Error':
+        db.conn.rollback()
+        return False
+    features = health.get('feature_drift', {}).values()
+    return (any(result['drift_detected'] for result in features)
+            or bool(health.get('performance_drift', {}).get('degradation_detected')))
+
+
+class CycleTimer:
+    """Wall-clock and process CPU time of a training cycle"""
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = time.process_time() - self._cpu
+        return False
+
+
+def log_training_run(db, engine: str, mode: str, reason: str, samples_total: int, samples_new: int,
+                     timer: CycleTimer, metrics: Optional[Dict] = None, error: Optional[str] = None):
+    """Record one training cycle in ml_training_runs"""
+    try:
+        cursor = db.conn.cursor()
+        cursor.execute("""
+            INSERT INTO ml_training_runs
+            (engine, mode, reason, samples_total, samples_new, wall_seconds, cpu_seconds, metrics, status, error)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            engine, mode, reason, int(samples_total), int(samples_new),
+            round(timer.wall_seconds, 3), round(timer.cpu_seconds, 3),
+            json.dumps(metrics or {}), 'failed' if error else 'success', error
+        ))
+        db.conn.commit()
+    except Exception as e:
+        db.conn.rollback()
+        logger.warning(f"Could not log training run: {str(e)}")
+
+
+def last_training_run(db, engine: str, mode: str) -> Optional[Dict]:
+    """Most recent successful run of an engine in a mode"""
+    try:
+        cursor = db.conn.cursor()
+        cursor.execute("""
+            SELECT samples_total, run_at FROM ml_training_runs
+            WHERE engine = %s AND mode = %s AND status = 'success'
+            ORDER BY run_at DESC LIMIT 1
+        """, (engine, mode))
+        row = cursor.fetchone()
+        db.conn.commit()
+        return dict(row) if row else None
+    except Exception as e:
+        db.conn.rollback()
+        logger.warning(f"Could not read training runs: {str(e)}")
+        return None
+
+
+class TrainingScheduler:
+    """Runs training cycles for a UnifiedMLIntelligence instance"""
+
+    def __init__(self, db, ml_engine, drift_check=detect_drift, cycle_interval: float = CYCLE_INTERVAL):
+        self.db = db
+        self.ml_engine = ml_engine
+        self.drift_check = drift_check
+        self.cycle_interval = cycle_interval
+        self.last_cycle = 0.0
+        self._lock = threading.Lock()
+
+    def run_if_due(self) -> Optional[Dict]:
+        """Run a cycle unless one ran within cycle_interval or is running now"""
+        if time.time() - self.last_cycle < self.cycle_interval or not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self._run_cycle()
+        finally:
+            self._lock.release()
+
+    def run_cycle(self) -> Dict:
+        with self._lock:
+            return self._run_cycle()
+
+    def _run_cycle(self) -> Dict:
+        self.last_cycle = time.time()
+        engine = self.ml_engine
+        new_samples, total_samples = engine.pending_training_samples()
+        drift = self.drift_check(self.db) if engine.is_trained else False
+        plan = plan_training(engine.is_trained, engine.full_fit_samples, total_samples, new_samples,
+                             engine.tree_count(), engine.last_full_training, drift)
+        if plan.mode == 'skip':
+            logger.info(f"⏸️ Training skipped: {plan.reason}")
+            return {'mode': plan.mode, 'reason': plan.reason}
+
+        logger.info(f"🔄 Training cycle: {plan.mode} ({plan.reason})")
+        with CycleTimer() as timer:
+            if plan.mode == 'warm_start':
+                result = engine.warm_start_update(WARM_START_TREES)
+            else:
+                result = engine.train_on_all_data()
+
+        metrics = {k: result[k] for k in ('mfe_mae', 'success_accuracy', 'trees') if k in result}
+        log_training_run(self.db, UNIFIED_ENGINE, plan.mode, plan.reason,
+                         result.get('training_samples', total_samples), new_samples, timer,
+                         metrics, result.get('error'))
+        logger.info(f"⏱️ {plan.mode}: {timer.wall_seconds:.2f}s wall, {timer.cpu_seconds:.2f}s CPU")
+        return dict(result, mode=plan.mode, reason=plan.reason,
+                    wall_seconds=timer.wall_seconds, cpu_seconds=timer.cpu_seconds)
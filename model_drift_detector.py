@@ -5,6 +5,53 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 import json
 
+# Fixed bins per feature, matching model_drift_bins() in database/model_drift_histograms.sql
+DRIFT_BINS = {'bias': 2, 'session': 4}
+
+
+def histogram_drift(baseline_counts: np.ndarray, current_counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    PSI and two-sample KS for every feature at once from binned counts
+
+    Rows are features, columns bins (pad short rows with zeros). KS is exact for
+    binned values; its p-value is the asymptotic one (ks_2samp mode='asymp').
+    """
+    baseline_counts = np.asarray(baseline_counts, dtype=np.float64)
+    current_counts = np.asarray(current_counts, dtype=np.float64)
+    n = baseline_counts.sum(axis=1)
+    m = current_counts.sum(axis=1)
+
+    expected = baseline_counts / n[:, None]
+    actual = current_counts / m[:, None]
+    ks_stat = np.abs(np.cumsum(expected, axis=1) - np.cumsum(actual, axis=1)).max(axis=1)
+    ks_pval = stats.kstwo.sf(ks_stat, np.round(n * m / (n + m)))
+
+    expected = np.where(expected == 0, 0.0001, expected)
+    actual = np.where(actual == 0, 0.0001, actual)
+    psi = np.sum((actual - expected) * np.log(actual / expected), axis=1)
+    return {'psi': psi, 'ks_statistic': ks_stat, 'ks_pvalue': ks_pval, 'baseline_n': n, 'current_n': m}
+
+
+def load_drift_histograms(cursor, baseline_days: int = 30, current_days: int = 7) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Baseline (older than baseline_days) and current (last current_days) histograms per feature"""
+    cursor.execute("""
+        SELECT feature, bin,
+               COALESCE(SUM(count) FILTER (WHERE bucket_date < CURRENT_DATE - %s), 0) AS baseline,
+               COALESCE(SUM(count) FILTER (WHERE bucket_date > CURRENT_DATE - %s), 0) AS current
+        FROM model_drift_histograms
+        GROUP BY feature, bin
+    """, (baseline_days, current_days))
+    histograms = {f: (np.zeros(bins), np.zeros(bins)) for f, bins in DRIFT_BINS.items()}
+    for row in cursor.fetchall():
+        feature, bin_index, baseline, current = (
+            (row['feature'], row['bin'], row['baseline'], row['current']) if isinstance(row, dict) else row
+        )
+        if feature in histograms and 0 <= bin_index < DRIFT_BINS[feature]:
+            histograms[feature][0][bin_index] = baseline
+            histograms[feature][1][bin_index] = current
+    return histograms
+
+
 class ModelDriftDetector:
     def __init__(self, db):
         self.db = db
@@ -22,6 +69,40 @@ class ModelDriftDetector:
         psi = np.sum((actual_percents - expected_percents) * np.log(actual_percents / expected_percents))
         return psi
     
+    def _drift_result(self, psi: float, ks_stat: float, ks_pval: float) -> Dict:
+        if psi > 0.25 or ks_pval < 0.01:
+            severity = 'Critical'
+        elif psi > 0.2 or ks_pval < 0.05:
+            severity = 'High'
+        elif psi > 0.1:
+            severity = 'Medium'
+        else:
+            severity = 'Low'
+
+        return {
+            'psi': float(psi),
+            'ks_statistic': float(ks_stat),
+            'ks_pvalue': float(ks_pval),
+            'severity': severity,
+            'drift_detected': bool(psi > self.psi_threshold or ks_pval < self.ks_threshold)
+        }
+
+    def detect_histogram_drift(self, histograms: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Dict:
+        """Detect drift from (baseline, current) histograms, all features in one pass"""
+        features = list(histograms.keys())
+        width = max(len(histograms[f][0]) for f in features)
+        baseline = np.zeros((len(features), width))
+        current = np.zeros((len(features), width))
+        for row, feature in enumerate(features):
+            baseline[row, :len(histograms[feature][0])] = histograms[feature][0]
+            current[row, :len(histograms[feature][1])] = histograms[feature][1]
+
+        drift = histogram_drift(baseline, current)
+        return {
+            feature: self._drift_result(drift['psi'][row], drift['ks_statistic'][row], drift['ks_pvalue'][row])
+            for row, feature in enumerate(features)
+        }
+
     def detect_feature_drift(self, baseline_data: Dict, current_data: Dict) -> Dict:
         """Detect drift in feature distributions"""
         drift_results = {}
@@ -39,23 +120,7 @@ class ModelDriftDetector:
             # KS test
             ks_stat, ks_pval = stats.ks_2samp(baseline, current)
             
-            # Determine severity
-            if psi > 0.25 or ks_pval < 0.01:
-                severity = 'Critical'
-            elif psi > 0.2 or ks_pval < 0.05:
-                severity = 'High'
-            elif psi > 0.1:
-                severity = 'Medium'
-            else:
-                severity = 'Low'
-            
-            drift_results[feature] = {
-                'psi': float(psi),
-                'ks_statistic': float(ks_stat),
-                'ks_pvalue': float(ks_pval),
-                'severity': severity,
-                'drift_detected': psi > self.psi_threshold or ks_pval < self.ks_threshold
-            }
+            drift_results[feature] = self._drift_result(psi, ks_stat, ks_pval)
         
         return drift_results
     
@@ -106,39 +171,14 @@ class ModelDriftDetector:
     def get_model_health_score(self) -> Dict:
         """Calculate composite model health score"""
         try:
-            # Get baseline data (first 30 days)
+            # Baseline (older than 30 days) and current (last 7 days) feature histograms,
+            # kept up to date by triggers on signal_lab_trades
             cursor = self.db.conn.cursor()
-            cursor.execute("""
-                SELECT 
-                    CASE WHEN bias = 'Bullish' THEN 1 ELSE 0 END as bias_encoded,
-                    CASE 
-                        WHEN session = 'NY AM' THEN 1
-                        WHEN session = 'NY PM' THEN 2
-                        WHEN session = 'London' THEN 3
-                        ELSE 0
-                    END as session_encoded
-                FROM signal_lab_trades
-                WHERE created_at < NOW() - INTERVAL '30 days'
-                LIMIT 500
-            """)
-            baseline = cursor.fetchall()
-            
-            # Get current data (last 7 days)
-            cursor.execute("""
-                SELECT 
-                    CASE WHEN bias = 'Bullish' THEN 1 ELSE 0 END as bias_encoded,
-                    CASE 
-                        WHEN session = 'NY AM' THEN 1
-                        WHEN session = 'NY PM' THEN 2
-                        WHEN session = 'London' THEN 3
-                        ELSE 0
-                    END as session_encoded
-                FROM signal_lab_trades
-                WHERE created_at > NOW() - INTERVAL '7 days'
-            """)
-            current = cursor.fetchall()
+            histograms = load_drift_histograms(cursor, baseline_days=30, current_days=7)
+            baseline_n = min(h[0].sum() for h in histograms.values())
+            current_n = min(h[1].sum() for h in histograms.values())
             
-            if len(baseline) < 50 or len(current) < 10:
+            if baseline_n < 50 or current_n < 10:
                 return {
                     'health_score': 75,
                     'status': 'Insufficient Data',
@@ -146,16 +186,7 @@ class ModelDriftDetector:
                 }
             
             # Feature drift
-            baseline_data = {
-                'bias': [r['bias_encoded'] for r in baseline],
-                'session': [r['session_encoded'] for r in baseline]
-            }
-            current_data = {
-                'bias': [r['bias_encoded'] for r in current],
-                'session': [r['session_encoded'] for r in current]
-            }
-            
-            drift_results = self.detect_feature_drift(baseline_data, current_data)
+            drift_results = self.detect_histogram_drift(histograms)
             
             # Performance drift
             perf_drift = self.calculate_performance_drift(30)
@@ -208,9 +239,10 @@ class ModelDriftDetector:
                 'recommendation': f'Error calculating health: {str(e)}'
             }
     
-    def get_drift_alerts(self) -> List[Dict]:
-        """Get active drift alerts"""
-        health = self.get_model_health_score()
+    def get_drift_alerts(self, health: Dict = None) -> List[Dict]:
+        """Get active drift alerts (from an already computed health score when given)"""
+        if health is None:
+            health = self.get_model_health_score()
         alerts = []
         
         # Feature drift alerts
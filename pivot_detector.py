@@ -38,7 +38,7 @@ class PivotDetector:
         if end_index is None:
             end_index = len(candles) - 1
         
-        logger.info(f"🔍 Searching for pivot low from index {start_index} to {end_index}")
+        logger.debug(f"🔍 Searching for pivot low from index {start_index} to {end_index}")
         
         # Need at least 3 candles for pivot detection
         if len(candles) < 3:
@@ -56,8 +56,8 @@ class PivotDetector:
             if (current_candle['low'] < left_candle['low'] and 
                 current_candle['low'] < right_candle['low']):
                 
-                logger.info(f"✅ PIVOT LOW FOUND at index {i}: {current_candle['low']}")
-                logger.info(f"   Left: {left_candle['low']}, Center: {current_candle['low']}, Right: {right_candle['low']}")
+                logger.debug(f"✅ PIVOT LOW FOUND at index {i}: {current_candle['low']}")
+                logger.debug(f"   Left: {left_candle['low']}, Center: {current_candle['low']}, Right: {right_candle['low']}")
                 
                 return {
                     'candle': current_candle,
@@ -66,7 +66,7 @@ class PivotDetector:
                     'pivot_value': current_candle['low']
                 }
         
-        logger.info("❌ No pivot low found in range")
+        logger.debug("❌ No pivot low found in range")
         return None
     
     def find_pivot_high_in_range(self, candles: List[Dict], start_index: int = 0, end_index: int = None) -> Optional[Dict]:
@@ -85,7 +85,7 @@ class PivotDetector:
         if end_index is None:
             end_index = len(candles) - 1
         
-        logger.info(f"🔍 Searching for pivot high from index {start_index} to {end_index}")
+        logger.debug(f"🔍 Searching for pivot high from index {start_index} to {end_index}")
         
         # Need at least 3 candles for pivot detection
         if len(candles) < 3:
@@ -103,8 +103,8 @@ class PivotDetector:
             if (current_candle['high'] > left_candle['high'] and 
                 current_candle['high'] > right_candle['high']):
                 
-                logger.info(f"✅ PIVOT HIGH FOUND at index {i}: {current_candle['high']}")
-                logger.info(f"   Left: {left_candle['high']}, Center: {current_candle['high']}, Right: {right_candle['high']}")
+                logger.debug(f"✅ PIVOT HIGH FOUND at index {i}: {current_candle['high']}")
+                logger.debug(f"   Left: {left_candle['high']}, Center: {current_candle['high']}, Right: {right_candle['high']}")
                 
                 return {
                     'candle': current_candle,
@@ -113,7 +113,7 @@ class PivotDetector:
                     'pivot_value': current_candle['high']
                 }
         
-        logger.info("❌ No pivot high found in range")
+        logger.debug("❌ No pivot high found in range")
         return None
     
     def is_candle_pivot_low(self, candles: List[Dict], candle_index: int) -> bool:
@@ -141,7 +141,7 @@ class PivotDetector:
                    current_candle['low'] < right_candle['low'])
         
         if is_pivot:
-            logger.info(f"✅ Candle at index {candle_index} IS a pivot low: {current_candle['low']}")
+            logger.debug(f"✅ Candle at index {candle_index} IS a pivot low: {current_candle['low']}")
         else:
             logger.debug(f"❌ Candle at index {candle_index} is NOT a pivot low")
         
@@ -172,7 +172,7 @@ class PivotDetector:
                    current_candle['high'] > right_candle['high'])
         
         if is_pivot:
-            logger.info(f"✅ Candle at index {candle_index} IS a pivot high: {current_candle['high']}")
+            logger.debug(f"✅ Candle at index {candle_index} IS a pivot high: {current_candle['high']}")
         else:
             logger.debug(f"❌ Candle at index {candle_index} is NOT a pivot high")
         
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+PIVOT INDEX - Array-based 3-candle pivots and range extremes over a bar series
+Same rules as PivotDetector, computed once per series instead of rescanning per signal
+
+- Pivot masks from NumPy shifted comparisons (PIVOT LOW: low < both neighbours,
+  PIVOT HIGH: high > both neighbours)
+- Nearest pivot left of an index: binary search over sorted pivot positions, O(log n)
+- Lowest low / highest high of any range: sparse table, O(n log n) build, O(1) query;
+  ties resolve to the leftmost candle like the PivotDetector scans
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class SparseTable:
+    """Range argmin/argmax over a fixed array (leftmost index on ties)"""
+
+    def __init__(self, values, mode: str = 'min'):
+        if mode not in ('min', 'max'):
+            raise ValueError(f"Invalid sparse table mode: {mode}")
+        self.values = np.asarray(values, dtype=np.float64)
+        self.mode = mode
+        n = len(self.values)
+        self.levels = [np.arange(n, dtype=np.int64)]
+        k = 1
+        while (1 << k) <= n:
+            prev = self.levels[-1]
+            width = n - (1 << k) + 1
+            left = prev[:width]
+            right = prev[(1 << (k - 1)):(1 << (k - 1)) + width]
+            self.levels.append(np.where(self._better(right, left), right, left))
+            k += 1
+
+    def _better(self, a, b):
+        """a strictly better than b (strict keeps the left candidate on ties)"""
+        if self.mode == 'min':
+            return self.values[a] < self.values[b]
+        return self.values[a] > self.values[b]
+
+    def argquery(self, lo: int, hi: int) -> int:
+        """Index of the extreme value in values[lo..hi] (inclusive)"""
+        if lo < 0 or hi >= len(self.values) or hi < lo:
+            raise IndexError(f"Invalid range [{lo}, {hi}] for {len(self.values)} values")
+        k = (hi - lo + 1).bit_length() - 1
+        left = self.levels[k][lo]
+        right = self.levels[k][hi - (1 << k) + 1]
+        return int(right) if self._better(right, left) else int(left)
+
+    def argquery_many(self, lo, hi) -> np.ndarray:
+        """Vectorized argquery for arrays of inclusive ranges"""
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        if len(lo) and (lo.min() < 0 or hi.max() >= len(self.values) or (hi < lo).any()):
+            raise IndexError("Invalid range in batch query")
+        k = np.floor(np.log2(hi - lo + 1)).astype(np.int64)
+        result = np.empty(len(lo), dtype=np.int64)
+        for level in np.unique(k):
+            sel = k == level
+            left = self.levels[level][lo[sel]]
+            right = self.levels[level][hi[sel] - (1 << int(level)) + 1]
+            result[sel] = np.where(self._better(right, left), right, left)
+        return result
+
+
+class PivotIndex:
+    """Pivot masks, pivot positions and range extremes for one bar series"""
+
+    def __init__(self, highs, lows, opens=None, closes=None):
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.opens = None if opens is None else np.asarray(opens, dtype=np.float64)
+        self.closes = None if closes is None else np.asarray(closes, dtype=np.float64)
+        n = len(self.lows)
+
+        self.pivot_low_mask = np.zeros(n, dtype=bool)
+        self.pivot_high_mask = np.zeros(n, dtype=bool)
+        if n >= 3:
+            self.pivot_low_mask[1:-1] = (self.lows[1:-1] < self.lows[:-2]) & (self.lows[1:-1] < self.lows[2:])
+            self.pivot_high_mask[1:-1] = (self.highs[1:-1] > self.highs[:-2]) & (self.highs[1:-1] > self.highs[2:])
+        self.pivot_lows = np.flatnonzero(self.pivot_low_mask)
+        self.pivot_highs = np.flatnonzero(self.pivot_high_mask)
+
+        self.low_table = SparseTable(self.lows, 'min')
+        self.high_table = SparseTable(self.highs, 'max')
+
+        if self.opens is not None and self.closes is not None:
+            self.bearish = np.flatnonzero(self.closes < self.opens)
+            self.bullish = np.flatnonzero(self.closes > self.opens)
+        else:
+            self.bearish = self.bullish = None
+
+    @classmethod
+    def from_candles(cls, candles: List[Dict]) -> 'PivotIndex':
+        """Build from candle dictionaries with 'high', 'low', 'open', 'close'"""
+        return cls(
+            [c['high'] for c in candles],
+            [c['low'] for c in candles],
+            [c['open'] for c in candles],
+            [c['close'] for c in candles],
+        )
+
+    def __len__(self):
+        return len(self.lows)
+
+    def is_pivot_low(self, index: int, lo: int = 0, hi: Optional[int] = None) -> bool:
+        """Pivot low whose neighbours both lie inside [lo, hi]"""
+        hi = len(self) - 1 if hi is None else hi
+        return lo < index < hi and bool(self.pivot_low_mask[index])
+
+    def is_pivot_high(self, index: int, lo: int = 0, hi: Optional[int] = None) -> bool:
+        """Pivot high whose neighbours both lie inside [lo, hi]"""
+        hi = len(self) - 1 if hi is None else hi
+        return lo < index < hi and bool(self.pivot_high_mask[index])
+
+    def lowest(self, lo: int, hi: int) -> int:
+        """Index of the lowest low in [lo, hi]"""
+        return self.low_table.argquery(lo, hi)
+
+    def highest(self, lo: int, hi: int) -> int:
+        """Index of the highest high in [lo, hi]"""
+        return self.high_table.argquery(lo, hi)
+
+    @staticmethod
+    def _nearest_left(positions, index, max_distance):
+        pos = int(np.searchsorted(positions, index, side='left')) - 1
+        if pos < 0:
+            return None
+        found = int(positions[pos])
+        if max_distance is not None and index - found > max_distance:
+            return None
+        return found
+
+    def nearest_pivot_low_left(self, index: int, max_distance: Optional[int] = None) -> Optional[int]:
+        """Closest pivot low strictly left of index (within max_distance candles)"""
+        return self._nearest_left(self.pivot_lows, index, max_distance)
+
+    def nearest_pivot_high_left(self, index: int, max_distance: Optional[int] = None) -> Optional[int]:
+        """Closest pivot high strictly left of index (within max_distance candles)"""
+        return self._nearest_left(self.pivot_highs, index, max_distance)
+
+    @staticmethod
+    def _first_in(positions, start, end):
+        if positions is None:
+            return None
+        pos = int(np.searchsorted(positions, start, side='left'))
+        if pos < len(positions) and positions[pos] < end:
+            return int(positions[pos])
+        return None
+
+    def first_pivot_low_in(self, start: int, end: int) -> Optional[int]:
+        """First pivot low in [start, end) (PivotDetector.find_pivot_low_in_range bounds)"""
+        return self._first_in(self.pivot_lows, start, end)
+
+    def first_pivot_high_in(self, start: int, end: int) -> Optional[int]:
+        """First pivot high in [start, end) (PivotDetector.find_pivot_high_in_range bounds)"""
+        return self._first_in(self.pivot_highs, start, end)
+
+    def first_bearish_in(self, lo: int, hi: int) -> Optional[int]:
+        """First candle with close < open in [lo, hi]"""
+        return self._first_in(self.bearish, lo, hi + 1)
+
+    def first_bullish_in(self, lo: int, hi: int) -> Optional[int]:
+        """First candle with close > open in [lo, hi]"""
+        return self._first_in(self.bullish, lo, hi + 1)
@@ -0,0 +1,245 @@
+"""
+Regime Feature Kernels - Rolling fractal / Hurst / volatility features for every bar at once
+
+InstitutionalMLEngine computes these for one window at a time: Higuchi's fractal
+dimension with nested Python loops over k, m and i, the R/S Hurst exponent, and the
+realized-volatility, tail and moment features of _volatility_risk_features. Building
+a training set bar by bar repeats that work per bar.
+
+Each kernel here takes a whole price (or return) series and returns one value per
+bar, with the same definitions and edge cases as the engine:
+
+- Higuchi: curve lengths for every window come from one cumulative sum per k over
+  the lagged absolute differences (strided per residue class), and the log-log slope
+  is solved in closed form for all windows together.
+- Hurst R/S, volatility, tail risk, skew/kurtosis: sliding_window_view matrices,
+  processed in bounded chunks so a year of 1m bars stays within a few tens of MB.
+- Bipower and realized variance: window sums from cumulative sums.
+
+Bars without a full window are NaN.
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FRACTAL_WINDOW = 50
+HURST_WINDOW = 100
+VOLATILITY_WINDOWS = (5, 10, 20, 50)
+REALIZED_WINDOW = 20
+TAIL_WINDOW = 50
+MOMENT_WINDOW = 20
+ANNUALIZATION = np.sqrt(252 * 24 * 60)
+
+# Elements per chunk of a window matrix (~32 MB of float64)
+CHUNK_ELEMENTS = 4_000_000
+
+REGIME_FEATURE_COLUMNS = (
+    ['fractal_dimension', 'hurst_exponent']
+    + [f'volatility_{w}' for w in VOLATILITY_WINDOWS]
+    + ['bipower_variation', 'jump_variation', 'var_95', 'cvar_95', 'skewness', 'kurtosis']
+)
+
+
+def _windows(values: np.ndarray, window: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """(first window index, window matrix) chunks of sliding_window_view(values, window)"""
+    view = sliding_window_view(values, window)
+    step = max(1, CHUNK_ELEMENTS // window)
+    for start in range(0, len(view), step):
+        yield start, view[start:start + step]
+
+
+def _aligned(values: np.ndarray, length: int) -> np.ndarray:
+    """Right-align per-window values to a per-bar array of the given length (NaN-padded)"""
+    out = np.full(length, np.nan)
+    if len(values):
+        out[length - len(values):] = values
+    return out
+
+
+def log_returns(prices: np.ndarray) -> np.ndarray:
+    """Per-bar log return (bar t vs t-1); NaN for the first bar"""
+    prices = np.asarray(prices, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _aligned(np.diff(np.log(prices)), len(prices))
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    return csum[window:] - csum[:-window]
+
+
+def higuchi_curve_lengths(prices: np.ndarray, window: int = FRACTAL_WINDOW) -> np.ndarray:
+    """
+    Higuchi mean curve length L(k), k = 1..min(20, window // 4), of every full
+    trailing `window` of prices: one row per window (row 0 ends at bar window - 1).
+    Normalized by int((N - m) / k) like the engine's loops.
+    """
+    x = np.asarray(prices, dtype=np.float64)
+    n_windows = max(0, len(x) - window + 1)
+    k_max = min(20, window // 4)
+    starts = np.arange(n_windows)
+    lengths = np.empty((n_windows, k_max))
+    for k in range(1, k_max + 1):
+        diffs = np.abs(x[k:] - x[:-k])
+        # Cumulative sums along each residue class mod k: strided[j] = diffs[j] + strided[j - k]
+        pad = (-len(diffs)) % k
+        strided = np.cumsum(np.concatenate((diffs, np.zeros(pad))).reshape(-1, k), axis=0).ravel()
+        total = np.zeros(n_windows)
+        for m in range(k):
+            n = (window - m) // k
+            first = starts + m
+            last = first + (n - 2) * k
+            segment = strided[last] - np.where(first >= k, strided[np.maximum(first - k, 0)], 0.0)
+            total += segment * (window - 1) / (k * k * n)
+        lengths[:, k - 1] = total / k
+    return lengths
+
+
+def higuchi_fractal_dimension(prices: np.ndarray, window: int = FRACTAL_WINDOW) -> np.ndarray:
+    """
+    Higuchi fractal dimension of each trailing `window` of prices, as
+    InstitutionalMLEngine._calculate_fractal_dimension computes it for one window:
+    2 - slope of log L(k) on log k, clamped to [1, 2]; 1.5 below 10 prices and 2.0
+    where the log-log fit is undefined (a zero curve length).
+    """
+    x = np.asarray(prices, dtype=np.float64)
+    n_windows = len(x) - window + 1
+    if n_windows <= 0:
+        return np.full(len(x), np.nan)
+    if window < 10:
+        return _aligned(np.full(n_windows, 1.5), len(x))
+
+    lengths = higuchi_curve_lengths(x, window)
+    log_k = np.log(np.arange(1, lengths.shape[1] + 1))
+    centered = log_k - log_k.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.log(lengths) @ centered / (centered @ centered)
+    dimension = np.where(np.isfinite(slope), np.clip(2 - slope, 1.0, 2.0), 2.0)
+    return _aligned(dimension, len(x))
+
+
+def hurst_exponent(prices: np.ndarray, window: int = HURST_WINDOW) -> np.ndarray:
+    """
+    Single-scale R/S Hurst exponent of each trailing `window` of prices, as
+    InstitutionalMLEngine._calculate_hurst_exponent computes it for one window
+    (clamped to [0, 1]; 0.5 below 20 prices or for zero-variance returns).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n_windows = len(prices) - window + 1
+    if n_windows <= 0:
+        return np.full(len(prices), np.nan)
+    if window < 20:
+        return _aligned(np.full(n_windows, 0.5), len(prices))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(prices))
+    n = window - 1
+    hurst = np.empty(n_windows)
+    for start, block in _windows(returns, n):
+        deviations = block - block.mean(axis=1, keepdims=True)
+        cumulative = np.cumsum(deviations, axis=1)
+        spread = cumulative.max(axis=1) - cumulative.min(axis=1)
+        std = block.std(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = np.clip(np.log(spread / std) / np.log(n), 0.0, 1.0)
+        hurst[start:start + len(block)] = np.where(std == 0, 0.5, value)
+    return _aligned(hurst, len(prices))
+
+
+def rolling_volatility(returns: np.ndarray, window: int) -> np.ndarray:
+    """Annualized population std of the trailing `window` returns (per bar, NaN-led returns)"""
+    r = np.asarray(returns, dtype=np.float64)[1:]
+    n_windows = len(r) - window + 1
+    if n_windows <= 0:
+        return np.full(len(returns), np.nan)
+    # Window matrices rather than moment cumsums: flat stretches must give exactly 0
+    volatility = np.empty(n_windows)
+    for start, block in _windows(r, window):
+        volatility[start:start + len(block)] = block.std(axis=1)
+    return _aligned(volatility * ANNUALIZATION, len(returns))
+
+
+def realized_variation(returns: np.ndarray, window: int = REALIZED_WINDOW) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (bipower variation, jump variation) over the trailing `window` returns:
+    pi/2 * sum |r_j||r_j+1| over the window's adjacent pairs, and
+    max(0, sum r^2 - bipower).
+    """
+    r = np.asarray(returns, dtype=np.float64)[1:]
+    if len(r) < window:
+        empty = np.full(len(returns), np.nan)
+        return empty, empty.copy()
+    products = np.abs(r[:-1]) * np.abs(r[1:])
+    bipower = _window_sums(products, window - 1) * (np.pi / 2)
+    realized = _window_sums(r * r, window)
+    jump = np.maximum(0.0, realized - bipower)
+    return _aligned(bipower, len(returns)), _aligned(jump, len(returns))
+
+
+def tail_risk(returns: np.ndarray, window: int = TAIL_WINDOW) -> Tuple[np.ndarray, np.ndarray]:
+    """(5th percentile, mean of returns at or below it) over the trailing `window` returns"""
+    r = np.asarray(returns, dtype=np.float64)[1:]
+    n_windows = len(r) - window + 1
+    if n_windows <= 0:
+        empty = np.full(len(returns), np.nan)
+        return empty, empty.copy()
+    var = np.empty(n_windows)
+    cvar = np.empty(n_windows)
+    for start, block in _windows(r, window):
+        q = np.percentile(block, 5, axis=1, keepdims=True)
+        tail = block <= q
+        var[start:start + len(block)] = q[:, 0]
+        cvar[start:start + len(block)] = np.where(tail, block, 0.0).sum(axis=1) / tail.sum(axis=1)
+    return _aligned(var, len(returns)), _aligned(cvar, len(returns))
+
+
+def rolling_moments(returns: np.ndarray, window: int = MOMENT_WINDOW) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (skewness, excess kurtosis) of the trailing `window` returns, biased estimators as
+    scipy.stats.skew / kurtosis (NaN where scipy treats the variance as zero).
+    """
+    r = np.asarray(returns, dtype=np.float64)[1:]
+    n_windows = len(r) - window + 1
+    if n_windows <= 0:
+        empty = np.full(len(returns), np.nan)
+        return empty, empty.copy()
+    skew = np.empty(n_windows)
+    kurt = np.empty(n_windows)
+    resolution = np.finfo(np.float64).resolution
+    for start, block in _windows(r, window):
+        mean = block.mean(axis=1, keepdims=True)
+        deviations = block - mean
+        squared = deviations * deviations
+        m2 = squared.mean(axis=1)
+        m3 = (squared * deviations).mean(axis=1)
+        m4 = (squared * squared).mean(axis=1)
+        zero = m2 <= (resolution * mean[:, 0]) ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            skew[start:start + len(block)] = np.where(zero, np.nan, m3 / m2 ** 1.5)
+            kurt[start:start + len(block)] = np.where(zero, np.nan, m4 / (m2 * m2) - 3.0)
+    return _aligned(skew, len(returns)), _aligned(kurt, len(returns))
+
+
+def regime_features(prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """Every REGIME_FEATURE_COLUMNS series for a price series, one value per bar"""
+    prices = np.asarray(prices, dtype=np.float64)
+    returns = log_returns(prices)
+    features = {
+        'fractal_dimension': higuchi_fractal_dimension(prices),
+        'hurst_exponent': hurst_exponent(prices),
+    }
+    for window in VOLATILITY_WINDOWS:
+        features[f'volatility_{window}'] = rolling_volatility(returns, window)
+    features['bipower_variation'], features['jump_variation'] = realized_variation(returns)
+    features['var_95'], features['cvar_95'] = tail_risk(returns)
+    features['skewness'], features['kurtosis'] = rolling_moments(returns)
+    return features
+
+
+def regime_feature_matrix(prices: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """(REGIME_FEATURE_COLUMNS, bars x columns float32 matrix)"""
+    features = regime_features(prices)
+    columns = list(REGIME_FEATURE_COLUMNS)
+    return columns, np.column_stack([features[name] for name in columns]).astype(np.float32)
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
-import os, psycopg2
+import os, sys, psycopg2
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bar_merkle_index import refresh_range
+
 load_dotenv()
 conn = psycopg2.connect(os.environ['DATABASE_URL'])
 cursor = conn.cursor()
@@ -49,6 +53,7 @@ for symbol in symbols:
     """, (version_id, symbol))
     
     updated = cursor.rowcount
+    refresh_range(conn, symbol, 'raw')
     conn.commit()
     print(f"✅ {symbol}: Updated {updated:,} bars to version {version_id}")
 
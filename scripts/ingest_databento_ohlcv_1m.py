@@ -34,6 +34,8 @@ from dotenv import load_dotenv
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from services.bar_merkle_index import refresh_range
+
 class DatabentoIngester:
     """Handles ingestion of Databento OHLCV data into PostgreSQL"""
     
@@ -405,8 +407,14 @@ class DatabentoIngester:
         inserted_count = len(df) - existing_count
         updated_count = existing_count
         
+        # Re-hash the touched days in the bar Merkle index, in the same transaction
+        changed_days = refresh_range(self.conn, symbol, 'raw', min_ts, max_ts)
+        
         self.conn.commit()
         
+        if self.verbose and changed_days is not None:
+            print(f"    Merkle days changed: {changed_days:,}")
+        
         if self.verbose:
             print(f"    Inserted: {inserted_count:,}")
             print(f"    Updated: {updated_count:,}")
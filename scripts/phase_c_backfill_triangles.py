@@ -17,6 +17,7 @@ from market_parity.htf_bias import HTFBiasEngine
 from market_parity.htf_alignment import compute_htf_alignment
 from market_parity.engulfing import Bar, detect_engulfing
 from market_parity.signal_generation import generate_signals
+from market_parity.snapshot import EngineSnapshot, day_boundary, load_nearest_snapshot, save_snapshot
 
 # Bar interval for timestamp conversion
 BAR_INTERVAL = timedelta(minutes=1)
@@ -34,19 +35,28 @@ try:
 except:
     logic_version = os.environ.get('LOGIC_VERSION', 'unknown')
 
-if len(sys.argv) < 4:
+# Positional arguments (flags such as --allow-legacy may appear anywhere)
+args = [a for a in sys.argv if not a.startswith('--')]
+
+if len(args) < 4:
     print("Usage: python scripts/phase_c_backfill_triangles.py SYMBOL START_DATE END_DATE WARMUP [PRELOAD_START_TS]")
     print("Example: python scripts/phase_c_backfill_triangles.py GLBX.MDP3:NQ 2025-12-02 2025-12-02 5 2025-11-30T23:00:00Z")
+    print("\nFlags:")
+    print("  --allow-legacy     Allow the legacy (non-clean) OHLCV table")
+    print("  --resume-snapshot  Resume engine state from the nearest snapshot <= START_DATE instead of preloading")
+    print("  --write-snapshots  Save engine state snapshots at each UTC day boundary")
     print("\nEnvironment:")
     print("  PURGE=1  Delete existing triangles in date range before backfill")
     sys.exit(1)
 
 load_dotenv()
 
-symbol = sys.argv[1]
-start_date = sys.argv[2]
-end_date = sys.argv[3]
-warmup = max(0, int(sys.argv[4])) if len(sys.argv) > 4 else 5
+symbol = args[1]
+start_date = args[2]
+end_date = args[3]
+warmup = max(0, int(args[4])) if len(args) > 4 else 5
+resume_snapshot = '--resume-snapshot' in sys.argv
+write_snapshots = '--write-snapshots' in sys.argv
 
 # Parse dates to UTC
 utc_tz = ZoneInfo('UTC')
@@ -66,8 +76,8 @@ else:
 insert_close_end = insert_open_end + BAR_INTERVAL
 
 # Compute preload start timestamp (default: start_date - warmup days at 23:00Z)
-if len(sys.argv) > 5:
-    preload_start_ts_arg = sys.argv[5]
+if len(args) > 5:
+    preload_start_ts_arg = args[5]
     preload_start_ts = datetime.fromisoformat(preload_start_ts_arg.replace("Z", "+00:00"))
 else:
     preload_date = (insert_open_start.date() - timedelta(days=warmup))
@@ -138,6 +148,21 @@ if not use_clean_table and not allow_legacy:
 # Legacy table: ts = bar CLOSE time (Databento default)
 ts_is_open_time = use_clean_table
 
+# Snapshots are only kept for clean-table state (legacy hygiene differs)
+snapshot = None
+if (resume_snapshot or write_snapshots) and not use_clean_table:
+    print("WARNING: engine snapshots require the clean table - snapshot flags ignored")
+    resume_snapshot = write_snapshots = False
+if resume_snapshot:
+    snapshot = load_nearest_snapshot(cursor, symbol, logic_version, insert_open_start)
+    if snapshot is not None:
+        preload_start_ts = snapshot.ts
+        preload_start_ts_arg = preload_start_ts.isoformat().replace('+00:00', 'Z')
+        print(f"Resuming from engine snapshot @ {preload_start_ts_arg} "
+              f"({snapshot.bars_processed} bars since {snapshot.origin_ts})")
+    else:
+        print("No engine snapshot found - falling back to full preload")
+
 # Fetch bars (preload range to insert end)
 table_name = 'market_bars_ohlcv_1m_clean' if use_clean_table else 'market_bars_ohlcv_1m'
 print(f"Fetching OHLCV bars from {preload_start_ts.date()} to {insert_close_end.date()} (table: {table_name})...")
@@ -152,16 +177,21 @@ cursor.execute(f"""
 bars = cursor.fetchall()
 print(f"Fetched {len(bars)} bars (includes preload from {preload_start_ts_arg})")
 
-if len(bars) < 3:
-    print(f"ERROR: Not enough bars (need >= 3 for FVG). Found: {len(bars)}")
+min_bars = 1 if snapshot is not None else 3
+if len(bars) < min_bars:
+    print(f"ERROR: Not enough bars (need >= {min_bars} for FVG). Found: {len(bars)}")
     cursor.close()
     conn.close()
     sys.exit(1)
 
 # Initialize engines
 print("Initializing Phase B modules...")
-bias_engine = BiasEngineFvgIfvg()
-htf_engine = HTFBiasEngine()
+if snapshot is not None:
+    bias_engine = snapshot.bias_engine
+    htf_engine = snapshot.htf_engine
+else:
+    bias_engine = BiasEngineFvgIfvg()
+    htf_engine = HTFBiasEngine()
 
 # Hardcoded filters for Stage 1
 use_flags = {'daily': False, 'h4': False, 'h1': False, 'm15': False, 'm5': False}
@@ -181,7 +211,28 @@ skipped_bars = []
 prev_good_close = None
 start_index = min(warmup, max(0, len(bars) - 1))
 
+# Engine snapshot chain (bars applied since origin_ts)
+chain_origin_ts = bars[0][0]
+chain_bars = 0
+snapshots_written = 0
+if snapshot is not None:
+    bias_prev = snapshot.bias_prev
+    prev_bar = snapshot.prev_bar
+    prev_good_close = snapshot.prev_good_close
+    chain_origin_ts = snapshot.origin_ts
+    chain_bars = snapshot.bars_processed
+    start_index = 0  # state is already warm
+
 for i, bar_tuple in enumerate(bars):
+    # Day boundary: persist state before the first bar of the new UTC day
+    if write_snapshots and i > 0:
+        boundary = day_boundary(bars[i - 1][0], bar_tuple[0])
+        if boundary is not None:
+            save_snapshot(cursor, symbol, logic_version, EngineSnapshot(
+                boundary, bias_engine, htf_engine, bias_prev, prev_bar,
+                prev_good_close, chain_bars + processed_count, chain_origin_ts))
+            snapshots_written += 1
+
     bar_dict = {
         'ts': bar_tuple[0],
         'open': float(bar_tuple[1]),
@@ -372,6 +423,9 @@ for i, bar_tuple in enumerate(bars):
 
 print(f"Processed {processed_count} bars")
 print(f"Bad bars skipped: {bad_skipped}")
+if write_snapshots:
+    conn.commit()
+    print(f"Engine snapshots written: {snapshots_written}")
 
 if skipped_bars:
     print("\nFirst 30 skipped bars:")
@@ -17,6 +17,11 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bar_merkle_index import refresh_range
+from services.bar_rollups import refresh_rollups
+
 if len(sys.argv) < 4:
     print("Usage: python scripts/phase_c_copy_validated_ohlcv.py SYMBOL START_TS END_TS")
     print("Example: python scripts/phase_c_copy_validated_ohlcv.py GLBX.MDP3:NQ 2025-11-30T23:00:00Z 2025-12-02T05:00:00Z")
@@ -150,6 +155,10 @@ for idx, row in enumerate(rows):
     if (idx + 1) % 1000 == 0:
         print(f"  Processed: {idx + 1}/{len(rows)} bars")
 
+# Re-hash the copied days in the bar Merkle index and re-roll their HTF bars, committed with the bars
+changed_days = refresh_range(conn, symbol, 'clean', start_ts, end_ts)
+changed_rollups = refresh_rollups(conn, symbol, start_ts, end_ts)
+
 conn.commit()
 
 print("-" * 80)
@@ -158,6 +167,10 @@ print(f"  Total bars: {len(rows)}")
 print(f"  Inserted: {inserted_count}")
 print(f"  Updated: {updated_count}")
 print(f"  Skipped (invalid): {skipped_invalid}")
+if changed_days is not None:
+    print(f"  Merkle days changed: {changed_days}")
+if changed_rollups is not None:
+    print(f"  Rollup bars changed: {sum(changed_rollups.values())}")
 
 if skipped_details:
     print(f"\nFirst {len(skipped_details)} skipped bars:")
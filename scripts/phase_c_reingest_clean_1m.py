@@ -20,6 +20,11 @@ from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bar_merkle_index import refresh_range
+from services.bar_rollups import refresh_rollups
+
 def to_databento_continuous(symbol: str, roll_rule: str = "v", rank: int = 0) -> str:
     """
     Convert internal symbol format to Databento continuous symbology.
@@ -315,6 +320,9 @@ batch_size = 500
 total_batches = (len(valid_bars) + batch_size - 1) // batch_size
 batch_commits = 0
 retries = 0
+# Merkle days / rollup bars changed; None when those tables aren't installed
+changed_days = None
+changed_rollups = None
 
 for batch_num in range(total_batches):
     batch_start = batch_num * batch_size
@@ -343,8 +351,21 @@ for batch_num in range(total_batches):
                 page_size=500
             )
             
+            # Re-hash the batch's days in the bar Merkle index and re-roll their HTF
+            # bars in the same transaction, so every committed batch is indexed
+            batch_lo = min(bar[1] for bar in batch)
+            batch_hi = max(bar[1] for bar in batch)
+            batch_days = refresh_range(conn, db_symbol, 'clean', batch_lo, batch_hi)
+            batch_rollups = refresh_rollups(conn, db_symbol, batch_lo, batch_hi)
+            
             # Commit after each batch
             conn.commit()
+            if batch_days is not None:
+                changed_days = (changed_days or 0) + batch_days
+            if batch_rollups is not None:
+                changed_rollups = changed_rollups or {}
+                for tf, n in batch_rollups.items():
+                    changed_rollups[tf] = changed_rollups.get(tf, 0) + n
             batch_commits += 1
             
             # Print progress
@@ -377,6 +398,10 @@ print(f"  Valid bars: {len(valid_bars)}")
 print(f"  Skipped (invalid): {skipped_invalid}")
 print(f"  Batch commits: {batch_commits}")
 print(f"  Retries: {retries}")
+if changed_days is not None:
+    print(f"  Merkle days changed: {changed_days}")
+if changed_rollups is not None:
+    print(f"  Rollup bars changed: {sum(changed_rollups.values())}")
 
 # Calculate duration
 duration_seconds = time.time() - start_time
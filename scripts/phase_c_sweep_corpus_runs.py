@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Phase C Corpus Sweep - Triangle corpus runs for many filter configs in one pass
+Usage: python scripts/phase_c_sweep_corpus_runs.py SYMBOLS START_DATE END_DATE --logic-version LOGIC [--warmup W]
+       [--engulfing none,engulfing,sweep] [--htf daily,h4,h1,m15,m5] [--max-htf N] [--dry-run]
+
+SYMBOLS is a comma-separated list. Bias + HTF series are computed once per symbol
+(market_parity.sweep); every config then gets its own signal_corpus_runs row,
+one COMPLETE batch, its triangles and a signal_corpus_sweep_results summary.
+"""
+
+import os
+import sys
+import json
+import uuid
+import argparse
+import hashlib
+import time
+import pytz
+from datetime import datetime, timedelta
+import psycopg2
+from psycopg2.extras import execute_values
+
+sys.path.append('.')
+from market_parity.sweep import (
+    ENGULFING_MODES, HTF_ORDER, build_sweep_configs, compute_signal_series, evaluate_sweep,
+    summarize_triangles, sweep_triangles,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Sweep Phase C triangle filter configs')
+    parser.add_argument('symbols', help='Comma-separated symbols (e.g., GLBX.MDP3:NQ,GLBX.MDP3:ES)')
+    parser.add_argument('start_date', help='Start date YYYY-MM-DD')
+    parser.add_argument('end_date', help='End date YYYY-MM-DD')
+    parser.add_argument('--logic-version', required=True, help='Logic version identifier')
+    parser.add_argument('--warmup', type=int, default=5, help='Warmup days (default: 5)')
+    parser.add_argument('--engulfing', default=','.join(ENGULFING_MODES),
+                        help='Engulfing modes to sweep (default: none,engulfing,sweep)')
+    parser.add_argument('--htf', default=','.join(HTF_ORDER),
+                        help='HTF timeframes whose subsets are swept (default: daily,h4,h1,m15,m5)')
+    parser.add_argument('--max-htf', type=int, help='Largest HTF subset size (default: all)')
+    parser.add_argument('--dry-run', action='store_true', help='Print summaries without writing runs')
+    return parser.parse_args()
+
+
+def get_connection():
+    database_url = os.environ.get('DATABASE_URL')
+    if not database_url:
+        raise ValueError('DATABASE_URL environment variable not set')
+    return psycopg2.connect(database_url)
+
+
+def compute_sha256(*parts):
+    content = '|'.join(str(p) for p in parts)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def fetch_bars(conn, symbol, start_ts, end_ts):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT ts, open, high, low, close
+            FROM market_bars_ohlcv_1m_clean
+            WHERE symbol = %s AND ts >= %s AND ts < %s
+            ORDER BY ts ASC
+        """, (symbol, start_ts, end_ts))
+        return cur.fetchall()
+
+
+def write_config_run(conn, sweep_id, symbol, config, triangles, stats, start_ts, end_ts, bars,
+                     bars_fingerprint, logic_version, git_sha, config_fingerprint):
+    """Run + single COMPLETE batch + triangles + summary, committed together"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO signal_corpus_runs
+            (symbol, timeframe, start_ts, end_ts, bars_table, bars_min_ts, bars_max_ts,
+             bars_rowcount, bars_fingerprint, logic_version, git_sha, config_fingerprint, status, notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING run_id
+        """, (symbol, '1m', start_ts, end_ts, 'market_bars_ohlcv_1m_clean',
+              bars[0][0], bars[-1][0], len(bars), bars_fingerprint,
+              logic_version, git_sha, config_fingerprint, 'RUNNING',
+              f'sweep {sweep_id} config {config.name}'))
+        run_id = cur.fetchone()[0]
+
+        cur.execute("""
+            INSERT INTO signal_corpus_batches
+            (run_id, batch_start, batch_end, status, bars_rowcount, signals_emitted, started_at, finished_at)
+            VALUES (%s, %s, %s, 'COMPLETE', %s, %s, NOW(), NOW())
+        """, (run_id, start_ts, end_ts, len(bars), len(triangles)))
+
+        if triangles:
+            execute_values(cur, """
+                INSERT INTO signal_corpus_triangles
+                (run_id, symbol, ts, direction, source_table, logic_version)
+                VALUES %s
+                ON CONFLICT (run_id, symbol, ts, direction) DO NOTHING
+            """, [(run_id, symbol, ts, direction, 'market_bars_ohlcv_1m_clean', logic_version)
+                  for ts, direction in triangles], page_size=1000)
+
+        cur.execute("""
+            INSERT INTO signal_corpus_sweep_results
+            (sweep_id, run_id, symbol, config_name, config, total_triangles, bull_count, bear_count,
+             min_ts, max_ts, bars_evaluated, triangles_per_1k_bars)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (sweep_id, run_id, symbol, config.name, json.dumps(config.to_dict()),
+              stats['total_triangles'], stats['bull_count'], stats['bear_count'],
+              stats['min_ts'], stats['max_ts'], stats['bars_evaluated'], stats['triangles_per_1k_bars']))
+
+        cur.execute("""
+            UPDATE signal_corpus_runs
+            SET status = 'COMPLETE', completed_at = NOW()
+            WHERE run_id = %s
+        """, (run_id,))
+    conn.commit()
+    return run_id
+
+
+def sweep_symbol(conn, sweep_id, symbol, configs, start_ts, end_ts, preload_start_ts, args, git_sha):
+    t0 = time.time()
+    bars = fetch_bars(conn, symbol, preload_start_ts, end_ts)
+    if not bars:
+        print(f'{symbol}: no data in market_bars_ohlcv_1m_clean for {preload_start_ts} to {end_ts} - skipped')
+        return []
+
+    series = compute_signal_series(bars)
+    t_series = time.time() - t0
+    masks = evaluate_sweep(series, configs)
+    t_masks = time.time() - t0 - t_series
+    bars_in_window = sum(1 for ts in series.ts if start_ts <= ts < end_ts)
+    bars_fingerprint = compute_sha256(symbol, 'market_bars_ohlcv_1m_clean',
+                                      bars[0][0].isoformat(), bars[-1][0].isoformat(), len(bars))
+    print(f'{symbol}: {len(bars)} bars, series {t_series:.1f}s, {len(configs)} configs masked in {t_masks:.3f}s')
+
+    rows = []
+    for config in configs:
+        bull_mask, bear_mask = masks[config]
+        triangles = sweep_triangles(series, bull_mask, bear_mask, start_ts, end_ts)
+        stats = summarize_triangles(triangles, bars_in_window)
+        run_id = None
+        if not args.dry_run:
+            config_fingerprint = compute_sha256(args.logic_version, args.warmup, preload_start_ts.isoformat(),
+                                                start_ts.isoformat(), end_ts.isoformat(), config.name)
+            run_id = write_config_run(conn, sweep_id, symbol, config, triangles, stats, start_ts, end_ts, bars,
+                                      bars_fingerprint, args.logic_version, git_sha, config_fingerprint)
+        rows.append((symbol, config.name, run_id, stats))
+    return rows
+
+
+def main():
+    args = parse_args()
+
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d')
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d')
+    start_ts = start_date.replace(hour=0, minute=0, second=0, tzinfo=pytz.UTC)
+    end_ts = end_date.replace(hour=23, minute=59, second=59, tzinfo=pytz.UTC)
+    preload_date = (start_date - timedelta(days=args.warmup)).date()
+    preload_start_ts = datetime.combine(preload_date, datetime.min.time()).replace(hour=23, minute=0, second=0, tzinfo=pytz.UTC)
+
+    symbols = [s.strip() for s in args.symbols.split(',') if s.strip()]
+    configs = build_sweep_configs(
+        engulfing_modes=[m.strip() for m in args.engulfing.split(',') if m.strip()],
+        htf_tfs=[tf.strip() for tf in args.htf.split(',') if tf.strip()],
+        max_htf=args.max_htf
+    )
+    git_sha = os.environ.get('GIT_SHA', 'unknown')
+    sweep_id = str(uuid.uuid4())
+    print(f'Sweep {sweep_id}: {len(symbols)} symbols x {len(configs)} configs '
+          f'({start_ts.date()} to {end_ts.date()}, preload from {preload_start_ts.isoformat()})')
+
+    conn = get_connection()
+    try:
+        results = []
+        for symbol in symbols:
+            results.extend(sweep_symbol(conn, sweep_id, symbol, configs, start_ts, end_ts,
+                                        preload_start_ts, args, git_sha))
+    finally:
+        conn.close()
+
+    print(f"\n{'SYMBOL':<16} {'CONFIG':<28} {'TOTAL':>7} {'BULL':>6} {'BEAR':>6} {'PER_1K':>8}  RUN_ID")
+    print('-' * 110)
+    for symbol, name, run_id, stats in results:
+        print(f"{symbol:<16} {name:<28} {stats['total_triangles']:>7} {stats['bull_count']:>6} "
+              f"{stats['bear_count']:>6} {stats['triangles_per_1k_bars']:>8.3f}  {run_id or '-'}")
+    print(f'\nSweep {sweep_id} complete: {len(results)} runs')
+
+
+if __name__ == '__main__':
+    main()
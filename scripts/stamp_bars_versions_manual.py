@@ -1,7 +1,12 @@
 ﻿import os
+import sys
 import psycopg2
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bar_merkle_index import refresh_range
+
 load_dotenv()
 db = os.environ.get("DATABASE_URL")
 if not db:
@@ -30,6 +35,10 @@ WHERE symbol = %s
 """, (MNQ_VER, "GLBX.MDP3:MNQ"))
 mnq_updated = cur.rowcount
 
+# Stamped bars move to their version's Merkle leaves
+for symbol in ("GLBX.MDP3:NQ", "GLBX.MDP3:MNQ"):
+    refresh_range(conn, symbol, "raw")
+
 conn.commit()
 
 print("NQ updated:", nq_updated)
@@ -0,0 +1,488 @@
+"""
+Bar Merkle Index
+Persisted day/month/year hash tree over 1m bars (database/bar_merkle_index.sql)
+
+Leaves are computed inside Postgres from the bar tables, so building or refreshing
+the index never ships bars to Python. A range hash reads only the nodes that cover
+the range - whole years, whole months, whole days, plus the two edge days cut from
+their stored bar digests - and a diff descends only into nodes whose hashes differ,
+down to the exact bars.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+CLEAN_VERSION = 'clean'
+
+# source -> (bar table, dataset_version_id expression)
+SOURCES = {
+    'raw': ('market_bars_ohlcv_1m', "COALESCE(dataset_version_id, '')"),
+    'clean': ('market_bars_ohlcv_1m_clean', "'clean'"),
+}
+
+DIGEST_SIZE = 8
+ENTRY_SIZE = 2 + DIGEST_SIZE
+LAST_MINUTE = 24 * 60 - 1
+PRICE_QUANTUM = Decimal('0.000001')
+
+DAY_ENTRIES_SQL = """
+    SELECT dataset_version_id, day, bar_count,
+           sha256(convert_to(to_char(day, 'YYYY-MM-DD'), 'UTF8') || bar_digests) AS leaf_hash,
+           bar_digests
+    FROM (
+        SELECT {version} AS dataset_version_id,
+               (ts AT TIME ZONE 'UTC')::date AS day,
+               COUNT(*) AS bar_count,
+               string_agg(
+                   int2send((EXTRACT(HOUR FROM ts AT TIME ZONE 'UTC') * 60
+                             + EXTRACT(MINUTE FROM ts AT TIME ZONE 'UTC'))::int2)
+                   || substr(sha256(convert_to(
+                          to_char(ts AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS')
+                          || '|' || round(open, 6)::text || '|' || round(high, 6)::text
+                          || '|' || round(low, 6)::text || '|' || round(close, 6)::text
+                          || '|' || trunc(COALESCE(volume, 0))::bigint::text, 'UTF8')), 1, 8),
+                   ''::bytea ORDER BY ts) AS bar_digests
+        FROM {table}
+        WHERE symbol = %(symbol)s AND ts >= %(lo)s AND ts < %(hi)s {version_filter}
+        GROUP BY 1, 2
+    ) days
+"""
+
+REFRESH_DAYS_SQL = """
+    WITH fresh AS ({entries}),
+    removed AS (
+        DELETE FROM bar_merkle_days d
+        WHERE d.symbol = %(symbol)s AND d.day >= %(day_lo)s AND d.day <= %(day_hi)s AND {scope}
+          AND NOT EXISTS (SELECT 1 FROM fresh f WHERE f.dataset_version_id = d.dataset_version_id AND f.day = d.day)
+        RETURNING 1
+    ),
+    upserted AS (
+        INSERT INTO bar_merkle_days AS m (symbol, dataset_version_id, day, bar_count, leaf_hash, bar_digests)
+        SELECT %(symbol)s, dataset_version_id, day, bar_count, leaf_hash, bar_digests FROM fresh
+        ON CONFLICT (symbol, dataset_version_id, day) DO UPDATE SET
+            bar_count = EXCLUDED.bar_count,
+            leaf_hash = EXCLUDED.leaf_hash,
+            bar_digests = EXCLUDED.bar_digests,
+            updated_at = NOW()
+        WHERE m.leaf_hash IS DISTINCT FROM EXCLUDED.leaf_hash
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM removed) + (SELECT COUNT(*) FROM upserted)
+"""
+
+ROLLUP_SQL = """
+    INSERT INTO bar_merkle_nodes (symbol, dataset_version_id, level, period, node_hash, child_count, bar_count)
+    SELECT symbol, dataset_version_id, %(level)s, period,
+           sha256(convert_to(to_char(period, %(label)s), 'UTF8') || string_agg(child_hash, ''::bytea ORDER BY child)),
+           COUNT(*), SUM(bar_count)
+    FROM (
+        SELECT symbol, dataset_version_id, date_trunc(%(level)s, {child}::timestamp)::date AS period,
+               {child} AS child, {child_hash} AS child_hash, bar_count
+        FROM {children}
+        WHERE symbol = %(symbol)s AND {child} >= %(lo)s AND {child} < %(hi)s AND {scope} {child_filter}
+    ) c
+    GROUP BY symbol, dataset_version_id, period
+"""
+
+
+def source_for_version(dataset_version_id: str) -> str:
+    return 'clean' if dataset_version_id == CLEAN_VERSION else 'raw'
+
+
+def _scope(source: str, alias: str = '') -> str:
+    column = f"{alias}dataset_version_id"
+    return f"{column} = '{CLEAN_VERSION}'" if source == 'clean' else f"{column} <> '{CLEAN_VERSION}'"
+
+
+def _utc(ts) -> datetime:
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+    elif isinstance(ts, date) and not isinstance(ts, datetime):
+        ts = datetime(ts.year, ts.month, ts.day)
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + (day.month == 12), day.month % 12 + 1, 1)
+
+
+# ---------------------------------------------------------------------------
+# Python reference of the SQL encoding (tests, ad-hoc checks)
+# ---------------------------------------------------------------------------
+
+def _price(value) -> str:
+    return format(Decimal(str(value)).quantize(PRICE_QUANTUM, rounding=ROUND_HALF_UP), 'f')
+
+
+def bar_entry(ts, open_, high, low, close, volume) -> bytes:
+    """One bar's 10-byte digest entry, identical to the one DAY_ENTRIES_SQL builds"""
+    ts = _utc(ts)
+    text = '|'.join([ts.strftime('%Y-%m-%dT%H:%M:%S'), _price(open_), _price(high), _price(low), _price(close),
+                     str(int(Decimal(str(volume or 0))))])
+    minute = ts.hour * 60 + ts.minute
+    return minute.to_bytes(2, 'big') + hashlib.sha256(text.encode()).digest()[:DIGEST_SIZE]
+
+
+def leaf_hash(day: date, bar_digests: bytes) -> bytes:
+    return hashlib.sha256(day.isoformat().encode() + bytes(bar_digests)).digest()
+
+
+def split_entries(bar_digests: bytes) -> Dict[int, bytes]:
+    """minute-of-day -> bar digest"""
+    data = bytes(bar_digests)
+    return {int.from_bytes(data[i:i + 2], 'big'): data[i + 2:i + ENTRY_SIZE] for i in range(0, len(data), ENTRY_SIZE)}
+
+
+def _cut(bar_digests: bytes, lo_minute: int, hi_minute: int) -> Tuple[bytes, int]:
+    data = bytes(bar_digests)
+    kept = [data[i:i + ENTRY_SIZE] for i in range(0, len(data), ENTRY_SIZE)
+            if lo_minute <= int.from_bytes(data[i:i + 2], 'big') <= hi_minute]
+    return b''.join(kept), len(kept)
+
+
+# ---------------------------------------------------------------------------
+# Range cover
+# ---------------------------------------------------------------------------
+
+def _whole(first: date, last: date) -> List[Tuple]:
+    segments = []
+    day = first
+    while day <= last:
+        if day.month == 1 and day.day == 1 and date(day.year, 12, 31) <= last:
+            segments.append(('year', day, None, None))
+            day = date(day.year + 1, 1, 1)
+        elif day.day == 1 and _next_month(day) - timedelta(days=1) <= last:
+            segments.append(('month', day, None, None))
+            day = _next_month(day)
+        else:
+            segments.append(('day', day, None, None))
+            day += timedelta(days=1)
+    return segments
+
+
+def range_segments(start, end) -> List[Tuple]:
+    """
+    Canonical cover of [start, end] (inclusive, UTC) as (level, period, lo_minute,
+    hi_minute): a partial first day, whole days/months/years taken greedily from the
+    left, a partial last day. Minutes are None for whole periods. A range always
+    decomposes the same way, so its hash is comparable across versions and runs.
+    """
+    start, end = _utc(start), _utc(end)
+    if start > end:
+        return []
+    lo = start.hour * 60 + start.minute + (1 if start.second or start.microsecond else 0)
+    hi = end.hour * 60 + end.minute
+    first, last = start.date(), end.date()
+
+    if first == last:
+        if lo == 0 and hi == LAST_MINUTE:
+            return [('day', first, None, None)]
+        return [('day', first, lo, hi)] if lo <= hi else []
+
+    head, tail = [], []
+    if lo != 0:
+        if lo <= LAST_MINUTE:
+            head.append(('day', first, lo, LAST_MINUTE))
+        first += timedelta(days=1)
+    if hi != LAST_MINUTE:
+        tail.append(('day', last, 0, hi))
+        last -= timedelta(days=1)
+    return head + _whole(first, last) + tail
+
+
+def _children(segment: Tuple) -> List[Tuple]:
+    level, period = segment[0], segment[1]
+    if level == 'year':
+        return [('month', date(period.year, m, 1), None, None) for m in range(1, 13)]
+    return [('day', day, None, None) for day in
+            (period + timedelta(days=i) for i in range((_next_month(period) - period).days))]
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def index_installed(conn) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('bar_merkle_days') IS NOT NULL AND to_regclass('bar_merkle_nodes') IS NOT NULL")
+        return cursor.fetchone()[0]
+
+
+def refresh_range(conn, symbol: str, source: str, start=None, end=None) -> Optional[int]:
+    """
+    Recompute the leaves of every UTC day touched by [start, end] (every day of the
+    symbol when both are None) from the source bar table, then re-roll the months and
+    years above them. Runs in the caller's transaction so the index commits with the
+    bar writes. Returns the number of day leaves changed, or None when the index
+    tables are not installed.
+    """
+    table, version = SOURCES[source]
+    if not index_installed(conn):
+        logger.warning("bar_merkle_days not installed - run database/run_bar_merkle_index_migration.py")
+        return None
+
+    with conn.cursor() as cursor:
+        if start is None or end is None:
+            cursor.execute(f"SELECT MIN(ts), MAX(ts) FROM {table} WHERE symbol = %s", (symbol,))
+            min_ts, max_ts = cursor.fetchone()
+            cursor.execute("SELECT MIN(day), MAX(day) FROM bar_merkle_days WHERE symbol = %s AND " + _scope(source),
+                           (symbol,))
+            min_day, max_day = cursor.fetchone()
+            days = [d for d in (min_ts and _utc(min_ts).date(), max_ts and _utc(max_ts).date(), min_day, max_day) if d]
+            if not days:
+                return 0
+            day_lo, day_hi = min(days), max(days)
+        else:
+            day_lo, day_hi = _utc(start).date(), _utc(end).date()
+
+        params = {
+            'symbol': symbol,
+            'lo': _day_start(day_lo),
+            'hi': _day_start(day_hi + timedelta(days=1)),
+            'day_lo': day_lo,
+            'day_hi': day_hi,
+        }
+        entries = DAY_ENTRIES_SQL.format(version=version, table=table, version_filter='')
+        cursor.execute(REFRESH_DAYS_SQL.format(entries=entries, scope=_scope(source, 'd.')), params)
+        changed = cursor.fetchone()[0]
+
+        month_lo, month_hi = day_lo.replace(day=1), _next_month(day_hi)
+        year_lo, year_hi = date(day_lo.year, 1, 1), date(day_hi.year + 1, 1, 1)
+        for level, label, lo, hi, children, child, child_hash, child_filter in (
+            ('month', 'YYYY-MM', month_lo, month_hi, 'bar_merkle_days', 'day', 'leaf_hash', ''),
+            ('year', 'YYYY', year_lo, year_hi, 'bar_merkle_nodes', 'period', 'node_hash', "AND level = 'month'"),
+        ):
+            cursor.execute(
+                "DELETE FROM bar_merkle_nodes WHERE symbol = %s AND level = %s AND period >= %s AND period < %s AND "
+                + _scope(source), (symbol, level, lo, hi))
+            cursor.execute(ROLLUP_SQL.format(child=child, child_hash=child_hash, children=children,
+                                             scope=_scope(source), child_filter=child_filter),
+                           {'symbol': symbol, 'level': level, 'label': label, 'lo': lo, 'hi': hi})
+
+    logger.info(f"Merkle index refreshed: {symbol} {source} {day_lo}..{day_hi}, {changed} day leaves changed")
+    return changed
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def _read(cursor, symbol: str, version: str, segments: List[Tuple], digests: bool = False) -> Dict[Tuple, Dict]:
+    """segment key (level, period) -> {'hash', 'bar_count', 'bar_digests'} for the stored nodes"""
+    days = [s[1] for s in segments if s[0] == 'day']
+    partial = [s[1] for s in segments if s[0] == 'day' and (digests or s[2] is not None)]
+    months = [s[1] for s in segments if s[0] == 'month']
+    years = [s[1] for s in segments if s[0] == 'year']
+    found = {}
+    if days:
+        cursor.execute("""
+            SELECT day, leaf_hash, bar_count, CASE WHEN day = ANY(%(partial)s) THEN bar_digests END
+            FROM bar_merkle_days
+            WHERE symbol = %(symbol)s AND dataset_version_id = %(version)s AND day = ANY(%(days)s)
+        """, {'symbol': symbol, 'version': version, 'days': days, 'partial': partial})
+        for day, hash_, bar_count, bar_digests in cursor.fetchall():
+            found[('day', day)] = {'hash': bytes(hash_), 'bar_count': bar_count,
+                                   'bar_digests': bytes(bar_digests) if bar_digests is not None else None}
+    if months or years:
+        cursor.execute("""
+            SELECT level, period, node_hash, bar_count FROM bar_merkle_nodes
+            WHERE symbol = %(symbol)s AND dataset_version_id = %(version)s
+              AND ((level = 'month' AND period = ANY(%(months)s)) OR (level = 'year' AND period = ANY(%(years)s)))
+        """, {'symbol': symbol, 'version': version, 'months': months, 'years': years})
+        for level, period, hash_, bar_count in cursor.fetchall():
+            found[(level, period)] = {'hash': bytes(hash_), 'bar_count': int(bar_count), 'bar_digests': None}
+    return found
+
+
+def _segment_hash(segment: Tuple, node: Optional[Dict]) -> Tuple[Optional[bytes], int]:
+    """(hash, bar_count) of one cover segment, cutting partial days from their digests"""
+    if node is None:
+        return None, 0
+    if segment[2] is None:
+        return node['hash'], node['bar_count']
+    kept, count = _cut(node['bar_digests'], segment[2], segment[3])
+    if not count:
+        return None, 0
+    return leaf_hash(segment[1], kept), count
+
+
+def has_index(conn, symbol: str, dataset_version_id: str) -> bool:
+    """True when the index is installed and holds leaves for (symbol, dataset_version_id)"""
+    if not index_installed(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM bar_merkle_days WHERE symbol = %s AND dataset_version_id = %s)",
+                       (symbol, dataset_version_id))
+        return cursor.fetchone()[0]
+
+
+def range_hash(conn, symbol: str, dataset_version_id: str, start, end) -> Dict[str, Any]:
+    """
+    Merkle hash of the bars of (symbol, dataset_version_id) in [start, end]:
+    sha256 over the hashes of the range's cover segments in time order (empty
+    segments skipped). Reads at most one node per segment.
+    """
+    segments = range_segments(start, end)
+    with conn.cursor() as cursor:
+        nodes = _read(cursor, symbol, dataset_version_id, segments)
+    hasher = hashlib.sha256()
+    bar_count = 0
+    for segment in segments:
+        hash_, count = _segment_hash(segment, nodes.get(segment[:2]))
+        if hash_ is not None:
+            hasher.update(hash_)
+            bar_count += count
+    return {
+        'merkle_root': hasher.hexdigest(),
+        'bar_count': bar_count,
+        'segments': len(segments),
+        'nodes_read': len(nodes),
+    }
+
+
+def _bar_diff(day: date, base: Optional[bytes], other: Optional[bytes], lo: int, hi: int) -> Optional[Dict]:
+    a = split_entries(base or b'')
+    b = split_entries(other or b'')
+    start = _day_start(day)
+
+    def stamps(minutes):
+        return [(start + timedelta(minutes=m)).isoformat() for m in sorted(minutes) if lo <= m <= hi]
+
+    changed = stamps(m for m in a.keys() & b.keys() if a[m] != b[m])
+    missing = stamps(a.keys() - b.keys())
+    extra = stamps(b.keys() - a.keys())
+    if not (changed or missing or extra):
+        return None
+    return {'day': day.isoformat(), 'changed': changed, 'missing': missing, 'extra': extra}
+
+
+def diff_versions(conn, symbol: str, base_version: str, other_version: str, start, end) -> List[Dict]:
+    """
+    Days and bars where other_version differs from base_version in [start, end].
+    Descends only into segments whose hashes differ: year -> months -> days -> bars.
+    'missing' bars exist only in base, 'extra' only in other.
+    """
+    diffs = []
+    pending = range_segments(start, end)
+    with conn.cursor() as cursor:
+        while pending:
+            base = _read(cursor, symbol, base_version, pending)
+            other = _read(cursor, symbol, other_version, pending)
+            descend, days = [], []
+            for segment in pending:
+                key = segment[:2]
+                if _segment_hash(segment, base.get(key))[0] == _segment_hash(segment, other.get(key))[0]:
+                    continue
+                if segment[0] == 'day':
+                    days.append(segment)
+                else:
+                    descend.extend(_children(segment))
+            if days:
+                base_days = _read(cursor, symbol, base_version, days, digests=True)
+                other_days = _read(cursor, symbol, other_version, days, digests=True)
+                for segment in days:
+                    key = segment[:2]
+                    diff = _bar_diff(segment[1], (base_days.get(key) or {}).get('bar_digests'),
+                                     (other_days.get(key) or {}).get('bar_digests'),
+                                     segment[2] or 0, LAST_MINUTE if segment[3] is None else segment[3])
+                    if diff:
+                        diffs.append(diff)
+            pending = descend
+    diffs.sort(key=lambda d: d['day'])
+    return diffs
+
+
+def verify_range(conn, symbol: str, dataset_version_id: str, start, end) -> List[Dict]:
+    """
+    Recompute the leaves of [start, end] from the bar table and compare them with the
+    stored index. Returns the days and bars the table no longer matches ('missing':
+    indexed but gone, 'extra': in the table but not indexed).
+    """
+    source = source_for_version(dataset_version_id)
+    table, version = SOURCES[source]
+    start, end = _utc(start), _utc(end)
+    segments = {s[1]: s for s in range_segments(start, end) if s[0] == 'day'}
+    day_lo, day_hi = start.date(), end.date()
+    version_filter = '' if source == 'clean' else f"AND {version} = %(version)s"
+
+    with conn.cursor() as cursor:
+        cursor.execute(DAY_ENTRIES_SQL.format(version=version, table=table, version_filter=version_filter), {
+            'symbol': symbol, 'version': dataset_version_id,
+            'lo': _day_start(day_lo), 'hi': _day_start(day_hi + timedelta(days=1)),
+        })
+        current = {row[1]: (bytes(row[3]), bytes(row[4])) for row in cursor.fetchall()}
+        cursor.execute("""
+            SELECT day, leaf_hash, bar_digests FROM bar_merkle_days
+            WHERE symbol = %s AND dataset_version_id = %s AND day >= %s AND day <= %s
+        """, (symbol, dataset_version_id, day_lo, day_hi))
+        stored = {row[0]: (bytes(row[1]), bytes(row[2])) for row in cursor.fetchall()}
+
+    diffs = []
+    for day in sorted(current.keys() | stored.keys()):
+        if current.get(day, (None,))[0] == stored.get(day, (None,))[0]:
+            continue
+        segment = segments.get(day, ('day', day, 0, LAST_MINUTE))
+        diff = _bar_diff(day, stored.get(day, (None, b''))[1], current.get(day, (None, b''))[1],
+                         segment[2] or 0, LAST_MINUTE if segment[3] is None else segment[3])
+        if diff:
+            diffs.append(diff)
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bar Merkle index maintenance and checks")
+    sub = parser.add_subparsers(dest='command', required=True)
+    refresh = sub.add_parser('refresh', help="(re)build leaves and nodes for a symbol")
+    refresh.add_argument('symbol')
+    refresh.add_argument('source', choices=sorted(SOURCES))
+    refresh.add_argument('--start')
+    refresh.add_argument('--end')
+    for name in ('root', 'verify'):
+        cmd = sub.add_parser(name)
+        cmd.add_argument('symbol')
+        cmd.add_argument('version')
+        cmd.add_argument('start')
+        cmd.add_argument('end')
+    diff = sub.add_parser('diff')
+    diff.add_argument('symbol')
+    diff.add_argument('base_version')
+    diff.add_argument('other_version')
+    diff.add_argument('start')
+    diff.add_argument('end')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+    try:
+        if args.command == 'refresh':
+            result = {'changed_days': refresh_range(conn, args.symbol, args.source, args.start, args.end)}
+            conn.commit()
+        elif args.command == 'root':
+            result = range_hash(conn, args.symbol, args.version, args.start, args.end)
+        elif args.command == 'verify':
+            result = {'mismatches': verify_range(conn, args.symbol, args.version, args.start, args.end)}
+        else:
+            result = {'diff': diff_versions(conn, args.symbol, args.base_version, args.other_version,
+                                            args.start, args.end)}
+    finally:
+        conn.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""
+Bar Rollups
+Multi-timeframe OHLCV rollups of market_bars_ohlcv_1m_clean (database/bar_rollups_schema.sql)
+
+Buckets use the UTC HTF boundaries of market_parity.htf_bias: 5m/15m/1H/4H floor
+from 00:00 UTC and 1D is the UTC day. Each timeframe is built set-based in Postgres
+from the one below it (1m -> 5m -> 15m -> 60m -> 240m -> 1d), so a refresh reads
+each row once per level and a daily request reads one row per day.
+"""
+
+import argparse
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = 'market_bars_ohlcv_rollup'
+SOURCE_TABLE = 'market_bars_ohlcv_1m_clean'
+
+# timeframe -> bucket seconds, in build order
+TIMEFRAMES = {
+    '5m': 300,
+    '15m': 900,
+    '60m': 3600,
+    '240m': 14400,
+    '1d': 86400,
+}
+
+# Spellings accepted by /api/hist/v1/bars (bias columns, htf_bias keys, Pine-style)
+TIMEFRAME_ALIASES = {
+    '5m': '5m', '5M': '5m', '5': '5m',
+    '15m': '15m', '15M': '15m', '15': '15m',
+    '60m': '60m', '1h': '60m', '1H': '60m', '60': '60m',
+    '240m': '240m', '4h': '240m', '4H': '240m', '240': '240m',
+    '1d': '1d', '1D': '1d', 'D': '1d',
+}
+
+DAY = timedelta(days=1)
+
+AGGREGATE_SQL = """
+    SELECT to_timestamp(floor(extract(epoch FROM ts) / {seconds}) * {seconds}) AS bucket,
+           (array_agg(open ORDER BY ts))[1] AS open,
+           MAX(high) AS high,
+           MIN(low) AS low,
+           (array_agg(close ORDER BY ts DESC))[1] AS close,
+           SUM({volume})::bigint AS volume,
+           SUM({bar_count})::int AS bar_count
+    FROM {table}
+    WHERE symbol = %(symbol)s AND ts >= %(lo)s AND ts < %(hi)s {tf_filter}
+    GROUP BY 1
+"""
+
+REFRESH_SQL = """
+    WITH fresh AS ({aggregate}),
+    removed AS (
+        DELETE FROM market_bars_ohlcv_rollup r
+        WHERE r.symbol = %(symbol)s AND r.tf = %(tf)s AND r.ts >= %(lo)s AND r.ts < %(hi)s
+          AND NOT EXISTS (SELECT 1 FROM fresh f WHERE f.bucket = r.ts)
+        RETURNING 1
+    ),
+    upserted AS (
+        INSERT INTO market_bars_ohlcv_rollup AS r (symbol, tf, ts, open, high, low, close, volume, bar_count)
+        SELECT %(symbol)s, %(tf)s, bucket, open, high, low, close, volume, bar_count FROM fresh
+        ON CONFLICT (symbol, tf, ts) DO UPDATE SET
+            open = EXCLUDED.open,
+            high = EXCLUDED.high,
+            low = EXCLUDED.low,
+            close = EXCLUDED.close,
+            volume = EXCLUDED.volume,
+            bar_count = EXCLUDED.bar_count,
+            updated_at = NOW()
+        WHERE (r.open, r.high, r.low, r.close, r.volume, r.bar_count)
+              IS DISTINCT FROM (EXCLUDED.open, EXCLUDED.high, EXCLUDED.low, EXCLUDED.close, EXCLUDED.volume, EXCLUDED.bar_count)
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM removed) + (SELECT COUNT(*) FROM upserted)
+"""
+
+
+def normalize_timeframe(tf: str) -> Optional[str]:
+    """Canonical rollup timeframe for a requested tf, or None when it is not rolled up"""
+    return TIMEFRAME_ALIASES.get(tf)
+
+
+def bucket_start(ts: datetime, tf: str) -> datetime:
+    """Open time of the UTC bucket containing ts"""
+    seconds = TIMEFRAMES[tf]
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    epoch = int(ts.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=timezone.utc)
+
+
+def _from_1m(tf: str) -> str:
+    return AGGREGATE_SQL.format(seconds=TIMEFRAMES[tf], table=SOURCE_TABLE, volume='COALESCE(volume, 0)',
+                                bar_count='1', tf_filter='')
+
+
+def _source(tf: str):
+    """(aggregate SQL, extra params) building tf from the level below it"""
+    order = list(TIMEFRAMES)
+    index = order.index(tf)
+    if index == 0:
+        return _from_1m(tf), {}
+    sql = AGGREGATE_SQL.format(seconds=TIMEFRAMES[tf], table=ROLLUP_TABLE, volume='volume',
+                               bar_count='bar_count', tf_filter='AND tf = %(child_tf)s')
+    return sql, {'child_tf': order[index - 1]}
+
+
+def rollups_installed(conn) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('market_bars_ohlcv_rollup') IS NOT NULL")
+        return cursor.fetchone()[0]
+
+
+def refresh_rollups(conn, symbol: str, start: datetime = None, end: datetime = None) -> Optional[Dict[str, int]]:
+    """
+    Rebuild every rollup bucket overlapping [start, end] (the symbol's whole history
+    when both are None) from the 1m clean bars. The window is widened to whole UTC
+    days so every timeframe's buckets are complete. Runs in the caller's transaction.
+    Returns {tf: rows changed}, or None when the rollup table is not installed.
+    """
+    if not rollups_installed(conn):
+        logger.warning("market_bars_ohlcv_rollup not installed - run database/run_bar_rollups_migration.py")
+        return None
+
+    with conn.cursor() as cursor:
+        if start is None or end is None:
+            cursor.execute(f"""
+                SELECT LEAST(MIN(ts), (SELECT MIN(ts) FROM {ROLLUP_TABLE} WHERE symbol = %(symbol)s)),
+                       GREATEST(MAX(ts), (SELECT MAX(ts) FROM {ROLLUP_TABLE} WHERE symbol = %(symbol)s))
+                FROM {SOURCE_TABLE} WHERE symbol = %(symbol)s
+            """, {'symbol': symbol})
+            start, end = cursor.fetchone()
+            if start is None:
+                return {tf: 0 for tf in TIMEFRAMES}
+
+        params = {'symbol': symbol, 'lo': bucket_start(start, '1d'), 'hi': bucket_start(end, '1d') + DAY}
+        changed = {}
+        for tf in TIMEFRAMES:
+            aggregate, extra = _source(tf)
+            cursor.execute(REFRESH_SQL.format(aggregate=aggregate), {**params, **extra, 'tf': tf})
+            changed[tf] = cursor.fetchone()[0]
+
+    logger.info(f"Bar rollups refreshed: {symbol} {params['lo'].date()}..{params['hi'].date()} {changed}")
+    return changed
+
+
+def has_rollups(cursor, symbol: str, tf: str) -> bool:
+    cursor.execute("SELECT to_regclass('market_bars_ohlcv_rollup') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return False
+    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {ROLLUP_TABLE} WHERE symbol = %s AND tf = %s)", (symbol, tf))
+    return cursor.fetchone()[0]
+
+
+def fetch_rollup_bars(cursor, symbol: str, tf: str, start: datetime, end: datetime, limit: int) -> List[tuple]:
+    """
+    (ts, open, high, low, close, volume, bar_count) rows for buckets opening in
+    [start, end]. Reads the rollup table when it holds the symbol, otherwise
+    aggregates the 1m clean bars on the fly with the same bucketing.
+    """
+    if has_rollups(cursor, symbol, tf):
+        cursor.execute(f"""
+            SELECT ts, open, high, low, close, volume, bar_count FROM {ROLLUP_TABLE}
+            WHERE symbol = %s AND tf = %s AND ts >= %s AND ts <= %s
+            ORDER BY ts ASC LIMIT %s
+        """, (symbol, tf, start, end, limit))
+        return cursor.fetchall()
+
+    seconds = TIMEFRAMES[tf]
+    aggregate = _from_1m(tf)
+    # Bars from start through the end of the bucket open at end; the partial bucket before start is dropped
+    cursor.execute(f"""
+        SELECT bucket, open, high, low, close, volume, bar_count FROM ({aggregate}) b
+        WHERE bucket >= %(lo)s ORDER BY bucket ASC LIMIT %(limit)s
+    """, {'symbol': symbol, 'lo': start, 'hi': bucket_start(end, tf) + timedelta(seconds=seconds), 'limit': limit})
+    return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild multi-timeframe bar rollups")
+    parser.add_argument('symbol')
+    parser.add_argument('--start', help="RFC3339; omit with --end for a full rebuild")
+    parser.add_argument('--end')
+    args = parser.parse_args()
+
+    parse = lambda value: datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+    conn = psycopg2.connect(os.environ.get('DATABASE_URL'))
+    try:
+        changed = refresh_rollups(conn, args.symbol, parse(args.start), parse(args.end))
+        conn.commit()
+    finally:
+        conn.close()
+    print(json.dumps({'symbol': args.symbol, 'changed': changed}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
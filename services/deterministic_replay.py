@@ -2,7 +2,21 @@
 
 import os, psycopg2, hashlib, json
 
-def replay_bars(dataset_version_id: str, symbol: str, start_date: str, end_date: str) -> dict:
+try:
+    from services.bar_merkle_index import has_index, range_hash, verify_range
+except ImportError:
+    from bar_merkle_index import has_index, range_hash, verify_range
+
+def replay_bars(dataset_version_id: str, symbol: str, start_date: str, end_date: str,
+                use_index: bool = True, verify: bool = False) -> dict:
+    """
+    Replay-check a version's bars over [start_date, end_date].
+    
+    With the bar Merkle index built for the version, the result carries the range's
+    merkle_root read from the index (no bar fetch); verify=True also recomputes the
+    range's day leaves and reports drifted bars. Otherwise, or with use_index=False,
+    it hashes every bar into output_hash as before.
+    """
     database_url = os.environ.get('DATABASE_URL')
     conn = psycopg2.connect(database_url)
     cursor = conn.cursor()
@@ -28,6 +42,23 @@ def replay_bars(dataset_version_id: str, symbol: str, start_date: str, end_date:
         conn.close()
         raise ValueError(f'Version mismatch: requested {dataset_version_id}, active is {active_version}')
     
+    if use_index and has_index(conn, symbol, dataset_version_id):
+        root = range_hash(conn, symbol, dataset_version_id, start_date, end_date)
+        result = {
+            'dataset_version_id': dataset_version_id,
+            'version_scoped': True,
+            'symbol': symbol,
+            'date_range': f'{start_date} to {end_date}',
+            'bar_count': root['bar_count'],
+            'merkle_root': root['merkle_root'],
+            'nodes_read': root['nodes_read']
+        }
+        if verify:
+            result['mismatches'] = verify_range(conn, symbol, dataset_version_id, start_date, end_date)
+        cursor.close()
+        conn.close()
+        return result
+    
     cursor.execute("""
         SELECT ts, open, high, low, close, volume FROM market_bars_ohlcv_1m
         WHERE symbol = %s AND ts >= %s::timestamptz AND ts <= %s::timestamptz
@@ -61,7 +92,8 @@ def replay_bars(dataset_version_id: str, symbol: str, start_date: str, end_date:
 if __name__ == '__main__':
     import sys
     if len(sys.argv) < 5:
-        print('Usage: python services/deterministic_replay.py <version_id> <symbol> <start> <end>')
+        print('Usage: python services/deterministic_replay.py <version_id> <symbol> <start> <end> [--full] [--verify]')
         exit(1)
-    result = replay_bars(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
+    result = replay_bars(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4],
+                         use_index='--full' not in sys.argv, verify='--verify' in sys.argv)
     print(json.dumps(result, indent=2))
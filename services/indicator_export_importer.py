@@ -1,25 +1,303 @@
 """
 Indicator Export Importer - INDICATOR_EXPORT_V2
 Idempotent import from raw batches into confirmed_signals_ledger
+
+Batches are imported set-based by default: the whole batch is normalized at once
+(canonical trade_ids and sessions come from one vectorized timezone conversion),
+folded to one row per trade_id in arrival order, staged in a temp table and merged
+with a single INSERT ... ON CONFLICT. The per-row path (bulk=False) is kept as the
+reference; both leave the same ledger contents.
 """
 
 import logging
 import psycopg2
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
 
 logger = logging.getLogger(__name__)
 
-def import_indicator_export_v2(batch_id: int, conn=None) -> dict:
+NY_TZ = "America/New_York"
+STAGING_PAGE_SIZE = 5000
+
+CONFIRMED_COLUMNS = ('trade_id', 'triangle_time_ms', 'confirmation_time_ms', 'date', 'session', 'direction',
+                     'entry', 'stop', 'be_mfe', 'no_be_mfe', 'mae', 'completed', 'symbol')
+ALL_SIGNALS_COLUMNS = ('trade_id', 'triangle_time_ms', 'confirmation_time_ms', 'direction', 'status',
+                       'bars_to_confirm', 'session', 'entry_price', 'stop_loss', 'risk_points',
+                       'htf_daily', 'htf_4h', 'htf_1h', 'htf_15m', 'htf_5m', 'htf_1m')
+
+
+def _optional(signal: Dict[str, Any], key: str, cast, allow_null_string: bool = True):
+    """cast(signal[key]) for a truthy value, None when missing or not coercible"""
+    value = signal.get(key)
+    if not value or (not allow_null_string and value == 'null'):
+        return None
+    try:
+        return cast(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _confirmed_fields(signal: Dict[str, Any]) -> Dict[str, Any]:
+    """Optional confirmed_signals_ledger columns of an INDICATOR_EXPORT_V2 signal"""
+    completed_raw = signal.get('completed')
+    if isinstance(completed_raw, str):
+        completed = completed_raw.lower() == 'true'
+    elif isinstance(completed_raw, bool):
+        completed = completed_raw
+    else:
+        completed = None
+    
+    date_obj = None
+    if signal.get('date'):
+        try:
+            date_obj = datetime.strptime(signal.get('date'), '%Y-%m-%d').date()
+        except:
+            date_obj = None
+    
+    return {
+        'confirmation_time_ms': _optional(signal, 'confirmation_time', int),
+        'date': date_obj,
+        'session': signal.get('session'),
+        'entry': _optional(signal, 'entry', float),
+        'stop': _optional(signal, 'stop', float),
+        'be_mfe': _optional(signal, 'be_mfe', float),
+        'no_be_mfe': _optional(signal, 'no_be_mfe', float),
+        'mae': _optional(signal, 'mae', float),
+        'completed': completed,
+        'symbol': signal.get('symbol') or signal.get('exchange'),
+    }
+
+
+def _all_signals_fields(signal: Dict[str, Any]) -> Dict[str, Any]:
+    """Optional all_signals_ledger columns of an ALL_SIGNALS_EXPORT signal (session aside)"""
+    return {
+        'confirmation_time_ms': _optional(signal, 'confirmation_time', int),
+        'bars_to_confirm': _optional(signal, 'bars_to_confirm', int),
+        'entry_price': _optional(signal, 'entry', float, allow_null_string=False),
+        'stop_loss': _optional(signal, 'stop', float, allow_null_string=False),
+        'risk_points': _optional(signal, 'risk', float, allow_null_string=False),
+        'htf_daily': signal.get('htf_daily'),
+        'htf_4h': signal.get('htf_4h'),
+        'htf_1h': signal.get('htf_1h'),
+        'htf_15m': signal.get('htf_15m'),
+        'htf_5m': signal.get('htf_5m'),
+        'htf_1m': signal.get('htf_1m'),
+    }
+
+
+def _ny_times(epoch_ms: List[int]) -> pd.Series:
+    return pd.to_datetime(pd.Series(epoch_ms, dtype='int64'), unit='ms', utc=True).dt.tz_convert(NY_TZ)
+
+
+def canonical_trade_ids(triangle_times_ms: List[int], directions: List[str]) -> List[str]:
+    """Vectorized form of the per-signal YYYYMMDD_HHMMSS000_BULLISH/BEARISH id"""
+    if not triangle_times_ms:
+        return []
+    stamps = _ny_times(triangle_times_ms).dt.strftime('%Y%m%d_%H%M%S000_')
+    bullish = pd.Series(directions).str.lower().str.startswith('bull')
+    return (stamps + bullish.map({True: 'BULLISH', False: 'BEARISH'})).tolist()
+
+
+def sessions_for(triangle_times_ms: List[int]) -> List[str]:
+    """Vectorized form of the per-signal session buckets (New York wall clock)"""
+    if not triangle_times_ms:
+        return []
+    ny = _ny_times(triangle_times_ms)
+    h = ny.dt.hour.to_numpy()
+    m = ny.dt.minute.to_numpy()
+    return np.select(
+        [(20 <= h) & (h <= 23),
+         h <= 5,
+         (h == 6) | ((h == 8) & (m <= 29)),
+         ((h == 8) & (m >= 30)) | ((9 <= h) & (h <= 11)),
+         h == 12,
+         (13 <= h) & (h <= 15)],
+        ["ASIA", "LONDON", "NY PRE", "NY AM", "NY LUNCH", "NY PM"],
+        default="AFTER_HOURS").tolist()
+
+
+def _fold(rows: List[Dict[str, Any]], first_wins: Tuple[str, ...], last_wins: Tuple[str, ...]) -> Dict[str, Dict[str, Any]]:
+    """
+    Collapse repeated trade_ids the way consecutive upserts would: insert-only columns
+    keep the first value, overwritten columns the last, COALESCEd columns the last non-null.
+    """
+    folded = {}
+    for row in rows:
+        current = folded.get(row['trade_id'])
+        if current is None:
+            folded[row['trade_id']] = dict(row)
+            continue
+        for column, value in row.items():
+            if column in first_wins:
+                continue
+            if column in last_wins or value is not None:
+                current[column] = value
+    return folded
+
+
+def normalize_indicator_export_v2(signals: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int, int]:
+    """(confirmed ledger rows folded per trade_id, skipped_invalid, trade_id mismatches)"""
+    valid = []
+    skipped_invalid = 0
+    for signal in signals:
+        try:
+            triangle_time = int(signal.get('triangle_time'))
+        except (ValueError, TypeError):
+            skipped_invalid += 1
+            continue
+        if not signal.get('direction'):
+            skipped_invalid += 1
+            continue
+        valid.append((signal, triangle_time))
+    
+    trade_ids = canonical_trade_ids([t for _, t in valid], [s['direction'] for s, _ in valid])
+    rows = []
+    mismatches = 0
+    for (signal, triangle_time), trade_id in zip(valid, trade_ids):
+        if signal.get('trade_id') and signal.get('trade_id') != trade_id:
+            mismatches += 1
+        row = _confirmed_fields(signal)
+        if row['mae'] is not None and row['mae'] > 0.0:
+            row['mae'] = 0.0
+        row.update(trade_id=trade_id, triangle_time_ms=triangle_time, direction=signal['direction'])
+        rows.append(row)
+    
+    folded = _fold(rows, first_wins=('trade_id', 'triangle_time_ms'), last_wins=('direction',))
+    return list(folded.values()), skipped_invalid, mismatches
+
+
+def normalize_all_signals_export(signals: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """(all_signals ledger rows folded per trade_id, skipped_invalid)"""
+    rows = []
+    skipped_invalid = 0
+    for signal in signals:
+        try:
+            triangle_time_ms = int(signal.get('signal_time'))
+        except (ValueError, TypeError):
+            skipped_invalid += 1
+            continue
+        if not signal.get('trade_id') or not signal.get('direction') or not signal.get('status'):
+            skipped_invalid += 1
+            continue
+        row = _all_signals_fields(signal)
+        row.update(trade_id=signal['trade_id'], triangle_time_ms=triangle_time_ms,
+                   direction=signal['direction'], status=signal['status'], session=signal.get('session'))
+        rows.append(row)
+    
+    missing = [row for row in rows if not row['session']]
+    for row, session in zip(missing, sessions_for([row['triangle_time_ms'] for row in missing])):
+        row['session'] = session
+    
+    folded = _fold(rows, first_wins=('trade_id', 'triangle_time_ms', 'direction'), last_wins=('status',))
+    return list(folded.values()), skipped_invalid
+
+
+def _merge_staged(cursor, table: str, columns: Tuple[str, ...], column_types: Dict[str, str],
+                  rows: List[Dict[str, Any]], overwrite: Tuple[str, ...], insert_only: Tuple[str, ...],
+                  batch_id: int) -> Dict[str, int]:
+    """
+    Stage rows in a temp table and merge them into `table` with one INSERT ... ON CONFLICT.
+    Columns in `overwrite` take the staged value, `insert_only` ones keep the ledger's,
+    the rest are COALESCEd like the per-row upserts. Returns inserted/updated/unchanged.
+    """
+    staging = f"{table}_staging"
+    cursor.execute(f"""
+        CREATE TEMP TABLE {staging} ({', '.join(f'{c} {column_types[c]}' for c in columns)}) ON COMMIT DROP
+    """)
+    execute_values(cursor, f"INSERT INTO {staging} ({', '.join(columns)}) VALUES %s",
+                   [tuple(row[c] for c in columns) for row in rows], page_size=STAGING_PAGE_SIZE)
+    
+    merged = {c: f"s.{c}" if c in overwrite else f"COALESCE(s.{c}, l.{c})"
+              for c in columns if c != 'trade_id' and c not in insert_only}
+    updates = ',\n            '.join(
+        f"{c} = EXCLUDED.{c}" if c in overwrite else f"{c} = COALESCE(EXCLUDED.{c}, {table}.{c})"
+        for c in merged)
+    cursor.execute(f"""
+        WITH prior AS (
+            -- Same snapshot as the merge below: the ledger before this batch
+            SELECT s.trade_id,
+                   ({', '.join(f'l.{c}' for c in merged)}) IS NOT DISTINCT FROM ({', '.join(merged.values())}) AS unchanged
+            FROM {staging} s
+            JOIN {table} l ON l.trade_id = s.trade_id
+        ), upserted AS (
+            INSERT INTO {table} ({', '.join(columns)}, last_seen_batch_id, updated_at)
+            SELECT {', '.join(columns)}, %s, NOW()
+            FROM {staging}
+            ORDER BY trade_id
+            ON CONFLICT (trade_id) DO UPDATE SET
+            {updates},
+            last_seen_batch_id = EXCLUDED.last_seen_batch_id,
+            updated_at = NOW()
+            RETURNING trade_id, (xmax = 0) AS inserted
+        )
+        SELECT
+            COUNT(*) FILTER (WHERE u.inserted),
+            COUNT(*) FILTER (WHERE NOT u.inserted AND NOT COALESCE(p.unchanged, FALSE)),
+            COUNT(*) FILTER (WHERE NOT u.inserted AND p.unchanged)
+        FROM upserted u
+        LEFT JOIN prior p ON p.trade_id = u.trade_id
+    """, (batch_id,))
+    inserted, updated, unchanged = cursor.fetchone()
+    return {'inserted': inserted, 'updated': updated, 'unchanged': unchanged}
+
+
+CONFIRMED_TYPES = {
+    'trade_id': 'TEXT', 'triangle_time_ms': 'BIGINT', 'confirmation_time_ms': 'BIGINT', 'date': 'DATE',
+    'session': 'TEXT', 'direction': 'TEXT', 'entry': 'NUMERIC(12, 4)', 'stop': 'NUMERIC(12, 4)',
+    'be_mfe': 'NUMERIC(12, 6)', 'no_be_mfe': 'NUMERIC(12, 6)', 'mae': 'NUMERIC(12, 6)',
+    'completed': 'BOOLEAN', 'symbol': 'VARCHAR(50)',
+}
+ALL_SIGNALS_TYPES = {
+    'trade_id': 'TEXT', 'triangle_time_ms': 'BIGINT', 'confirmation_time_ms': 'BIGINT', 'direction': 'TEXT',
+    'status': 'TEXT', 'bars_to_confirm': 'INTEGER', 'session': 'TEXT', 'entry_price': 'NUMERIC(12, 4)',
+    'stop_loss': 'NUMERIC(12, 4)', 'risk_points': 'NUMERIC(12, 4)', 'htf_daily': 'TEXT', 'htf_4h': 'TEXT',
+    'htf_1h': 'TEXT', 'htf_15m': 'TEXT', 'htf_5m': 'TEXT', 'htf_1m': 'TEXT',
+}
+
+
+def _bulk_import_confirmed(cursor, signals: List[Dict[str, Any]], batch_id: int) -> Dict[str, int]:
+    rows, skipped_invalid, mismatches = normalize_indicator_export_v2(signals)
+    if skipped_invalid:
+        logger.warning(f"[INDICATOR_IMPORT_V2] Skipping {skipped_invalid} signals with invalid triangle_time or missing direction")
+    if mismatches:
+        logger.warning(f"[INDICATOR_IMPORT_V2] ⚠️  {mismatches} trade_id mismatches, using canonical ids")
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if rows:
+        counts = _merge_staged(cursor, 'confirmed_signals_ledger', CONFIRMED_COLUMNS, CONFIRMED_TYPES, rows,
+                               overwrite=('direction',), insert_only=('triangle_time_ms',), batch_id=batch_id)
+    valid = len(signals) - skipped_invalid
+    return {**counts, 'skipped_invalid': skipped_invalid, 'merged_duplicates': valid - len(rows)}
+
+
+def _bulk_import_all_signals(cursor, signals: List[Dict[str, Any]], batch_id: int) -> Dict[str, int]:
+    rows, skipped_invalid = normalize_all_signals_export(signals)
+    if skipped_invalid:
+        logger.warning(f"[ALL_SIGNALS_IMPORT] Skipping {skipped_invalid} signals with invalid signal_time or missing required fields")
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    if rows:
+        counts = _merge_staged(cursor, 'all_signals_ledger', ALL_SIGNALS_COLUMNS, ALL_SIGNALS_TYPES, rows,
+                               overwrite=('status',), insert_only=('triangle_time_ms', 'direction'), batch_id=batch_id)
+        logger.info(f"[ALL_SIGNALS_EXPORT] upserted={len(rows)} max_triangle_ms={max(r['triangle_time_ms'] for r in rows)}")
+    valid = len(signals) - skipped_invalid
+    return {**counts, 'skipped_invalid': skipped_invalid, 'merged_duplicates': valid - len(rows)}
+
+
+def import_indicator_export_v2(batch_id: int, conn=None, bulk: bool = True) -> dict:
     """
     Import INDICATOR_EXPORT_V2 batch into confirmed_signals_ledger.
     
     Args:
         batch_id: ID from indicator_export_batches table
+        bulk: merge the batch set-based (False: one upsert per signal)
         
     Returns:
-        dict with counts: inserted, updated, skipped_invalid
+        dict with counts: inserted, updated, skipped_invalid (bulk also reports
+        unchanged and merged_duplicates)
     """
     import os
     
@@ -57,6 +335,13 @@ def import_indicator_export_v2(batch_id: int, conn=None) -> dict:
         
         logger.info(f"[INDICATOR_IMPORT_V2] Loaded batch {batch_number}, event_type={event_type}, signals={len(signals)}")
         
+        if bulk:
+            counts = _bulk_import_confirmed(cursor, signals, batch_id)
+            conn.commit()
+            logger.info(f"[INDICATOR_IMPORT_V2] ✅ Batch {batch_id} complete: {counts}")
+            return {'success': True, 'batch_id': batch_id, **counts,
+                    'total_processed': len(signals) - counts['skipped_invalid']}
+        
         inserted = 0
         updated = 0
         skipped_invalid = 0
@@ -209,15 +494,17 @@ def import_indicator_export_v2(batch_id: int, conn=None) -> dict:
             conn.close()
 
 
-def import_all_signals_export(batch_id: int) -> dict:
+def import_all_signals_export(batch_id: int, conn=None, bulk: bool = True) -> dict:
     """
     Import ALL_SIGNALS_EXPORT batch into all_signals_ledger.
     
     Args:
         batch_id: ID from indicator_export_batches table
+        bulk: merge the batch set-based (False: one upsert per signal)
         
     Returns:
-        dict with counts: inserted, updated, skipped_invalid
+        dict with counts: inserted, updated, skipped_invalid (bulk also reports
+        unchanged and merged_duplicates)
     """
     import os
     from datetime import datetime
@@ -225,8 +512,11 @@ def import_all_signals_export(batch_id: int) -> dict:
     
     logger.info(f"[ALL_SIGNALS_IMPORT] Starting import for batch_id={batch_id}")
     
-    DATABASE_URL = os.environ.get('DATABASE_PUBLIC_URL') or os.environ.get('DATABASE_URL')
-    conn = psycopg2.connect(DATABASE_URL)
+    # Use injected connection or create new one
+    conn_provided = conn is not None
+    if not conn_provided:
+        DATABASE_URL = os.environ.get('DATABASE_PUBLIC_URL') or os.environ.get('DATABASE_URL')
+        conn = psycopg2.connect(DATABASE_URL)
     cursor = conn.cursor()
     
     try:
@@ -258,6 +548,13 @@ def import_all_signals_export(batch_id: int) -> dict:
         
         logger.info(f"[ALL_SIGNALS_IMPORT] Loaded batch {batch_number}, event_type={event_type}, signals={len(signals)}")
         
+        if bulk:
+            counts = _bulk_import_all_signals(cursor, signals, batch_id)
+            conn.commit()
+            logger.info(f"[ALL_SIGNALS_IMPORT] ✅ Batch {batch_id} complete: {counts}")
+            return {'success': True, 'batch_id': batch_id, **counts,
+                    'total_processed': len(signals) - counts['skipped_invalid']}
+        
         inserted = 0
         updated = 0
         skipped_invalid = 0
@@ -384,7 +681,8 @@ def import_all_signals_export(batch_id: int) -> dict:
         # LOG: Upsert results and max triangle time
         max_triangle_time_ms = None
         if signals:
-            max_triangle_time_ms = max((int(s.get('signal_time', 0)) for s in signals if s.get('signal_time')), default=None)
+            # Skipped signals may carry an unparseable signal_time; the batch is already committed
+            max_triangle_time_ms = max((t for t in (_optional(s, 'signal_time', int) for s in signals) if t is not None), default=None)
         
         logger.info(f"[ALL_SIGNALS_EXPORT] upserted={inserted + updated} max_triangle_ms={max_triangle_time_ms}")
         logger.info(f"[ALL_SIGNALS_IMPORT] ✅ Batch {batch_id} complete: inserted={inserted}, updated={updated}, skipped={skipped_invalid}")
@@ -411,4 +709,5 @@ def import_all_signals_export(batch_id: int) -> dict:
         
     finally:
         cursor.close()
-        conn.close()
+        if not conn_provided:
+            conn.close()
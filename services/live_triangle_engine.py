@@ -0,0 +1,567 @@
+"""
+Live Triangle Engine - server-side triangles from the 1-second price stream
+
+Pipeline stage behind realtime_price_webhook_handler:
+- MinuteBarAggregator folds 1s ticks into 1m OHLC bars and closes each bar on
+  the first tick of the next minute or on a timer shortly after the boundary
+- LiveTriangleEngine feeds closed bars through persistent BiasEngineFvgIfvg /
+  HTFBiasEngine instances and the Phase B engulfing + signal modules (same
+  steps as scripts/phase_c_backfill_triangles.py, one bar at a time)
+- TriangleParityTracker matches emitted triangles with indicator SIGNAL_CREATED
+  webhooks by (bar open minute, direction) and records the latency difference
+- Warm start resumes from the nearest market_parity engine snapshot when a
+  logic version is configured (exact state, only bars since the snapshot are
+  replayed); otherwise it restores the last persisted biases from
+  bias_series_1m_v1 and replays a short window of clean 1m bars to rebuild
+  FVG/ATH state. Catch-up replays stream through a server-side cursor and are
+  capped at max_catch_up_bars; a snapshot or bias series further behind than
+  that is ignored and the engines are rebuilt from the most recent bars
+- start_live_triangle_pipeline warm-starts on a background thread; bars that
+  close meanwhile are queued and replayed before the pipeline goes live
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from market_parity.engulfing import Bar, detect_engulfing
+from market_parity.get_bias_fvg_ifvg import BiasEngineFvgIfvg
+from market_parity.htf_alignment import compute_htf_alignment
+from market_parity.htf_bias import HTFBiasEngine
+from market_parity.signal_generation import generate_signals
+from market_parity.snapshot import load_nearest_snapshot
+
+logger = logging.getLogger(__name__)
+
+BAR_INTERVAL = timedelta(minutes=1)
+DEFAULT_SYMBOL = 'GLBX.MDP3:NQ'
+DEFAULT_CLOSE_GRACE_MS = 250
+DEFAULT_WARMUP_BARS = 1440
+DEFAULT_MAX_CATCH_UP_BARS = 7 * 1440
+CATCH_UP_FETCH_SIZE = 2000
+NY_TZ = ZoneInfo('America/New_York')
+
+# bias_series_1m_v1 column -> HTFBiasEngine timeframe key
+BIAS_SERIES_HTF_COLUMNS = {'bias_5m': '5M', 'bias_15m': '15M', 'bias_1h': '1H', 'bias_4h': '4H', 'bias_1d': '1D'}
+
+
+def minute_open(ts_ms):
+    """UTC bar OPEN time of the minute containing an epoch-ms timestamp"""
+    ts = datetime.fromtimestamp(ts_ms / 1000.0, tz=timezone.utc)
+    return ts.replace(second=0, microsecond=0)
+
+
+class MinuteBarAggregator:
+    """
+    Aggregates ticks into 1m bars. on_bar(bar) receives
+    {'ts', 'open', 'high', 'low', 'close', 'ticks', 'closed_at'} with ts = bar OPEN (UTC).
+    Ticks for an already closed minute are dropped and counted.
+    """
+
+    def __init__(self, on_bar, close_grace_ms=DEFAULT_CLOSE_GRACE_MS):
+        self.on_bar = on_bar
+        self.close_grace_ms = close_grace_ms
+        self.current = None
+        self.last_closed_ts = None
+        self.late_ticks = 0
+        self._lock = threading.Lock()
+
+    def add_tick(self, price, ts_ms):
+        closed = None
+        with self._lock:
+            bar_ts = minute_open(ts_ms)
+            if self.last_closed_ts is not None and bar_ts <= self.last_closed_ts:
+                self.late_ticks += 1
+                return
+            if self.current is not None and bar_ts > self.current['ts']:
+                closed = self._close_locked()
+            if self.current is None:
+                self.current = {'ts': bar_ts, 'open': price, 'high': price, 'low': price, 'close': price, 'ticks': 1}
+            else:
+                bar = self.current
+                bar['high'] = max(bar['high'], price)
+                bar['low'] = min(bar['low'], price)
+                bar['close'] = price
+                bar['ticks'] += 1
+        if closed:
+            self.on_bar(closed)
+
+    def close_due(self, now_ms=None):
+        """Close the open bar once its minute (plus grace) has passed without a new tick"""
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        closed = None
+        with self._lock:
+            if self.current is not None:
+                close_ms = (self.current['ts'] + BAR_INTERVAL).timestamp() * 1000
+                if now_ms >= close_ms + self.close_grace_ms:
+                    closed = self._close_locked()
+        if closed:
+            self.on_bar(closed)
+        return closed
+
+    def _close_locked(self):
+        bar = self.current
+        bar['closed_at'] = datetime.now(timezone.utc)
+        self.last_closed_ts = bar['ts']
+        self.current = None
+        return bar
+
+
+class LiveTriangleEngine:
+    """
+    Bar-by-bar triangle generation with persistent engine state.
+    Filters default to the Phase C Stage 1 settings (no HTF / engulfing gating).
+    """
+
+    def __init__(self, symbol=DEFAULT_SYMBOL, use_flags=None, htf_aligned_only=False,
+                 require_engulfing=False, require_sweep_engulfing=False):
+        self.symbol = symbol
+        self.use_flags = use_flags or {'daily': False, 'h4': False, 'h1': False, 'm15': False, 'm5': False}
+        self.htf_aligned_only = htf_aligned_only
+        self.require_engulfing = require_engulfing
+        self.require_sweep_engulfing = require_sweep_engulfing
+        self.bias_engine = BiasEngineFvgIfvg()
+        self.htf_engine = HTFBiasEngine()
+        self.bias_prev = "Neutral"
+        self.prev_bar = None
+        self.bars_processed = 0
+        self.bad_bars = 0
+
+    def update(self, bar):
+        """Process one closed 1m bar (ts = OPEN time); returns the triangles it produced"""
+        o, h, l, c = bar['open'], bar['high'], bar['low'], bar['close']
+        if h < max(o, c) or l > min(o, c) or h < l:
+            self.bad_bars += 1
+            return []
+
+        bias_1m = self.bias_engine.update(bar)
+        htf_biases = self.htf_engine.update_ltf_bar(bar)
+        htf_bull, htf_bear = compute_htf_alignment({
+            'daily': htf_biases['daily_bias'],
+            'h4': htf_biases['h4_bias'],
+            'h1': htf_biases['h1_bias'],
+            'm15': htf_biases['m15_bias'],
+            'm5': htf_biases['m5_bias']
+        }, self.use_flags)
+
+        triangles = []
+        if self.prev_bar is not None:
+            engulfing = detect_engulfing(
+                Bar(self.prev_bar['open'], self.prev_bar['high'], self.prev_bar['low'], self.prev_bar['close']),
+                Bar(o, h, l, c)
+            )
+            signals = generate_signals(
+                bias=bias_1m,
+                bias_prev=self.bias_prev,
+                htf_bullish=htf_bull,
+                htf_bearish=htf_bear,
+                bullish_engulfing=engulfing.bullish,
+                bearish_engulfing=engulfing.bearish,
+                bullish_sweep_engulfing=engulfing.bullish_sweep,
+                bearish_sweep_engulfing=engulfing.bearish_sweep,
+                htf_aligned_only=self.htf_aligned_only,
+                require_engulfing=self.require_engulfing,
+                require_sweep_engulfing=self.require_sweep_engulfing
+            )
+            for direction, key in (('BULL', 'show_bull_triangle'), ('BEAR', 'show_bear_triangle')):
+                if signals[key]:
+                    triangles.append({
+                        'symbol': self.symbol,
+                        'ts': bar['ts'],
+                        'direction': direction,
+                        'bias_1m': bias_1m,
+                        'bias_m5': htf_biases['m5_bias'],
+                        'bias_m15': htf_biases['m15_bias'],
+                        'bias_h1': htf_biases['h1_bias'],
+                        'bias_h4': htf_biases['h4_bias'],
+                        'bias_d1': htf_biases['daily_bias'],
+                        'htf_bullish': htf_bull,
+                        'htf_bearish': htf_bear,
+                    })
+
+        self.bias_prev = bias_1m
+        self.prev_bar = {'ts': bar['ts'], 'open': o, 'high': h, 'low': l, 'close': c}
+        self.bars_processed += 1
+        return triangles
+
+    def restore_biases(self, row):
+        """Apply persisted biases (a bias_series_1m_v1 row as a dict) on top of the engines"""
+        self.bias_engine.bias = row['bias_1m']
+        self.bias_prev = row['bias_1m']
+        for column, tf in BIAS_SERIES_HTF_COLUMNS.items():
+            self.htf_engine.engines[tf].bias = row[column]
+            self.htf_engine.last_biases[tf] = row[column]
+
+    def restore_snapshot(self, snapshot):
+        """Adopt the engines and loop state of a market_parity EngineSnapshot"""
+        self.bias_engine = snapshot.bias_engine
+        self.htf_engine = snapshot.htf_engine
+        self.bias_prev = snapshot.bias_prev
+        self.prev_bar = snapshot.prev_bar
+        self.bars_processed = snapshot.bars_processed
+
+    def _replay(self, rows):
+        for ts, o, h, l, c in rows:
+            self.update({'ts': ts, 'open': float(o), 'high': float(h), 'low': float(l), 'close': float(c)})
+
+    def _bars_after(self, cursor, since, inclusive, limit):
+        """How many clean bars follow `since`, counting no further than limit + 1"""
+        cursor.execute(f"""
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM market_bars_ohlcv_1m_clean
+                WHERE symbol = %s AND ts {'>=' if inclusive else '>'} %s
+                LIMIT %s
+            ) pending
+        """, (self.symbol, since, limit + 1))
+        return cursor.fetchone()[0]
+
+    def _replay_after(self, cursor, since, inclusive):
+        """Replay the clean bars after `since` through a server-side cursor; returns the count"""
+        stream = cursor.connection.cursor(name='live_triangle_catch_up')
+        stream.itersize = CATCH_UP_FETCH_SIZE
+        replayed = 0
+        try:
+            stream.execute(f"""
+                SELECT ts, open, high, low, close
+                FROM market_bars_ohlcv_1m_clean
+                WHERE symbol = %s AND ts {'>=' if inclusive else '>'} %s
+                ORDER BY ts ASC
+            """, (self.symbol, since))
+            for row in stream:
+                self._replay((row,))
+                replayed += 1
+        finally:
+            stream.close()
+        return replayed
+
+    def _recent_bars(self, cursor, until, count):
+        """The last `count` clean bars at or before `until`, oldest first"""
+        cursor.execute("""
+            SELECT ts, open, high, low, close FROM (
+                SELECT ts, open, high, low, close
+                FROM market_bars_ohlcv_1m_clean
+                WHERE symbol = %s AND ts <= %s
+                ORDER BY ts DESC
+                LIMIT %s
+            ) recent
+            ORDER BY ts ASC
+        """, (self.symbol, until, count))
+        return cursor.fetchall()
+
+    def warm_start_from_snapshot(self, cursor, logic_version, max_catch_up_bars=DEFAULT_MAX_CATCH_UP_BARS):
+        """
+        Resume from the latest engine snapshot for logic_version and replay the
+        clean bars after it. Returns a summary dict, or None when no snapshot exists
+        or more than max_catch_up_bars bars would have to be replayed.
+        """
+        try:
+            snapshot = load_nearest_snapshot(cursor, self.symbol, logic_version, datetime.now(timezone.utc))
+            if snapshot is None:
+                return None
+            pending = self._bars_after(cursor, snapshot.ts, True, max_catch_up_bars)
+        except Exception as e:
+            cursor.connection.rollback()
+            logger.warning(f"[LIVE_TRIANGLES] Engine snapshot unavailable: {e}")
+            return None
+        if pending > max_catch_up_bars:
+            logger.warning(f"[LIVE_TRIANGLES] Engine snapshot @ {snapshot.ts} is more than "
+                           f"{max_catch_up_bars} bars behind - not used")
+            return None
+
+        self.restore_snapshot(snapshot)
+        replayed = self._replay_after(cursor, snapshot.ts, True)
+        logger.info(f"[LIVE_TRIANGLES] Warm start from engine snapshot @ {snapshot.ts} ({replayed} bars replayed)")
+        return {'restored_ts': snapshot.ts, 'replayed': replayed, 'bias_mismatch': False, 'source': 'snapshot'}
+
+    def warm_start(self, cursor, warmup_bars=DEFAULT_WARMUP_BARS, logic_version=None,
+                   max_catch_up_bars=DEFAULT_MAX_CATCH_UP_BARS):
+        """
+        Restore state from the database instead of replaying full history.
+
+        With a logic_version, an engine snapshot is used when one exists.
+        bias_series_1m_v1 holds the bias labels computed over full history but not
+        the engines' FVG/IFVG lists or ATH/ATL, so those are rebuilt from the last
+        warmup_bars clean 1m bars and the persisted labels are then applied on top.
+        Clean bars newer than the last persisted row are replayed afterwards, up to
+        max_catch_up_bars; a bias series further behind than that is ignored and the
+        engines are rebuilt from the latest warmup_bars bars alone.
+        Returns a summary dict (restored_ts, replayed, bias_mismatch, source).
+        """
+        if logic_version:
+            result = self.warm_start_from_snapshot(cursor, logic_version, max_catch_up_bars)
+            if result is not None:
+                return result
+
+        cursor.execute("""
+            SELECT ts, bias_1m, bias_5m, bias_15m, bias_1h, bias_4h, bias_1d
+            FROM bias_series_1m_v1
+            WHERE symbol = %s
+            ORDER BY ts DESC
+            LIMIT 1
+        """, (self.symbol,))
+        row = cursor.fetchone()
+        if not row:
+            return {'restored_ts': None, 'replayed': 0, 'bias_mismatch': False, 'source': None}
+        persisted = dict(zip(('ts', 'bias_1m') + tuple(BIAS_SERIES_HTF_COLUMNS), row))
+
+        try:
+            pending = self._bars_after(cursor, persisted['ts'], False, max_catch_up_bars)
+            if pending > max_catch_up_bars:
+                logger.warning(f"[LIVE_TRIANGLES] bias_series_1m_v1 @ {persisted['ts']} is more than "
+                               f"{max_catch_up_bars} bars behind - rebuilding from recent bars only")
+                bars = self._recent_bars(cursor, datetime.now(timezone.utc), warmup_bars)
+                self._replay(bars)
+                return {'restored_ts': None, 'replayed': len(bars), 'bias_mismatch': False,
+                        'source': 'recent_bars'}
+            bars = self._recent_bars(cursor, persisted['ts'], warmup_bars)
+        except Exception as e:
+            cursor.connection.rollback()
+            logger.warning(f"[LIVE_TRIANGLES] No clean 1m bars for warm start replay: {e}")
+            self.restore_biases(persisted)
+            return {'restored_ts': persisted['ts'], 'replayed': 0, 'bias_mismatch': False, 'source': 'bias_series'}
+
+        self._replay(bars)
+        bias_mismatch = self.bias_engine.bias != persisted['bias_1m']
+        self.restore_biases(persisted)
+        # Bars the bias series hasn't caught up with yet
+        caught_up = self._replay_after(cursor, persisted['ts'], False)
+
+        logger.info(f"[LIVE_TRIANGLES] Warm start from bias_series_1m_v1 @ {persisted['ts']} "
+                    f"({len(bars)} + {caught_up} bars replayed, bias_mismatch={bias_mismatch})")
+        return {'restored_ts': persisted['ts'], 'replayed': len(bars) + caught_up, 'bias_mismatch': bias_mismatch,
+                'source': 'bias_series'}
+
+
+def json_safe(d):
+    """Copy of a flat dict with datetimes as ISO strings (triangles, warm start summary)"""
+    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in d.items()} if d else d
+
+
+def trade_id_bar_open(trade_id):
+    """UTC bar OPEN time encoded in an indicator trade_id (YYYYMMDD_HHMMSS000_DIRECTION, NY local)"""
+    try:
+        date_part, time_part = trade_id.split('_')[:2]
+        local = datetime.strptime(date_part + time_part[:4], '%Y%m%d%H%M')
+    except (AttributeError, ValueError):
+        return None
+    return local.replace(tzinfo=NY_TZ).astimezone(timezone.utc)
+
+
+class TriangleParityTracker:
+    """
+    Matches server triangles with indicator SIGNAL_CREATED events.
+    latency_delta_ms = server emitted_at - indicator received_at (negative = server first).
+    Unmatched entries older than match_window are counted as misses.
+    """
+
+    def __init__(self, match_window_seconds=120, history=500):
+        self.match_window = timedelta(seconds=match_window_seconds)
+        self._server = {}
+        self._indicator = {}
+        self.latency_deltas_ms = deque(maxlen=history)
+        self.server_latency_ms = deque(maxlen=history)
+        self.counts = {'matched': 0, 'server_only': 0, 'indicator_only': 0}
+        self._lock = threading.Lock()
+
+    def observe_server(self, triangle):
+        key = (triangle['ts'], triangle['direction'])
+        with self._lock:
+            self.server_latency_ms.append(triangle['latency_ms'])
+            indicator_at = self._indicator.pop(key, None)
+            if indicator_at is not None:
+                self._match(triangle['emitted_at'], indicator_at)
+            else:
+                self._server[key] = triangle['emitted_at']
+            self._expire(triangle['emitted_at'])
+
+    def observe_indicator(self, bar_ts, direction, received_at=None):
+        received_at = received_at or datetime.now(timezone.utc)
+        key = (bar_ts, direction)
+        with self._lock:
+            server_at = self._server.pop(key, None)
+            if server_at is not None:
+                self._match(server_at, received_at)
+            else:
+                self._indicator[key] = received_at
+            self._expire(received_at)
+
+    def _match(self, server_at, indicator_at):
+        self.counts['matched'] += 1
+        self.latency_deltas_ms.append((server_at - indicator_at).total_seconds() * 1000)
+
+    def _expire(self, now):
+        cutoff = now - self.match_window
+        for pending, bucket in ((self._server, 'server_only'), (self._indicator, 'indicator_only')):
+            for key in [k for k, seen in pending.items() if seen < cutoff]:
+                del pending[key]
+                self.counts[bucket] += 1
+
+    def stats(self):
+        with self._lock:
+            decided = sum(self.counts.values())
+            deltas = sorted(self.latency_deltas_ms)
+            own = sorted(self.server_latency_ms)
+            return {
+                **self.counts,
+                'pending_server': len(self._server),
+                'pending_indicator': len(self._indicator),
+                'parity_rate': round(self.counts['matched'] / decided, 4) if decided else None,
+                'latency_delta_ms_p50': deltas[len(deltas) // 2] if deltas else None,
+                'server_latency_ms_p50': own[len(own) // 2] if own else None,
+                'server_latency_ms_max': own[-1] if own else None,
+            }
+
+
+class LiveTrianglePipeline:
+    """Ticks -> 1m bars -> triangles, with parity tracking and subscriber callbacks"""
+
+    def __init__(self, engine=None, close_grace_ms=DEFAULT_CLOSE_GRACE_MS, recent=100):
+        self.engine = engine or LiveTriangleEngine()
+        self.aggregator = MinuteBarAggregator(self._on_bar, close_grace_ms=close_grace_ms)
+        self.parity = TriangleParityTracker()
+        self.subscribers = []
+        self.recent = deque(maxlen=recent)
+        self.warm_start_result = None
+        self.running = False
+        # False while a background warm start owns the engine; closed bars are queued meanwhile
+        self.live = True
+        self._queued_bars = []
+        self._engine_lock = threading.Lock()
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def on_price_update(self, price_update):
+        """RealTimePriceHandler subscriber"""
+        self.aggregator.add_tick(price_update.price, price_update.timestamp)
+
+    def observe_indicator_signal(self, trade_id, direction=None, received_at=None):
+        bar_ts = trade_id_bar_open(trade_id)
+        if bar_ts is None:
+            return
+        direction = direction or trade_id.rsplit('_', 1)[-1]
+        direction = 'BULL' if str(direction).upper() in ('BULLISH', 'BULL', 'LONG') else 'BEAR'
+        self.parity.observe_indicator(bar_ts, direction, received_at)
+
+    def _on_bar(self, bar):
+        with self._engine_lock:
+            if not self.live:
+                self._queued_bars.append(bar)
+                return
+            triangles = self.engine.update(bar)
+        self._emit(bar, triangles)
+
+    def _emit(self, bar, triangles):
+        for triangle in triangles:
+            triangle['emitted_at'] = datetime.now(timezone.utc)
+            triangle['latency_ms'] = round(
+                (triangle['emitted_at'] - (bar['ts'] + BAR_INTERVAL)).total_seconds() * 1000, 1)
+            self.recent.append(triangle)
+            self.parity.observe_server(triangle)
+            logger.info(f"[LIVE_TRIANGLES] {triangle['direction']} @ {triangle['ts'].isoformat()} "
+                        f"({triangle['latency_ms']}ms after bar close)")
+            for callback in self.subscribers:
+                try:
+                    callback(triangle)
+                except Exception as e:
+                    logger.error(f"Live triangle subscriber error: {e}")
+
+    def warm_start(self, database_url, warmup_bars=DEFAULT_WARMUP_BARS, logic_version=None,
+                   max_catch_up_bars=DEFAULT_MAX_CATCH_UP_BARS):
+        import psycopg2
+        conn = psycopg2.connect(database_url)
+        try:
+            cursor = conn.cursor()
+            # While not live, bars are only queued, so the engine needs no lock
+            with self._engine_lock if self.live else nullcontext():
+                self.warm_start_result = self.engine.warm_start(cursor, warmup_bars, logic_version,
+                                                                max_catch_up_bars)
+            cursor.close()
+        finally:
+            conn.close()
+        return self.warm_start_result
+
+    def warm_start_in_background(self, database_url, warmup_bars=DEFAULT_WARMUP_BARS, logic_version=None,
+                                 max_catch_up_bars=DEFAULT_MAX_CATCH_UP_BARS):
+        """Warm start on a thread; the pipeline goes live (queued bars replayed) when it finishes"""
+        with self._engine_lock:
+            self.live = False
+
+        def run():
+            try:
+                self.warm_start(database_url, warmup_bars, logic_version, max_catch_up_bars)
+            except Exception as e:
+                logger.warning(f"[LIVE_TRIANGLES] Warm start skipped: {e}")
+            finally:
+                self.go_live()
+
+        thread = threading.Thread(target=run, name="live-triangle-warm-start", daemon=True)
+        thread.start()
+        return thread
+
+    def go_live(self):
+        """Replay the bars queued during warm start that it didn't already cover, then process bars as they close"""
+        emitted = []
+        with self._engine_lock:
+            queued, self._queued_bars = self._queued_bars, []
+            last_ts = (self.engine.prev_bar or {}).get('ts')
+            for bar in queued:
+                if last_ts is None or bar['ts'] > last_ts:
+                    emitted.append((bar, self.engine.update(bar)))
+            self.live = True
+        for bar, triangles in emitted:
+            self._emit(bar, triangles)
+        logger.info(f"[LIVE_TRIANGLES] Live ({len(emitted)} of {len(queued)} queued bars replayed)")
+
+    def run_close_timer(self, interval=0.05):
+        self.running = True
+        while self.running:
+            time.sleep(interval)
+            try:
+                self.aggregator.close_due()
+            except Exception as e:
+                logger.error(f"Live triangle bar close error: {e}")
+
+    def start(self):
+        threading.Thread(target=self.run_close_timer, name="live-triangle-bar-close", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def status(self):
+        return {
+            'symbol': self.engine.symbol,
+            'live': self.live,
+            'queued_bars': len(self._queued_bars),
+            'bars_processed': self.engine.bars_processed,
+            'bad_bars': self.engine.bad_bars,
+            'late_ticks': self.aggregator.late_ticks,
+            'bias_1m': self.engine.bias_engine.bias,
+            'htf_biases': dict(self.engine.htf_engine.last_biases),
+            'warm_start': json_safe(self.warm_start_result),
+            'parity': self.parity.stats(),
+            'recent_triangles': [json_safe(t) for t in list(self.recent)[-20:]],
+        }
+
+
+def start_live_triangle_pipeline(price_handler, database_url=None, symbol=None):
+    """
+    Wire a pipeline to the 1s price handler. With a database it warm-starts on a
+    background thread, so the server can start listening meanwhile; /status reports
+    live=False until the warm start has finished.
+    """
+    pipeline = LiveTrianglePipeline(LiveTriangleEngine(symbol=symbol or os.environ.get('DEFAULT_SYMBOL', DEFAULT_SYMBOL)))
+    if database_url:
+        pipeline.warm_start_in_background(
+            database_url,
+            int(os.environ.get('LIVE_TRIANGLE_WARMUP_BARS', DEFAULT_WARMUP_BARS)),
+            os.environ.get('LOGIC_VERSION'),
+            int(os.environ.get('LIVE_TRIANGLE_MAX_CATCH_UP_BARS', DEFAULT_MAX_CATCH_UP_BARS)))
+    price_handler.subscribe(pipeline.on_price_update)
+    return pipeline.start()
@@ -17,9 +17,17 @@ def get_logic_version():
         return 'unknown'
 
 def ms_to_timestamptz(ms_timestamp):
-    """Convert milliseconds timestamp to timestamptz"""
-    if ms_timestamp is None:
+    """Convert milliseconds timestamp to timestamptz (ISO strings are treated as NY local, like the webhook handlers)"""
+    if ms_timestamp is None or ms_timestamp == '':
         return None
+    if isinstance(ms_timestamp, str):
+        try:
+            ms_timestamp = float(ms_timestamp)
+        except ValueError:
+            ts = datetime.fromisoformat(ms_timestamp.replace('Z', '+00:00'))
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=ZoneInfo('America/New_York'))
+            return ts.astimezone(ZoneInfo('UTC'))
     return datetime.fromtimestamp(ms_timestamp / 1000.0, tz=ZoneInfo('UTC'))
 
 def floor_to_minute(dt):
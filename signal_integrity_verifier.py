@@ -1,15 +1,23 @@
 """
 Signal Integrity Verification System
 Randomly selects signals and verifies dashboard data matches TradingView webhooks exactly
+
+verify_all_signals() runs the same checks over the whole automated_signals history in
+one set-based statement and stores every violation in signal_integrity_violations
+(database/signal_integrity_schema.sql); with incremental=True it re-verifies only the
+trades the triggers marked as touched since the last run.
 """
 
 import os
 import psycopg2
 import random
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 import json
 
+VALID_SESSIONS = ["ASIA", "LONDON", "NY PRE", "NY AM", "NY LUNCH", "NY PM"]
+
 def get_db_connection():
     """Get fresh database connection"""
     database_url = os.environ.get('DATABASE_URL')
@@ -333,19 +341,272 @@ def check_timestamp_order(events, result):
 def check_session_validity(entry_event, result):
     """Verify session is valid"""
     session = entry_event[7]
-    valid_sessions = ["ASIA", "LONDON", "NY PRE", "NY AM", "NY LUNCH", "NY PM"]
-    
-    if session not in valid_sessions:
+    if session not in VALID_SESSIONS:
         result["warnings"].append(
             f"Invalid session: '{session}'"
         )
     
     result["checks"].append({
         "name": "Session Validity",
-        "status": "PASS" if session in valid_sessions else "WARNING",
+        "status": "PASS" if session in VALID_SESSIONS else "WARNING",
         "details": f"Session: {session}"
     })
 
+# Whole-history verification: the checks above as one statement over automated_signals.
+# Rule -> severity; a rule's rows carry the same message the per-trade check produces.
+INTEGRITY_RULES = {
+    'first_event_not_entry': 'error',
+    'multiple_entry': 'error',
+    'missing_entry': 'error',
+    'exit_not_last': 'warning',
+    'risk_distance_mismatch': 'error',
+    'be_mfe_decreased': 'warning',
+    'no_be_mfe_decreased': 'warning',
+    'be_mfe_changed_after_trigger': 'error',
+    'no_be_below_be_after_trigger': 'warning',
+    'exit_status_not_completed': 'warning',
+    'target_1r_mismatch': 'error',
+    'timestamp_out_of_order': 'error',
+    'invalid_session': 'warning',
+}
+
+# Events are ordered per trade by (timestamp, id), as verify_single_signal reads them,
+# and prices / MFEs are compared as float8 like its float() tolerances.
+# The entry / BE / exit checks read the trade's last event of that kind, like the
+# per-trade parse loop; timestamp_out_of_order compares timestamps in insertion (id)
+# order, since in timestamp order they can never be out of order.
+VERIFY_SQL = """
+    WITH events AS MATERIALIZED (
+        SELECT id, trade_id, event_type, bias, entry_price::float8, sl_price::float8, risk_distance::float8,
+               COALESCE(be_mfe, 0)::float8 AS be_mfe, COALESCE(no_be_mfe, 0)::float8 AS no_be_mfe,
+               session, timestamp AS ts, status, target_1r,
+               ROW_NUMBER() OVER trade_order AS seq,
+               COUNT(*) OVER trade_events AS n_events,
+               COUNT(*) FILTER (WHERE event_type = 'ENTRY') OVER trade_events AS n_entries,
+               LAG(timestamp) OVER (PARTITION BY trade_id ORDER BY id) AS prev_ts_by_id
+        FROM automated_signals
+        WHERE trade_id IS NOT NULL {scope}
+        WINDOW trade_order AS (PARTITION BY trade_id ORDER BY timestamp, id),
+               trade_events AS (PARTITION BY trade_id)
+    ),
+    last_of AS (
+        SELECT DISTINCT ON (trade_id, kind) *
+        FROM (
+            SELECT e.*, CASE event_type WHEN 'ENTRY' THEN 'entry' WHEN 'BE_TRIGGERED' THEN 'be' ELSE 'exit' END AS kind
+            FROM events e
+            WHERE event_type IN ('ENTRY', 'BE_TRIGGERED') OR event_type LIKE 'EXIT\\_%%'
+        ) k
+        ORDER BY trade_id, kind, seq DESC
+    ),
+    mfe AS (
+        SELECT id, trade_id, ts, be_mfe, no_be_mfe,
+               GREATEST(0, MAX(be_mfe) OVER prior) AS peak_be,
+               GREATEST(0, MAX(no_be_mfe) OVER prior) AS peak_no_be
+        FROM events
+        WHERE event_type = 'MFE_UPDATE'
+        WINDOW prior AS (PARTITION BY trade_id ORDER BY seq ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+    ),
+    violations (trade_id, rule, severity, event_id, detail) AS (
+        SELECT trade_id, 'first_event_not_entry', 'error', id,
+               'First event is ' || COALESCE(event_type, 'None') || ', expected ENTRY'
+        FROM events WHERE seq = 1 AND event_type IS DISTINCT FROM 'ENTRY'
+        UNION ALL
+        SELECT trade_id, 'multiple_entry', 'error', NULL, format('Multiple ENTRY events found (%%s)', n_entries)
+        FROM events WHERE seq = 1 AND n_entries > 1
+        UNION ALL
+        SELECT trade_id, 'missing_entry', 'error', NULL, 'Missing ENTRY event'
+        FROM events WHERE seq = 1 AND n_entries = 0
+        UNION ALL
+        SELECT e.trade_id, 'exit_not_last', 'warning', e.id, 'EXIT event is not the last event'
+        FROM events e JOIN last_of x ON x.trade_id = e.trade_id AND x.kind = 'exit'
+        WHERE e.seq = e.n_events AND COALESCE(e.event_type, '') NOT LIKE 'EXIT\\_%%'
+        UNION ALL
+        SELECT trade_id, 'risk_distance_mismatch', 'error', id,
+               format('Risk distance mismatch: calculated=%%s, stored=%%s',
+                      round(ABS(entry_price - sl_price)::numeric, 2), round(COALESCE(risk_distance, 0)::numeric, 2))
+        FROM last_of
+        WHERE kind = 'entry' AND COALESCE(entry_price, 0) <> 0 AND COALESCE(sl_price, 0) <> 0
+          AND ABS(ABS(entry_price - sl_price) - COALESCE(risk_distance, 0)) > 0.5
+        UNION ALL
+        SELECT trade_id, 'be_mfe_decreased', 'warning', id,
+               format('BE MFE decreased: %%sR → %%sR', round(peak_be::numeric, 2), round(be_mfe::numeric, 2))
+        FROM mfe WHERE be_mfe < peak_be - 0.01
+        UNION ALL
+        SELECT trade_id, 'no_be_mfe_decreased', 'warning', id,
+               format('No-BE MFE decreased: %%sR → %%sR', round(peak_no_be::numeric, 2), round(no_be_mfe::numeric, 2))
+        FROM mfe WHERE no_be_mfe < peak_no_be - 0.01
+        UNION ALL
+        SELECT m.trade_id, 'be_mfe_changed_after_trigger', 'error', m.id,
+               format('BE MFE changed after trigger: %%sR → %%sR', round(b.be_mfe::numeric, 2), round(m.be_mfe::numeric, 2))
+        FROM mfe m JOIN last_of b ON b.trade_id = m.trade_id AND b.kind = 'be'
+        WHERE m.ts > b.ts AND ABS(m.be_mfe - b.be_mfe) > 0.01
+        UNION ALL
+        SELECT m.trade_id, 'no_be_below_be_after_trigger', 'warning', m.id,
+               format('No-BE MFE < BE MFE after trigger: %%sR < %%sR', round(m.no_be_mfe::numeric, 2),
+                      round(m.be_mfe::numeric, 2))
+        FROM mfe m JOIN last_of b ON b.trade_id = m.trade_id AND b.kind = 'be'
+        WHERE m.ts > b.ts AND m.no_be_mfe < m.be_mfe - 0.01
+        UNION ALL
+        SELECT trade_id, 'exit_status_not_completed', 'warning', id,
+               format('EXIT event exists but status is ''%%s'', expected ''completed''', COALESCE(status, 'None'))
+        FROM last_of WHERE kind = 'exit' AND status IS DISTINCT FROM 'completed'
+        UNION ALL
+        SELECT trade_id, 'target_1r_mismatch', 'error', id,
+               format('Target 1R mismatch: expected %%s, got %%s', round(expected_1r::numeric, 2), target_1r)
+        FROM (
+            SELECT l.*, CASE WHEN bias = 'Bullish' THEN entry_price + risk_distance
+                             ELSE entry_price - risk_distance END AS expected_1r
+            FROM last_of l
+            WHERE kind = 'entry' AND COALESCE(entry_price, 0) <> 0 AND COALESCE(risk_distance, 0) <> 0
+              AND COALESCE(target_1r, 0) <> 0
+        ) t
+        WHERE ABS(target_1r::float8 - expected_1r) > 1.0
+        UNION ALL
+        SELECT trade_id, 'timestamp_out_of_order', 'error', id, format('Timestamp out of order at event %%s', id)
+        FROM events WHERE ts < prev_ts_by_id
+        UNION ALL
+        SELECT trade_id, 'invalid_session', 'warning', id, format('Invalid session: ''%%s''', COALESCE(session, 'None'))
+        FROM last_of WHERE kind = 'entry' AND NOT (COALESCE(session, '') = ANY(%(sessions)s))
+    ),
+    inserted AS (
+        INSERT INTO signal_integrity_violations (trade_id, rule, severity, event_id, detail)
+        SELECT * FROM violations
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM events WHERE seq = 1), (SELECT COUNT(*) FROM inserted)
+"""
+
+
+def read_dirty_marks(cursor):
+    """The trades awaiting re-verification, each with its mark's row version"""
+    cursor.execute("SELECT trade_id, xmin::text FROM signal_integrity_dirty_trades")
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def clear_dirty_marks(conn, marks):
+    """
+    Delete the given marks in a short transaction of their own, skipping any a write
+    has re-marked since they were read (its row version changed): that write may not
+    have been visible to the run, so its trade stays marked for the next one.
+    """
+    if not marks:
+        return 0
+    trade_ids, versions = zip(*marks)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            DELETE FROM signal_integrity_dirty_trades d
+            USING unnest(%s::text[], %s::text[]) AS m (trade_id, version)
+            WHERE d.trade_id = m.trade_id AND d.xmin::text = m.version
+        """, (list(trade_ids), list(versions)))
+        cleared = cursor.rowcount
+        conn.commit()
+        return cleared
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def verify_all_signals(conn, incremental=False):
+    """
+    Evaluate every integrity rule for every trade and store the violations.
+    incremental=True re-verifies only the trades marked in signal_integrity_dirty_trades
+    and replaces just their rows. The marks are read before the scan, and the ones the
+    run covered are cleared after it commits, so webhook writes re-marking a trade never
+    wait on the scan. Returns the run summary.
+    """
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        # Read before the scan: any write the scan can't see re-marks its trade after this
+        marks = read_dirty_marks(cursor)
+        trade_ids = None
+        if incremental:
+            trade_ids = [trade_id for trade_id, _ in marks]
+            cursor.execute("DELETE FROM signal_integrity_violations WHERE trade_id = ANY(%s)", (trade_ids,))
+            scope = "AND trade_id = ANY(%(trade_ids)s)"
+        else:
+            cursor.execute("DELETE FROM signal_integrity_violations")
+            scope = ""
+
+        trades_checked, violations = 0, 0
+        if trade_ids is None or trade_ids:
+            cursor.execute(VERIFY_SQL.format(scope=scope), {'trade_ids': trade_ids, 'sessions': VALID_SESSIONS})
+            trades_checked, violations = cursor.fetchone()
+
+        result = {
+            "mode": "incremental" if incremental else "full",
+            "trades_checked": trades_checked,
+            "violations": violations,
+            "duration_ms": int((time.perf_counter() - started) * 1000),
+        }
+        cursor.execute("""
+            INSERT INTO signal_integrity_runs (mode, duration_ms, trades_checked, violations)
+            VALUES (%(mode)s, %(duration_ms)s, %(trades_checked)s, %(violations)s)
+        """, result)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    clear_dirty_marks(conn, marks)
+    return result
+
+
+def integrity_violation_summary(cursor):
+    """Per-rule violation counts from the last runs, the latest run and the trades awaiting re-verification"""
+    cursor.execute("""
+        SELECT rule, severity, COUNT(*), COUNT(DISTINCT trade_id)
+        FROM signal_integrity_violations
+        GROUP BY rule, severity
+        ORDER BY rule
+    """)
+    rules = {
+        rule: {"severity": severity, "violations": count, "trades": trades}
+        for rule, severity, count, trades in cursor.fetchall()
+    }
+    cursor.execute("""
+        SELECT mode, started_at, duration_ms, trades_checked, violations
+        FROM signal_integrity_runs ORDER BY id DESC LIMIT 1
+    """)
+    row = cursor.fetchone()
+    last_run = dict(zip(("mode", "started_at", "duration_ms", "trades_checked", "violations"), row)) if row else None
+    if last_run:
+        last_run["started_at"] = last_run["started_at"].isoformat()
+    cursor.execute("SELECT COUNT(*) FROM signal_integrity_dirty_trades")
+    pending = cursor.fetchone()[0]
+
+    severities = {entry["severity"] for entry in rules.values()}
+    status = "FAIL" if "error" in severities else "WARNING" if severities else "PASS"
+    return {"status": status, "rules": rules, "last_run": last_run, "pending_trades": pending}
+
+
+def list_integrity_violations(cursor, rule=None, trade_id=None, limit=100):
+    """Stored violation rows, newest trades first, optionally for one rule / trade"""
+    clauses, params = [], []
+    if rule:
+        clauses.append("rule = %s")
+        params.append(rule)
+    if trade_id:
+        clauses.append("trade_id = %s")
+        params.append(trade_id)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    cursor.execute(f"""
+        SELECT trade_id, rule, severity, event_id, detail
+        FROM signal_integrity_violations {where}
+        ORDER BY trade_id DESC, rule, event_id
+        LIMIT %s
+    """, params + [limit])
+    return [
+        {"trade_id": t, "rule": r, "severity": s, "event_id": e, "detail": d}
+        for t, r, s, e, d in cursor.fetchall()
+    ]
+
+
 def register_signal_integrity_api(app):
     """Register signal integrity verification endpoint"""
     from flask import jsonify
@@ -363,3 +624,51 @@ def register_signal_integrity_api(app):
                 "signals_checked": 0,
                 "errors": [str(e)]
             }), 500
+
+    @app.route('/api/automated-signals/integrity-violations', methods=['GET'])
+    def signal_integrity_violations():
+        """Whole-history violation table; refresh=1 first re-verifies the touched trades"""
+        from flask import request
+
+        conn = get_db_connection()
+        try:
+            run = None
+            if request.args.get('refresh') == '1':
+                run = verify_all_signals(conn, incremental=True)
+            try:
+                limit = max(1, min(int(request.args.get('limit', 100)), 1000))
+            except ValueError:
+                limit = 100
+            cursor = conn.cursor()
+            summary = integrity_violation_summary(cursor)
+            summary["run"] = run
+            summary["violations"] = list_integrity_violations(
+                cursor, request.args.get('rule'), request.args.get('trade_id'), limit
+            )
+            cursor.close()
+            return jsonify(summary), 200
+        except Exception as e:
+            return jsonify({
+                "status": "ERROR",
+                "message": str(e),
+                "errors": [str(e)]
+            }), 500
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Verify every automated signal trade against the integrity rules")
+    parser.add_argument('--incremental', action='store_true', help="Only re-verify trades touched since the last run")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = get_db_connection()
+    try:
+        print(json.dumps(verify_all_signals(conn, incremental=args.incremental), indent=2))
+        print(json.dumps(integrity_violation_summary(conn.cursor()), indent=2))
+    finally:
+        conn.close()
@@ -3,13 +3,14 @@ Signal ML Predictor - Learn which market conditions produce best signals
 Works with existing 1M Signal Lab workflow
 """
 
-import json
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import logging
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from ml_feature_store import FEATURE_SETS, feature_row, get_feature_store
+
 logger = logging.getLogger(__name__)
 
 class SignalMLPredictor:
@@ -28,43 +29,25 @@ class SignalMLPredictor:
         }
     
     def get_training_data(self, days_back: int = 60) -> List[Dict]:
-        """Get training data from signal_lab_trades with market context"""
+        """Get training data (signals with outcomes and market context) from the shared feature store"""
         try:
-            cursor = self.db.conn.cursor()
-            
-            # Get signals with outcomes and market context
-            cursor.execute("""
-                SELECT st.bias, st.session, st.signal_type,
-                       COALESCE(st.mfe_none, st.mfe, 0) as mfe,
-                       st.market_context, st.context_quality_score,
-                       st.date, st.time
-                FROM signal_lab_trades st
-                WHERE st.date > CURRENT_DATE - INTERVAL '%s days'
-                AND st.market_context IS NOT NULL
-                AND COALESCE(st.mfe_none, st.mfe, 0) != 0
-                ORDER BY st.date DESC, st.time DESC
-            """, (days_back,))
-            
-            trades = cursor.fetchall()
-            
-            training_data = []
-            for trade in trades:
-                try:
-                    market_ctx = json.loads(trade['market_context']) if trade['market_context'] else {}
-                    
-                    features = self._extract_features(market_ctx, trade)
-                    outcome = float(trade['mfe']) if trade['mfe'] else 0
-                    
-                    training_data.append({
-                        'features': features,
-                        'outcome': outcome,
-                        'date': trade['date'],
-                        'session': trade['session'],
-                        'bias': trade['bias']
-                    })
-                    
-                except (json.JSONDecodeError, KeyError, TypeError):
-                    continue
+            matrix = get_feature_store(self.db).matrix('signal_context')
+            frame = matrix.frame
+            
+            since = np.datetime64(datetime.now().date() - timedelta(days=days_back))
+            dates = frame['ts'].astype('datetime64[D]')
+            mask = (frame['source'] == 0) & (dates > since) & frame['has_context'] & (frame['mfe'] != 0)
+            rows = np.flatnonzero(mask)
+            rows = rows[np.argsort(frame['ts'][rows], kind='stable')[::-1]]
+            
+            columns = matrix.columns
+            training_data = [{
+                'features': dict(zip(columns, matrix.X[i].tolist())),
+                'outcome': float(frame['mfe'][i]),
+                'date': dates[i].item(),
+                'session': frame['session'][i],
+                'bias': frame['bias'][i]
+            } for i in rows]
             
             logger.info(f"Loaded {len(training_data)} training samples")
             return training_data
@@ -74,77 +57,13 @@ class SignalMLPredictor:
             return []
     
     def _extract_features(self, market_ctx: Dict, trade: Dict) -> Dict[str, float]:
-        """Extract ML features from market context"""
-        
-        # VIX regime (0-1 scale)
-        vix = market_ctx.get('vix', 20)
-        if vix < 15:
-            vix_regime = 0.9  # Low VIX = good
-        elif vix < 25:
-            vix_regime = 0.7  # Normal VIX = ok
-        elif vix < 35:
-            vix_regime = 0.3  # High VIX = caution
-        else:
-            vix_regime = 0.1  # Extreme VIX = avoid
-        
-        # Session quality (0-1 scale)
-        session = trade.get('session', 'Unknown')
-        session_scores = {
-            'London': 0.9,
-            'NY Regular': 0.8,
-            'NY AM': 0.8,
-            'NY Pre Market': 0.4,
-            'Asia': 0.3,
-            'After Hours': 0.2
-        }
-        session_quality = session_scores.get(session, 0.5)
-        
-        # Volume regime (0-1 scale)
-        spy_volume = market_ctx.get('spy_volume', 80000000)
-        volume_ratio = spy_volume / 80000000  # vs average
-        if volume_ratio > 1.2:
-            volume_regime = 0.8  # High volume = good
-        elif volume_ratio > 0.8:
-            volume_regime = 0.7  # Normal volume = ok
-        else:
-            volume_regime = 0.4  # Low volume = caution
-        
-        # DXY impact (0-1 scale)
-        dxy_change = market_ctx.get('dxy_change', 0)
-        bias = trade.get('bias', 'Bullish')
-        
-        if abs(dxy_change) < 0.2:
-            dxy_impact = 0.6  # Neutral DXY
-        elif (dxy_change < 0 and bias == 'Bullish') or (dxy_change > 0 and bias == 'Bearish'):
-            dxy_impact = 0.8  # DXY supports signal
-        else:
-            dxy_impact = 0.3  # DXY opposes signal
-        
-        # Correlation strength
-        nq_es_corr = market_ctx.get('nq_es_correlation', 0.85)
-        correlation_strength = min(1.0, abs(nq_es_corr))
-        
-        # Trend strength
-        trend_strength = min(1.0, market_ctx.get('trend_strength', 0.5))
-        
-        # Sector rotation
-        sector_rotation = market_ctx.get('sector_rotation', 'BALANCED')
-        sector_scores = {
-            'TECH_LEADERSHIP': 0.8,  # Good for NQ
-            'BALANCED': 0.6,
-            'VALUE_ROTATION': 0.4   # Bad for NQ
-        }
-        sector_score = sector_scores.get(sector_rotation, 0.5)
-        
-        return {
-            'vix_regime': vix_regime,
-            'session_quality': session_quality,
-            'volume_regime': volume_regime,
-            'dxy_impact': dxy_impact,
-            'correlation_strength': correlation_strength,
-            'trend_strength': trend_strength,
-            'sector_rotation': sector_score
-        }
+        """Extract ML features from market context (same builder as the stored training rows)"""
+        row = feature_row('signal_context', {
+            'session': trade.get('session', 'Unknown'),
+            'bias': trade.get('bias', 'Bullish'),
+            'market_context': market_ctx,
+        })
+        return dict(zip(FEATURE_SETS['signal_context'].columns, row.tolist()))
     
     def predict_signal_quality(self, market_context: Dict, signal_data: Dict) -> Dict[str, float]:
         """Predict signal quality based on current market context"""
@@ -0,0 +1,284 @@
+"""
+Signal Payload Parser
+Single-pass parser for /api/automated-signals/webhook payloads.
+
+Folds the Phase E1 auto-guard, the Phase 2A normalization decision, the 7F/7G
+parse + validation gates and the 7H source fusion into one walk over the decoded
+body, using precomputed alias tables instead of rebuilding them per request. The
+result is a SignalEvent: the same fused canonical dict the lifecycle handlers
+already read, with typed slots for the parsed fields.
+"""
+
+import json
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from automated_signals_state import auto_guard_webhook_payload
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NY_TZ = ZoneInfo("America/New_York")
+UTC_TZ = ZoneInfo("UTC")
+
+ALLOWED_EVENT_TYPES = frozenset({
+    "SIGNAL_CREATED", "ENTRY", "MFE_UPDATE", "BE_TRIGGERED", "EXIT_BE", "EXIT_SL", "CANCELLED"
+})
+ALLOWED_EVENT_LIST = ["SIGNAL_CREATED", "ENTRY", "MFE_UPDATE", "BE_TRIGGERED", "EXIT_BE", "EXIT_SL", "CANCELLED"]
+
+# Event type aliases per payload format (same tables as as_parse_automated_signal_payload)
+STRATEGY_EVENT_TYPES = {
+    "signal_created": "SIGNAL_CREATED",
+    "ENTRY": "ENTRY",
+    "mfe_update": "MFE_UPDATE",
+    "MFE_UPDATE": "MFE_UPDATE",
+    "be_triggered": "BE_TRIGGERED",
+    "BE_TRIGGERED": "BE_TRIGGERED",
+    "signal_completed": "EXIT_SL",
+    "EXIT_SL": "EXIT_SL",
+    "EXIT_STOP_LOSS": "EXIT_SL",
+    "EXIT_BREAK_EVEN": "EXIT_BE",
+}
+LEGACY_STAGE_EVENT_TYPES = {
+    "SIGNAL_DETECTED": "ENTRY",
+    "CONFIRMATION_DETECTED": "ENTRY",
+    "TRADE_ACTIVATED": "ENTRY",
+    "MFE_UPDATE": "MFE_UPDATE",
+    "TRADE_RESOLVED": "EXIT_SL",
+    "SIGNAL_CANCELLED": "CANCELLED",
+}
+DIRECT_EVENT_TYPES = {
+    "signal_created": "SIGNAL_CREATED",
+    "SIGNAL_CREATED": "SIGNAL_CREATED",
+    "mfe_update": "MFE_UPDATE",
+    "be_triggered": "BE_TRIGGERED",
+    "signal_completed": "EXIT_SL",
+    "EXIT_STOP_LOSS": "EXIT_SL",
+    "EXIT_BREAK_EVEN": "EXIT_BE",
+}
+
+# Field aliases the Phase 2A normalizer falls back through: (field, alias)
+ENTRY_PRICE_FIELDS = (("entry_price", "price"), ("stop_loss", "stop_price"))
+
+_INVALID_TRADE_IDS = (None, "", "null", "undefined")
+
+
+def decode_json_body(body):
+    """
+    Decode a raw webhook body once. Uses orjson when installed and falls back to the
+    stdlib for anything it rejects (NaN, oversized ints). Returns None for bodies
+    that are not JSON, like request.get_json(silent=True).
+    """
+    if not body:
+        return None
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+class SignalEvent(dict):
+    """
+    Fused canonical webhook event. The dict contents are exactly what
+    as_fuse_automated_payload_sources() builds, so handlers and raw_payload JSON are
+    unchanged; the slots carry the parsed fields without leaking into either.
+    """
+
+    __slots__ = ('event_type', 'trade_id', 'format_kind', 'normalized', 'raw', 'error', '_event_time')
+
+    def __init__(self, event_type, trade_id, format_kind, normalized, raw):
+        super().__init__(event_type=event_type, trade_id=trade_id, format_kind=format_kind, normalized=normalized)
+        self.event_type = event_type
+        self.trade_id = trade_id
+        self.format_kind = format_kind
+        self.normalized = normalized
+        self.raw = raw
+        self.error = None
+        self._event_time = None
+
+    def parsed(self):
+        """Parser-stage view (before fusion) for the telemetry audit log"""
+        parsed = {
+            "event_type": self.event_type,
+            "trade_id": self.trade_id,
+            "format_kind": self.format_kind,
+            "normalized": self.normalized,
+        }
+        if isinstance(self.error, dict):
+            parsed["validation_error"] = self.error
+        return parsed
+
+
+def _price(value):
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _normalizes(payload):
+    """
+    True when signal_normalization.normalize_signal_payload() followed by
+    validate_normalized_payload() would accept the payload, checked without
+    building the normalized dict.
+    """
+    direction = payload['direction'] if 'direction' in payload else payload.get('type', '')
+    if not isinstance(direction, str) or not direction:
+        return False
+    session = payload.get('session', '')
+    if session and not isinstance(session, str):
+        return False
+    event_type = payload.get('event_type', 'ENTRY')
+    if not event_type or isinstance(event_type, (dict, list)):
+        return False
+    if event_type == 'ENTRY':
+        for field, alias in ENTRY_PRICE_FIELDS:
+            value = payload[field] if field in payload else payload.get(alias)
+            if _price(value) is None:
+                return False
+    return True
+
+
+def _parse_fields(payload):
+    """Branch selection of as_parse_automated_signal_payload(): (event_type, trade_id, format_kind, normalized)"""
+    attributes = payload.get("attributes")
+    if not isinstance(attributes, dict):
+        attributes = None
+
+    if attributes is None and "event_type" in payload and "schema_version" in payload:
+        return payload.get("event_type"), payload.get("trade_id"), "telemetry_root", True
+    if attributes is not None:
+        return attributes.get("event_type"), attributes.get("trade_id"), "telemetry_wrapped", True
+
+    message_type = payload.get("type")
+    if message_type:
+        event_type = STRATEGY_EVENT_TYPES.get(message_type) if isinstance(message_type, str) else None
+        return event_type, payload.get("signal_id"), "strategy", False
+
+    automation_stage = payload.get("automation_stage")
+    if automation_stage:
+        event_type = LEGACY_STAGE_EVENT_TYPES.get(automation_stage) if isinstance(automation_stage, str) else None
+        return event_type, payload.get("trade_id") or payload.get("signal_id"), "legacy_indicator", False
+
+    if "event_type" in payload and ("trade_id" in payload or "signal_id" in payload):
+        event_type = payload.get("event_type")
+        if isinstance(event_type, str):
+            event_type = DIRECT_EVENT_TYPES.get(event_type, event_type)
+        return event_type, payload.get("trade_id") or payload.get("signal_id"), "direct_telemetry", True
+
+    return None, None, None, False
+
+
+def _validation_error(event_type, trade_id):
+    """7F strict telemetry validation: the last failing check wins, as in the original block"""
+    error = None
+    if not event_type:
+        error = {
+            "type": "MISSING_REQUIRED_FIELDS",
+            "missing": ["event_type"],
+            "payload_subset": {"event_type": event_type, "trade_id": trade_id},
+        }
+    if not isinstance(event_type, str) or event_type not in ALLOWED_EVENT_TYPES:
+        error = {"type": "UNKNOWN_EVENT_TYPE", "value": event_type, "allowed": ALLOWED_EVENT_LIST}
+    if trade_id in _INVALID_TRADE_IDS or not isinstance(trade_id, str) or "," in trade_id:
+        error = {"type": "INVALID_TRADE_ID_FORMAT", "value": trade_id}
+    return error
+
+
+def _gate_error(event):
+    """as_validate_parsed_payload() string errors"""
+    for field in ("event_type", "trade_id", "format_kind"):
+        if event[field] in (None, "", "UNKNOWN"):
+            return f"Missing or invalid required field: {field}"
+    if event.event_type not in ALLOWED_EVENT_TYPES:
+        return f"Illegal or unknown event_type: {event.event_type}"
+    tid = event.trade_id
+    if tid.strip() == "" or "," in tid or " " in tid:
+        return f"Malformed trade_id: {repr(tid)}"
+    return None
+
+
+def parse_signal_event(payload):
+    """
+    Guard, parse, validate and fuse a decoded webhook payload in one pass.
+
+    Returns (event, error):
+        (None, str)          rejected by the auto-guard
+        (SignalEvent, err)   parsed but failed validation; err is the 7F dict or a gate string
+        (SignalEvent, None)  accepted; the event is the fused canonical payload
+    """
+    _, error = auto_guard_webhook_payload(payload)
+    if error:
+        return None, error
+
+    if _normalizes(payload):
+        # Normalized payloads only carry event_type/trade_id into the parser
+        event_type = payload["event_type"]
+        if isinstance(event_type, str):
+            event_type = DIRECT_EVENT_TYPES.get(event_type, event_type)
+        event_type, trade_id, format_kind, normalized = event_type, payload["trade_id"], "direct_telemetry", True
+    else:
+        event_type, trade_id, format_kind, normalized = _parse_fields(payload)
+
+    event = SignalEvent(event_type, trade_id or "UNKNOWN", format_kind, normalized, payload)
+    event.error = _validation_error(event.event_type, event.trade_id) or _gate_error(event)
+    if event.error:
+        return event, event.error
+
+    # 7H fusion: raw fields, then attributes, never overriding parsed keys
+    for key, value in payload.items():
+        if key != "attributes" and key not in event:
+            event[key] = value
+    attributes = payload.get("attributes")
+    if not isinstance(attributes, dict):
+        attributes = None
+    elif attributes:
+        for key, value in attributes.items():
+            if key not in event:
+                event[key] = value
+
+    raw_event_type = payload.get("event_type") or (attributes.get("event_type") if attributes else None)
+    if raw_event_type and raw_event_type != event.event_type:
+        event["telemetry_warning"] = f"event_type mismatch: raw='{raw_event_type}' canonical='{event.event_type}'"
+    raw_trade_id = payload.get("trade_id") or (attributes.get("trade_id") if attributes else None)
+    if raw_trade_id and raw_trade_id != event.trade_id:
+        event["telemetry_warning"] = f"trade_id mismatch: raw='{raw_trade_id}' canonical='{event.trade_id}'"
+    return event, None
+
+
+def event_time_utc(data):
+    """
+    UTC ISO string for an event's event_timestamp (or timestamp), reading naive
+    values as New York local time. Falls back to utcnow when the value does not
+    parse. Cached on SignalEvent so the parse happens once per event.
+    """
+    cached = getattr(data, '_event_time', None)
+    if cached is not None:
+        return cached
+
+    raw_ts = data.get("event_timestamp") or data.get("timestamp")
+    if not raw_ts:
+        raw_ts = datetime.utcnow().isoformat()
+        cacheable = False
+    else:
+        cacheable = True
+    try:
+        parsed_local = datetime.fromisoformat(raw_ts.replace("Z", ""))
+        if parsed_local.tzinfo is None:
+            parsed_local = parsed_local.replace(tzinfo=NY_TZ)
+        event_time = parsed_local.astimezone(UTC_TZ).isoformat()
+    except Exception:
+        return datetime.utcnow().isoformat()
+
+    if cacheable and isinstance(data, SignalEvent):
+        data._event_time = event_time
+    return event_time
@@ -0,0 +1,68 @@
+"""
+Signals Feed Pagination
+Opaque keyset cursors and cached totals shared by /api/signals/v1/all and
+/api/all-signals/data.
+
+A cursor encodes the (sort key, trade_id) of the last row of a page; the next page
+starts strictly after it, so page N costs the same index range scan as page 1.
+Totals come from a short-lived single-flight cache instead of a COUNT(*) per request.
+"""
+
+import base64
+import json
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from automated_signals_stats import SingleFlightTTLCache
+
+TOTALS_TTL_SECONDS = 60
+MAX_CACHED_TOTALS = 256
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor this server did not issue"""
+
+
+def encode_cursor(sort_key, trade_id: str) -> str:
+    """Opaque cursor for the row (sort_key, trade_id); datetimes are sent as ISO strings"""
+    if hasattr(sort_key, 'isoformat'):
+        sort_key = sort_key.isoformat()
+    payload = json.dumps([sort_key, trade_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple]:
+    """(sort_key, trade_id) from encode_cursor, or None for the first page"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_key, trade_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(trade_id, str) or not isinstance(sort_key, (str, int)):
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    return sort_key, trade_id
+
+
+class CachedTotals:
+    """
+    One SingleFlightTTLCache per filter key. The loader given with a key's first
+    request serves that key from then on, so it must not capture per-request state
+    (open its own connection rather than reuse the request's cursor).
+    """
+
+    def __init__(self, ttl: float = TOTALS_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._caches: Dict[Hashable, SingleFlightTTLCache] = {}
+
+    def get(self, key: Hashable, loader: Callable[[], int]) -> int:
+        with self._lock:
+            cache = self._caches.get(key)
+            if cache is None:
+                # Ad-hoc time windows make keys unbounded; start over rather than grow
+                if len(self._caches) >= MAX_CACHED_TOTALS:
+                    self._caches.clear()
+                cache = self._caches[key] = SingleFlightTTLCache(loader, ttl=self.ttl)
+        return cache.get()
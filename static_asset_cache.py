@@ -0,0 +1,215 @@
+"""
+Static Asset Cache
+Startup-built cache of root-level dashboard HTML/JS/CSS files with precomputed
+gzip/brotli variants and strong ETags. Entries are invalidated by mtime.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from threading import Lock
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Files smaller than this are served as-is; compression overhead outweighs savings
+MIN_COMPRESS_SIZE = 1024
+
+# Preload runs at boot; quality 11 brotli costs seconds for ~2.5MB of pages
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+DEFAULT_EXTENSIONS = ('.html', '.js', '.css')
+
+MIMETYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+}
+
+
+class CachedAsset:
+    """Immutable snapshot of one file plus its encoded variants"""
+
+    __slots__ = ('filename', 'mtime_ns', 'size', 'raw', 'etag', 'variants', 'mimetype')
+
+    def __init__(self, filename, mtime_ns, raw, mimetype):
+        self.filename = filename
+        self.mtime_ns = mtime_ns
+        self.size = len(raw)
+        self.raw = raw
+        self.mimetype = mimetype
+
+        digest = hashlib.sha256(raw).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+
+        # encoding -> (body, etag); a strong ETag must differ per content-coding
+        self.variants = {'identity': (raw, self.etag)}
+        if self.size >= MIN_COMPRESS_SIZE:
+            gz = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+            if len(gz) < self.size:
+                self.variants['gzip'] = (gz, f'"{digest}-gz"')
+            if brotli is not None:
+                br = brotli.compress(raw, quality=BROTLI_QUALITY)
+                if len(br) < self.size:
+                    self.variants['br'] = (br, f'"{digest}-br"')
+
+    @property
+    def text(self):
+        return self.raw.decode('utf-8')
+
+    @property
+    def etags(self):
+        return {etag for _, etag in self.variants.values()}
+
+
+def parse_accept_encoding(header):
+    """Return {coding: q} for an Accept-Encoding header value"""
+    accepted = {}
+    if not header:
+        return accepted
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def select_encoding(asset, accept_encoding):
+    """Pick the smallest variant the client accepts (br > gzip > identity)"""
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+    for coding in ('br', 'gzip'):
+        if coding in asset.variants and accepted.get(coding, wildcard) > 0:
+            return coding
+    return 'identity'
+
+
+def etag_matches(asset, if_none_match):
+    """Weak comparison of an If-None-Match header against the asset's ETags"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    known = asset.etags
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag in known:
+            return True
+    return False
+
+
+class StaticAssetCache:
+    """
+    In-memory cache of files under base_dir.
+    - preload() builds every entry once at startup
+    - get() revalidates against the file's mtime with a single stat() call
+    - build_response() answers conditional GETs and content negotiation
+    """
+
+    def __init__(self, base_dir, extensions=DEFAULT_EXTENSIONS):
+        self.base_dir = os.path.abspath(base_dir)
+        self.extensions = tuple(extensions)
+        self._entries = {}
+        self._lock = Lock()
+        self.stats = {'hits': 0, 'loads': 0, 'not_modified': 0}
+
+    def preload(self):
+        """Load every matching file in base_dir (non-recursive)"""
+        loaded = 0
+        total_bytes = 0
+        for name in sorted(os.listdir(self.base_dir)):
+            if not name.endswith(self.extensions):
+                continue
+            asset = self.get(name)
+            if asset is not None:
+                loaded += 1
+                total_bytes += asset.size
+        logger.info(f"Static asset cache preloaded {loaded} files ({total_bytes // 1024} KB, brotli={'on' if brotli else 'off'})")
+        return loaded
+
+    def _path(self, filename):
+        return os.path.join(self.base_dir, filename)
+
+    def get(self, filename):
+        """Return the CachedAsset for filename, reloading if the file changed on disk"""
+        file_path = self._path(filename)
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._entries.pop(filename, None)
+            return None
+
+        asset = self._entries.get(filename)
+        if asset is not None and asset.mtime_ns == mtime_ns:
+            self.stats['hits'] += 1
+            return asset
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        ext = os.path.splitext(filename)[1].lower()
+        mimetype = MIMETYPES.get(ext) or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        asset = CachedAsset(filename, mtime_ns, raw, mimetype)
+        with self._lock:
+            self._entries[filename] = asset
+        self.stats['loads'] += 1
+        return asset
+
+    def get_text(self, filename):
+        """Decoded file contents (for render_template_string callers)"""
+        asset = self.get(filename)
+        if asset is None:
+            raise FileNotFoundError(filename)
+        return asset.text
+
+    def build_response(self, asset, if_none_match=None, accept_encoding=None, mimetype=None):
+        """Return (body, status, headers) for a GET of asset"""
+        coding = select_encoding(asset, accept_encoding)
+        body, etag = asset.variants[coding]
+        headers = {
+            'ETag': etag,
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': 'no-cache',
+        }
+        if etag_matches(asset, if_none_match):
+            self.stats['not_modified'] += 1
+            return b'', 304, headers
+
+        headers['Content-Type'] = mimetype or asset.mimetype
+        headers['Content-Length'] = str(len(body))
+        if coding != 'identity':
+            headers['Content-Encoding'] = coding
+        return body, 200, headers
+
+    def serve(self, filename, mimetype=None):
+        """Flask response for filename using the current request's validators"""
+        from flask import Response, request
+
+        asset = self.get(filename)
+        if asset is None:
+            return None
+        body, status, headers = self.build_response(
+            asset,
+            if_none_match=request.headers.get('If-None-Match'),
+            accept_encoding=request.headers.get('Accept-Encoding'),
+            mimetype=mimetype,
+        )
+        return Response(body, status=status, headers=headers)
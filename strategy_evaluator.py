@@ -2,9 +2,20 @@
 Unified Strategy Evaluation Framework
 Consolidates: Time Analysis, ML Predictions, Session Performance, Risk Metrics
 """
+from itertools import combinations
 from typing import Dict, List, Tuple
+import logging
 import math
 
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SESSIONS = ['Asia', 'London', 'NY Pre Market', 'NY AM', 'NY Lunch', 'NY PM']
+BE_STRATEGIES = ['none', 'be1']
+R_TARGETS = [i * 0.5 for i in range(1, 41)]  # 0.5R to 20R in 0.5R increments
+TIME_FILTERS = ['all', 'optimal', 'macro']  # all hours, optimal hour per session, macro windows only
+
 class StrategyEvaluator:
     def __init__(self, db):
         self.db = db
@@ -139,61 +150,89 @@ class StrategyEvaluator:
         Find optimal strategy from database given constraints
         Constraints: min_win_rate, max_drawdown, min_trades, etc.
         """
-        cursor = self.db.conn.cursor()
+        trades = self._fetch_trades()
+        
+        if not trades:
+            return {'error': 'No trade data available'}
+        
+        ranked = self.rank_strategies(self.build_lattice(trades), constraints, limit=1)
         
-        # Get all completed trades
+        return ranked[0] if ranked else {'error': 'No strategies meet constraints'}
+    
+    def _fetch_trades(self) -> List:
+        cursor = self.db.conn.cursor()
         cursor.execute("""
             SELECT date, time, session, bias,
                    COALESCE(mfe_none, mfe, 0) as mfe_none,
                    COALESCE(mfe1, 0) as mfe1
             FROM signal_lab_trades
         """)
-        
-        trades = cursor.fetchall()
-        
-        if not trades:
-            return {'error': 'No trade data available'}
-        
-        # Test different strategy combinations
-        strategies = self._generate_strategy_combinations(trades)
-        
-        # Apply constraints
-        if constraints:
-            strategies = self._apply_constraints(strategies, constraints)
-        
-        # Evaluate and rank
-        evaluated = self.compare_strategies(strategies)
-        
-        return evaluated[0] if evaluated else {'error': 'No strategies meet constraints'}
+        return cursor.fetchall()
+    
+    def build_lattice(self, trades: List) -> 'StrategyLattice':
+        return StrategyLattice(trades, self._find_optimal_hours(trades, SESSIONS))
+    
+    def rank_strategies(self, lattice: 'StrategyLattice', constraints: Dict = None, limit: int = 10) -> List[Dict]:
+        """
+        Top `limit` strategies as compare_strategies would rank them, without building the
+        rest. Metrics other than drawdown come from the lattice counts; drawdown is computed
+        only for candidates whose best possible score can still reach the top.
+        """
+        constraints = constraints or {}
+        keep = lattice.total_trades >= 10
+        if constraints.get('min_win_rate'):
+            keep &= lattice.win_rate >= constraints['min_win_rate']
+        if constraints.get('min_trades'):
+            keep &= lattice.total_trades >= constraints['min_trades']
+        if constraints.get('min_expectancy'):
+            keep &= lattice.expectancy >= constraints['min_expectancy']
+        max_dd = constraints.get('max_drawdown')
+        
+        def evaluate(i):
+            strategy = lattice.strategy(i, with_results=False)
+            if max_dd and strategy['max_drawdown'] > max_dd:
+                return None
+            result = self.evaluate_strategy(strategy)
+            result['strategy'] = strategy
+            return result
+        
+        # Same shortcut evaluate_strategy takes: anything unprofitable scores 0
+        positive = keep & (lattice.expectancy > 0) & (lattice.total_r > 0)
+        upper_bound = lattice.score_upper_bound()
+        candidates = np.flatnonzero(positive)
+        order = candidates[np.argsort(-upper_bound[candidates], kind='stable')]
+        
+        scored = []
+        for i, upper in zip(order.tolist(), upper_bound[order].tolist()):
+            if len(scored) >= limit and upper < scored[limit - 1][0]['composite_score']:
+                break
+            result = evaluate(i)
+            if result is not None and result['composite_score'] > 0:
+                scored.append((result, i))
+                scored.sort(key=lambda item: (-item[0]['composite_score'], item[1]))
+                del scored[limit:]
+        
+        # Fewer than `limit` scored: every positive candidate was visited, so the rest
+        # are the zero scores in generation order (the order a stable sort keeps)
+        if len(scored) < limit:
+            winners = {i for _, i in scored}
+            for i in np.flatnonzero(keep).tolist():
+                if i in winners:
+                    continue
+                result = evaluate(i)
+                if result is not None and result['composite_score'] == 0:
+                    scored.append((result, i))
+                    if len(scored) >= limit:
+                        break
+        
+        for result, i in scored:
+            result['strategy'] = lattice.strategy(i)
+        return [result for result, _ in scored]
     
     def _generate_strategy_combinations(self, trades: List) -> List[Dict]:
         """Generate ALL strategy combinations: sessions, time windows, macro, BE, R-targets"""
-        strategies = []
-        
-        sessions = ['Asia', 'London', 'NY Pre Market', 'NY AM', 'NY Lunch', 'NY PM']
-        be_strategies = ['none', 'be1']
-        r_targets = [i * 0.5 for i in range(1, 41)]  # 0.5R to 20R in 0.5R increments
-        time_filters = ['all', 'optimal', 'macro']  # all hours, optimal hour per session, macro windows only
-        
-        # Get optimal hours per session
-        optimal_hours = self._find_optimal_hours(trades, sessions)
-        
-        # All session combinations (1, 2, 3, 4, 5, 6 sessions)
-        all_session_combos = []
-        for r in range(1, len(sessions) + 1):
-            from itertools import combinations
-            all_session_combos.extend(['+'.join(combo) for combo in combinations(sessions, r)])
-        
-        # Test every combination
-        for session_combo in all_session_combos:
-            for time_filter in time_filters:
-                for be_strat in be_strategies:
-                    for r_target in r_targets:
-                        strategy = self._test_strategy(trades, session_combo, be_strat, r_target, time_filter, optimal_hours)
-                        if strategy['total_trades'] >= 10:
-                            strategies.append(strategy)
-        
-        return strategies
+        lattice = self.build_lattice(trades)
+        return [lattice.strategy(i) for i in np.flatnonzero(lattice.total_trades >= 10).tolist()]
     
     def _find_optimal_hours(self, trades: List, sessions: List[str]) -> Dict:
         """Find best hour per session based on raw expectancy"""
@@ -234,10 +273,7 @@ class StrategyEvaluator:
         else:
             session_trades = [t for t in trades if t['session'] == session]
         
-        # DEBUG: Log what we're testing
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Testing: {session} | {be_strategy} | {r_target}R | {time_filter} | {len(session_trades)} trades")
+        logger.debug(f"Testing: {session} | {be_strategy} | {r_target}R | {time_filter} | {len(session_trades)} trades")
         
         # Apply time filter
         if time_filter == 'optimal' and optimal_hours:
@@ -346,3 +382,149 @@ class StrategyEvaluator:
             filtered.append(strategy)
         
         return filtered
+
+
+class StrategyLattice:
+    """
+    Sufficient statistics for every strategy _test_strategy can be asked about.
+
+    Trades are split once into (session, time filter) cells; each cell's sorted MFE
+    arrays give its win/loss counts at all R-targets via binary search. A session
+    union's counts are the sum of its cells', built over the subset lattice by adding
+    one session to an already-summed subset. Everything except drawdown follows from
+    the counts; drawdown depends on trade order and is computed per strategy on demand.
+    """
+
+    def __init__(self, trades: List, optimal_hours: Dict):
+        self.optimal_hours = optimal_hours
+        count = len(trades)
+        self.session_codes = np.full(count, -1, dtype=np.int8)
+        hours = np.full(count, -1, dtype=np.int16)
+        minutes = np.full(count, -1, dtype=np.int16)
+        self.mfe = np.zeros((len(BE_STRATEGIES), count))
+        session_index = {session: i for i, session in enumerate(SESSIONS)}
+        for j, trade in enumerate(trades):
+            self.session_codes[j] = session_index.get(trade['session'], -1)
+            time_val = trade.get('time')
+            if time_val:
+                hours[j] = time_val.hour if hasattr(time_val, 'hour') else int(str(time_val).split(':')[0])
+                minutes[j] = time_val.minute if hasattr(time_val, 'minute') else int(str(time_val).split(':')[1])
+            self.mfe[0, j] = float(trade['mfe_none'])
+            self.mfe[1, j] = float(trade['mfe1'])
+
+        # Trade masks per time filter, as _test_strategy applies them
+        has_time = hours >= 0
+        if optimal_hours:
+            best = np.array([optimal_hours.get(session, -1) for session in SESSIONS] + [-1])
+            optimal = has_time & (hours == best[self.session_codes])
+        else:
+            optimal = np.ones(count, dtype=bool)
+        macro = has_time & ((minutes >= 45) | (minutes <= 15))
+        self.time_masks = np.stack([np.ones(count, dtype=bool), optimal, macro])
+
+        # Counts per session subset (bitmask over SESSIONS)
+        targets = np.array(R_TARGETS)
+        subsets = 1 << len(SESSIONS)
+        n = np.zeros((subsets, len(TIME_FILTERS)), dtype=np.int64)
+        wins = np.zeros((subsets, len(TIME_FILTERS), len(BE_STRATEGIES), len(targets)), dtype=np.int64)
+        losses = np.zeros_like(wins)
+        for s in range(len(SESSIONS)):
+            for t in range(len(TIME_FILTERS)):
+                cell = (self.session_codes == s) & self.time_masks[t]
+                size = int(cell.sum())
+                n[1 << s, t] = size
+                # none: a win at r is MFE >= r, anything else loses 1R
+                mfe_none = np.sort(self.mfe[0, cell])
+                wins[1 << s, t, 0] = size - np.searchsorted(mfe_none, targets, side='left')
+                losses[1 << s, t, 0] = size - wins[1 << s, t, 0]
+                # be1: MFE < 1 loses 1R, MFE >= r wins r, in between is scratched at BE
+                mfe1 = np.sort(self.mfe[1, cell])
+                wins[1 << s, t, 1] = size - np.searchsorted(mfe1, np.maximum(targets, 1.0), side='left')
+                losses[1 << s, t, 1] = np.searchsorted(mfe1, 1.0, side='left')
+        for subset in range(1, subsets):
+            low = subset & -subset
+            if subset != low:
+                n[subset] = n[subset ^ low] + n[low]
+                wins[subset] = wins[subset ^ low] + wins[low]
+                losses[subset] = losses[subset ^ low] + losses[low]
+
+        # Candidates in _generate_strategy_combinations order: combo, time filter, BE, target
+        self.combos = [combo for size in range(1, len(SESSIONS) + 1)
+                       for combo in combinations(range(len(SESSIONS)), size)]
+        masks = np.array([sum(1 << s for s in combo) for combo in self.combos])
+        shape = (len(masks), len(TIME_FILTERS), len(BE_STRATEGIES), len(targets))
+        self.total_trades = np.broadcast_to(n[masks][:, :, None, None], shape).ravel()
+        self.wins = wins[masks].ravel()
+        self.losses = losses[masks].ravel()
+        self.r_targets = np.broadcast_to(targets, shape).ravel()
+        self.combo_idx, self.time_idx, self.be_idx, self.r_idx = np.unravel_index(np.arange(len(self.total_trades)), shape)
+
+        gross_profit = self.wins * self.r_targets
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.total_r = gross_profit - self.losses
+            self.expectancy = np.where(self.total_trades > 0, self.total_r / self.total_trades, 0.0)
+            self.win_rate = np.where(self.total_trades > 0, self.wins / self.total_trades, 0.0)
+            self.profit_factor = gross_profit / np.where(self.losses > 0, self.losses, 1)
+            self.omega_ratio = np.where(self.losses > 0, gross_profit / self.losses, 0.0)
+        self._upper_bound = None
+        self._selection = (None, None)
+
+    def __len__(self):
+        return len(self.total_trades)
+
+    def score_upper_bound(self) -> np.ndarray:
+        """
+        evaluate_strategy's composite with the drawdown term at its ceiling: any loss
+        leaves a drawdown of at least 1R, and without losses the term is 0.
+        """
+        if self._upper_bound is None:
+            exp = self.expectancy
+            sharpe = np.where(self.losses > 0, exp, 0.0)
+            sample = np.log(np.maximum(self.total_trades, 1)) * 5
+            bound = (exp * 40) + (self.win_rate * 20) + (exp * 15) + (sharpe * 10) + sample
+            self._upper_bound = bound + np.abs(bound) * 1e-9 + 1e-9
+        return self._upper_bound
+
+    def results(self, i: int) -> np.ndarray:
+        """Per-trade R results of candidate i, in trade order"""
+        key = (self.combo_idx[i], self.time_idx[i], self.be_idx[i])
+        if self._selection[0] != key:
+            combo, time_idx, be_idx = key
+            # Indexed by session code; -1 (not a known session) reads the trailing False
+            in_combo = np.zeros(len(SESSIONS) + 1, dtype=bool)
+            in_combo[list(self.combos[combo])] = True
+            selected = in_combo[self.session_codes] & self.time_masks[time_idx]
+            self._selection = (key, self.mfe[be_idx, selected])
+        mfe = self._selection[1]
+        r_target = self.r_targets[i]
+        if self.be_idx[i] == 0:
+            return np.where(mfe >= r_target, r_target, -1.0)
+        return np.where(mfe < 1, -1.0, np.where(mfe >= r_target, r_target, 0.0))
+
+    @staticmethod
+    def max_drawdown(results: np.ndarray) -> float:
+        if not len(results):
+            return 0
+        running = np.cumsum(results)
+        peak = np.maximum.accumulate(np.maximum(running, 0))
+        return float((peak - running).max())
+
+    def strategy(self, i: int, with_results: bool = True) -> Dict:
+        """Candidate i in the shape _test_strategy returns"""
+        results = self.results(i)
+        strategy = {
+            'session': '+'.join(SESSIONS[s] for s in self.combos[self.combo_idx[i]]),
+            'be_strategy': BE_STRATEGIES[self.be_idx[i]],
+            'r_target': R_TARGETS[self.r_idx[i]],
+            'time_filter': TIME_FILTERS[self.time_idx[i]],
+            'expectancy': float(self.expectancy[i]),
+            'win_rate': float(self.win_rate[i]),
+            'profit_factor': float(self.profit_factor[i]),
+            'total_r': float(self.total_r[i]),
+            'total_trades': int(self.total_trades[i]),
+            'max_drawdown': self.max_drawdown(results),
+            'omega_ratio': float(self.omega_ratio[i]),
+        }
+        if with_results:
+            strategy['results'] = [r if r > 0 else int(r) for r in results.tolist()]
+        return strategy
@@ -0,0 +1,97 @@
+"""
+Shared fixtures for the Postgres-backed tests
+
+Every test that needs a database runs in a scratch schema of the database named by
+TEST_DATABASE_URL and is skipped when it is not set:
+
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres pytest tests
+
+A test module lists what its schema needs in SCHEMA_SQL; entries ending in .sql are
+files under the repo root, anything else is run as SQL, in order. The schema is named
+after the module unless the module sets SCHEMA.
+"""
+
+import os
+from urllib.parse import quote
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+
+def schema_url(schema):
+    """TEST_DATABASE_URL with search_path pinned to `schema`"""
+    separator = '&' if '?' in TEST_DATABASE_URL else '?'
+    return TEST_DATABASE_URL + separator + 'options=' + quote(f'-csearch_path={schema}')
+
+
+class ScratchSchemas:
+    """Creates scratch schemas on demand and drops them all on close"""
+
+    def __init__(self):
+        import psycopg2
+
+        self.admin = psycopg2.connect(TEST_DATABASE_URL)
+        self.admin.autocommit = True
+        self.schemas = []
+
+    def create(self, schema, sql=()):
+        with self.admin.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            cur.execute(f"CREATE SCHEMA {schema}")
+            self.schemas.append(schema)
+            cur.execute(f"SET search_path TO {schema}")
+            for entry in sql:
+                if entry.endswith('.sql'):
+                    with open(entry) as f:
+                        entry = f.read()
+                cur.execute(entry)
+            cur.execute("RESET search_path")
+        return schema_url(schema)
+
+    def close(self):
+        with self.admin.cursor() as cur:
+            for schema in self.schemas:
+                cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        self.admin.close()
+
+
+def _scratch_schemas():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    schemas = ScratchSchemas()
+    try:
+        yield schemas
+    finally:
+        schemas.close()
+
+
+@pytest.fixture
+def scratch_schemas():
+    yield from _scratch_schemas()
+
+
+@pytest.fixture(scope='module')
+def module_scratch_schemas():
+    yield from _scratch_schemas()
+
+
+def _module_schema(module):
+    return getattr(module, 'SCHEMA', module.__name__.rpartition('.')[2])
+
+
+@pytest.fixture
+def pg_url(request, scratch_schemas):
+    """URL of a fresh schema for this test, with the module's SCHEMA_SQL applied"""
+    return scratch_schemas.create(_module_schema(request.module), getattr(request.module, 'SCHEMA_SQL', ()))
+
+
+@pytest.fixture
+def conn(pg_url):
+    import psycopg2
+
+    connection = psycopg2.connect(pg_url)
+    try:
+        yield connection
+    finally:
+        connection.close()
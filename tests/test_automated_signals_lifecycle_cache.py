@@ -0,0 +1,118 @@
+"""
+Tests for the webhook lifecycle state cache
+"""
+
+import sys
+sys.path.append('.')
+
+import threading
+
+from automated_signals_lifecycle_cache import LifecycleStateCache
+from automated_signals_state import check_strict_lifecycle_transition, enforce_strict_lifecycle_rules
+
+
+class FakeCursor:
+    """Answers STATE_SQL from an in-memory list of (trade_id, event_type) rows"""
+
+    def __init__(self, rows, before_fetch=None):
+        self.rows = rows
+        self.queries = 0
+        self.before_fetch = before_fetch
+        self._result = None
+
+    def execute(self, sql, params):
+        self.queries += 1
+        events = [et for tid, et in self.rows if tid == params[0]]
+        if not events:
+            self._result = (0, None, None, None)
+        else:
+            self._result = (len(events), events[0], events[-1], sorted(set(events)))
+
+    def fetchone(self):
+        if self.before_fetch:
+            self.before_fetch()
+        return self._result
+
+
+def test_miss_loads_once_then_hits():
+    cursor = FakeCursor([('T1', 'SIGNAL_CREATED'), ('T1', 'ENTRY')])
+    cache = LifecycleStateCache()
+
+    state = cache.get('T1', cursor)
+    assert not state.cached and state.has_entry and state.seq == 2
+    assert state.first_event == 'SIGNAL_CREATED' and state.last_event == 'ENTRY'
+
+    for _ in range(5):
+        assert cache.get('T1', cursor).cached
+    assert cursor.queries == 1
+
+
+def test_record_updates_in_place_and_exit_evicts():
+    cursor = FakeCursor([('T1', 'ENTRY')])
+    cache = LifecycleStateCache()
+    cache.get('T1', cursor)
+
+    cache.record('T1', 'MFE_UPDATE')
+    cache.record('T1', 'MFE_UPDATE', removed=1)
+    state = cache.peek('T1')
+    assert state.last_event == 'MFE_UPDATE' and state.seq == 2
+
+    cache.record('T1', 'EXIT_SL')
+    assert cache.peek('T1') is None
+
+
+def test_unknown_and_exited_trades_are_not_cached():
+    cursor = FakeCursor([('T2', 'ENTRY'), ('T2', 'EXIT_BE')])
+    cache = LifecycleStateCache()
+    assert not cache.get('MISSING', cursor).exists
+    assert cache.get('T2', cursor).has_exit
+    assert len(cache) == 0
+
+
+def test_lru_bound_and_idle_expiry():
+    cursor = FakeCursor([(f'T{i}', 'ENTRY') for i in range(5)])
+    cache = LifecycleStateCache(max_trades=3)
+    for i in range(5):
+        cache.get(f'T{i}', cursor)
+    assert len(cache) == 3
+    assert cache.peek('T0') is None and cache.peek('T4') is not None
+
+    cache.idle_ttl = -1
+    assert cache.peek('T4') is None
+
+
+def test_record_during_load_is_not_lost():
+    """A concurrent insert that lands while a miss is loading keeps the stale load out of the cache"""
+    cache = LifecycleStateCache()
+    rows = [('T1', 'SIGNAL_CREATED')]
+
+    def concurrent_entry():
+        rows.append(('T1', 'ENTRY'))
+        thread = threading.Thread(target=cache.record, args=('T1', 'ENTRY'))
+        thread.start()
+        thread.join()
+
+    stale = FakeCursor(list(rows), before_fetch=concurrent_entry)
+    assert not cache.get('T1', stale).has_entry
+    assert cache.peek('T1') is None
+    assert cache.get('T1', FakeCursor(rows)).has_entry
+
+
+def test_invalidate():
+    cursor = FakeCursor([('T1', 'ENTRY'), ('T2', 'ENTRY')])
+    cache = LifecycleStateCache()
+    cache.get('T1', cursor)
+    cache.get('T2', cursor)
+    cache.invalidate(['T1'])
+    assert cache.peek('T1') is None and cache.peek('T2') is not None
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_state_check_matches_history_check():
+    histories = [[], ['SIGNAL_CREATED'], ['SIGNAL_CREATED', 'ENTRY'], ['ENTRY', 'MFE_UPDATE']]
+    for history in histories:
+        events = [{'event_type': et} for et in history]
+        for new_event in ('SIGNAL_CREATED', 'ENTRY', 'MFE_UPDATE', 'BE_TRIGGERED', 'EXIT_SL', 'CANCELLED'):
+            assert enforce_strict_lifecycle_rules(events, new_event) == \
+                check_strict_lifecycle_transition('ENTRY' in history, new_event)
@@ -0,0 +1,298 @@
+"""
+EXPLAIN-based regression tests for automated_signals hot queries.
+
+Seeds a synthetic lifecycle dataset (default 1,000,000 events) into a scratch
+schema of a local Postgres, applies database/automated_signals_hot_path_indexes.sql
+(and then the monthly partitioning migration), and asserts each hot reader gets an
+index-driven plan.
+
+Requires a disposable database:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres pytest tests/test_automated_signals_query_plans.py
+Optional: AUTOMATED_SIGNALS_PLAN_TEST_EVENTS=200000 for a faster run.
+"""
+
+import os
+import sys
+sys.path.append('.')
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from database.run_automated_signals_performance_migration import run_migration
+
+EVENT_COUNT = int(os.environ.get("AUTOMATED_SIGNALS_PLAN_TEST_EVENTS", "1000000"))
+EVENTS_PER_TRADE = 40
+SCHEMA = "as_plan_test"
+
+# Mirrors the runtime schema created by web_server.py (timestamp is TIMESTAMP there)
+CREATE_TABLE_SQL = """
+CREATE TABLE automated_signals (
+    id SERIAL PRIMARY KEY,
+    trade_id VARCHAR(100),
+    event_type VARCHAR(20),
+    direction VARCHAR(10),
+    entry_price DECIMAL(10,2),
+    stop_loss DECIMAL(10,2),
+    session VARCHAR(20),
+    bias VARCHAR(20),
+    risk_distance DECIMAL(10,2),
+    targets JSONB,
+    current_price DECIMAL(10,2),
+    mfe DECIMAL(10,4),
+    be_mfe DECIMAL(10,4),
+    no_be_mfe DECIMAL(10,4),
+    mae_global_r DECIMAL(10,4),
+    exit_price DECIMAL(10,2),
+    final_mfe DECIMAL(10,4),
+    signal_date DATE,
+    signal_time TIME,
+    timestamp TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# One trade every 10 minutes, one event per minute; every 20th trade is still open
+SEED_SQL = """
+INSERT INTO automated_signals (
+    trade_id, event_type, direction, entry_price, stop_loss, session, bias,
+    current_price, mfe, be_mfe, no_be_mfe, mae_global_r, exit_price, final_mfe,
+    signal_date, signal_time, timestamp
+)
+SELECT
+    'T' || lpad(t::text, 8, '0'),
+    CASE
+        WHEN s = 0 THEN 'ENTRY'
+        WHEN s = %(last)s AND t %% 20 <> 0 THEN CASE WHEN t %% 3 = 0 THEN 'EXIT_BE' ELSE 'EXIT_SL' END
+        WHEN s = %(last)s - 1 THEN 'BE_TRIGGERED'
+        ELSE 'MFE_UPDATE'
+    END,
+    CASE WHEN t %% 2 = 0 THEN 'LONG' ELSE 'SHORT' END,
+    20000 + (t %% 500),
+    19975 + (t %% 500),
+    CASE WHEN t %% 4 = 0 THEN 'NY AM' WHEN t %% 4 = 1 THEN 'London' WHEN t %% 4 = 2 THEN 'NY PM' ELSE 'Asia' END,
+    CASE WHEN t %% 2 = 0 THEN 'Bullish' ELSE 'Bearish' END,
+    20000 + (t %% 500) + s * 0.25,
+    s * 0.05,
+    s * 0.04,
+    s * 0.05,
+    CASE WHEN s > 0 THEN -0.1 * (s %% 5) ELSE NULL END,
+    CASE WHEN s = %(last)s AND t %% 20 <> 0 THEN 20000 + (t %% 500) ELSE NULL END,
+    CASE WHEN s = %(last)s AND t %% 20 <> 0 THEN s * 0.05 ELSE NULL END,
+    (TIMESTAMP '2025-01-01' + (t * INTERVAL '10 minutes'))::date,
+    (TIMESTAMP '2025-01-01' + (t * INTERVAL '10 minutes'))::time,
+    TIMESTAMP '2025-01-01' + (t * INTERVAL '10 minutes') + (s * INTERVAL '1 minute')
+FROM generate_series(1, %(trades)s) AS t, generate_series(0, %(last)s) AS s
+"""
+
+# Hot readers, copied from their call sites
+FETCH_EVENTS_FOR_RANGE = """
+SELECT id, trade_id, event_type, direction, entry_price, stop_loss, session, bias,
+       risk_distance, current_price, mfe, exit_price, final_mfe, timestamp,
+       signal_date, signal_time, be_mfe, no_be_mfe
+FROM automated_signals
+WHERE signal_date >= %s AND signal_date <= %s
+ORDER BY trade_id, timestamp ASC, id ASC
+"""
+
+STATS_ENTRY_COUNT = "SELECT COUNT(*) FROM automated_signals WHERE event_type = 'ENTRY'"
+STATS_EXIT_COUNT = "SELECT COUNT(*) FROM automated_signals WHERE event_type LIKE 'EXIT_%%'"
+STATS_AVG_MFE = "SELECT AVG(final_mfe) FROM automated_signals WHERE final_mfe IS NOT NULL"
+
+GAP_NO_MAE = """
+SELECT DISTINCT e.trade_id, e.entry_price, e.stop_loss, e.direction
+FROM automated_signals e
+WHERE e.event_type = 'ENTRY'
+AND NOT EXISTS (
+    SELECT 1 FROM automated_signals x
+    WHERE x.trade_id = e.trade_id AND x.event_type LIKE 'EXIT_%%'
+)
+AND NOT EXISTS (
+    SELECT 1 FROM automated_signals m
+    WHERE m.trade_id = e.trade_id
+    AND m.mae_global_r IS NOT NULL
+    AND m.mae_global_r != 0
+)
+"""
+
+GAP_NO_MFE_UPDATE = """
+SELECT DISTINCT e.trade_id, e.entry_price, e.stop_loss, e.direction, m.last_mfe_update
+FROM automated_signals e
+LEFT JOIN LATERAL (
+    SELECT MAX(timestamp) AS last_mfe_update
+    FROM automated_signals
+    WHERE trade_id = e.trade_id AND event_type = 'MFE_UPDATE'
+) m ON TRUE
+WHERE e.event_type = 'ENTRY'
+AND NOT EXISTS (
+    SELECT 1 FROM automated_signals x
+    WHERE x.trade_id = e.trade_id AND x.event_type LIKE 'EXIT_%%'
+)
+AND (m.last_mfe_update IS NULL OR m.last_mfe_update < NOW() - INTERVAL '2 minutes')
+"""
+
+LOAD_V2_TRADES = """
+SELECT trade_id, event_type, direction, entry_price, stop_loss, be_mfe, no_be_mfe, session, timestamp
+FROM automated_signals
+WHERE trade_id IS NOT NULL
+ORDER BY trade_id, timestamp ASC
+"""
+
+
+def _vacuum_analyze(url):
+    conn = psycopg2.connect(url)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("VACUUM ANALYZE automated_signals")
+        cur.execute("""
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass('automated_signals')
+        """)
+        for (part,) in cur.fetchall():
+            cur.execute(f"VACUUM ANALYZE {part}")
+    conn.close()
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def explain(conn, sql, params=None):
+    with conn.cursor() as cur:
+        cur.execute("EXPLAIN (FORMAT JSON) " + sql, params or ())
+        return cur.fetchone()[0][0]["Plan"]
+
+
+def seq_scanned(conn, plan):
+    """Relations with rows that are read by a Seq Scan (empty future partitions are ignored)"""
+    names = [n["Relation Name"] for n in _plan_nodes(plan)
+             if n["Node Type"] == "Seq Scan" and n.get("Relation Name", "").startswith("automated_signals")]
+    if not names:
+        return []
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT relname FROM pg_class
+            WHERE relname = ANY(%s) AND relnamespace = %s::regnamespace AND reltuples > 0
+        """, (names, SCHEMA))
+        return sorted(row[0] for row in cur.fetchall())
+
+
+def scanned_relations(plan):
+    return {n["Relation Name"] for n in _plan_nodes(plan) if n.get("Relation Name")}
+
+
+@pytest.fixture(scope="module")
+def seeded_db(module_scratch_schemas):
+    url = module_scratch_schemas.create(SCHEMA, [CREATE_TABLE_SQL])
+    conn = psycopg2.connect(url)
+    with conn.cursor() as cur:
+        cur.execute(SEED_SQL, {"trades": EVENT_COUNT // EVENTS_PER_TRADE, "last": EVENTS_PER_TRADE - 1})
+    conn.commit()
+    run_migration(conn, partition=False)
+    conn.close()
+    _vacuum_analyze(url)
+    return {"url": url, "partitioned": False}
+
+
+@pytest.fixture(scope="module", params=["indexed", "partitioned"])
+def db(request, seeded_db):
+    if request.param == "partitioned" and not seeded_db["partitioned"]:
+        conn = psycopg2.connect(seeded_db["url"])
+        run_migration(conn, partition=True)
+        conn.close()
+        _vacuum_analyze(seeded_db["url"])
+        seeded_db["partitioned"] = True
+    conn = psycopg2.connect(seeded_db["url"])
+    yield request.param, conn
+    conn.close()
+
+
+def test_seeded_event_count(db):
+    _, conn = db
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM automated_signals")
+        assert cur.fetchone()[0] == (EVENT_COUNT // EVENTS_PER_TRADE) * EVENTS_PER_TRADE
+
+
+def test_fetch_events_for_range_uses_index(db):
+    """Single-day hub query: index range scan, and only one partition touched"""
+    layout, conn = db
+    plan = explain(conn, FETCH_EVENTS_FOR_RANGE, ("2025-02-10", "2025-02-10"))
+    assert seq_scanned(conn, plan) == []
+    if layout == "partitioned":
+        assert scanned_relations(plan) == {"automated_signals_y2025m02"}
+
+
+def test_fetch_events_for_month_prunes_partitions(db):
+    """A month-wide range reads one partition instead of the whole table"""
+    layout, conn = db
+    if layout != "partitioned":
+        pytest.skip("month-wide ranges rely on partition pruning")
+    plan = explain(conn, FETCH_EVENTS_FOR_RANGE, ("2025-03-01", "2025-03-31"))
+    assert scanned_relations(plan) == {"automated_signals_y2025m03"}
+
+
+@pytest.mark.parametrize("sql", [STATS_ENTRY_COUNT, STATS_EXIT_COUNT, STATS_AVG_MFE],
+                         ids=["entry_count", "exit_count", "avg_final_mfe"])
+def test_stats_queries_are_index_only(db, sql):
+    _, conn = db
+    plan = explain(conn, sql)
+    node_types = {n["Node Type"] for n in _plan_nodes(plan)}
+    assert seq_scanned(conn, plan) == []
+    assert "Index Only Scan" in node_types
+
+
+@pytest.mark.parametrize("sql", [GAP_NO_MAE, GAP_NO_MFE_UPDATE], ids=["no_mae", "no_mfe_update"])
+def test_gap_detection_avoids_seq_scans(db, sql):
+    _, conn = db
+    plan = explain(conn, sql)
+    assert seq_scanned(conn, plan) == []
+
+
+def test_load_v2_trades_needs_no_sort(db):
+    """Covering index delivers rows in (trade_id, timestamp) order"""
+    _, conn = db
+    plan = explain(conn, LOAD_V2_TRADES)
+    node_types = [n["Node Type"] for n in _plan_nodes(plan)]
+    assert "Sort" not in node_types
+    assert seq_scanned(conn, plan) == []
+
+
+def test_partitioning_keeps_checks_triggers_and_late_months(scratch_schemas):
+    """Converting keeps CHECKs and trigger-maintained counters; a late month leaves the default partition"""
+    from automated_signals_stats import read_counter_stats, recount_stats
+
+    url = scratch_schemas.create("as_partition_test", [
+        CREATE_TABLE_SQL,
+        "ALTER TABLE automated_signals ADD CONSTRAINT automated_signals_event_type_check CHECK (event_type <> '')",
+        "INSERT INTO automated_signals (trade_id, event_type, signal_date) VALUES ('T1', 'ENTRY', '2025-01-06')",
+        "database/automated_signals_stats_counters.sql",
+    ])
+    conn = psycopg2.connect(url)
+    try:
+        run_migration(conn, partition=True)
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO automated_signals (trade_id, event_type, final_mfe, signal_date) VALUES
+                    ('T1', 'EXIT_SL', 1.5, '2025-01-06'), ('T2', 'ENTRY', NULL, '2031-05-02'),
+                    ('T2', 'EXIT_TP', 2, '2031-05-02')
+            """)
+            counters = read_counter_stats(cur)
+            assert counters == recount_stats(cur) and counters['trade_count'] == 2
+            cur.execute("SELECT tableoid::regclass::text FROM automated_signals WHERE trade_id = 'T2'")
+            assert {row[0] for row in cur.fetchall()} == {"automated_signals_default"}
+        conn.commit()
+        with conn.cursor() as cur, pytest.raises(psycopg2.errors.CheckViolation):
+            cur.execute("INSERT INTO automated_signals (event_type, signal_date) VALUES ('', '2025-01-06')")
+        conn.rollback()
+
+        # The next deploy creates the uncovered month and moves its rows in
+        run_migration(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT tableoid::regclass::text, COUNT(*) FROM automated_signals GROUP BY 1 ORDER BY 1")
+            assert cur.fetchall() == [("automated_signals_y2025m01", 2), ("automated_signals_y2031m05", 2)]
+            assert read_counter_stats(cur) == recount_stats(cur)
+    finally:
+        conn.close()
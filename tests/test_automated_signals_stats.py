@@ -0,0 +1,144 @@
+"""
+Tests for the automated signals stats counters and single-flight cache
+
+The trigger/reconciliation test needs a scratch Postgres database; set
+TEST_DATABASE_URL to run it.
+"""
+
+import sys
+sys.path.append('.')
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from automated_signals_stats import (
+    SingleFlightTTLCache, bind_stats_db, build_dashboard_stats, load_stats_snapshot, read_counter_stats,
+    recount_stats, reconcile_stats_counters, stats_cache,
+)
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE automated_signals (
+        id SERIAL PRIMARY KEY,
+        trade_id VARCHAR(100),
+        event_type VARCHAR(20),
+        final_mfe DECIMAL(10, 2),
+        timestamp TIMESTAMPTZ DEFAULT NOW()
+    )
+    """,
+    # A row from before the counters existed, picked up by the install backfill
+    "INSERT INTO automated_signals (trade_id, event_type) VALUES ('T0', 'ENTRY')",
+    'database/automated_signals_stats_counters.sql',
+]
+
+
+def test_single_flight_loads_once_for_concurrent_callers():
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return len(calls)
+
+    cache = SingleFlightTTLCache(slow_loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [1] * 8
+
+
+def test_cache_expires_and_invalidates():
+    counter = iter(range(100))
+    cache = SingleFlightTTLCache(lambda: next(counter), ttl=0.01)
+    assert cache.get() == 0
+    assert cache.get() == 0
+    time.sleep(0.02)
+    assert cache.get() == 1
+
+    cache.ttl = 60
+    cache.invalidate()
+    assert cache.get() == 2
+    assert cache.get() == 2
+
+
+def test_failed_refresh_keeps_serving_after_recovery():
+    state = {'fail': True}
+
+    def loader():
+        if state['fail']:
+            raise RuntimeError('db down')
+        return 'ok'
+
+    cache = SingleFlightTTLCache(loader, ttl=60)
+    with pytest.raises(RuntimeError):
+        cache.get()
+    state['fail'] = False
+    assert cache.get() == 'ok'
+
+
+def test_build_dashboard_stats_shape():
+    stats = build_dashboard_stats({
+        'total_events': 10, 'trade_count': 3, 'entry_count': 3, 'exit_count': 1,
+        'final_mfe_count': 2, 'final_mfe_sum': 3.333, 'last_event_at': None
+    })
+    assert stats['total_signals'] == 10
+    assert stats['active_count'] == 2
+    assert stats['completed_count'] == 1
+    assert stats['avg_mfe'] == 1.67
+
+
+def test_triggers_track_recount_and_reconcile_repairs_drift(conn, pg_url):
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        INSERT INTO automated_signals (trade_id, event_type, final_mfe) VALUES
+            ('T1', 'ENTRY', NULL), ('T1', 'MFE_UPDATE', NULL), ('T1', 'EXIT_SL', 1.5),
+            ('T2', 'ENTRY', NULL), ('T2', 'EXIT_BE', 0.5), (NULL, 'ENTRY', NULL)
+    """)
+    cursor.execute("UPDATE automated_signals SET event_type = 'EXIT_TP', final_mfe = 3 "
+                   "WHERE trade_id = 'T1' AND event_type = 'MFE_UPDATE'")
+    cursor.execute("DELETE FROM automated_signals WHERE trade_id = 'T2'")
+
+    counters = read_counter_stats(cursor)
+    assert counters == recount_stats(cursor)
+    assert counters['trade_count'] == 2
+    assert counters['exit_count'] == 2
+
+    cursor.execute("UPDATE automated_signals_stats_counters SET total_events = total_events + 5, "
+                   "trade_count = trade_count - 1 WHERE slot = (SELECT MIN(slot) FROM automated_signals_stats_counters)")
+
+    result = reconcile_stats_counters(pg_url)
+    assert not result['in_sync'] and result['repaired']
+    assert result['drift']['total_events'] == -5
+    assert read_counter_stats(cursor) == recount_stats(cursor)
+    assert reconcile_stats_counters(pg_url)['in_sync']
+
+
+def test_snapshot_reads_app_connection_and_reports_missing_table(pg_url):
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    # The app's RailwayDB connection hands out RealDictCursors by default
+    db = SimpleNamespace(conn=psycopg2.connect(pg_url, cursor_factory=RealDictCursor))
+    try:
+        bind_stats_db(db)
+        snapshot = stats_cache.get()
+        assert snapshot['total_events'] == 1 and snapshot['last_event_at'] is not None
+        # The read doesn't leave the shared connection idle in transaction
+        assert db.conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        with db.conn.cursor() as cur:
+            cur.execute("DROP TABLE automated_signals CASCADE")
+        assert load_stats_snapshot(db.conn) is None
+    finally:
+        db.conn.close()
+        bind_stats_db(None)
+    assert stats_cache.get() is None
@@ -0,0 +1,161 @@
+"""
+Tests for the bar Merkle index: range cover, SQL/Python encoding parity, incremental
+refresh vs full rebuild, and localization of changed bars
+
+The index tests need a scratch Postgres database; set TEST_DATABASE_URL to run them.
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from services.bar_merkle_index import (
+    bar_entry, diff_versions, leaf_hash, range_hash, range_segments, refresh_range, split_entries, verify_range
+)
+
+SCHEMA_SQL = [
+    'database/databento_ohlcv_schema.sql',
+    'database/phase_a_bars_versioning_migration.sql',
+    'database/phase_c_clean_ohlcv_overlay_schema.sql',
+    'database/bar_merkle_index.sql',
+]
+SYMBOL = 'GLBX.MDP3:NQ'
+T0 = datetime(2024, 12, 30, 22, 0, tzinfo=timezone.utc)
+
+
+def test_range_segments_cover_edges_days_months_years():
+    segments = range_segments('2024-12-31T05:03:30Z', '2026-02-03T11:00:00Z')
+    assert segments == [
+        ('day', date(2024, 12, 31), 304, 1439),
+        ('year', date(2025, 1, 1), None, None),
+        ('month', date(2026, 1, 1), None, None),
+        ('day', date(2026, 2, 1), None, None),
+        ('day', date(2026, 2, 2), None, None),
+        ('day', date(2026, 2, 3), 0, 660),
+    ]
+    assert range_segments('2025-03-01T00:00:00Z', '2025-03-31T23:59:00Z') == [('month', date(2025, 3, 1), None, None)]
+    assert range_segments('2025-03-02T10:00:00Z', '2025-03-02T10:00:00Z') == [('day', date(2025, 3, 2), 600, 600)]
+    assert range_segments('2025-03-02T10:00:30Z', '2025-03-02T10:00:40Z') == []
+
+
+def test_bar_entry_encoding():
+    entry = bar_entry(datetime(2025, 1, 6, 14, 31, tzinfo=timezone.utc), '21000.25', 21001, 20999.5, '21000.0000004', 12.9)
+    assert len(entry) == 10 and int.from_bytes(entry[:2], 'big') == 14 * 60 + 31
+    # Prices are compared at 6 dp, so representation noise below that does not change the digest
+    assert entry == bar_entry('2025-01-06T14:31:00Z', 21000.25, '21001.000000', '20999.50', 21000, 12)
+    assert entry != bar_entry('2025-01-06T14:31:00Z', 21000.25, 21001, 20999.5, 21000.25, 12)
+    assert split_entries(entry) == {871: entry[2:]}
+
+
+def make_bars(seed=1, days=40, step=7):
+    rng = random.Random(seed)
+    bars = []
+    for minute in range(0, 60 * 24 * days, step):
+        price = round(21000 + rng.random() * 10, 2)
+        bars.append((T0 + timedelta(minutes=minute), price, price + 1, price - 1, price, rng.randint(0, 1000)))
+    return bars
+
+
+BARS = make_bars()
+
+
+@pytest.fixture
+def conn(conn):
+    from psycopg2.extras import execute_values
+
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO market_bars_ohlcv_1m (symbol, ts, ts_ms, open, high, low, close, volume, dataset_version_id)
+            VALUES %s
+        """, [(SYMBOL, b[0], int(b[0].timestamp() * 1000), *b[1:], 'v1') for b in BARS])
+        execute_values(cur, """
+            INSERT INTO market_bars_ohlcv_1m_clean (symbol, ts, open, high, low, close, volume) VALUES %s
+        """, [(SYMBOL, *b) for b in BARS])
+    refresh_range(conn, SYMBOL, 'raw')
+    refresh_range(conn, SYMBOL, 'clean')
+    conn.commit()
+    return conn
+
+
+def snapshot(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT dataset_version_id, day, leaf_hash, bar_digests FROM bar_merkle_days ORDER BY 1, 2")
+        days = [(r[0], r[1], bytes(r[2]), bytes(r[3])) for r in cur.fetchall()]
+        cur.execute("""
+            SELECT dataset_version_id, level, period, node_hash, child_count, bar_count
+            FROM bar_merkle_nodes ORDER BY 1, 2, 3
+        """)
+        nodes = [(r[0], r[1], r[2], bytes(r[3]), r[4], r[5]) for r in cur.fetchall()]
+    return days, nodes
+
+
+def test_sql_leaves_match_python_reference(conn):
+    with conn.cursor() as cur:
+        cur.execute("SELECT day, leaf_hash, bar_digests FROM bar_merkle_days WHERE dataset_version_id = 'v1' ORDER BY day")
+        rows = cur.fetchall()
+    assert len(rows) == 41
+    for day, leaf, digests in rows:
+        expected = b''.join(bar_entry(*bar) for bar in BARS if bar[0].date() == day)
+        assert bytes(digests) == expected
+        assert bytes(leaf) == leaf_hash(day, expected)
+
+
+def test_range_hash_matches_across_versions_and_counts_bars(conn):
+    start, end = '2024-12-31T05:03:30Z', '2025-02-03T11:00:00Z'
+    raw = range_hash(conn, SYMBOL, 'v1', start, end)
+    clean = range_hash(conn, SYMBOL, 'clean', start, end)
+    assert raw['merkle_root'] == clean['merkle_root']
+    lo = datetime(2024, 12, 31, 5, 4, tzinfo=timezone.utc)
+    hi = datetime(2025, 2, 3, 11, 0, tzinfo=timezone.utc)
+    assert raw['bar_count'] == sum(1 for bar in BARS if lo <= bar[0] <= hi)
+    assert raw['nodes_read'] <= raw['segments'] == 5
+    assert range_hash(conn, SYMBOL, 'v1', start, '2025-02-03T11:07:00Z')['merkle_root'] != raw['merkle_root']
+
+
+def test_incremental_refresh_matches_full_rebuild(conn):
+    moved = BARS[3000][0]
+    with conn.cursor() as cur:
+        cur.execute("UPDATE market_bars_ohlcv_1m_clean SET close = close + 0.25 WHERE ts = %s", (moved,))
+        cur.execute("DELETE FROM market_bars_ohlcv_1m_clean WHERE ts >= %s AND ts < %s",
+                    (datetime(2025, 1, 20, tzinfo=timezone.utc), datetime(2025, 1, 21, tzinfo=timezone.utc)))
+    assert refresh_range(conn, SYMBOL, 'clean', moved, moved) == 1
+    assert refresh_range(conn, SYMBOL, 'clean', '2025-01-20T00:00:00Z', '2025-01-20T23:59:00Z') == 1
+    incremental = snapshot(conn)
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM bar_merkle_days")
+        cur.execute("DELETE FROM bar_merkle_nodes")
+    refresh_range(conn, SYMBOL, 'raw')
+    refresh_range(conn, SYMBOL, 'clean')
+    assert snapshot(conn) == incremental
+    assert refresh_range(conn, SYMBOL, 'clean') == 0
+
+
+def test_changed_bar_is_localized_by_verify_and_diff(conn):
+    changed = BARS[3000][0]
+    added = datetime(2025, 1, 3, 10, 1, tzinfo=timezone.utc)
+    with conn.cursor() as cur:
+        cur.execute("UPDATE market_bars_ohlcv_1m_clean SET close = close + 0.25 WHERE ts = %s", (changed,))
+        cur.execute("""
+            INSERT INTO market_bars_ohlcv_1m_clean (symbol, ts, open, high, low, close, volume)
+            VALUES (%s, %s, 21000, 21001, 20999, 21000, 5)
+        """, (SYMBOL, added))
+    start, end = '2024-12-30T00:00:00Z', '2025-02-08T23:59:00Z'
+
+    assert verify_range(conn, SYMBOL, 'clean', start, end) == [
+        {'day': '2025-01-03', 'changed': [], 'missing': [], 'extra': [added.isoformat()]},
+        {'day': changed.date().isoformat(), 'changed': [changed.isoformat()], 'missing': [], 'extra': []},
+    ]
+    assert verify_range(conn, SYMBOL, 'v1', start, end) == []
+
+    refresh_range(conn, SYMBOL, 'clean', added, changed)
+    assert verify_range(conn, SYMBOL, 'clean', start, end) == []
+    assert diff_versions(conn, SYMBOL, 'v1', 'clean', start, end) == [
+        {'day': '2025-01-03', 'changed': [], 'missing': [], 'extra': [added.isoformat()]},
+        {'day': changed.date().isoformat(), 'changed': [changed.isoformat()], 'missing': [], 'extra': []},
+    ]
+    # Bars outside the range are not reported
+    assert diff_versions(conn, SYMBOL, 'v1', 'clean', start, '2025-01-03T10:00:00Z') == []
@@ -0,0 +1,109 @@
+"""
+Tests for the 1m bar range index and the signal_metrics_v1 excursion built on it
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bar_range_index import BarRangeIndex, compute_trade_excursion
+
+START = datetime(2025, 3, 3, 0, 0, tzinfo=timezone.utc)
+
+
+def random_rows(n, seed=11):
+    rng = random.Random(seed)
+    price = 20000.0
+    rows = []
+    minute = 0
+    for _ in range(n):
+        minute += rng.choice([1, 1, 1, 2])
+        o = price + rng.uniform(-2, 2)
+        c = o + rng.uniform(-10, 10)
+        rows.append((START + timedelta(minutes=minute), max(o, c) + rng.uniform(0, 5), min(o, c) - rng.uniform(0, 5)))
+        price = c
+    return rows
+
+
+def reference_excursion(rows, direction, entry_ts, exit_ts, entry_price, stop_loss):
+    """backfill_signal_metrics_v1 loop over the bars in the window"""
+    bars = [r for r in rows if entry_ts <= r[0] <= exit_ts]
+    if not bars:
+        return None
+    risk = abs(entry_price - stop_loss)
+    highest = lowest = entry_price
+    mae, be_ts = 0.0, None
+    for ts, high, low in bars:
+        if (low <= stop_loss) if direction == 'Bullish' else (high >= stop_loss):
+            continue
+        highest, lowest = max(highest, high), min(lowest, low)
+        if direction == 'Bullish':
+            mae = min(mae, (lowest - entry_price) / risk)
+            if be_ts is None and highest >= entry_price + risk:
+                be_ts = ts
+        else:
+            mae = min(mae, (entry_price - highest) / risk)
+            if be_ts is None and lowest <= entry_price - risk:
+                be_ts = ts
+    mfe = (highest - entry_price) / risk if direction == 'Bullish' else (entry_price - lowest) / risk
+    return mfe, mae, highest, lowest, be_ts
+
+
+def test_range_and_first_touch_match_scan():
+    rows = random_rows(700)
+    index = BarRangeIndex.from_rows(rows[:500], compact_at=64)
+    for row in rows[500:]:
+        index.append(*row)
+    assert index.static_size > 500 and index.tail_highs.size
+    highs, lows = [r[1] for r in rows], [r[2] for r in rows]
+    rng = random.Random(2)
+
+    for _ in range(400):
+        lo = rng.randint(0, len(rows) - 1)
+        hi = rng.randint(lo, len(rows) - 1)
+        assert index.max_high(lo, hi) == max(highs[lo:hi + 1])
+        assert index.argmin_low(lo, hi) == lo + lows[lo:hi + 1].index(min(lows[lo:hi + 1]))
+        price = rng.uniform(19900, 20100)
+        above = [i for i in range(lo, hi + 1) if highs[i] >= price]
+        below = [i for i in range(lo, hi + 1) if lows[i] <= price]
+        assert index.first_high_at_or_above(lo, hi, price) == (above[0] if above else None)
+        assert index.first_low_at_or_below(lo, hi, price) == (below[0] if below else None)
+
+
+def test_append_updates_forming_bar_and_rejects_old_bars():
+    rows = random_rows(10)
+    index = BarRangeIndex.from_rows(rows)
+    ts = rows[-1][0] + timedelta(minutes=1)
+    index.append(ts, 20500.0, 19500.0)
+    index.append(ts, 20600.0, 19400.0)
+    assert len(index) == 11
+    assert index.max_high(0, 10) == 20600.0 and index.min_low(0, 10) == 19400.0
+    assert index.position_range(rows[3][0], rows[5][0]) == (3, 5)
+    assert index.position_range(ts + timedelta(minutes=1), ts + timedelta(minutes=5)) is None
+    with pytest.raises(ValueError):
+        index.append(rows[0][0], 1.0, 0.0)
+
+
+def test_trade_excursion_matches_backfill_loop():
+    rows = random_rows(3000, seed=5)
+    index = BarRangeIndex.from_rows(rows)
+    rng = random.Random(9)
+
+    for _ in range(800):
+        a = rng.randint(0, len(rows) - 2)
+        b = rng.randint(a, min(len(rows) - 1, a + 120))
+        direction = rng.choice(['Bullish', 'Bearish'])
+        entry = rows[a][1] if rng.random() < 0.5 else rows[a][2]
+        risk = rng.uniform(2, 25)
+        stop = entry - risk if direction == 'Bullish' else entry + risk
+
+        got = compute_trade_excursion(index, direction, rows[a][0], rows[b][0], entry, stop)
+        mfe, mae, highest, lowest, be_ts = reference_excursion(rows, direction, rows[a][0], rows[b][0], entry, stop)
+        assert got['no_be_mfe'] == pytest.approx(mfe) and got['be_mfe'] == got['no_be_mfe']
+        assert got['mae_global_r'] == pytest.approx(mae)
+        assert (got['highest_high'], got['lowest_low']) == (highest, lowest)
+        assert got['be_trigger_bar_open_ts'] == be_ts and got['be_triggered'] == (be_ts is not None)
@@ -0,0 +1,139 @@
+"""
+Tests for the multi-timeframe bar rollups: HTF bucket boundaries, rollup parity with
+a direct aggregation of the 1m bars, and incremental refresh vs full rebuild
+
+The rollup tests need a scratch Postgres database; set TEST_DATABASE_URL to run them.
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from market_parity.htf_bias import HTFBiasEngine
+from services.bar_rollups import TIMEFRAMES, bucket_start, fetch_rollup_bars, normalize_timeframe, refresh_rollups
+
+SCHEMA_SQL = [
+    'database/phase_c_clean_ohlcv_overlay_schema.sql',
+    'database/bar_rollups_schema.sql',
+]
+SYMBOL = 'GLBX.MDP3:NQ'
+T0 = datetime(2025, 3, 6, 21, 3, tzinfo=timezone.utc)
+HTF_KEYS = {'5m': '5M', '15m': '15M', '60m': '1H', '240m': '4H', '1d': '1D'}
+
+
+def test_buckets_close_where_htf_bias_closes():
+    engine = HTFBiasEngine(bias_engine_factory=lambda: None)
+    ts = datetime(2025, 3, 9, 0, 0, tzinfo=timezone.utc)
+    for minute in range(0, 3 * 24 * 60, 7):
+        bar = ts + timedelta(minutes=minute)
+        for tf, key in HTF_KEYS.items():
+            closes = bucket_start(bar + timedelta(minutes=1), tf) != bucket_start(bar, tf)
+            assert closes == engine._is_htf_bar_close(bar, key), (bar, tf)
+
+
+def test_normalize_timeframe():
+    assert [normalize_timeframe(tf) for tf in ('5m', '1H', '4h', '240m', '1D', '1m', '3m')] == \
+        ['5m', '60m', '240m', '240m', '1d', None, None]
+
+
+def make_bars(seed=5, minutes=4 * 24 * 60):
+    rng = random.Random(seed)
+    bars, price = [], Decimal('21000.00')
+    for minute in range(minutes):
+        if rng.random() < 0.15:
+            continue  # gaps, like the overnight/maintenance holes in real data
+        price += Decimal(rng.randint(-8, 8)) / 4
+        high, low = price + Decimal(rng.randint(0, 6)) / 4, price - Decimal(rng.randint(0, 6)) / 4
+        bars.append((T0 + timedelta(minutes=minute), price, high, low, price + Decimal(rng.randint(-2, 2)) / 4,
+                     rng.randint(0, 500)))
+    return bars
+
+
+BARS = make_bars()
+
+
+def expected_rollup(bars, tf):
+    buckets = {}
+    for ts, o, h, l, c, v in bars:
+        key = bucket_start(ts, tf)
+        if key not in buckets:
+            buckets[key] = [key, o, h, l, c, v, 1]
+        else:
+            b = buckets[key]
+            b[2], b[3], b[4], b[5], b[6] = max(b[2], h), min(b[3], l), c, b[5] + v, b[6] + 1
+    return [tuple(b) for _, b in sorted(buckets.items())]
+
+
+@pytest.fixture
+def conn(conn):
+    from psycopg2.extras import execute_values
+
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO market_bars_ohlcv_1m_clean (symbol, ts, open, high, low, close, volume) VALUES %s
+        """, [(SYMBOL, *bar) for bar in BARS])
+    conn.commit()
+    return conn
+
+
+def rollup_rows(conn, tf):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT ts, open, high, low, close, volume, bar_count FROM market_bars_ohlcv_rollup
+            WHERE symbol = %s AND tf = %s ORDER BY ts
+        """, (SYMBOL, tf))
+        return cur.fetchall()
+
+
+def test_rollups_match_direct_aggregation(conn):
+    changed = refresh_rollups(conn, SYMBOL)
+    for tf in TIMEFRAMES:
+        expected = expected_rollup(BARS, tf)
+        assert rollup_rows(conn, tf) == expected, tf
+        assert changed[tf] == len(expected)
+    assert refresh_rollups(conn, SYMBOL) == {tf: 0 for tf in TIMEFRAMES}
+
+
+def test_fallback_aggregation_matches_rollup_reads(conn):
+    start, end = T0 + timedelta(minutes=17), T0 + timedelta(days=2, minutes=3)
+    with conn.cursor() as cur:
+        on_the_fly = {tf: fetch_rollup_bars(cur, SYMBOL, tf, start, end, 50000) for tf in TIMEFRAMES}
+    refresh_rollups(conn, SYMBOL)
+    with conn.cursor() as cur:
+        for tf in TIMEFRAMES:
+            stored = fetch_rollup_bars(cur, SYMBOL, tf, start, end, 50000)
+            assert stored == on_the_fly[tf], tf
+            assert stored and start <= stored[0][0] and stored[-1][0] <= end
+
+
+def test_incremental_refresh_matches_full_rebuild(conn):
+    cutoff = T0 + timedelta(days=3, hours=5, minutes=2)
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM market_bars_ohlcv_1m_clean WHERE ts >= %s", (cutoff,))
+    refresh_rollups(conn, SYMBOL)
+
+    # New 1m bars land, one existing bar is corrected, then only their window is refreshed
+    late = [bar for bar in BARS if bar[0] >= cutoff]
+    fixed = BARS[500]
+    with conn.cursor() as cur:
+        cur.executemany("""
+            INSERT INTO market_bars_ohlcv_1m_clean (symbol, ts, open, high, low, close, volume)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, [(SYMBOL, *bar) for bar in late])
+        cur.execute("UPDATE market_bars_ohlcv_1m_clean SET high = high + 100 WHERE symbol = %s AND ts = %s",
+                    (SYMBOL, fixed[0]))
+    refresh_rollups(conn, SYMBOL, late[0][0], late[-1][0])
+    refresh_rollups(conn, SYMBOL, fixed[0], fixed[0])
+    incremental = {tf: rollup_rows(conn, tf) for tf in TIMEFRAMES}
+
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM market_bars_ohlcv_rollup")
+    refresh_rollups(conn, SYMBOL)
+    assert {tf: rollup_rows(conn, tf) for tf in TIMEFRAMES} == incremental
+    patched = [(ts, o, h + 100 if ts == fixed[0] else h, l, c, v) for ts, o, h, l, c, v in BARS]
+    assert incremental['1d'] == expected_rollup(patched, '1d')
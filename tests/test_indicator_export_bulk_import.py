@@ -0,0 +1,174 @@
+"""
+Tests for the set-based indicator export import against the per-row reference path
+
+The ledger tests need a scratch Postgres database; set TEST_DATABASE_URL to run them.
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+import random
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from services.indicator_export_importer import (
+    canonical_trade_ids, import_all_signals_export, import_indicator_export_v2,
+    normalize_indicator_export_v2, sessions_for
+)
+
+SCHEMA_SQL = [
+    'database/indicator_export_schema.sql',
+    "ALTER TABLE confirmed_signals_ledger ADD COLUMN symbol VARCHAR(50) DEFAULT 'NQH2025'",
+]
+BASE_MS = 1741012200000  # 2025-03-03 09:30 New York
+
+
+def test_vectorized_ids_and_sessions_match_zoneinfo():
+    rng = random.Random(0)
+    # Spans both 2025 DST transitions
+    times = [BASE_MS + rng.randrange(0, 300 * 86400000) for _ in range(500)]
+    directions = [rng.choice(['Bullish', 'Bearish', 'bull', 'BEAR']) for _ in times]
+    expected_ids, expected_sessions = [], []
+    for ms, direction in zip(times, directions):
+        dt = datetime.fromtimestamp(ms / 1000, tz=ZoneInfo("America/New_York"))
+        suffix = "BULLISH" if direction.lower().startswith('bull') else "BEARISH"
+        expected_ids.append(f"{dt.strftime('%Y%m%d')}_{dt.strftime('%H%M%S')}000_{suffix}")
+        h, m = dt.hour, dt.minute
+        if 20 <= h <= 23:
+            expected_sessions.append("ASIA")
+        elif 0 <= h <= 5:
+            expected_sessions.append("LONDON")
+        elif h == 6 or (h == 8 and m <= 29):
+            expected_sessions.append("NY PRE")
+        elif (h == 8 and m >= 30) or (9 <= h <= 11):
+            expected_sessions.append("NY AM")
+        elif h == 12:
+            expected_sessions.append("NY LUNCH")
+        elif 13 <= h <= 15:
+            expected_sessions.append("NY PM")
+        else:
+            expected_sessions.append("AFTER_HOURS")
+    assert canonical_trade_ids(times, directions) == expected_ids
+    assert sessions_for(times) == expected_sessions
+
+
+def test_duplicates_fold_like_consecutive_upserts():
+    signals = [
+        {'triangle_time': BASE_MS, 'direction': 'Bullish', 'entry': '100.5', 'mae': '-0.4', 'completed': 'false'},
+        {'triangle_time': BASE_MS + 400, 'direction': 'Bullish', 'entry': None, 'mae': '0.3', 'completed': True},
+        {'triangle_time': 'x', 'direction': 'Bullish'},
+        {'triangle_time': BASE_MS, 'direction': ''},
+    ]
+    rows, skipped, mismatches = normalize_indicator_export_v2(signals)
+    assert skipped == 2 and len(rows) == 1
+    row = rows[0]
+    assert row['triangle_time_ms'] == BASE_MS and row['entry'] == 100.5
+    assert row['mae'] == 0.0 and row['completed'] is True
+
+
+def make_v2_signals(rng, count):
+    signals = []
+    for _ in range(count):
+        ms = BASE_MS + rng.randrange(0, 40) * 60000 + rng.choice([0, 250])
+        signals.append({
+            'trade_id': rng.choice([None, 'stale-id']),
+            'triangle_time': rng.choice([ms, str(ms), ms, 'bad']),
+            'direction': rng.choice(['Bullish', 'Bearish', 'Bullish', None]),
+            'confirmation_time': rng.choice([None, ms + 120000, 'x']),
+            'date': rng.choice([None, '2025-03-03', '03/03/2025']),
+            'session': rng.choice([None, 'NY AM']),
+            'entry': rng.choice([None, 0, '20125.25', 20130.5]),
+            'stop': rng.choice([None, 20100.0]),
+            'be_mfe': rng.choice([None, round(rng.uniform(0, 3), 4)]),
+            'no_be_mfe': rng.choice([None, round(rng.uniform(0, 5), 4)]),
+            'mae': rng.choice([None, round(rng.uniform(-1, 0.3), 4)]),
+            'completed': rng.choice([None, 'true', 'false', True, False]),
+            'symbol': rng.choice([None, 'NQ1!']),
+        })
+    return signals
+
+
+def make_all_signals(rng, count):
+    signals = []
+    for _ in range(count):
+        ms = BASE_MS + rng.randrange(0, 40) * 60000
+        signals.append({
+            'trade_id': rng.choice([f"T{ms}", f"T{ms}", None]),
+            'signal_time': rng.choice([ms, str(ms), 'bad']),
+            'direction': rng.choice(['Bullish', 'Bearish']),
+            'status': rng.choice(['PENDING', 'CONFIRMED', 'CANCELLED', 'COMPLETED']),
+            'confirmation_time': rng.choice([None, ms + 60000]),
+            'bars_to_confirm': rng.choice([None, '3', 5]),
+            'session': rng.choice([None, None, 'NY AM']),
+            'entry': rng.choice([None, 'null', 20125.25]),
+            'stop': rng.choice([None, 20100.5]),
+            'risk': rng.choice([None, '24.75']),
+            'htf_daily': rng.choice([None, 'Bullish', 'Bearish']),
+            'htf_1h': rng.choice([None, 'Neutral']),
+        })
+    return signals
+
+
+@pytest.fixture
+def ledgers(scratch_schemas):
+    """The same ledger tables twice: one for the per-row path, one for the bulk path"""
+    import psycopg2
+
+    conns = {name: psycopg2.connect(scratch_schemas.create(f"indicator_import_{name}", SCHEMA_SQL))
+             for name in ('rows', 'bulk')}
+    try:
+        yield conns
+    finally:
+        for conn in conns.values():
+            conn.close()
+
+
+def store_batch(conn, event_type, signals, number):
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO indicator_export_batches (event_type, batch_number, payload_json, payload_sha256, is_valid)
+            VALUES (%s, %s, %s, %s, TRUE) RETURNING id
+        """, (event_type, number, json.dumps({'signals': signals}), f"{event_type}-{number}"))
+        batch_id = cur.fetchone()[0]
+    conn.commit()
+    return batch_id
+
+
+def ledger(conn, table):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT * FROM {table} ORDER BY trade_id")
+        columns = [d[0] for d in cur.description]
+        rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+    conn.commit()
+    for row in rows:
+        row.pop('updated_at')
+    return rows
+
+
+@pytest.mark.parametrize('event_type,make_signals,importer,table', [
+    ('INDICATOR_EXPORT_V2', make_v2_signals, import_indicator_export_v2, 'confirmed_signals_ledger'),
+    ('ALL_SIGNALS_EXPORT', make_all_signals, import_all_signals_export, 'all_signals_ledger'),
+])
+def test_bulk_import_leaves_same_ledger_as_row_path(ledgers, event_type, make_signals, importer, table):
+    rng = random.Random(5)
+    for number in range(4):
+        signals = make_signals(rng, 150)
+        row_result = importer(store_batch(ledgers['rows'], event_type, signals, number),
+                              conn=ledgers['rows'], bulk=False)
+        bulk_result = importer(store_batch(ledgers['bulk'], event_type, signals, number),
+                               conn=ledgers['bulk'])
+        assert row_result['success'] and bulk_result['success']
+        assert bulk_result['inserted'] == row_result['inserted']
+        assert bulk_result['skipped_invalid'] == row_result['skipped_invalid']
+        assert (bulk_result['updated'] + bulk_result['unchanged'] + bulk_result['merged_duplicates']
+                == row_result['updated'])
+        assert ledger(ledgers['bulk'], table) == ledger(ledgers['rows'], table)
+
+    # Re-importing the last batch changes nothing but last_seen_batch_id
+    again = importer(store_batch(ledgers['bulk'], event_type, signals, 99), conn=ledgers['bulk'])
+    assert again['inserted'] == 0 and again['updated'] == 0
+    assert again['unchanged'] == len({r['trade_id'] for r in ledger(ledgers['bulk'], table)
+                                      if r['last_seen_batch_id'] == again['batch_id']})
@@ -0,0 +1,292 @@
+"""
+Tests for the bulk level-hit evaluator: per-level parity with a day-by-day
+reference loop, and the backfill round trip
+through Postgres (New York day boundaries, one upsert, idempotent re-runs)
+
+The backfill test needs a scratch Postgres database; set TEST_DATABASE_URL to run it.
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+import os
+import random
+from types import SimpleNamespace
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from level_hit_evaluator import (
+    DAY_SECONDS, DEFAULT_SYMBOL, HIT_TOLERANCE, backfill_level_hits, evaluate_level_hits, level_hit_rows
+)
+
+NY = ZoneInfo('America/New_York')
+
+
+def reference_level(day_bars, level_type, level, tolerance=HIT_TOLERANCE):
+    """One level against its day's (time, open, high, low) bars, loop by loop"""
+    day_high = max(b[2] for b in day_bars)
+    day_low = min(b[3] for b in day_bars)
+    if level_type == 'support':
+        hit = (day_low <= level + tolerance) and (day_low >= level - tolerance)
+        overshoot = max(0.0, level - day_low)
+    elif level_type == 'resistance':
+        hit = (day_high >= level - tolerance) and (day_high <= level + tolerance)
+        overshoot = max(0.0, day_high - level)
+    else:
+        hit = day_low <= level <= day_high
+        overshoot = max(0.0, level - day_low) if day_bars[0][1] >= level else max(0.0, day_high - level)
+
+    touch, low, high = None, float('inf'), float('-inf')
+    for t, _, h, l in day_bars:
+        low, high = min(low, l), max(high, h)
+        if level_type == 'support' and l <= level + tolerance:
+            touch = (t, l)
+        elif level_type == 'resistance' and h >= level - tolerance:
+            touch = (t, h)
+        elif level_type == 'pivot' and low <= level <= high:
+            touch = (t, level)
+        if touch:
+            break
+    return hit, touch, min(abs(day_high - level), abs(day_low - level)), overshoot
+
+
+def make_bars(seed, days=12):
+    """1m bars with overnight gaps, a missing day and wide and flat days"""
+    rng = random.Random(seed)
+    times, opens, highs, lows = [], [], [], []
+    price = 21000.0
+    for day in range(days):
+        if day == 4:
+            continue
+        minute = rng.randint(0, 60)
+        while minute < 24 * 60:
+            step = rng.choice([0.0, 0.25, -0.25, 1.0, -1.0, 3.0, -3.0]) * (0 if day == 7 else 1)
+            o = price
+            price += step
+            times.append((20000 + day) * DAY_SECONDS + minute * 60)
+            opens.append(o)
+            highs.append(max(o, price) + rng.choice([0, 0.25, 0.5]) * (day != 7))
+            lows.append(min(o, price) - rng.choice([0, 0.25, 0.5]) * (day != 7))
+            minute += rng.choice([1, 1, 1, 2, 5])
+    return {'time': np.array(times, dtype=np.int64), 'open': np.array(opens), 'high': np.array(highs),
+            'low': np.array(lows)}
+
+
+def make_levels(bars, seed, count=600):
+    rng = random.Random(seed)
+    days = sorted(set((bars['time'] // DAY_SECONDS).tolist())) + [20004, 19999, 20100]
+    level_days, types, levels = [], [], []
+    for _ in range(count):
+        day = rng.choice(days)
+        in_day = bars['time'] // DAY_SECONDS == day
+        center = float(np.median(bars['low'][in_day])) if in_day.any() else 21000.0
+        level_days.append(day)
+        types.append(rng.choice(['support', 'resistance', 'pivot']))
+        levels.append(round((center + rng.uniform(-60, 60)) * 4) / 4)
+    return level_days, types, levels
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_matches_day_by_day_loop(seed):
+    bars = make_bars(seed)
+    level_days, types, levels = make_levels(bars, seed)
+    result = evaluate_level_hits(level_days, types, levels, bars)
+    rows = list(zip(bars['time'].tolist(), bars['open'].tolist(), bars['high'].tolist(), bars['low'].tolist()))
+    for i, (day, level_type, level) in enumerate(zip(level_days, types, levels)):
+        day_bars = [row for row in rows if row[0] // DAY_SECONDS == day]
+        if not day_bars:
+            assert not result['evaluated'][i] and result['touch'][i] == -1
+            continue
+        hit, touch, distance, overshoot = reference_level(day_bars, level_type, level)
+        assert result['evaluated'][i]
+        assert result['actual_hit'][i] == hit, (day, level_type, level)
+        assert result['distance'][i] == pytest.approx(distance)
+        assert result['overshoot'][i] == pytest.approx(overshoot)
+        if touch is None:
+            assert result['touch'][i] == -1
+        else:
+            assert bars['time'][result['touch'][i]] == touch[0], (day, level_type, level)
+            assert result['price_at_hit'][i] == touch[1]
+
+
+def test_unknown_types_and_empty_inputs():
+    bars = make_bars(4, days=3)
+    result = evaluate_level_hits([20000, 20000], ['fvg', 'support'], [21000.0, 21000.0], bars)
+    assert result['evaluated'].tolist() == [False, True]
+    empty = {key: np.array([], dtype=bars[key].dtype) for key in bars}
+    assert not evaluate_level_hits([20000], ['support'], [21000.0], empty)['evaluated'].any()
+    assert level_hit_rows([], bars) == []
+
+
+LEVEL_TABLES_SQL = """
+CREATE TABLE market_bars_ohlcv_1m_clean (
+    ts TIMESTAMPTZ NOT NULL,
+    symbol TEXT NOT NULL,
+    open NUMERIC(10, 2) NOT NULL,
+    high NUMERIC(10, 2) NOT NULL,
+    low NUMERIC(10, 2) NOT NULL,
+    close NUMERIC(10, 2) NOT NULL,
+    volume BIGINT DEFAULT 0,
+    PRIMARY KEY (symbol, ts)
+);
+CREATE TABLE daily_levels (
+    id SERIAL PRIMARY KEY,
+    date DATE UNIQUE,
+    support_levels JSON,
+    resistance_levels JSON,
+    pivot_level DECIMAL(10,2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE level_hits (
+    id SERIAL PRIMARY KEY,
+    date DATE,
+    level_type VARCHAR(20),
+    predicted_level DECIMAL(10,2),
+    actual_hit BOOLEAN,
+    hit_time TIME,
+    price_at_hit DECIMAL(10,2),
+    distance_from_level DECIMAL(10,2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE level_accuracy (
+    id SERIAL PRIMARY KEY,
+    level_type VARCHAR(20),
+    total_predictions INTEGER,
+    total_hits INTEGER,
+    accuracy_percentage DECIMAL(5,2),
+    confidence_score DECIMAL(5,2),
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+SCHEMA_SQL = [LEVEL_TABLES_SQL, os.path.join('database', 'level_hits_schema.sql')]
+
+
+def seed_levels(conn):
+    """1m bars for Nov 1-4 2024 (UTC) and the daily levels of four days; returns the bars"""
+    from psycopg2.extras import execute_values
+
+    # Nov 1-4 2024 spans the DST change; every bar is stored in UTC
+    rng = random.Random(9)
+    bars, price = [], 21000.0
+    ts = datetime(2024, 11, 1, 0, 0, tzinfo=NY).astimezone(timezone.utc)
+    while ts < datetime(2024, 11, 5, 0, 0, tzinfo=NY):
+        o = price
+        price += rng.choice([-1.0, -0.25, 0.25, 1.0])
+        bars.append((ts, DEFAULT_SYMBOL, o, max(o, price) + 0.25, min(o, price) - 0.25, price))
+        ts += timedelta(minutes=1)
+    levels = {
+        date(2024, 11, 1): ([20990.0, 20990.0, 20900.0], [21010.0, 21200.0], 21000.0),
+        date(2024, 11, 3): ([20950.0], [21050.5], 0),
+        date(2024, 11, 4): (["21000", "n/a"], [], 21001.0),
+        date(2024, 11, 6): ([21000.0], [], 21000.0),  # no bars
+    }
+    with conn.cursor() as cur:
+        execute_values(cur, """
+            INSERT INTO market_bars_ohlcv_1m_clean (ts, symbol, open, high, low, close) VALUES %s
+        """, bars)
+        cur.executemany("""
+            INSERT INTO daily_levels (date, support_levels, resistance_levels, pivot_level) VALUES (%s, %s, %s, %s)
+        """, [(d, json.dumps(s), json.dumps(r), p) for d, (s, r, p) in levels.items()])
+    conn.commit()
+    return bars
+
+
+def test_backfill_round_trip(conn):
+    bars = seed_levels(conn)
+    summary = backfill_level_hits(conn, date(2024, 11, 1), date(2024, 11, 30))
+    assert (summary['levels'], summary['evaluated']) == (11, 9)
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT date, level_type, predicted_level::float8, actual_hit, hit_time, price_at_hit::float8,
+                   distance_from_level::float8, overshoot::float8
+            FROM level_hits ORDER BY date, level_type, predicted_level
+        """)
+        stored = cur.fetchall()
+    assert len(stored) == 9 and summary['hits'] == sum(1 for row in stored if row[3])
+
+    for day, level_type, level, hit, hit_time, price_at_hit, distance, overshoot in stored:
+        local = [(b[0].astimezone(NY), b[2], b[3], b[4]) for b in bars if b[0].astimezone(NY).date() == day]
+        day_bars = [((t.hour * 60 + t.minute) * 60, o, h, l) for t, o, h, l in local]
+        expected_hit, touch, expected_distance, expected_overshoot = reference_level(day_bars, level_type, level)
+        assert (hit, distance, overshoot) == (expected_hit, round(expected_distance, 2), round(expected_overshoot, 2))
+        if touch is None:
+            assert (hit_time, price_at_hit) == (None, None)
+        else:
+            assert hit_time == time(touch[0] // 3600, touch[0] // 60 % 60)
+            assert price_at_hit == touch[1]
+
+    # Re-running updates in place
+    assert backfill_level_hits(conn, date(2024, 11, 1), date(2024, 11, 30))['evaluated'] == 9
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM level_hits")
+        assert cur.fetchone()[0] == 9
+
+
+def test_level_tracker_on_the_app_connection(pg_url, monkeypatch):
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    # level_tracker imports database.railway_db, which connects on import
+    monkeypatch.setenv('DATABASE_URL', pg_url)
+    monkeypatch.setenv('DATABASE_SSLMODE', 'disable')
+    from level_tracker import LevelTracker
+
+    # RailwayDB's shared connection hands out RealDictCursors by default
+    conn = psycopg2.connect(pg_url, cursor_factory=RealDictCursor)
+    try:
+        tracker = LevelTracker.__new__(LevelTracker)
+        tracker.db = SimpleNamespace(conn=conn)
+        tracker.setup_tables()
+        seed_levels(conn)
+
+        summary = tracker.evaluate_level_range(date(2024, 11, 1), date(2024, 11, 30))
+        assert (summary['levels'], summary['evaluated']) == (11, 9)
+        assert tracker.check_level_hits(date(2024, 11, 4))['evaluated'] == 2
+        tracker.update_accuracy_scores()
+        tracker.update_accuracy_scores()
+        report = tracker.get_accuracy_report()
+        assert sorted(row[1] for row in report) == ['pivot', 'resistance', 'support']
+        assert sum(row[2] for row in report) == 9
+    finally:
+        conn.close()
+
+
+def test_migration_dedupes_legacy_tables(scratch_schemas):
+    import psycopg2
+    from database.run_level_hits_migration import run_migration
+
+    conn = psycopg2.connect(scratch_schemas.create('level_hits_legacy', [LEVEL_TABLES_SQL]))
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO level_hits (date, level_type, predicted_level, actual_hit)
+                VALUES ('2024-11-01', 'support', 20990, false), ('2024-11-01', 'support', 20990, true),
+                       ('2024-11-01', 'pivot', 21000, true)
+            """)
+            cur.execute("""
+                INSERT INTO level_accuracy (level_type, total_predictions, total_hits)
+                VALUES ('support', 1, 0), ('support', 2, 1)
+            """)
+        conn.commit()
+
+        # Without the migration the upserts have no key to conflict on
+        with pytest.raises(RuntimeError, match='run_level_hits_migration'):
+            backfill_level_hits(conn, date(2024, 11, 1), date(2024, 11, 30))
+
+        assert run_migration(conn) == (2, 1)
+        assert run_migration(conn) == (2, 1)
+        with conn.cursor() as cur:
+            cur.execute("SELECT actual_hit FROM level_hits WHERE level_type = 'support'")
+            assert cur.fetchall() == [(True,)]
+            cur.execute("SELECT total_predictions FROM level_accuracy")
+            assert cur.fetchall() == [(2,)]
+            cur.execute("SELECT COUNT(*) FROM information_schema.columns WHERE table_name = 'level_hits' "
+                        "AND column_name = 'overshoot' AND table_schema = 'level_hits_legacy'")
+            assert cur.fetchone()[0] == 1
+        conn.commit()
+    finally:
+        conn.close()
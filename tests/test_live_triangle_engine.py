@@ -0,0 +1,197 @@
+"""
+Tests for the live (1s stream) triangle pipeline
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from market_parity.engulfing import Bar, detect_engulfing
+from market_parity.get_bias_fvg_ifvg import BiasEngineFvgIfvg
+from market_parity.signal_generation import generate_signals
+from services.live_triangle_engine import (
+    LiveTriangleEngine, LiveTrianglePipeline, MinuteBarAggregator, TriangleParityTracker,
+    trade_id_bar_open,
+)
+
+START = datetime(2025, 3, 3, 14, 30, tzinfo=timezone.utc)
+
+
+def random_bars(n, seed=11):
+    rng = random.Random(seed)
+    price = 20000.0
+    bars = []
+    for i in range(n):
+        o = price
+        c = o + rng.uniform(-12, 12)
+        h = max(o, c) + rng.uniform(0, 6)
+        l = min(o, c) - rng.uniform(0, 6)
+        bars.append({'ts': START + timedelta(minutes=i), 'open': o, 'high': h, 'low': l, 'close': c})
+        price = c
+    return bars
+
+
+def reference_triangles(bars):
+    """Phase C backfill loop with Stage 1 filters (no HTF / engulfing gating)"""
+    engine = BiasEngineFvgIfvg()
+    bias_prev, prev_bar, out = "Neutral", None, []
+    for bar in bars:
+        bias = engine.update(bar)
+        if prev_bar is not None:
+            eng = detect_engulfing(Bar(prev_bar['open'], prev_bar['high'], prev_bar['low'], prev_bar['close']),
+                                   Bar(bar['open'], bar['high'], bar['low'], bar['close']))
+            sig = generate_signals(bias, bias_prev, True, True, eng.bullish, eng.bearish,
+                                   eng.bullish_sweep, eng.bearish_sweep, False, False, False)
+            if sig['show_bull_triangle']:
+                out.append((bar['ts'], 'BULL'))
+            if sig['show_bear_triangle']:
+                out.append((bar['ts'], 'BEAR'))
+        bias_prev, prev_bar = bias, bar
+    return out
+
+
+def ticks_for(bar):
+    """Four 1s ticks that reproduce the bar's OHLC"""
+    base_ms = bar['ts'].timestamp() * 1000
+    return [(bar['open'], base_ms), (bar['high'], base_ms + 15000),
+            (bar['low'], base_ms + 30000), (bar['close'], base_ms + 59000)]
+
+
+def test_engine_matches_backfill_loop():
+    bars = random_bars(400)
+    engine = LiveTriangleEngine()
+    live = [(t['ts'], t['direction']) for bar in bars for t in engine.update(bar)]
+    assert live == reference_triangles(bars)
+    assert live
+
+
+def test_tick_stream_reproduces_bar_triangles():
+    bars = random_bars(200, seed=5)
+    pipeline = LiveTrianglePipeline()
+    for bar in bars:
+        for price, ts_ms in ticks_for(bar):
+            pipeline.aggregator.add_tick(price, ts_ms)
+    pipeline.aggregator.close_due(now_ms=(bars[-1]['ts'] + timedelta(minutes=2)).timestamp() * 1000)
+
+    live = [(t['ts'], t['direction']) for t in pipeline.recent]
+    assert live == reference_triangles(bars)[-len(live):]
+    assert pipeline.engine.bars_processed == len(bars)
+
+
+def test_aggregator_ohlc_timer_close_and_late_ticks():
+    closed = []
+    agg = MinuteBarAggregator(closed.append, close_grace_ms=250)
+    base = START.timestamp() * 1000
+    for price, offset in ((10.0, 0), (12.0, 1000), (9.0, 2000), (11.0, 59000)):
+        agg.add_tick(price, base + offset)
+
+    assert agg.close_due(now_ms=base + 60100) is None
+    bar = agg.close_due(now_ms=base + 60250)
+    assert (bar['open'], bar['high'], bar['low'], bar['close'], bar['ticks']) == (10.0, 12.0, 9.0, 11.0, 4)
+    assert closed == [bar]
+
+    agg.add_tick(13.0, base + 30000)
+    assert agg.late_ticks == 1 and agg.current is None
+
+
+def test_parity_tracker_matches_and_expires():
+    tracker = TriangleParityTracker(match_window_seconds=60)
+    bar_ts = START
+    emitted = bar_ts + timedelta(minutes=1, milliseconds=300)
+    tracker.observe_server({'ts': bar_ts, 'direction': 'BULL', 'emitted_at': emitted, 'latency_ms': 300.0})
+    tracker.observe_indicator(bar_ts, 'BULL', received_at=emitted + timedelta(seconds=2))
+    tracker.observe_indicator(bar_ts + timedelta(minutes=5), 'BEAR', received_at=emitted + timedelta(minutes=5))
+    tracker.observe_server({'ts': bar_ts + timedelta(minutes=9), 'direction': 'BULL',
+                            'emitted_at': emitted + timedelta(minutes=9), 'latency_ms': 250.0})
+
+    stats = tracker.stats()
+    assert stats['matched'] == 1 and stats['indicator_only'] == 1
+    assert stats['latency_delta_ms_p50'] == -2000.0
+    assert stats['pending_server'] == 1
+
+
+def test_trade_id_bar_open_is_ny_local():
+    assert trade_id_bar_open('20250303_093000000_BULLISH') == START
+    assert trade_id_bar_open('garbage') is None
+
+
+class FakeCursor:
+    """Stands in for both the psycopg2 connection and its (server-side) cursors"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self._current = None
+        self.connection = self
+        self.itersize = None
+
+    def cursor(self, name=None):
+        return self
+
+    def execute(self, sql, params=None):
+        self._current = self.results.pop(0)
+
+    def fetchone(self):
+        return self._current[0] if self._current else None
+
+    def fetchall(self):
+        return self._current
+
+    def __iter__(self):
+        return iter(self._current)
+
+    def close(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_warm_start_applies_persisted_biases():
+    bars = random_bars(30)
+    rows = [(b['ts'], b['open'], b['high'], b['low'], b['close']) for b in bars]
+    persisted = (bars[19]['ts'], 'Bearish', 'Bullish', 'Bullish', 'Bearish', 'Neutral', 'Bullish')
+    engine = LiveTriangleEngine()
+    result = engine.warm_start(FakeCursor([[persisted], [(10,)], rows[:20], rows[20:]]))
+
+    assert result['replayed'] == 30
+    assert engine.htf_engine.last_biases['1D'] == 'Bullish'
+    assert engine.bars_processed == 30
+
+
+def test_warm_start_ignores_bias_series_too_far_behind():
+    bars = random_bars(30)
+    rows = [(b['ts'], b['open'], b['high'], b['low'], b['close']) for b in bars]
+    persisted = (bars[0]['ts'], 'Bearish', 'Bullish', 'Bullish', 'Bearish', 'Neutral', 'Bullish')
+    engine = LiveTriangleEngine()
+    result = engine.warm_start(FakeCursor([[persisted], [(11,)], rows[-5:]]), warmup_bars=5, max_catch_up_bars=10)
+
+    assert result == {'restored_ts': None, 'replayed': 5, 'bias_mismatch': False, 'source': 'recent_bars'}
+    assert engine.bars_processed == 5
+    assert engine.htf_engine.last_biases['1D'] != 'Bullish'
+    assert engine.prev_bar['ts'] == bars[-1]['ts']
+
+
+def test_pipeline_queues_bars_until_warm_start_finishes():
+    bars = random_bars(400)
+    pipeline = LiveTrianglePipeline()
+    emitted = []
+    pipeline.subscribe(emitted.append)
+    pipeline.live = False
+
+    # Warm start covers the first 300 bars; the stream already delivered 250..399
+    for bar in bars[250:]:
+        pipeline._on_bar(bar)
+    assert pipeline.engine.bars_processed == 0
+    assert pipeline.status()['queued_bars'] == 150
+
+    for bar in bars[:300]:
+        pipeline.engine.update(bar)
+    pipeline.go_live()
+
+    assert pipeline.live and pipeline.status()['queued_bars'] == 0
+    assert pipeline.engine.bars_processed == 400
+    expected = [t for t in reference_triangles(bars) if t[0] > bars[299]['ts']]
+    assert expected
+    assert [(t['ts'], t['direction']) for t in emitted] == expected
@@ -0,0 +1,86 @@
+"""
+Tests for the concurrent, stale-while-revalidate market context cache
+"""
+
+import sys
+sys.path.append('.')
+
+import time
+
+from market_context_providers import FakeContextProvider, MarketContextCache, SnapshotStore, fake_providers
+from market_data_enricher import MarketDataEnricher
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_cold_fetch_runs_sources_concurrently():
+    providers = fake_providers(seed=1, latency=0.2)
+    cache = MarketContextCache(providers)
+    started = time.monotonic()
+    sources = cache.get()
+    assert time.monotonic() - started < 0.2 * len(providers) / 2
+    assert sources == {p.name: p.payload for p in providers}
+
+
+def test_slow_source_times_out_to_fallback_then_lands():
+    slow = FakeContextProvider('vix', {'current': 31.0}, latency=0.5, timeout=0.05, fallback={'current': 20.0})
+    fast = FakeContextProvider('dxy', {'price': 104.0})
+    cache = MarketContextCache([slow, fast])
+    started = time.monotonic()
+    assert cache.get() == {'vix': {'current': 20.0}, 'dxy': {'price': 104.0}}
+    assert time.monotonic() - started < 0.3
+
+    assert wait_for(lambda: cache.get()['vix'] == {'current': 31.0})
+    assert slow.calls == 1
+
+
+def test_stale_snapshot_is_served_while_refreshing():
+    provider = FakeContextProvider('trend', {'strength': 0.7}, latency=0.3)
+    cache = MarketContextCache([provider], fresh_seconds=60)
+    cache.get()
+    assert provider.calls == 1
+
+    cache.fresh_seconds = 0
+    provider.payload = {'strength': 1.4}
+    started = time.monotonic()
+    assert cache.get() == {'trend': {'strength': 0.7}}
+    assert time.monotonic() - started < 0.1
+    assert wait_for(lambda: cache._snapshot['trend']['data'] == {'strength': 1.4})
+
+
+def test_failing_source_keeps_last_good_value():
+    provider = FakeContextProvider('sector', {'rotation': 'TECH_LEADERSHIP'}, fallback={'rotation': 'BALANCED'})
+    cache = MarketContextCache([provider])
+    cache.get()
+    provider.fail = True
+    cache.refresh()
+    assert cache.get() == {'sector': {'rotation': 'TECH_LEADERSHIP'}}
+
+
+def test_workers_share_snapshot_through_store(tmp_path):
+    path = str(tmp_path / 'snapshot.json')
+    first = fake_providers(seed=2)
+    second = fake_providers(seed=3)
+    MarketContextCache(first, store=SnapshotStore(path)).get()
+
+    other_worker = MarketContextCache(second, store=SnapshotStore(path))
+    assert other_worker.get() == {p.name: p.payload for p in first}
+    assert all(p.calls == 0 for p in second)
+
+
+def test_enrich_signal_with_fake_providers():
+    providers = fake_providers(seed=4)
+    payloads = {p.name: p.payload for p in providers}
+    enricher = MarketDataEnricher(providers=providers)
+    enriched = enricher.enrich_signal_with_context({'symbol': 'NQ1!', 'bias': 'Bullish'})
+    context = enriched['market_context']
+    assert context['vix'] == payloads['vix']['current']
+    assert context['spy_volume'] == payloads['volume']['spy_volume']
+    assert context['nq_es_correlation'] == payloads['correlation']['nq_es']
+    assert context['sector_rotation'] == payloads['sector']['rotation']
+    assert 0.0 <= enriched['context_quality_score'] <= 1.0
@@ -0,0 +1,111 @@
+"""
+Tests for market_parity engine state snapshots
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from market_parity.engulfing import Bar, detect_engulfing
+from market_parity.get_bias_fvg_ifvg import BiasEngineFvgIfvg
+from market_parity.htf_bias import HTFBiasEngine
+from market_parity.signal_generation import generate_signals
+from market_parity.snapshot import (
+    SNAPSHOT_MAGIC, EngineSnapshot, day_boundary, decode_snapshot, encode_snapshot,
+)
+
+START = datetime(2025, 3, 2, 21, 0, tzinfo=timezone.utc)
+
+
+def random_bars(n, seed=3):
+    rng = random.Random(seed)
+    price = 20000.0
+    bars = []
+    for i in range(n):
+        o = price
+        c = o + rng.uniform(-10, 10)
+        bars.append({'ts': START + timedelta(minutes=i), 'open': o, 'high': max(o, c) + rng.uniform(0, 5),
+                     'low': min(o, c) - rng.uniform(0, 5), 'close': c})
+        price = c
+    return bars
+
+
+def run(bars, snapshot=None):
+    """Backfill loop; returns (triangles, day-boundary snapshot bytes, final state bytes)"""
+    if snapshot is None:
+        snapshot = EngineSnapshot(None, BiasEngineFvgIfvg(), HTFBiasEngine(), origin_ts=bars[0]['ts'])
+    bias_engine, htf_engine = snapshot.bias_engine, snapshot.htf_engine
+    bias_prev, prev_bar, count = snapshot.bias_prev, snapshot.prev_bar, snapshot.bars_processed
+    triangles, snapshots = [], {}
+
+    for i, bar in enumerate(bars):
+        boundary = day_boundary(bars[i - 1]['ts'], bar['ts']) if i else None
+        if boundary:
+            snapshots[boundary] = encode_snapshot(boundary, bias_engine, htf_engine, bias_prev, prev_bar,
+                                                  prev_bar and prev_bar['close'], count, snapshot.origin_ts)
+        bias = bias_engine.update(bar)
+        htf = htf_engine.update_ltf_bar(bar)
+        if prev_bar is not None:
+            eng = detect_engulfing(Bar(prev_bar['open'], prev_bar['high'], prev_bar['low'], prev_bar['close']),
+                                   Bar(bar['open'], bar['high'], bar['low'], bar['close']))
+            sig = generate_signals(bias, bias_prev, True, True, eng.bullish, eng.bearish,
+                                   eng.bullish_sweep, eng.bearish_sweep, False, False, False)
+            for direction, key in (('BULL', 'show_bull_triangle'), ('BEAR', 'show_bear_triangle')):
+                if sig[key]:
+                    triangles.append((bar['ts'], direction, bias, tuple(sorted(htf.items()))))
+        bias_prev, prev_bar, count = bias, bar, count + 1
+
+    final = encode_snapshot(bars[-1]['ts'] + timedelta(minutes=1), bias_engine, htf_engine, bias_prev,
+                            prev_bar, prev_bar['close'], count, snapshot.origin_ts)
+    return triangles, snapshots, final
+
+
+def test_resume_from_snapshot_equals_full_replay():
+    bars = random_bars(3 * 1440 + 500)
+    full_triangles, snapshots, full_final = run(bars)
+    assert len(snapshots) == 4
+
+    for boundary, data in snapshots.items():
+        snapshot = decode_snapshot(data)
+        assert snapshot.ts == boundary and snapshot.origin_ts == START
+        remaining = [b for b in bars if b['ts'] >= boundary]
+        assert snapshot.bars_processed == len(bars) - len(remaining)
+
+        triangles, _, final = run(remaining, snapshot)
+        assert triangles == [t for t in full_triangles if t[0] >= boundary]
+        assert final == full_final
+
+
+def test_round_trip_preserves_in_progress_htf_bars_and_none_fields():
+    bars = random_bars(97)
+    bias_engine, htf_engine = BiasEngineFvgIfvg(), HTFBiasEngine()
+    for bar in bars:
+        bias_engine.update(bar)
+        htf_engine.update_ltf_bar(bar)
+
+    data = encode_snapshot(START, bias_engine, htf_engine, "Bullish", None, None, 97)
+    snapshot = decode_snapshot(data)
+    assert snapshot.prev_bar is None and snapshot.prev_good_close is None and snapshot.origin_ts is None
+    assert vars(snapshot.bias_engine) == vars(bias_engine)
+    assert htf_engine.current_htf_bars['1D'] is not None
+    assert snapshot.htf_engine.current_htf_bars == htf_engine.current_htf_bars
+    assert snapshot.htf_engine.last_biases == htf_engine.last_biases
+    assert snapshot.htf_engine.last_htf_close == htf_engine.last_htf_close
+    assert snapshot.htf_engine.engines['1D'].ath is None
+    assert encode_snapshot(START, bias_engine, htf_engine, compress=False) != \
+        encode_snapshot(START, bias_engine, htf_engine)
+
+
+def test_rejects_foreign_and_newer_formats():
+    data = EngineSnapshot(START, BiasEngineFvgIfvg(), HTFBiasEngine()).to_bytes()
+    assert data.startswith(SNAPSHOT_MAGIC)
+    with pytest.raises(ValueError):
+        decode_snapshot(b'XXXX' + data[4:])
+    with pytest.raises(ValueError):
+        decode_snapshot(data[:4] + b'\x63\x00' + data[6:])
+    with pytest.raises(ValueError):
+        decode_snapshot(data[:3])
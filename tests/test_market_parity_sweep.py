@@ -0,0 +1,100 @@
+"""
+Tests for the Phase C filter sweep (shared series + boolean masks)
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from market_parity.engulfing import Bar, detect_engulfing
+from market_parity.get_bias_fvg_ifvg import BiasEngineFvgIfvg
+from market_parity.htf_alignment import compute_htf_alignment
+from market_parity.htf_bias import HTFBiasEngine
+from market_parity.signal_generation import generate_signals
+from market_parity.sweep import (
+    SweepConfig, build_sweep_configs, compute_signal_series, evaluate_sweep, summarize_triangles,
+    sweep_triangles,
+)
+
+START = datetime(2025, 3, 3, 0, 0, tzinfo=timezone.utc)
+
+
+def random_bars(n, seed=21):
+    rng = random.Random(seed)
+    price = 20000.0
+    bars = []
+    for i in range(n):
+        o = price + rng.uniform(-3, 3)
+        c = o + rng.uniform(-15, 15)
+        bars.append((START + timedelta(minutes=i), o, max(o, c) + rng.uniform(0, 6),
+                     min(o, c) - rng.uniform(0, 6), c))
+        price = c
+    return bars
+
+
+def corpus_loop(bars, config):
+    """phase_c_build_corpus_run.process_batch with the config's filters"""
+    bias_engine, htf_engine = BiasEngineFvgIfvg(), HTFBiasEngine()
+    bias_prev, out = "Neutral", []
+    for i, (ts, o, h, l, c) in enumerate(bars):
+        bar = {'ts': ts, 'open': o, 'high': h, 'low': l, 'close': c}
+        bias = bias_engine.update(bar)
+        htf = htf_engine.update_ltf_bar(bar)
+        htf_bull, htf_bear = compute_htf_alignment({
+            'daily': htf['daily_bias'], 'h4': htf['h4_bias'], 'h1': htf['h1_bias'],
+            'm15': htf['m15_bias'], 'm5': htf['m5_bias']
+        }, config.use_flags)
+        if i > 0:
+            prev = bars[i - 1]
+            eng = detect_engulfing(Bar(*prev[1:]), Bar(o, h, l, c))
+            sig = generate_signals(bias, bias_prev, htf_bull, htf_bear, eng.bullish, eng.bearish,
+                                   eng.bullish_sweep, eng.bearish_sweep, config.htf_aligned_only,
+                                   config.require_engulfing, config.require_sweep_engulfing)
+            if sig['show_bull_triangle']:
+                out.append((ts, 'BULL'))
+            if sig['show_bear_triangle']:
+                out.append((ts, 'BEAR'))
+        bias_prev = bias
+    return out
+
+
+def test_masks_match_per_config_loop():
+    bars = random_bars(2 * 1440)
+    configs = build_sweep_configs(max_htf=2)
+    assert len(configs) == 3 * (1 + 5 + 10)
+
+    series = compute_signal_series(bars)
+    masks = evaluate_sweep(series, configs)
+    checked = [c for c in configs if len(c.htf_tfs) <= 1] + [SweepConfig(('h1', 'm5'), 'engulfing')]
+    for config in checked:
+        assert sweep_triangles(series, *masks[config]) == corpus_loop(bars, config), config.name
+    assert sweep_triangles(series, *masks[SweepConfig()])
+
+
+def test_window_and_summary():
+    bars = random_bars(600, seed=4)
+    series = compute_signal_series(bars)
+    config = SweepConfig()
+    bull, bear = evaluate_sweep(series, [config])[config]
+    window_start, window_end = START + timedelta(minutes=200), START + timedelta(minutes=400)
+
+    triangles = sweep_triangles(series, bull, bear, window_start, window_end)
+    assert triangles == [t for t in corpus_loop(bars, config) if window_start <= t[0] < window_end]
+
+    stats = summarize_triangles(triangles, 200)
+    assert stats['total_triangles'] == stats['bull_count'] + stats['bear_count'] == len(triangles)
+    assert stats['min_ts'] >= window_start and stats['max_ts'] < window_end
+
+
+def test_config_canonical_order_and_validation():
+    assert SweepConfig(('m5', 'daily')) == SweepConfig(('daily', 'm5'))
+    assert SweepConfig(('m5', 'daily'), 'sweep').name == 'daily+m5|sweep'
+    assert not SweepConfig().htf_aligned_only
+    with pytest.raises(ValueError):
+        SweepConfig(('w1',))
+    with pytest.raises(ValueError):
+        SweepConfig(engulfing='both')
@@ -0,0 +1,50 @@
+"""
+Tests for batched ensemble scoring and matrix-resampled bootstrap intervals
+"""
+
+import sys
+sys.path.append('.')
+
+import numpy as np
+
+import ml_confidence_intervals
+from ml_confidence_intervals import MLConfidenceScorer
+
+
+def trained_scorer():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 3))
+    y = (X[:, 0] > 0).astype(int) + (X[:, 1] > 0.5).astype(int)
+    scorer = MLConfidenceScorer(n_bootstrap=200)
+    scorer.train_ensemble(X, y)
+    return scorer, rng.normal(size=(60, 3))
+
+
+def test_batch_matches_per_row_ensemble():
+    scorer, X = trained_scorer()
+    predictions = scorer.predict_with_confidence(X)
+
+    assert len(predictions) == len(X)
+    for i, prediction in enumerate(predictions):
+        model_probs = [model.predict_proba(X[i:i + 1])[0] for model in scorer.models]
+        avg_probs = np.mean(model_probs, axis=0)
+        predicted = int(np.argmax(avg_probs))
+        assert prediction['prediction'] == predicted
+        assert np.isclose(prediction['confidence_score'], avg_probs[predicted])
+
+        # Every bootstrap draw is one model's probability for the predicted class
+        class_probs = [p[predicted] for p in model_probs]
+        ci = prediction['confidence_interval']
+        assert min(class_probs) - 1e-12 <= ci['lower'] <= ci['upper'] <= max(class_probs) + 1e-12
+        assert np.isclose(ci['width'], ci['upper'] - ci['lower'])
+    assert any(p['confidence_interval']['width'] > 0 for p in predictions)
+    assert scorer.predict_with_confidence(X[:0]) == []
+
+
+def test_pool_chunks_match_single_process(monkeypatch):
+    scorer, X = trained_scorer()
+    monkeypatch.setattr(ml_confidence_intervals, 'POOL_MIN_ROWS', 0)
+    monkeypatch.setattr(ml_confidence_intervals.os, 'cpu_count', lambda: 2)
+
+    pooled = scorer._model_probabilities(X, n_jobs=2)
+    assert np.allclose(pooled, ml_confidence_intervals._ensemble_probabilities(scorer.models, X))
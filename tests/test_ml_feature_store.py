@@ -0,0 +1,153 @@
+"""
+Tests for the shared ML feature store
+
+The refresh test needs a scratch Postgres database; set TEST_DATABASE_URL to run it.
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from ml_feature_store import FEATURE_SETS, FeatureStore, feature_row, frame_from_records
+from signal_ml_predictor import SignalMLPredictor
+
+SCHEMA_SQL = ["""
+    CREATE TABLE signal_lab_trades (
+        id BIGSERIAL PRIMARY KEY, date DATE, time VARCHAR(10), bias VARCHAR(20), session VARCHAR(50),
+        signal_type VARCHAR(50), news_proximity VARCHAR(20), market_context TEXT,
+        context_quality_score DECIMAL(4, 2), entry_price DECIMAL(10, 2),
+        mfe_none DECIMAL(6, 2), mfe DECIMAL(6, 2), be1_hit BOOLEAN, be2_hit BOOLEAN
+    )
+"""]
+
+
+def reference_unified_features(trade):
+    """UnifiedMLIntelligence._extract_features_from_trade before the feature store"""
+    session = trade.get('session', 'Unknown')
+    signal_type = trade.get('signal_type') or ''
+    news = trade.get('news_proximity', 'None')
+    return [
+        1.0 if trade.get('bias') == 'Bullish' else 0.0,
+        1.0 if session == 'London' else 0.0,
+        1.0 if session == 'NY AM' else 0.0,
+        1.0 if session == 'NY PM' else 0.0,
+        1.0 if 'FVG' in signal_type else 0.0,
+        1.0 if 'IFVG' in signal_type else 0.0,
+        1.0 if news == 'High' else 0.0,
+        1.0 if news == 'Medium' else 0.0,
+        1.0 if trade.get('timeframe') == '1M' else 0.0,
+        float(trade.get('context_quality_score', 0.5)),
+    ]
+
+
+def random_trades(n, seed=1):
+    rng = random.Random(seed)
+    trades = []
+    for i in range(n):
+        context = {k: v for k, v in {
+            'vix': rng.choice([12, 18, 28, 40, None]),
+            'spy_volume': rng.choice([50e6, 80e6, 110e6]),
+            'dxy_change': rng.choice([-0.5, -0.1, 0.0, 0.3]),
+            'nq_es_correlation': rng.uniform(-1, 1),
+            'trend_strength': rng.uniform(0, 1.4),
+            'sector_rotation': rng.choice(['TECH_LEADERSHIP', 'BALANCED', 'VALUE_ROTATION', 'OTHER']),
+        }.items() if v is not None and rng.random() < 0.85}
+        trades.append({
+            'id': i + 1,
+            'date': f"2025-03-{1 + i % 28:02d}",
+            'time': f"{9 + i % 8:02d}:{i % 60:02d}:00",
+            'bias': rng.choice(['Bullish', 'Bearish']),
+            'session': rng.choice(['London', 'NY AM', 'NY PM', 'Asia', 'NY Lunch']),
+            'signal_type': rng.choice(['FVG_BULL', 'IFVG_BEAR', 'BIAS_BULLISH', None]),
+            'news_proximity': rng.choice(['High', 'Medium', 'None', None]),
+            'context_quality_score': rng.choice([0.2, 0.7, None]),
+            'market_context': json.dumps(context),
+            'entry_price': 20000 + i,
+        })
+    return trades
+
+
+def test_builders_match_per_trade_extractors():
+    trades = random_trades(300)
+    frame = frame_from_records(trades, source=0)
+
+    X, valid = FEATURE_SETS['unified'].build(frame)
+    for i, trade in enumerate(trades):
+        if trade['context_quality_score'] is None:
+            assert not valid[i]
+            continue
+        assert X[i].tolist() == reference_unified_features(dict(trade, timeframe='1M'))
+
+    fifteen = frame_from_records([{k: v for k, v in t.items() if k not in ('market_context', 'context_quality_score')}
+                                  for t in trades[:20]], source=1)
+    X15, valid15 = FEATURE_SETS['unified'].build(fifteen)
+    assert valid15.all()
+    for i, trade in enumerate(trades[:20]):
+        assert X15[i].tolist() == reference_unified_features({k: v for k, v in trade.items()
+                                                              if k != 'context_quality_score'} | {'timeframe': '15M'})
+
+    predictor = SignalMLPredictor(db=None)
+    X, _ = FEATURE_SETS['signal_context'].build(frame)
+    columns = FEATURE_SETS['signal_context'].columns
+    for i, trade in enumerate(trades):
+        row = feature_row('signal_context', {'session': trade['session'], 'bias': trade['bias'],
+                                             'market_context': json.loads(trade['market_context'])})
+        assert np.allclose(row, X[i])
+        assert predictor._extract_features(json.loads(trade['market_context']), trade) == dict(zip(columns, X[i].tolist()))
+
+
+def test_refresh_appends_updates_and_drops(pg_url, tmp_path):
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    conn = psycopg2.connect(pg_url, cursor_factory=RealDictCursor)
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    def insert(trades):
+        for t in trades:
+            cursor.execute("""
+                INSERT INTO signal_lab_trades (id, date, time, bias, session, signal_type, news_proximity,
+                    market_context, context_quality_score, entry_price, mfe_none)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (t['id'], t['date'], t['time'], t['bias'], t['session'], t['signal_type'], t['news_proximity'],
+                  t['market_context'], t['context_quality_score'], t['entry_price'], t['id'] % 4))
+
+    trades = random_trades(60, seed=4)
+    try:
+        # id 5 commits late, after the store has already seen higher ids
+        insert(trades[:4] + trades[5:40])
+        store = FeatureStore(SimpleNamespace(conn=conn), root=str(tmp_path), refresh_interval=0)
+        first = store.matrix('unified')
+        assert first.frame['id'].tolist() == [1, 2, 3, 4] + list(range(6, 41))
+        assert first.frame['mfe'].tolist() == [i % 4 for i in first.frame['id']]
+
+        insert(trades[4:5] + trades[40:])
+        cursor.execute("UPDATE signal_lab_trades SET mfe_none = 9 WHERE id = 1")
+        cursor.execute("DELETE FROM signal_lab_trades WHERE id IN (2, 3)")
+        # Trade edits (PUT /api/signal-lab-trades/<id>) reach the cached frame and matrices
+        edited = dict(trades[5], bias='Bullish' if trades[5]['bias'] == 'Bearish' else 'Bearish',
+                      session='NY PM', context_quality_score=0.7)
+        cursor.execute("UPDATE signal_lab_trades SET bias = %s, session = %s, context_quality_score = %s WHERE id = 6",
+                       (edited['bias'], edited['session'], edited['context_quality_score']))
+        trades[5] = edited
+        refreshed = store.matrix('unified')
+        row = refreshed.frame['id'].tolist().index(6)
+        assert refreshed.X[row].tolist() == reference_unified_features(dict(edited, timeframe='1M'))
+
+        # A fresh store picks up the persisted frame and only fetches ids past its watermark
+        store = FeatureStore(SimpleNamespace(conn=conn), root=str(tmp_path), refresh_interval=0)
+        matrix = store.matrix('unified')
+        assert matrix.frame['id'].tolist() == [1] + list(range(4, 61))
+        assert matrix.frame['mfe'][0] == 9
+        by_id = {t['id']: t for t in trades}
+        for i, trade_id in enumerate(matrix.frame['id']):
+            if matrix.valid[i]:
+                assert matrix.X[i].tolist() == reference_unified_features(dict(by_id[trade_id], timeframe='1M'))
+    finally:
+        conn.close()
@@ -0,0 +1,105 @@
+"""
+Tests for the ML training scheduler and warm-start updates of the unified models
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import ml_training_scheduler
+import unified_ml_intelligence
+from ml_feature_store import FEATURE_SETS, FeatureMatrix, frame_from_records
+from ml_training_scheduler import MAX_TREES, plan_search, plan_training
+from unified_ml_intelligence import UnifiedMLIntelligence
+
+NOW = datetime(2025, 3, 10, 12, 0)
+
+
+def test_plan_training_modes():
+    recent = NOW - timedelta(hours=2)
+    assert plan_training(False, 0, 300, 300, 0, None, False, NOW).mode == 'full_refit'
+    assert plan_training(True, 1000, 1010, 10, 100, recent, False, NOW).mode == 'skip'
+    assert plan_training(True, 1000, 1060, 60, 100, recent, False, NOW).mode == 'warm_start'
+    # Enough growth since the last full refit, an old refit, or too many trees force a refit
+    assert plan_training(True, 1000, 1250, 60, 100, recent, False, NOW).mode == 'full_refit'
+    assert plan_training(True, 1000, 1001, 1, 100, NOW - timedelta(days=8), False, NOW).mode == 'full_refit'
+    assert plan_training(True, 1000, 1060, 60, MAX_TREES, recent, False, NOW).mode == 'full_refit'
+    # Drift refits at most once a day
+    assert plan_training(True, 1000, 1000, 0, 100, recent, True, NOW).mode == 'skip'
+    assert plan_training(True, 1000, 1000, 0, 100, NOW - timedelta(days=2), True, NOW).mode == 'full_refit'
+
+
+def test_plan_search_triggers():
+    assert plan_search(400, None, None, False, NOW).mode == 'skip'
+    assert plan_search(500, None, None, False, NOW).mode == 'hyperparameter_search'
+    assert plan_search(650, 500, NOW - timedelta(days=60), False, NOW).mode == 'skip'
+    assert plan_search(700, 500, NOW, False, NOW).mode == 'hyperparameter_search'
+    assert plan_search(550, 500, NOW - timedelta(days=2), True, NOW).mode == 'skip'
+    assert plan_search(550, 500, NOW - timedelta(days=8), True, NOW).mode == 'hyperparameter_search'
+
+
+class FakeStore:
+    def __init__(self, trades):
+        self.trades = trades
+
+    def matrix(self, name):
+        frame = frame_from_records(self.trades, source=0)
+        X, valid = FEATURE_SETS[name].build(frame)
+        return FeatureMatrix(FEATURE_SETS[name].columns, X, valid, frame)
+
+    def frame(self):
+        return self.matrix('unified').frame
+
+
+def make_trades(n, start=1, seed=0):
+    rng = random.Random(seed)
+    return [{
+        'id': i,
+        'date': '2025-03-03',
+        'time': '10:00:00',
+        'bias': rng.choice(['Bullish', 'Bearish']),
+        'session': rng.choice(['London', 'NY AM', 'NY PM']),
+        'signal_type': rng.choice(['FVG_BULL', 'IFVG_BEAR']),
+        'news_proximity': 'None',
+        'context_quality_score': rng.choice([0.3, 0.8]),
+        'mfe': rng.uniform(-1, 3),
+    } for i in range(start, start + n)]
+
+
+def test_warm_start_cycle_adds_trees_on_new_trades(monkeypatch):
+    store = FakeStore(make_trades(400))
+    monkeypatch.setattr(unified_ml_intelligence, 'get_feature_store', lambda db: store)
+    runs = []
+    monkeypatch.setattr(ml_training_scheduler, 'log_training_run', lambda *args, **kwargs: runs.append(args))
+
+    engine = UnifiedMLIntelligence(db=None)
+    engine.scheduler.drift_check = lambda db: False
+    first = engine.scheduler.run_cycle()
+    assert first['mode'] == 'full_refit' and engine.tree_count() == 100
+    assert engine.pending_training_samples() == (0, 400)
+
+    store.trades = store.trades + make_trades(60, start=401, seed=1)
+    regressor = engine.models['mfe_predictor']
+    before = regressor.predict(engine.scalers['main'].transform(engine._training_matrix()[0]))
+
+    second = engine.scheduler.run_cycle()
+    assert second['mode'] == 'warm_start' and second['new_samples'] == 60
+    assert engine.models['mfe_predictor'] is regressor and regressor.n_estimators == 110
+    assert engine.tree_count() == 110 and engine.full_fit_samples == 400
+    assert engine.pending_training_samples() == (0, 460)
+
+    # The original stages are kept; only the added trees move the predictions
+    X = engine.scalers['main'].transform(engine._training_matrix()[0])
+    assert not np.allclose(regressor.predict(X), before)
+    stages = list(regressor.staged_predict(X))
+    assert np.allclose(stages[99], before)
+
+    assert [run[2] for run in runs] == ['full_refit', 'warm_start']
+    assert runs[1][5] == 60 and runs[1][6].wall_seconds > 0
+
+    assert engine.scheduler.run_cycle()['mode'] == 'skip'
+    assert len(runs) == 2
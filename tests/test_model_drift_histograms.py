@@ -0,0 +1,94 @@
+"""
+Tests for histogram-based drift statistics and the trigger-maintained histograms
+
+The trigger test needs a scratch Postgres database; set TEST_DATABASE_URL to run it.
+"""
+
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from model_drift_detector import DRIFT_BINS, ModelDriftDetector, histogram_drift, load_drift_histograms
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE signal_lab_trades (
+        id BIGSERIAL PRIMARY KEY,
+        bias VARCHAR(20),
+        session VARCHAR(50),
+        mfe_none DECIMAL(10, 2),
+        created_at TIMESTAMPTZ DEFAULT NOW()
+    )
+    """,
+    # History from before the histograms existed, picked up by the install backfill
+    "INSERT INTO signal_lab_trades (bias, session, created_at) "
+    "SELECT 'Bullish', 'London', NOW() - INTERVAL '40 days' FROM generate_series(1, 60)",
+    'database/model_drift_histograms.sql',
+]
+
+
+def test_histogram_drift_matches_sample_statistics():
+    rng = np.random.default_rng(3)
+    baseline = [rng.integers(0, 2, 400), rng.choice(4, 400, p=[0.1, 0.4, 0.3, 0.2])]
+    current = [rng.integers(0, 2, 60), rng.choice(4, 60, p=[0.4, 0.2, 0.2, 0.2])]
+    baseline_counts = np.zeros((2, 4))
+    current_counts = np.zeros((2, 4))
+    for row in range(2):
+        baseline_counts[row] = np.bincount(baseline[row], minlength=4)
+        current_counts[row] = np.bincount(current[row], minlength=4)
+
+    drift = histogram_drift(baseline_counts, current_counts)
+    for row in range(2):
+        ks = stats.ks_2samp(baseline[row], current[row], method='asymp')
+        assert drift['ks_statistic'][row] == pytest.approx(ks.statistic)
+        assert drift['ks_pvalue'][row] == pytest.approx(ks.pvalue)
+    assert drift['psi'][1] > drift['psi'][0]
+
+    # Windows merge by adding their histograms
+    halves = histogram_drift(baseline_counts, current_counts / 2 + current_counts / 2)
+    assert np.allclose(halves['psi'], drift['psi'])
+
+
+def test_detect_histogram_drift_flags_shifted_feature():
+    detector = ModelDriftDetector(db=None)
+    result = detector.detect_histogram_drift({
+        'bias': (np.array([250, 250]), np.array([26, 24])),
+        'session': (np.array([50, 200, 150, 100]), np.array([40, 5, 3, 2])),
+    })
+    assert result['bias']['severity'] == 'Low' and not result['bias']['drift_detected']
+    assert result['session']['severity'] == 'Critical' and result['session']['drift_detected']
+
+
+def test_triggers_track_recount(conn):
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    def recount():
+        cursor.execute("""
+            SELECT t.created_at::date, b.feature, b.bin, COUNT(*)
+            FROM signal_lab_trades t CROSS JOIN LATERAL model_drift_bins(t.bias, t.session) b
+            WHERE t.created_at IS NOT NULL GROUP BY 1, 2, 3
+        """)
+        return {r[:3]: r[3] for r in cursor.fetchall()}
+
+    def histograms():
+        cursor.execute("SELECT bucket_date, feature, bin, count FROM model_drift_histograms WHERE count <> 0")
+        return {r[:3]: r[3] for r in cursor.fetchall()}
+
+    cursor.execute("""
+        INSERT INTO signal_lab_trades (bias, session) VALUES
+            ('Bearish', 'NY AM'), ('Bullish', 'NY PM'), ('Bearish', 'Asia'), ('Bullish', 'NY AM')
+    """)
+    cursor.execute("INSERT INTO signal_lab_trades (bias, session, created_at) VALUES ('Bullish', 'NY AM', NULL)")
+    cursor.execute("UPDATE signal_lab_trades SET mfe_none = 1.5 WHERE session = 'NY AM'")
+    cursor.execute("UPDATE signal_lab_trades SET session = 'London' WHERE session = 'Asia'")
+    cursor.execute("DELETE FROM signal_lab_trades WHERE session = 'NY PM'")
+    assert histograms() == recount()
+
+    loaded = load_drift_histograms(cursor)
+    assert set(loaded) == set(DRIFT_BINS)
+    assert list(loaded['bias'][0]) == [0, 60] and list(loaded['bias'][1]) == [2, 1]
+    assert list(loaded['session'][1]) == [0, 2, 0, 1]
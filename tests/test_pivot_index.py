@@ -0,0 +1,107 @@
+"""
+Tests for the array-based pivot index and the stop loss calculator built on it
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+
+from exact_stop_loss_calculator import ExactStopLossCalculator
+from pivot_detector import PivotDetector
+from pivot_index import PivotIndex, SparseTable
+
+
+def random_candles(n, seed=7):
+    rng = random.Random(seed)
+    price = 20000
+    candles = []
+    for _ in range(n):
+        o = price + rng.randint(-3, 3)
+        c = o + rng.randint(-8, 8)
+        candles.append({'open': o, 'high': max(o, c) + rng.randint(0, 4),
+                        'low': min(o, c) - rng.randint(0, 4), 'close': c})
+        price = c
+    return candles
+
+
+def test_sparse_table_matches_leftmost_scan():
+    rng = random.Random(1)
+    values = [rng.randint(0, 20) for _ in range(300)]
+    mins, maxs = SparseTable(values, 'min'), SparseTable(values, 'max')
+    ranges = [(lo, rng.randint(lo, len(values) - 1)) for lo in (rng.randint(0, 299) for _ in range(500))]
+
+    for lo, hi in ranges:
+        window = values[lo:hi + 1]
+        assert mins.argquery(lo, hi) == lo + window.index(min(window))
+        assert maxs.argquery(lo, hi) == lo + window.index(max(window))
+    los, his = zip(*ranges)
+    assert list(mins.argquery_many(los, his)) == [mins.argquery(lo, hi) for lo, hi in ranges]
+
+
+def test_pivots_match_pivot_detector():
+    candles = random_candles(400)
+    index = PivotIndex.from_candles(candles)
+    detector = PivotDetector()
+
+    for i in range(len(candles)):
+        assert index.is_pivot_low(i) == detector.is_candle_pivot_low(candles, i)
+        assert index.is_pivot_high(i) == detector.is_candle_pivot_high(candles, i)
+    for start in range(0, 390, 7):
+        low = detector.find_pivot_low_in_range(candles, start, start + 9)
+        high = detector.find_pivot_high_in_range(candles, start, start + 9)
+        assert index.first_pivot_low_in(max(1, start), start + 9) == (low['index'] if low else None)
+        assert index.first_pivot_high_in(max(1, start), start + 9) == (high['index'] if high else None)
+
+    left = index.nearest_pivot_low_left(200, max_distance=5)
+    expected = [j for j in range(195, 200) if detector.is_candle_pivot_low(candles, j)]
+    assert left == (expected[-1] if expected else None)
+
+
+def reference_stop_loss(candles, signal_type, lo, hi, buffer=25.0):
+    """Methodology over candle dicts: pivots inside [lo, hi], left search over the full series"""
+    detector = PivotDetector()
+    window = candles[lo:hi + 1]
+    bull = signal_type == 'Bullish'
+    point = detector.find_lowest_point_in_range(window) if bull else detector.find_highest_point_in_range(window)
+    sign = -1 if bull else 1
+    if point['is_pivot'] or point['index'] != 0:
+        return point['value'] + sign * buffer
+    is_pivot = detector.is_candle_pivot_low if bull else detector.is_candle_pivot_high
+    for j in range(lo - 1, max(lo - 5, 0) - 1, -1):
+        if is_pivot(candles, j):
+            return candles[j]['low' if bull else 'high'] + sign * buffer
+    for candle in window:
+        if (candle['close'] < candle['open']) if bull else (candle['close'] > candle['open']):
+            return candle['low' if bull else 'high'] + sign * buffer
+    return candles[lo]['low' if bull else 'high'] + sign * buffer
+
+
+def test_batch_stop_losses_match_reference():
+    candles = random_candles(3000, seed=3)
+    rng = random.Random(5)
+    signals = []
+    for _ in range(1000):
+        start = rng.randint(0, len(candles) - 2)
+        signals.append((rng.choice(['Bullish', 'Bearish']), start, min(len(candles) - 1, start + rng.randint(0, 12))))
+
+    results = ExactStopLossCalculator().calculate_stop_losses(candles, signals)
+    assert results == [reference_stop_loss(candles, st, lo, hi) for st, lo, hi in signals]
+
+
+def test_single_signal_scenarios():
+    calculator = ExactStopLossCalculator()
+    signal = {'open': 20000, 'high': 20005, 'low': 19980, 'close': 20002}
+    confirmation = {'open': 20010, 'high': 20015, 'low': 20005, 'close': 20012}
+    candle_range = [
+        signal,
+        {'open': 20002, 'high': 20008, 'low': 19985, 'close': 19990},
+        {'open': 19990, 'high': 20020, 'low': 19995, 'close': 20010},
+        confirmation,
+    ]
+    # Signal candle is the low and not a pivot, nothing to the left: first bearish candle
+    assert calculator.calculate_stop_loss('Bullish', signal, confirmation, candle_range, 0) == 19960.0
+    # Highest high at index 2 is a pivot inside the range
+    assert calculator.calculate_stop_loss('Bearish', signal, confirmation, candle_range, 0) == 20045.0
+    assert calculator.calculate_stop_loss('Sideways', signal, confirmation, candle_range, 0) is None
+    assert calculator.calculate_stop_losses(candle_range, [('Bullish', 2, 1)]) == [None]
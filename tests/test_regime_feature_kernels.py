@@ -0,0 +1,139 @@
+"""
+Parity tests for the rolling regime feature kernels against the per-window
+InstitutionalMLEngine implementations they replace
+"""
+
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from regime_feature_kernels import (
+    REGIME_FEATURE_COLUMNS, higuchi_curve_lengths, higuchi_fractal_dimension, hurst_exponent, log_returns,
+    realized_variation, regime_feature_matrix, rolling_moments, rolling_volatility, tail_risk
+)
+
+
+def reference_curve_lengths(prices):
+    """Higuchi loops of InstitutionalMLEngine._calculate_fractal_dimension before the kernels"""
+    N = len(prices)
+    k_max = min(20, N // 4)
+    lk = []
+    for k in range(1, k_max + 1):
+        lm = []
+        for m in range(k):
+            ll = 0
+            for i in range(1, int((N - m) / k)):
+                ll += abs(prices[m + i * k] - prices[m + (i - 1) * k])
+            ll = ll * (N - 1) / (k * k * int((N - m) / k))
+            lm.append(ll)
+        lk.append(np.mean(lm))
+    return lk
+
+
+def reference_fractal_dimension(prices):
+    if len(prices) < 10:
+        return 1.5
+    try:
+        lk = reference_curve_lengths(prices)
+        with np.errstate(divide='ignore'):
+            slope = np.polyfit(np.log(range(1, len(lk) + 1)), np.log(lk), 1)[0]
+        return max(1.0, min(2.0, 2 - slope))
+    except Exception:
+        return 1.5
+
+
+def reference_hurst(prices):
+    """InstitutionalMLEngine._calculate_hurst_exponent before the kernels"""
+    if len(prices) < 20:
+        return 0.5
+    returns = np.diff(np.log(prices))
+    n = len(returns)
+    cumulative_deviations = np.cumsum(returns - np.mean(returns))
+    R = np.max(cumulative_deviations) - np.min(cumulative_deviations)
+    S = np.std(returns)
+    if S == 0:
+        return 0.5
+    return max(0.0, min(1.0, np.log(R / S) / np.log(n)))
+
+
+def reference_risk(prices):
+    """Per-bar block of InstitutionalMLEngine._volatility_risk_features (NaN where it pads 0.0)"""
+    returns = np.diff(np.log(prices))
+    row = [np.std(returns[-w:]) * np.sqrt(252 * 24 * 60) if len(returns) >= w else np.nan for w in (5, 10, 20, 50)]
+    if len(returns) >= 20:
+        bipower = np.sum(np.abs(returns[-20:-1]) * np.abs(returns[-19:])) * (np.pi / 2)
+        row += [bipower, max(0, np.sum(returns[-20:] ** 2) - bipower)]
+    else:
+        row += [np.nan, np.nan]
+    if len(returns) >= 50:
+        var_95 = np.percentile(returns[-50:], 5)
+        row += [var_95, np.mean(returns[-50:][returns[-50:] <= var_95])]
+    else:
+        row += [np.nan, np.nan]
+    if len(returns) >= 20:
+        row += [stats.skew(returns[-20:]), stats.kurtosis(returns[-20:])]
+    else:
+        row += [np.nan, np.nan]
+    return row
+
+
+def make_prices(seed=7, bars=1500):
+    """Random walk with a trending stretch, a flat stretch and a tick-rounded stretch"""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 2.0, bars)
+    steps[300:500] += 0.8
+    steps[700:780] = 0.0
+    prices = 20000 + np.cumsum(steps)
+    prices[900:1100] = np.round(prices[900:1100] * 4) / 4
+    return prices
+
+
+PRICES = make_prices()
+
+
+@pytest.mark.parametrize('window', [10, 37, 50, 80, 120])
+def test_higuchi_matches_engine_loops(window):
+    lengths = higuchi_curve_lengths(PRICES, window)
+    dimension = higuchi_fractal_dimension(PRICES, window)
+    assert np.isnan(dimension[:window - 1]).all()
+    for end in range(window, len(PRICES) + 1, 7):
+        window_prices = PRICES[end - window:end]
+        np.testing.assert_allclose(lengths[end - window], reference_curve_lengths(window_prices), rtol=1e-9, atol=1e-9)
+        assert dimension[end - 1] == pytest.approx(reference_fractal_dimension(window_prices), abs=1e-9)
+
+
+def test_higuchi_flat_window_clamps_like_polyfit_nan():
+    flat = np.full(60, 21000.0)
+    assert higuchi_fractal_dimension(flat, 50)[-1] == reference_fractal_dimension(flat[-50:]) == 2.0
+    assert higuchi_fractal_dimension(flat[:9], 9)[-1] == 1.5
+
+
+@pytest.mark.parametrize('window', [20, 64, 100])
+def test_hurst_matches_engine(window):
+    hurst = hurst_exponent(PRICES, window)
+    assert np.isnan(hurst[:window - 1]).all()
+    for end in range(window, len(PRICES) + 1, 5):
+        assert hurst[end - 1] == pytest.approx(reference_hurst(PRICES[end - window:end]), abs=1e-9)
+
+
+def test_risk_features_match_engine_per_bar():
+    returns = log_returns(PRICES)
+    series = [rolling_volatility(returns, w) for w in (5, 10, 20, 50)]
+    series += list(realized_variation(returns)) + list(tail_risk(returns)) + list(rolling_moments(returns))
+    kernel = np.column_stack(series)
+    for end in list(range(2, 60)) + list(range(60, len(PRICES) + 1, 11)):
+        expected = reference_risk(PRICES[:end])
+        np.testing.assert_allclose(kernel[end - 1], expected, rtol=1e-7, atol=1e-12, equal_nan=True,
+                                   err_msg=f"bar {end - 1}")
+
+
+def test_feature_matrix_columns_line_up():
+    columns, matrix = regime_feature_matrix(PRICES)
+    assert columns == list(REGIME_FEATURE_COLUMNS)
+    assert matrix.shape == (len(PRICES), len(columns)) and matrix.dtype == np.float32
+    # The flat stretch (bars 700-780) has undefined moments, as in scipy
+    assert np.isfinite(matrix[900:, :]).all()
+    assert matrix[-1, columns.index('hurst_exponent')] == pytest.approx(reference_hurst(PRICES[-100:]), abs=1e-6)
@@ -0,0 +1,262 @@
+"""
+Tests for the set-based signal integrity verifier: per-trade parity with
+verify_single_signal over a seeded history, the id-order timestamp rule, and
+incremental re-verification vs a full run.
+
+Needs a scratch Postgres database; set TEST_DATABASE_URL to run them.
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from signal_integrity_verifier import (
+    INTEGRITY_RULES, clear_dirty_marks, integrity_violation_summary, list_integrity_violations,
+    read_dirty_marks, verify_all_signals, verify_single_signal
+)
+
+CREATE_TABLE_SQL = """
+CREATE TABLE automated_signals (
+    id SERIAL PRIMARY KEY,
+    trade_id VARCHAR(100),
+    event_type VARCHAR(20),
+    bias VARCHAR(20),
+    entry_price DECIMAL(10,2),
+    sl_price DECIMAL(10,2),
+    risk_distance DECIMAL(10,2),
+    target_1r DECIMAL(10,2),
+    target_2r DECIMAL(10,2),
+    target_3r DECIMAL(10,2),
+    be_mfe DECIMAL(10,4),
+    no_be_mfe DECIMAL(10,4),
+    session VARCHAR(20),
+    signal_date DATE,
+    signal_time TIME,
+    status TEXT,
+    timestamp TIMESTAMP DEFAULT NOW()
+)
+"""
+SCHEMA_SQL = [CREATE_TABLE_SQL, 'database/signal_integrity_schema.sql']
+
+COLUMNS = ('trade_id', 'event_type', 'bias', 'entry_price', 'sl_price', 'risk_distance', 'target_1r',
+           'be_mfe', 'no_be_mfe', 'session', 'status', 'timestamp')
+
+# Message prefixes of the per-trade checks, most specific first
+LEGACY_RULES = [
+    ('First event is', 'first_event_not_entry'),
+    ('Multiple ENTRY', 'multiple_entry'),
+    ('Missing ENTRY', 'missing_entry'),
+    ('EXIT event is not the last', 'exit_not_last'),
+    ('Risk distance mismatch', 'risk_distance_mismatch'),
+    ('No-BE MFE decreased', 'no_be_mfe_decreased'),
+    ('BE MFE decreased', 'be_mfe_decreased'),
+    ('BE MFE changed after trigger', 'be_mfe_changed_after_trigger'),
+    ('No-BE MFE < BE MFE', 'no_be_below_be_after_trigger'),
+    ('EXIT event exists but status', 'exit_status_not_completed'),
+    ('Target 1R mismatch', 'target_1r_mismatch'),
+    ('Timestamp out of order', 'timestamp_out_of_order'),
+    ('Invalid session', 'invalid_session'),
+]
+
+T0 = datetime(2025, 11, 3, 14, 30)
+
+
+def make_trade(rng, index):
+    """One trade's events in timestamp order, with randomly injected defects"""
+    trade_id = f"T{index:05d}"
+    bias = rng.choice(['Bullish', 'Bearish'])
+    entry = Decimal(20000 + rng.randint(0, 400))
+    risk = Decimal(rng.choice([10, 15, 20, 25]))
+    sl = entry - risk if bias == 'Bullish' else entry + risk
+    target = entry + risk if bias == 'Bullish' else entry - risk
+    stored_risk = risk + (Decimal(2) if rng.random() < 0.1 else Decimal('0.25'))
+    if rng.random() < 0.1:
+        target += rng.choice([Decimal(3), Decimal('-0.5')])
+    session = rng.choice(['NY AM', 'LONDON', 'ASIA', 'NY PM'] * 5 + ['London', None])
+    ts = T0 + timedelta(minutes=15 * index)
+    events = []
+
+    def add(event_type, **values):
+        nonlocal ts
+        ts += timedelta(seconds=rng.randint(1, 90))
+        event = dict(trade_id=trade_id, event_type=event_type, bias=bias, entry_price=None, sl_price=None,
+                     risk_distance=None, target_1r=None, be_mfe=None, no_be_mfe=None, session=session,
+                     status=None, timestamp=ts)
+        event.update(values)
+        events.append(event)
+
+    if rng.random() < 0.05:
+        add('MFE_UPDATE', be_mfe=Decimal('0.10'), no_be_mfe=Decimal('0.10'))
+    entry_values = dict(entry_price=entry, sl_price=sl if rng.random() > 0.05 else Decimal(0),
+                        risk_distance=stored_risk, target_1r=target)
+    if rng.random() > 0.05:
+        add('ENTRY', **entry_values)
+    if rng.random() < 0.05:
+        add('ENTRY', **entry_values)
+
+    be, no_be, triggered = Decimal(0), Decimal(0), False
+    for _ in range(rng.randint(0, 12)):
+        no_be += Decimal(rng.randint(-20, 40)) / 100
+        if not triggered:
+            be = no_be
+        elif rng.random() < 0.1:
+            be += Decimal('0.25')
+        add('MFE_UPDATE', be_mfe=be, no_be_mfe=no_be if rng.random() > 0.05 else be - 1)
+        if not triggered and no_be >= 1 and rng.random() < 0.7:
+            triggered = True
+            add('BE_TRIGGERED', be_mfe=be, no_be_mfe=no_be)
+
+    if rng.random() < 0.7:
+        add(rng.choice(['EXIT_STOP_LOSS', 'EXIT_BREAK_EVEN']), be_mfe=be, no_be_mfe=no_be,
+            status='completed' if rng.random() > 0.1 else rng.choice(['active', None]))
+        if rng.random() < 0.05:
+            add('MFE_UPDATE', be_mfe=be, no_be_mfe=no_be)
+    return events
+
+
+def make_history(seed=11, trades=400):
+    rng = random.Random(seed)
+    return [event for index in range(trades) for event in make_trade(rng, index)]
+
+
+def insert(conn, events):
+    from psycopg2.extras import execute_values
+
+    with conn.cursor() as cur:
+        execute_values(cur, f"INSERT INTO automated_signals ({', '.join(COLUMNS)}) VALUES %s",
+                       [tuple(event[c] for c in COLUMNS) for event in events])
+    conn.commit()
+
+
+def stored_violations(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT trade_id, rule, severity, event_id, detail FROM signal_integrity_violations
+            ORDER BY trade_id, rule, event_id, detail
+        """)
+        return cur.fetchall()
+
+
+def legacy_rule(message):
+    return next(rule for prefix, rule in LEGACY_RULES if message.startswith(prefix))
+
+
+def test_matches_per_trade_verifier(conn):
+    insert(conn, make_history())
+    run = verify_all_signals(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT DISTINCT trade_id FROM automated_signals ORDER BY trade_id")
+        trade_ids = [row[0] for row in cur.fetchall()]
+        assert run['trades_checked'] == len(trade_ids)
+
+        stored = {}
+        for trade_id, rule, severity, _, detail in stored_violations(conn):
+            assert INTEGRITY_RULES[rule] == severity
+            stored.setdefault(trade_id, Counter())[(rule, severity)] += 1
+
+        seen_rules = set()
+        for trade_id in trade_ids:
+            result = verify_single_signal(cur, trade_id)
+            expected = Counter((legacy_rule(m), 'error') for m in result['errors'])
+            expected.update((legacy_rule(m), 'warning') for m in result['warnings'])
+            assert stored.get(trade_id, Counter()) == expected, trade_id
+            seen_rules.update(rule for rule, _ in expected)
+
+    # The seeded defects exercise every rule the per-trade checks can raise
+    assert seen_rules == set(INTEGRITY_RULES) - {'timestamp_out_of_order'}
+    assert sum(entry['violations'] for entry in integrity_violation_summary(conn.cursor())['rules'].values()) \
+        == run['violations']
+
+
+def test_messages_match_per_trade_verifier(conn):
+    insert(conn, make_history(seed=3, trades=150))
+    verify_all_signals(conn)
+    with conn.cursor() as cur:
+        for trade_id in {row[0] for row in stored_violations(conn)}:
+            result = verify_single_signal(cur, trade_id)
+            details = [v['detail'] for v in list_integrity_violations(cur, trade_id=trade_id)]
+            assert sorted(details) == sorted(result['errors'] + result['warnings']), trade_id
+
+
+def test_timestamp_order_uses_insertion_order(conn):
+    late = dict(trade_id='LATE', bias='Bullish', entry_price=None, sl_price=None, risk_distance=None,
+                target_1r=None, be_mfe=Decimal('0.5'), no_be_mfe=Decimal('0.5'), session='NY AM', status=None)
+    insert(conn, [
+        dict(late, event_type='ENTRY', timestamp=T0),
+        dict(late, event_type='MFE_UPDATE', timestamp=T0 + timedelta(minutes=5)),
+        dict(late, event_type='MFE_UPDATE', timestamp=T0 + timedelta(minutes=2)),
+    ])
+    verify_all_signals(conn)
+    rows = stored_violations(conn)
+    assert [(r[1], r[2]) for r in rows] == [('timestamp_out_of_order', 'error')]
+    assert rows[0][4] == f"Timestamp out of order at event {rows[0][3]}"
+
+
+def test_incremental_matches_full_run(conn):
+    history = make_history(seed=5, trades=300)
+    insert(conn, history[:len(history) // 2])
+    verify_all_signals(conn)
+
+    # New events, an in-place correction, a deleted event and a re-keyed event
+    insert(conn, history[len(history) // 2:])
+    with conn.cursor() as cur:
+        cur.execute("UPDATE automated_signals SET risk_distance = 99 WHERE trade_id = 'T00003' AND event_type = 'ENTRY'")
+        cur.execute("DELETE FROM automated_signals WHERE trade_id = 'T00010' AND event_type = 'ENTRY'")
+        cur.execute("""
+            UPDATE automated_signals SET trade_id = 'T00021'
+            WHERE id = (SELECT MAX(id) FROM automated_signals WHERE trade_id = 'T00020')
+        """)
+        cur.execute("DELETE FROM automated_signals WHERE trade_id = 'T00030'")
+        cur.execute("SELECT COUNT(*) FROM signal_integrity_dirty_trades")
+        dirty = cur.fetchone()[0]
+    conn.commit()
+
+    run = verify_all_signals(conn, incremental=True)
+    assert run['mode'] == 'incremental' and run['trades_checked'] == dirty - 1  # T00030 has no events left
+    incremental = [row[:3] + row[4:] for row in stored_violations(conn)]
+    assert not any(row[0] == 'T00030' for row in incremental)
+    assert verify_all_signals(conn, incremental=True)['trades_checked'] == 0
+
+    verify_all_signals(conn)
+    assert [row[:3] + row[4:] for row in stored_violations(conn)] == incremental
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE automated_signals")
+    conn.commit()
+    assert stored_violations(conn) == []
+
+
+def test_runs_keep_marks_rewritten_after_they_were_read(conn, pg_url):
+    import psycopg2
+
+    insert(conn, make_history(seed=9, trades=40))
+    with conn.cursor() as cur:
+        marks = read_dirty_marks(cur)
+    conn.commit()
+    assert len(marks) == 40
+
+    # A webhook write lands after the run read the marks (e.g. during its scan)
+    writer = psycopg2.connect(pg_url)
+    try:
+        with writer.cursor() as cur:
+            cur.execute("UPDATE automated_signals SET be_mfe = be_mfe WHERE trade_id = 'T00005'")
+        writer.commit()
+    finally:
+        writer.close()
+
+    assert clear_dirty_marks(conn, marks) == 39
+    with conn.cursor() as cur:
+        cur.execute("SELECT trade_id FROM signal_integrity_dirty_trades")
+        assert cur.fetchall() == [('T00005',)]
+    conn.commit()
+
+    # A full run clears the marks it read and leaves no transaction open
+    verify_all_signals(conn)
+    assert conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM signal_integrity_dirty_trades")
+        assert cur.fetchone()[0] == 0
+    conn.commit()
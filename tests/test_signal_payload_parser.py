@@ -0,0 +1,121 @@
+"""
+Tests for the single-pass webhook payload parser against the original guard ->
+normalize -> parse -> validate -> fuse chain in web_server
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+import random
+
+import pytest
+
+from automated_signals_state import auto_guard_webhook_payload
+from signal_normalization import normalize_signal_payload, validate_normalized_payload
+from signal_payload_parser import SignalEvent, decode_json_body, event_time_utc, parse_signal_event
+from tools.synthetic_event_stream import SyntheticEventStream
+
+
+@pytest.fixture(scope='module')
+def legacy():
+    import web_server
+
+    def parse(raw):
+        guarded, error = auto_guard_webhook_payload(raw)
+        if error:
+            return 'guard', error
+        normalized = normalize_signal_payload(raw)
+        is_valid, _ = validate_normalized_payload(normalized)
+        parsed = web_server.as_parse_automated_signal_payload(normalized if is_valid else raw)
+        if parsed.get('validation_error'):
+            return 'rejected', parsed['validation_error'], parsed
+        error = web_server.as_validate_parsed_payload(parsed)
+        if error:
+            return 'rejected', error, parsed
+        return 'ok', web_server.as_fuse_automated_payload_sources(raw, parsed)
+    return parse
+
+
+def fast(raw):
+    event, error = parse_signal_event(raw)
+    if event is None:
+        return 'guard', error
+    if error:
+        return 'rejected', error, event.parsed()
+    return 'ok', event
+
+
+def test_synthetic_stream_matches_legacy_chain(legacy):
+    for payload in SyntheticEventStream(seed=11, bars=4, concurrent=3).webhook_events(12):
+        expected = legacy(dict(payload))
+        actual = fast(dict(payload))
+        assert expected[0] == 'ok' and actual == expected
+        # Same key order, so raw_payload JSON stored by the handlers is unchanged
+        assert json.dumps(actual[1]) == json.dumps(expected[1])
+
+
+@pytest.mark.parametrize('payload', [
+    {'event_type': 'ENTRY', 'trade_id': 'T1', 'direction': 'LONG', 'entry_price': 'x', 'stop_loss': '1',
+     'risk_R': 1, 'type': 'signal_created', 'signal_id': 'S1'},
+    {'event_type': 'MFE_UPDATE', 'trade_id': 'T1', 'direction': None, 'schema_version': 2},
+    {'event_type': 'MFE_UPDATE', 'trade_id': 'T1', 'attributes': {'event_type': 'BE_TRIGGERED', 'trade_id': 'A1'}},
+    {'event_type': 'mfe_update', 'trade_id': 'T1', 'direction': 'Bullish', 'session': 'NY AM'},
+    {'event_type': 'EXIT_SL', 'trade_id': 'T 1', 'direction': 'SHORT', 'exit_price': 1.0},
+    {'event_type': 'CANCELLED', 'trade_id': 'T,1', 'direction': 'SHORT'},
+    {'event_type': 'BOGUS', 'trade_id': 'T1', 'direction': 'SHORT'},
+    {'event_type': 'EXIT_BE', 'trade_id': 'T1', 'direction': 'SHORT'},
+    {'event_type': 'MFE_UPDATE', 'trade_id': 'T1', 'be_mfe': 'abc'},
+    {'event_type': 'MFE_UPDATE', 'trade_id': 'null'},
+    {'event_type': 'ENTRY', 'trade_id': 'T1', 'direction': 'LONG', 'automation_stage': 'TRADE_RESOLVED',
+     'entry_price': '1', 'stop_loss': '', 'risk_distance': 2},
+])
+def test_edge_payloads_match_legacy_chain(legacy, payload):
+    assert fast(dict(payload)) == legacy(dict(payload))
+
+
+def test_fuzzed_payloads_match_legacy_chain(legacy):
+    rng = random.Random(3)
+    values = [None, '', 'null', 'x', 0, 1.5, '12.5', 'LONG', 'Bullish', 'a b', 'a,b', 'UNKNOWN', True, {}]
+    keys = ['direction', 'type', 'session', 'entry_price', 'price', 'stop_loss', 'stop_price', 'risk_distance',
+            'risk_R', 'be_mfe', 'no_be_mfe', 'exit_price', 'schema_version', 'automation_stage', 'signal_id']
+    event_types = ['ENTRY', 'MFE_UPDATE', 'BE_TRIGGERED', 'EXIT_BE', 'EXIT_SL', 'SIGNAL_CREATED', 'CANCELLED',
+                   'signal_created', 'EXIT_STOP_LOSS', 'BOGUS', '', None]
+    for _ in range(3000):
+        payload = {'event_type': rng.choice(event_types), 'trade_id': rng.choice(['T1', 'T 1', 'T,1', '', 'undefined'])}
+        for _ in range(rng.randrange(6)):
+            payload[rng.choice(keys)] = rng.choice(values)
+        if rng.random() < 0.1:
+            payload['attributes'] = {'event_type': rng.choice(event_types), 'trade_id': rng.choice(['A1', 'A 1'])}
+        try:
+            expected = legacy(dict(payload))
+        except TypeError:
+            # The old chain crashed on non-string trade ids ("," in 1.5); they are now rejected
+            assert fast(dict(payload))[0] == 'rejected', payload
+            continue
+        assert fast(dict(payload)) == expected, payload
+
+
+def test_signal_event_slots_stay_out_of_json():
+    event, error = parse_signal_event({'event_type': 'MFE_UPDATE', 'trade_id': 'T1', 'direction': 'LONG',
+                                       'be_mfe': '1.5', 'event_timestamp': '2025-01-06T09:32:00'})
+    assert error is None and isinstance(event, SignalEvent)
+    assert (event.event_type, event.trade_id, event.format_kind) == ('MFE_UPDATE', 'T1', 'direct_telemetry')
+    assert not hasattr(event, '__dict__')
+    assert 'raw' not in json.loads(json.dumps(event))
+
+
+def test_event_time_utc_reads_naive_as_new_york_and_caches():
+    event, _ = parse_signal_event({'event_type': 'MFE_UPDATE', 'trade_id': 'T1', 'direction': 'LONG',
+                                   'event_timestamp': '2025-07-01T09:30:00'})
+    assert event_time_utc(event) == '2025-07-01T13:30:00+00:00'
+    event['event_timestamp'] = '2025-07-01T10:00:00'
+    assert event_time_utc(event) == '2025-07-01T13:30:00+00:00'
+    assert event_time_utc({'timestamp': '2025-01-06T09:30:00Z'}) == '2025-01-06T14:30:00+00:00'
+
+
+def test_decode_json_body():
+    assert decode_json_body(b'{"event_type": "ENTRY"}') == {'event_type': 'ENTRY'}
+    assert decode_json_body(b'{"be_mfe": NaN}')['be_mfe'] != 0
+    assert decode_json_body(b'not json') is None
+    assert decode_json_body(b'') is None
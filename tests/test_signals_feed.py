@@ -0,0 +1,190 @@
+"""
+Tests for keyset cursors, the trigger-maintained signals feed and both paged endpoints
+
+The feed and endpoint tests need a scratch Postgres database; set TEST_DATABASE_URL
+to run them.
+"""
+
+import sys
+sys.path.append('.')
+
+import os
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+import pytest
+
+from signals_feed import CachedTotals, InvalidCursor, decode_cursor, encode_cursor
+
+FEED_SQL_PATH = os.path.join('database', 'signals_feed_keyset.sql')
+BASE = datetime(2025, 3, 3, 14, 30, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    ts = datetime(2025, 3, 3, 9, 31, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(ts, 'T1')) == (ts.isoformat(), 'T1')
+    assert decode_cursor(encode_cursor(1741000000000, 'T2')) == (1741000000000, 'T2')
+    assert decode_cursor('') is None
+    for bad in ('nope', encode_cursor(1, 'T')[:-2] + '!!', 'W3siYSI6MX0sIDFd'):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(bad)
+
+
+def test_cached_totals_load_once_per_key():
+    calls = []
+    totals = CachedTotals(ttl=60)
+    assert totals.get('a', lambda: calls.append('a') or 3) == 3
+    assert totals.get('a', lambda: calls.append('a2') or 4) == 3
+    assert totals.get('b', lambda: calls.append('b') or 5) == 5
+    assert calls == ['a', 'b']
+
+
+SCHEMA_SQL = ["""
+    CREATE TABLE automated_signals (
+        id SERIAL PRIMARY KEY, trade_id VARCHAR(100), event_type VARCHAR(20), direction VARCHAR(10),
+        entry_price DECIMAL(10,2), stop_loss DECIMAL(10,2), be_mfe DECIMAL(10,4), no_be_mfe DECIMAL(10,4),
+        mae_global_r DECIMAL(10,4), timestamp TIMESTAMP DEFAULT NOW(), symbol TEXT,
+        signal_bar_open_ts TIMESTAMPTZ, entry_bar_open_ts TIMESTAMPTZ, exit_bar_open_ts TIMESTAMPTZ
+    );
+    CREATE TABLE signal_metrics_v1 (trade_id TEXT PRIMARY KEY, no_be_mfe NUMERIC, be_mfe NUMERIC, mae_global_r NUMERIC);
+    CREATE TABLE market_bars_ohlcv_1m_clean (symbol TEXT, ts TIMESTAMPTZ);
+    CREATE TABLE all_signals_ledger (
+        trade_id TEXT PRIMARY KEY, triangle_time_ms BIGINT NOT NULL, confirmation_time_ms BIGINT,
+        direction TEXT NOT NULL, status TEXT NOT NULL, bars_to_confirm INTEGER, session TEXT,
+        entry_price NUMERIC, stop_loss NUMERIC, risk_points NUMERIC, htf_daily TEXT, htf_4h TEXT,
+        htf_1h TEXT, htf_15m TEXT, htf_5m TEXT, htf_1m TEXT, updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    CREATE TABLE confirmed_signals_ledger (
+        trade_id TEXT PRIMARY KEY, entry NUMERIC, stop NUMERIC, be_mfe NUMERIC, no_be_mfe NUMERIC,
+        mae NUMERIC, completed BOOLEAN
+    );
+"""]
+
+
+def _insert_trades(cursor, start, count):
+    for i in range(start, start + count):
+        trade_id = f"T{i:04d}"
+        symbol = 'GLBX.MDP3:NQ' if i % 4 else 'GLBX.MDP3:ES'
+        # Every fifth trade shares its signal bar with the previous one to exercise the trade_id tiebreak
+        signal_ts = BASE + timedelta(minutes=i - (i % 5 == 0))
+        cursor.execute("""
+            INSERT INTO automated_signals (trade_id, event_type, direction, symbol, signal_bar_open_ts, entry_price, stop_loss)
+            VALUES (%s, 'SIGNAL_CREATED', 'LONG', %s, %s, 20000, 19990)
+        """, (trade_id, symbol, signal_ts))
+        if i % 3:
+            cursor.execute("""
+                INSERT INTO automated_signals (trade_id, event_type, symbol, entry_bar_open_ts, no_be_mfe)
+                VALUES (%s, 'ENTRY', NULL, %s, 0.5)
+            """, (trade_id, signal_ts + timedelta(minutes=1)))
+
+
+@pytest.fixture
+def feed_db(conn):
+    conn.autocommit = True
+    cursor = conn.cursor()
+    _insert_trades(cursor, 1, 40)
+    with open(FEED_SQL_PATH) as f:
+        cursor.execute(f.read())
+    return conn, cursor
+
+
+def test_feed_triggers_track_recount(feed_db):
+    from database.run_signals_feed_keyset_migration import read_feed, recount_feed
+
+    conn, cursor = feed_db
+    assert len(read_feed(cursor)) == 40 and read_feed(cursor) == recount_feed(cursor)
+
+    _insert_trades(cursor, 41, 5)
+    cursor.execute("INSERT INTO automated_signals (trade_id, event_type) VALUES ('T0002', 'EXIT_SL'), ('T0004', 'CANCELLED')")
+    cursor.execute("UPDATE automated_signals SET trade_id = 'T0007' WHERE trade_id = 'T0008'")
+    cursor.execute("UPDATE automated_signals SET symbol = 'GLBX.MDP3:ES' WHERE trade_id = 'T0010'")
+    cursor.execute("DELETE FROM automated_signals WHERE trade_id IN ('T0011', 'T0013') AND event_type = 'SIGNAL_CREATED'")
+    cursor.execute("DELETE FROM automated_signals WHERE trade_id = 'T0014'")
+    feed = read_feed(cursor)
+    assert feed == recount_feed(cursor)
+    assert feed['T0002'][2] == 'EXITED' and feed['T0004'][2] == 'CANCELLED' and 'T0008' not in feed
+    assert 'T0014' not in feed and feed['T0011'][0] is None
+
+    cursor.execute("TRUNCATE automated_signals")
+    assert read_feed(cursor) == {}
+
+
+def _client(monkeypatch, url):
+    from flask import Flask
+
+    monkeypatch.setenv('DATABASE_URL', url)
+    monkeypatch.delenv('DATABASE_PUBLIC_URL', raising=False)
+    import api.signals_v1 as signals_v1
+    import automated_signals_api_robust
+
+    signals_v1.feed_totals = CachedTotals()
+    automated_signals_api_robust.ledger_totals = CachedTotals()
+    app = Flask(__name__)
+    app.register_blueprint(signals_v1.signals_v1_bp)
+    automated_signals_api_robust.register_automated_signals_api_robust(app, None)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('installed', [True, False])
+def test_signals_v1_pages_match_full_ordering(feed_db, pg_url, monkeypatch, installed):
+    conn, cursor = feed_db
+    if not installed:
+        cursor.execute("DROP TABLE automated_signals_feed CASCADE")
+    client = _client(monkeypatch, pg_url)
+
+    cursor.execute("""
+        SELECT trade_id FROM automated_signals WHERE event_type = 'SIGNAL_CREATED' AND symbol = 'GLBX.MDP3:NQ'
+        ORDER BY signal_bar_open_ts DESC, trade_id DESC
+    """)
+    expected = [r[0] for r in cursor.fetchall()]
+
+    seen, cursor_param, pages = [], '', 0
+    while True:
+        resp = client.get(f'/api/signals/v1/all?symbol=GLBX.MDP3:NQ&limit=7&cursor={cursor_param}')
+        body = resp.get_json()
+        assert resp.status_code == 200 and body['total'] == len(expected)
+        seen += [r['trade_id'] for r in body['rows']]
+        pages += 1
+        if not body['next_cursor']:
+            break
+        cursor_param = body['next_cursor']
+    assert seen == expected and pages == -(-len(expected) // 7)
+
+    confirmed = client.get('/api/signals/v1/all?symbol=GLBX.MDP3:NQ&status=CONFIRMED&limit=500').get_json()
+    assert {r['status'] for r in confirmed['rows']} == {'CONFIRMED'}
+    assert [r['trade_id'] for r in confirmed['rows']] == [t for t in expected if int(t[1:]) % 3]
+
+    since = (BASE + timedelta(minutes=20)).isoformat()
+    window = client.get(f'/api/signals/v1/all?symbol=GLBX.MDP3:NQ&since={quote(since)}').get_json()
+    assert [r['trade_id'] for r in window['rows']] == [t for t in expected if int(t[1:]) > 20]
+
+    assert client.get('/api/signals/v1/all?cursor=garbage').status_code == 400
+    # Well-formed cursors whose sort key isn't a timestamp (e.g. from the ledger endpoint)
+    for bad in (encode_cursor(1741000000000, 'L001'), encode_cursor('yesterday', 'T0001')):
+        assert client.get(f'/api/signals/v1/all?cursor={bad}').status_code == 400
+
+
+def test_ledger_pages_follow_keyset(feed_db, pg_url, monkeypatch):
+    conn, cursor = feed_db
+    cursor.execute("""
+        INSERT INTO all_signals_ledger (trade_id, triangle_time_ms, direction, status)
+        SELECT 'L' || lpad(g::text, 3, '0'), 1741000000000 + (g / 2) * 60000, 'Bullish', 'PENDING'
+        FROM generate_series(1, 25) g
+    """)
+    client = _client(monkeypatch, pg_url)
+
+    seen, cursor_param = [], ''
+    while True:
+        body = client.get(f'/api/all-signals/data?limit=4&cursor={cursor_param}').get_json()
+        assert body['success'] and body['total'] == 25
+        seen += [s['trade_id'] for s in body['signals']]
+        if not body['next_cursor']:
+            break
+        cursor_param = body['next_cursor']
+    assert seen == sorted(seen, key=lambda t: (int(t[1:]) // 2, t), reverse=True) and len(set(seen)) == 25
+
+    window = client.get('/api/all-signals/data?since_ms=1741000300000&until_ms=1741000500000').get_json()
+    assert [s['trade_id'] for s in window['signals']] == ['L017', 'L016', 'L015', 'L014', 'L013', 'L012', 'L011', 'L010']
+
+    v1_cursor = encode_cursor(BASE, 'T0001')
+    assert client.get(f'/api/all-signals/data?cursor={v1_cursor}').status_code == 400
@@ -0,0 +1,73 @@
+"""
+Unit tests for the static asset cache (ETag / 304 / precompressed variants)
+"""
+
+import gzip
+import os
+import sys
+sys.path.append('.')
+from static_asset_cache import StaticAssetCache, parse_accept_encoding, select_encoding
+
+PAGE = "<html><body>" + ("<div class='row'>dashboard</div>" * 200) + "</body></html>"
+
+def _make_cache(tmp_path, content=PAGE):
+    (tmp_path / "page.html").write_text(content, encoding="utf-8")
+    cache = StaticAssetCache(str(tmp_path))
+    cache.preload()
+    return cache
+
+def test_preload_and_text(tmp_path):
+    """Preloaded asset returns identical text without re-reading"""
+    cache = _make_cache(tmp_path)
+    assert cache.get_text("page.html") == PAGE
+    assert cache.stats['loads'] == 1
+    assert cache.stats['hits'] == 1
+
+def test_gzip_variant_selected_and_decodes(tmp_path):
+    """Client accepting gzip receives the precompressed body"""
+    cache = _make_cache(tmp_path)
+    asset = cache.get("page.html")
+    body, status, headers = cache.build_response(asset, accept_encoding="gzip, deflate")
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body).decode() == PAGE
+    assert len(body) < asset.size
+
+def test_identity_when_encoding_refused(tmp_path):
+    """q=0 disables an encoding"""
+    cache = _make_cache(tmp_path)
+    asset = cache.get("page.html")
+    assert select_encoding(asset, "gzip;q=0, br;q=0") == 'identity'
+    body, status, headers = cache.build_response(asset, accept_encoding=None)
+    assert 'Content-Encoding' not in headers
+    assert body == PAGE.encode()
+
+def test_conditional_get_returns_304(tmp_path):
+    """Matching If-None-Match answers 304 with empty body"""
+    cache = _make_cache(tmp_path)
+    asset = cache.get("page.html")
+    _, _, headers = cache.build_response(asset, accept_encoding="gzip")
+    body, status, _ = cache.build_response(asset, if_none_match=headers['ETag'], accept_encoding="gzip")
+    assert status == 304
+    assert body == b''
+    body, status, _ = cache.build_response(asset, if_none_match='W/' + headers['ETag'])
+    assert status == 304
+
+def test_mtime_change_invalidates(tmp_path):
+    """Rewriting the file produces a new entry and ETag"""
+    cache = _make_cache(tmp_path)
+    old_etag = cache.get("page.html").etag
+    target = tmp_path / "page.html"
+    target.write_text(PAGE + "<!-- v2 -->", encoding="utf-8")
+    st = os.stat(target)
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    asset = cache.get("page.html")
+    assert asset.etag != old_etag
+    assert asset.text.endswith("<!-- v2 -->")
+
+def test_missing_file_returns_none(tmp_path):
+    cache = StaticAssetCache(str(tmp_path))
+    assert cache.get("nope.html") is None
+
+def test_parse_accept_encoding_qvalues():
+    assert parse_accept_encoding("br;q=0.5, gzip") == {'br': 0.5, 'gzip': 1.0}
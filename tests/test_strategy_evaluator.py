@@ -0,0 +1,54 @@
+"""
+Tests for the subset-lattice strategy evaluator against the per-strategy reference path
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+from datetime import time
+from decimal import Decimal
+
+from strategy_evaluator import SESSIONS, StrategyEvaluator
+
+
+def make_trades(n, seed=0):
+    rng = random.Random(seed)
+    trades = []
+    for _ in range(n):
+        trades.append({
+            'date': None,
+            'time': rng.choice([None, time(rng.randrange(24), rng.randrange(60)),
+                                f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00"]),
+            'session': rng.choice(SESSIONS + ['Unknown']),
+            'bias': 'Bullish',
+            'mfe_none': Decimal(str(round(rng.uniform(-1, 6), 1))),
+            'mfe1': Decimal(str(round(rng.choice([0, 0.5, 1, 1.5, rng.uniform(-1, 8)]), 1))),
+        })
+    return trades
+
+
+def test_lattice_matches_test_strategy():
+    trades = make_trades(300)
+    evaluator = StrategyEvaluator(db=None)
+    optimal_hours = evaluator._find_optimal_hours(trades, SESSIONS)
+    strategies = evaluator._generate_strategy_combinations(trades)
+    assert len(strategies) > 1000
+    for strategy in strategies[::37]:
+        expected = evaluator._test_strategy(trades, strategy['session'], strategy['be_strategy'],
+                                            strategy['r_target'], strategy['time_filter'], optimal_hours)
+        assert strategy == expected
+
+
+def test_rank_strategies_matches_full_comparison():
+    trades = make_trades(400, seed=1)
+    evaluator = StrategyEvaluator(db=None)
+    strategies = evaluator._generate_strategy_combinations(trades)
+    lattice = evaluator.build_lattice(trades)
+    for constraints in (None, {'max_drawdown': 8, 'min_win_rate': 0.3}, {'min_expectancy': 5}):
+        pool = evaluator._apply_constraints(strategies, constraints) if constraints else strategies
+        full = evaluator.compare_strategies(pool)
+        for limit in (1, 10):
+            ranked = evaluator.rank_strategies(lattice, constraints, limit=limit)
+            assert [r['strategy'] for r in ranked] == [r['strategy'] for r in full[:limit]]
+            assert [r['composite_score'] for r in ranked] == [r['composite_score'] for r in full[:limit]]
@@ -0,0 +1,63 @@
+"""
+Tests for the synthetic event stream and benchmark report helpers
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import datetime, timezone
+
+from services.signal_contract_v1_mapper import ms_to_timestamptz
+from tools.synthetic_event_stream import SyntheticEventStream
+from tools.webhook_throughput_benchmark import compare_reports, summarize
+
+
+def test_stream_is_deterministic_for_seed():
+    """Same seed and start produce identical payloads"""
+    start = datetime(2025, 3, 3, 9, 30)
+    a = list(SyntheticEventStream(seed=7, start=start, bars=5).webhook_events(4))
+    b = list(SyntheticEventStream(seed=7, start=start, bars=5).webhook_events(4))
+    assert a == b
+
+
+def test_each_trade_follows_lifecycle_order():
+    """Interleaving keeps SIGNAL_CREATED -> ENTRY -> MFE/BE -> EXIT per trade"""
+    stream = SyntheticEventStream(seed=3, bars=6, concurrent=3)
+    per_trade = {}
+    for payload in stream.webhook_events(6):
+        per_trade.setdefault(payload['trade_id'], []).append(payload['event_type'])
+
+    assert len(per_trade) == 6
+    for events in per_trade.values():
+        assert events[0] == 'SIGNAL_CREATED'
+        assert events[1] == 'ENTRY'
+        assert events[-1] in ('EXIT_BE', 'EXIT_SL')
+        assert set(events[2:-1]) <= {'MFE_UPDATE', 'BE_TRIGGERED'}
+        assert events.count('MFE_UPDATE') == 6
+
+
+def test_export_batches_shape():
+    batches = list(SyntheticEventStream(seed=1).export_batches(3, 10))
+    assert [b['batch_number'] for b in batches] == [1, 2, 3]
+    assert all(len(b['signals']) == 10 and b['total_signals'] == 30 for b in batches)
+
+
+def test_summarize_and_compare():
+    samples = [{'status': 200, 'ms': float(ms), 'connects': 1, 'queries': 3, 'commits': 1, 'rollbacks': ms % 2,
+                'error': None} for ms in range(1, 101)]
+    stats = summarize(samples, 2.0)
+    assert stats['latency_ms_p50'] == 51.0
+    assert stats['throughput_rps'] == 50.0
+    assert stats['db_queries_per_request'] == 3.0
+    assert (stats['db_commits_per_request'], stats['db_rollbacks_per_request']) == (1.0, 0.5)
+
+    slower = dict(stats, latency_ms_p50=102.0)
+    diff = compare_reports({'webhook': {'MFE_UPDATE': stats}}, {'webhook': {'MFE_UPDATE': slower}})
+    assert diff['webhook:MFE_UPDATE']['latency_ms_p50']['change_pct'] == 100.0
+
+
+def test_ms_to_timestamptz_accepts_iso_strings():
+    """Webhook payloads carry ISO NY-local event_timestamp strings as well as epoch ms"""
+    assert ms_to_timestamptz(1735741800000) == datetime(2025, 1, 1, 14, 30, tzinfo=timezone.utc)
+    assert ms_to_timestamptz('2025-01-01T09:30:00') == datetime(2025, 1, 1, 14, 30, tzinfo=timezone.utc)
+    assert ms_to_timestamptz(None) is None
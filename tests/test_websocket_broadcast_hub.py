@@ -0,0 +1,100 @@
+"""
+Unit tests for the sharded WebSocket broadcast hub
+"""
+
+import sys
+import time
+from threading import Lock
+sys.path.append('.')
+from websocket_broadcast_hub import BroadcastHub, trade_room, dashboard_room
+
+class FakeSocketIO:
+    """Records emits instead of writing to sockets"""
+    def __init__(self):
+        self.lock = Lock()
+        self.frames = []
+
+    def emit(self, event, payload, to=None, namespace=None):
+        with self.lock:
+            self.frames.append((to, event, dict(payload)))
+
+    def for_sid(self, sid):
+        with self.lock:
+            return [(e, p) for to, e, p in self.frames if to == sid]
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_mfe_updates_coalesce_within_window():
+    """Several MFE updates for one trade inside the window become one frame with latest values"""
+    sio = FakeSocketIO()
+    hub = BroadcastHub(sio, coalesce_ms=100, shards=2)
+    hub.start()
+    try:
+        hub.add_connection("a")
+        for i in range(5):
+            hub.publish_mfe_update("T1", {"trade_id": "T1", "be_mfe": i * 0.1})
+        assert _wait_for(lambda: len(sio.for_sid("a")) == 1)
+        time.sleep(0.15)
+        frames = sio.for_sid("a")
+        assert len(frames) == 1
+        event, payload = frames[0]
+        assert event == "mfe_update"
+        assert payload["be_mfe"] == 0.4
+        assert payload["coalesced"] == 5
+    finally:
+        hub.stop()
+
+def test_room_subscription_filters_events():
+    """Subscribed clients only receive their trade room; legacy clients receive everything"""
+    sio = FakeSocketIO()
+    hub = BroadcastHub(sio, coalesce_ms=10)
+    hub.start()
+    try:
+        hub.add_connection("legacy")
+        hub.add_connection("watcher")
+        hub.subscribe("watcher", [trade_room("T2")])
+        hub.publish_mfe_update("T1", {"trade_id": "T1"})
+        hub.publish_mfe_update("T2", {"trade_id": "T2"})
+        assert _wait_for(lambda: len(sio.for_sid("legacy")) == 2)
+        assert _wait_for(lambda: len(sio.for_sid("watcher")) == 1)
+        assert sio.for_sid("watcher")[0][1]["trade_id"] == "T2"
+    finally:
+        hub.stop()
+
+def test_dashboard_room_receives_non_trade_events():
+    sio = FakeSocketIO()
+    hub = BroadcastHub(sio, coalesce_ms=10)
+    hub.start()
+    try:
+        hub.subscribe("dash", [dashboard_room("automated_signals")])
+        hub.publish("signal_received", {"trade_id": "T9"})
+        assert _wait_for(lambda: len(sio.for_sid("dash")) == 1)
+    finally:
+        hub.stop()
+
+def test_outbound_queue_is_bounded():
+    """A connection whose queue overflows drops the oldest frames"""
+    sio = FakeSocketIO()
+    hub = BroadcastHub(sio, max_queue_depth=3)
+    hub.add_connection("slow")
+    # Hub not started: frames accumulate in the connection queue
+    for i in range(10):
+        hub._fan_out("tick", {"i": i}, frozenset({"all"}), "/")
+    conn = hub._connections["slow"]
+    assert len(conn.queue) == 3
+    assert conn.dropped == 7
+    assert [p["i"] for _, p, _ in conn.queue] == [7, 8, 9]
+
+def test_remove_connection_cleans_rooms():
+    hub = BroadcastHub(FakeSocketIO())
+    hub.add_connection("x")
+    hub.subscribe("x", [trade_room("T1")])
+    hub.remove_connection("x")
+    assert hub.room_size(trade_room("T1")) == 0
+    assert hub.get_stats()["connections"] == 0
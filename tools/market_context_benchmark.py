@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Offline latency benchmark for MarketDataEnricher.enrich_signal_with_context.
+
+Runs the enricher against deterministic fake providers (market_context_providers.
+fake_providers) that sleep --latency seconds per fetch, and reports the latency a
+webhook request sees in each cache state:
+
+- serial   every source fetched one after another (the old inline refresh on expiry)
+- cold     first request after start: sources fetched concurrently, inline
+- warm     snapshot fresh: served from memory
+- stale    snapshot older than the fresh window: served stale, refreshed in background
+
+Usage:
+    python tools/market_context_benchmark.py --latency 0.5 --requests 200 --output ctx.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_context_providers import fake_providers
+from market_data_enricher import MarketDataEnricher
+
+SIGNAL = {'symbol': 'NQ1!', 'bias': 'Bullish', 'type': 'FVG_BULL', 'price': 20125.25}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def timed(fn, count):
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return {
+        'requests': count,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'max_ms': round(max(samples), 3),
+    }
+
+
+def run(latency, requests, seed):
+    report = {'latency_s': latency, 'seed': seed}
+
+    providers = fake_providers(seed=seed, latency=latency)
+    report['serial'] = timed(lambda: [p.fetch() for p in providers], 1)
+
+    enricher = MarketDataEnricher(providers=fake_providers(seed=seed, latency=latency))
+    report['cold'] = timed(lambda: enricher.enrich_signal_with_context(SIGNAL), 1)
+    report['warm'] = timed(lambda: enricher.enrich_signal_with_context(SIGNAL), requests)
+
+    # Zero fresh window: every request finds the snapshot stale
+    enricher.context_cache.fresh_seconds = 0
+    report['stale'] = timed(lambda: enricher.enrich_signal_with_context(SIGNAL), requests)
+    report['fetches'] = {p.name: p.calls for p in enricher.context_cache.providers.values()}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market context enrichment latency benchmark")
+    parser.add_argument('--latency', type=float, default=0.5, help="seconds each fake source takes")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = run(args.latency, args.requests, args.seed)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the rolling regime feature kernels on a year of 1m bars.
+
+Times, for every bar of the series:
+
+- legacy   the per-window InstitutionalMLEngine paths (Higuchi loops, R/S Hurst and
+           the _volatility_risk_features block), timed on --legacy-sample evenly
+           spaced bars and extrapolated to the full series
+- kernels  regime_feature_kernels.regime_features over the whole series
+
+Both paths are compared on the sampled bars; the largest absolute difference per
+feature is reported.
+
+Prices are a synthetic 1m random walk (one year of 23h sessions by default) or the
+close column of a CSV (--csv, e.g. an export of market_bars_ohlcv_1m_clean).
+
+Usage:
+    python tools/regime_kernel_benchmark.py --output regime_kernels.json
+    python tools/regime_kernel_benchmark.py --csv nq_1m_2024.csv --legacy-sample 2000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from regime_feature_kernels import (
+    FRACTAL_WINDOW, HURST_WINDOW, REGIME_FEATURE_COLUMNS, TAIL_WINDOW, VOLATILITY_WINDOWS, regime_features
+)
+
+YEAR_OF_1M_BARS = 252 * 23 * 60
+
+
+def load_prices(args):
+    if args.csv:
+        with open(args.csv, newline='') as f:
+            return np.array([float(row[args.column]) for row in csv.DictReader(f)])
+    rng = np.random.default_rng(args.seed)
+    return 20000 * np.exp(np.cumsum(rng.normal(0, 4e-4, args.bars)))
+
+
+def legacy_row(prices):
+    """One bar's features the way the engine computed them before the kernels"""
+    returns = np.diff(np.log(prices))
+    row = [legacy_fractal(prices[-FRACTAL_WINDOW:]), legacy_hurst(prices[-HURST_WINDOW:])]
+    row += [np.std(returns[-w:]) * np.sqrt(252 * 24 * 60) for w in VOLATILITY_WINDOWS]
+    bipower = np.sum(np.abs(returns[-20:-1]) * np.abs(returns[-19:])) * (np.pi / 2)
+    row += [bipower, max(0, np.sum(returns[-20:] ** 2) - bipower)]
+    var_95 = np.percentile(returns[-50:], 5)
+    row += [var_95, np.mean(returns[-50:][returns[-50:] <= var_95])]
+    row += [stats.skew(returns[-20:]), stats.kurtosis(returns[-20:])]
+    return row
+
+
+def legacy_fractal(prices):
+    """InstitutionalMLEngine._calculate_fractal_dimension before the kernels"""
+    N = len(prices)
+    k_max = min(20, N // 4)
+    lk = []
+    for k in range(1, k_max + 1):
+        lm = []
+        for m in range(k):
+            ll = 0
+            for i in range(1, int((N - m) / k)):
+                ll += abs(prices[m + i * k] - prices[m + (i - 1) * k])
+            ll = ll * (N - 1) / (k * k * int((N - m) / k))
+            lm.append(ll)
+        lk.append(np.mean(lm))
+    slope = np.polyfit(np.log(range(1, k_max + 1)), np.log(lk), 1)[0]
+    return max(1.0, min(2.0, 2 - slope))
+
+
+def legacy_hurst(prices):
+    """InstitutionalMLEngine._calculate_hurst_exponent before the kernels"""
+    returns = np.diff(np.log(prices))
+    cumulative = np.cumsum(returns - np.mean(returns))
+    S = np.std(returns)
+    if S == 0:
+        return 0.5
+    return max(0.0, min(1.0, np.log((np.max(cumulative) - np.min(cumulative)) / S) / np.log(len(returns))))
+
+
+def run(args):
+    warnings.filterwarnings('ignore')
+    prices = load_prices(args)
+    first = max(HURST_WINDOW, TAIL_WINDOW + 1)
+    bars = np.linspace(first, len(prices), min(args.legacy_sample, len(prices) - first), dtype=int)
+
+    started = time.perf_counter()
+    # The engine sees a 200-bar market_data window per prediction
+    legacy = np.array([legacy_row(prices[max(0, end - 200):end]) for end in bars])
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    features = regime_features(prices)
+    kernel_seconds = time.perf_counter() - started
+
+    kernel = np.column_stack([features[name] for name in REGIME_FEATURE_COLUMNS])[bars - 1]
+    max_abs_diff = {
+        name: float(np.nanmax(np.abs(kernel[:, i] - legacy[:, i]))) for i, name in enumerate(REGIME_FEATURE_COLUMNS)
+    }
+    legacy_per_bar = legacy_seconds / len(bars)
+    report = {
+        'bars': len(prices),
+        'legacy_sample': len(bars),
+        'legacy_us_per_bar': round(legacy_per_bar * 1e6, 2),
+        'legacy_seconds_extrapolated': round(legacy_per_bar * len(prices), 2),
+        'kernel_seconds': round(kernel_seconds, 3),
+        'kernel_us_per_bar': round(kernel_seconds / len(prices) * 1e6, 3),
+        'max_abs_diff': max_abs_diff,
+    }
+    report['speedup'] = round(report['legacy_seconds_extrapolated'] / kernel_seconds, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling regime feature kernel benchmark")
+    parser.add_argument('--bars', type=int, default=YEAR_OF_1M_BARS, help="synthetic bars when --csv is not given")
+    parser.add_argument('--csv', help="CSV of 1m bars")
+    parser.add_argument('--column', default='close', help="price column in --csv")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--legacy-sample', type=int, default=3000, help="bars timed on the legacy path")
+    parser.add_argument('--output', help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Synthetic TradingView event stream.
+
+Generates realistic automated-signal lifecycles in the exact payload shapes the
+webhooks receive:
+
+- /api/automated-signals/webhook: SIGNAL_CREATED -> ENTRY -> MFE_UPDATE (one per
+  bar) -> optional BE_TRIGGERED -> EXIT_BE / EXIT_SL, interleaved across
+  concurrently open trades the way bars arrive live
+- /api/indicator-export: INDICATOR_EXPORT_V2 / ALL_SIGNALS_EXPORT / MFE_UPDATE_BATCH
+  envelopes with `batch_size` signals each
+
+Deterministic for a given seed so benchmark runs are comparable across commits.
+
+Usage:
+    python tools/synthetic_event_stream.py --trades 5 --bars 10 | head
+"""
+
+import argparse
+import heapq
+import json
+import random
+from datetime import datetime, timedelta
+
+LIFECYCLE_EVENT_TYPES = ("SIGNAL_CREATED", "ENTRY", "MFE_UPDATE", "BE_TRIGGERED", "EXIT_BE", "EXIT_SL")
+EXPORT_EVENT_TYPES = ("INDICATOR_EXPORT_V2", "ALL_SIGNALS_EXPORT", "MFE_UPDATE_BATCH")
+SESSIONS = (
+    (0, "ASIA"), (6, "LONDON"), (8, "NY PRE"), (9, "NY AM"), (12, "NY LUNCH"), (13, "NY PM"), (20, "ASIA"),
+)
+
+
+def session_for(ts):
+    name = SESSIONS[0][1]
+    for start_hour, label in SESSIONS:
+        if ts.hour >= start_hour:
+            name = label
+    return name
+
+
+def make_trade_id(ts, direction):
+    """Matches the indicator format parsed by handle_signal_created: YYYYMMDD_HHMMSS000_DIRECTION"""
+    return f"{ts.strftime('%Y%m%d_%H%M%S')}000_{'BULLISH' if direction == 'LONG' else 'BEARISH'}"
+
+
+class SyntheticEventStream:
+    """
+    Seeded generator of lifecycle webhook payloads and indicator export batches.
+    bars: MFE_UPDATE events per trade (one per 1m bar)
+    concurrent: trades open at the same time (controls interleaving)
+    be_rate: fraction of trades that reach +1R and exit at BE instead of SL
+    signal_created: emit the SIGNAL_CREATED (triangle) event ahead of ENTRY
+    """
+
+    def __init__(self, seed=42, symbol="NQ1!", start=None, bars=30, concurrent=5,
+                 be_rate=0.4, price=20000.0, signal_created=True):
+        self.rng = random.Random(seed)
+        self.symbol = symbol
+        self.start = start or datetime(2025, 1, 6, 9, 30)
+        self.bars = bars
+        self.concurrent = max(1, concurrent)
+        self.be_rate = be_rate
+        self.price = price
+        self.signal_created = signal_created
+
+    # ------------------------------------------------------------------
+    # Lifecycle webhooks
+    # ------------------------------------------------------------------
+    def lifecycle(self, index):
+        """All payloads for one trade as (arrival_time, payload) in lifecycle order"""
+        rng = self.rng
+        created = self.start + timedelta(minutes=index * max(1, self.bars // self.concurrent))
+        direction = "LONG" if rng.random() < 0.5 else "SHORT"
+        bias = "Bullish" if direction == "LONG" else "Bearish"
+        sign = 1 if direction == "LONG" else -1
+        trade_id = make_trade_id(created, direction)
+        session = session_for(created)
+
+        entry = round(self.price + rng.uniform(-150, 150), 2)
+        risk = round(rng.uniform(8, 40), 2)
+        stop = round(entry - sign * risk, 2)
+        base = {"trade_id": trade_id, "symbol": self.symbol, "direction": direction,
+                "session": session, "bias": bias}
+
+        events = []
+        if self.signal_created:
+            events.append((created, dict(base, event_type="SIGNAL_CREATED",
+                                         event_timestamp=created.isoformat(),
+                                         triangle_time_ms=int(created.timestamp() * 1000))))
+
+        confirm = created + timedelta(minutes=rng.randint(1, 3))
+        events.append((confirm, dict(base, event_type="ENTRY", entry_price=f"{entry:.2f}",
+                                     stop_loss=f"{stop:.2f}", risk_distance=f"{risk:.2f}",
+                                     event_timestamp=confirm.isoformat(),
+                                     confirmation_time_ms=int(confirm.timestamp() * 1000))))
+
+        hits_be = rng.random() < self.be_rate
+        peak = rng.uniform(1.0, 6.0) if hits_be else rng.uniform(0.0, 0.9)
+        be_bar = rng.randint(1, max(1, self.bars // 2)) if hits_be else None
+
+        price = entry
+        mfe = 0.0
+        mae = 0.0
+        for bar in range(1, self.bars + 1):
+            ts = confirm + timedelta(minutes=bar)
+            progress = bar / self.bars
+            target = peak * min(1.0, progress * 1.5)
+            r_move = target + rng.gauss(0, 0.15)
+            price = round(entry + sign * r_move * risk, 2)
+            mfe = max(mfe, r_move)
+            mae = min(mae, r_move, 0.0)
+            events.append((ts, dict(base, event_type="MFE_UPDATE", current_price=f"{price:.2f}",
+                                    be_mfe=f"{mfe:.2f}", no_be_mfe=f"{mfe:.2f}",
+                                    mae_global_r=f"{mae:.2f}", event_timestamp=ts.isoformat())))
+            if be_bar == bar:
+                events.append((ts, dict(base, event_type="BE_TRIGGERED", be_mfe="1.00",
+                                        no_be_mfe=f"{max(mfe, 1.0):.2f}", event_timestamp=ts.isoformat())))
+
+        exit_ts = confirm + timedelta(minutes=self.bars + 1)
+        if hits_be:
+            exit_type, exit_price = "EXIT_BE", entry
+        else:
+            exit_type, exit_price = "EXIT_SL", stop
+        events.append((exit_ts, dict(base, event_type=exit_type, exit_price=f"{exit_price:.2f}",
+                                     final_be_mfe=f"{mfe if hits_be else 0.0:.2f}",
+                                     final_no_be_mfe=f"{mfe:.2f}", event_timestamp=exit_ts.isoformat())))
+        return events
+
+    def webhook_events(self, trades):
+        """Lifecycles for `trades` trades merged in arrival order (as they'd hit the webhook)"""
+        streams = [iter(self.lifecycle(i)) for i in range(trades)]
+        heap = []
+        for n, stream in enumerate(streams):
+            first = next(stream, None)
+            if first is not None:
+                heap.append((first[0], n, 0, first[1], stream))
+        heapq.heapify(heap)
+        while heap:
+            ts, n, seq, payload, stream = heapq.heappop(heap)
+            yield payload
+            nxt = next(stream, None)
+            if nxt is not None:
+                heapq.heappush(heap, (nxt[0], n, seq + 1, nxt[1], stream))
+
+    # ------------------------------------------------------------------
+    # Indicator export batches
+    # ------------------------------------------------------------------
+    def _export_signal(self, index, completed):
+        rng = self.rng
+        ts = self.start + timedelta(minutes=index * 3)
+        direction = "Bullish" if rng.random() < 0.5 else "Bearish"
+        entry = round(self.price + rng.uniform(-150, 150), 2)
+        risk = round(rng.uniform(8, 40), 2)
+        stop = round(entry - risk if direction == "Bullish" else entry + risk, 2)
+        mfe = round(rng.uniform(0, 5), 2)
+        return {
+            "trade_id": make_trade_id(ts, "LONG" if direction == "Bullish" else "SHORT"),
+            "triangle_time_ms": int(ts.timestamp() * 1000),
+            "confirmation_time_ms": int((ts + timedelta(minutes=2)).timestamp() * 1000),
+            "date": ts.strftime("%Y-%m-%d"),
+            "session": session_for(ts),
+            "direction": direction,
+            "entry": entry,
+            "stop": stop,
+            "be_mfe": min(mfe, 1.0) if mfe >= 1.0 else 0.0,
+            "no_be_mfe": mfe,
+            "mae": round(-rng.uniform(0, 1), 2),
+            "completed": completed,
+            "status": "CONFIRMED",
+            "symbol": self.symbol,
+        }
+
+    def export_batches(self, batches, batch_size, event_type="INDICATOR_EXPORT_V2"):
+        """Indicator export envelopes; each batch covers a fresh window of signals"""
+        total = batches * batch_size
+        for b in range(batches):
+            signals = [self._export_signal(b * batch_size + i, completed=self.rng.random() < 0.8)
+                       for i in range(batch_size)]
+            if event_type == "MFE_UPDATE_BATCH":
+                yield {"event_type": event_type, "timestamp": self.start.isoformat(),
+                       "symbol": self.symbol, "signals": [
+                           {"trade_id": s["trade_id"], "be_mfe": s["be_mfe"], "no_be_mfe": s["no_be_mfe"],
+                            "mae_global_r": s["mae"], "current_price": s["entry"]} for s in signals]}
+                continue
+            yield {
+                "event_type": event_type,
+                "symbol": self.symbol,
+                "batch_number": b + 1,
+                "batch_size": batch_size,
+                "total_signals": total,
+                "signals": signals,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a synthetic TradingView event stream as JSON lines")
+    parser.add_argument('--trades', type=int, default=10)
+    parser.add_argument('--bars', type=int, default=30)
+    parser.add_argument('--concurrent', type=int, default=5)
+    parser.add_argument('--export-batches', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--no-signal-created', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    stream = SyntheticEventStream(seed=args.seed, bars=args.bars, concurrent=args.concurrent,
+                                  signal_created=not args.no_signal_created)
+    for payload in stream.webhook_events(args.trades):
+        print(json.dumps(payload))
+    for payload in stream.export_batches(args.export_batches, args.batch_size):
+        print(json.dumps(payload))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for automated-signals webhook payload parsing.
+
+Times decode + guard + normalize + parse + validate + fuse per event for:
+
+- legacy   json.loads, auto_guard_webhook_payload, normalize_signal_payload,
+           as_parse_automated_signal_payload, as_validate_parsed_payload and
+           as_fuse_automated_payload_sources (the pre-parser webhook chain)
+- fast     signal_payload_parser.decode_json_body + parse_signal_event
+
+Payloads are raw JSON bodies: one per line from --payloads (recorded webhook
+bodies), or the synthetic lifecycle stream (tools/synthetic_event_stream.py).
+Both paths must produce the same canonical event; mismatches are counted.
+
+Usage:
+    python tools/webhook_parse_benchmark.py --trades 200 --bars 30 --output parse.json
+    python tools/webhook_parse_benchmark.py --payloads recorded_webhooks.jsonl
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from automated_signals_state import auto_guard_webhook_payload
+from signal_normalization import normalize_signal_payload, validate_normalized_payload
+from signal_payload_parser import decode_json_body, orjson, parse_signal_event
+from tools.synthetic_event_stream import SyntheticEventStream
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def load_bodies(args):
+    if args.payloads:
+        with open(args.payloads, 'rb') as f:
+            return [line.strip() for line in f if line.strip()]
+    stream = SyntheticEventStream(seed=args.seed, bars=args.bars)
+    return [json.dumps(payload).encode() for payload in stream.webhook_events(args.trades)]
+
+
+def legacy_chain():
+    """The webhook's original parse path, imported from web_server (slow import, done once)"""
+    import web_server
+
+    def parse(body):
+        raw = json.loads(body)
+        guarded, error = auto_guard_webhook_payload(raw)
+        if error:
+            return None
+        normalized = normalize_signal_payload(raw)
+        is_valid, _ = validate_normalized_payload(normalized)
+        parsed = web_server.as_parse_automated_signal_payload(normalized if is_valid else raw)
+        if parsed.get("validation_error") or web_server.as_validate_parsed_payload(parsed):
+            return None
+        return web_server.as_fuse_automated_payload_sources(raw, parsed)
+    return parse
+
+
+def fast_chain(body):
+    event, error = parse_signal_event(decode_json_body(body))
+    return None if error else event
+
+
+def time_chain(parse, bodies, repeat):
+    per_type = {}
+    for _ in range(repeat):
+        for body in bodies:
+            started = time.perf_counter()
+            event = parse(body)
+            elapsed = (time.perf_counter() - started) * 1e6
+            key = event["event_type"] if event else "REJECTED"
+            per_type.setdefault(key, []).append(elapsed)
+    samples = [s for values in per_type.values() for s in values]
+    report = {
+        'events': len(samples),
+        'p50_us': round(percentile(samples, 50), 2),
+        'p99_us': round(percentile(samples, 99), 2),
+        'mean_us': round(sum(samples) / len(samples), 2),
+    }
+    report['by_event_type'] = {
+        key: {'events': len(values), 'p50_us': round(percentile(values, 50), 2)}
+        for key, values in sorted(per_type.items())
+    }
+    return report
+
+
+def run(args):
+    bodies = load_bodies(args)
+    legacy = legacy_chain()
+    # The per-event INFO logs are part of the legacy cost only when INFO is enabled
+    logging.disable(logging.INFO if not args.with_logging else logging.NOTSET)
+
+    mismatches = sum(1 for body in bodies if legacy(body) != fast_chain(body))
+    report = {
+        'payloads': len(bodies),
+        'repeat': args.repeat,
+        'json_decoder': 'orjson' if orjson is not None else 'json',
+        'mismatches': mismatches,
+        'legacy': time_chain(legacy, bodies, args.repeat),
+        'fast': time_chain(fast_chain, bodies, args.repeat),
+    }
+    report['speedup_p50'] = round(report['legacy']['p50_us'] / report['fast']['p50_us'], 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook payload parse + validate microbenchmark")
+    parser.add_argument('--payloads', help="JSONL file of recorded webhook bodies")
+    parser.add_argument('--trades', type=int, default=100, help="synthetic trades when --payloads is not given")
+    parser.add_argument('--bars', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--with-logging', action='store_true', help="keep INFO logging enabled while timing")
+    parser.add_argument('--output', help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
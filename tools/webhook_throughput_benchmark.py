@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+End-to-end webhook throughput benchmark.
+
+Replays a synthetic TradingView stream (tools/synthetic_event_stream.py) through
+the real Flask routes and reports per-endpoint latency percentiles, throughput
+and Postgres round trips:
+
+- /api/automated-signals/webhook  full lifecycles (SIGNAL_CREATED .. EXIT)
+- /api/indicator-export           export batches
+- dashboard GETs, re-measured as automated_signals grows (--table-sizes)
+
+In-process mode (default) imports web_server and drives app.test_client(), so
+DB round trips are counted exactly by wrapping psycopg2 connections. With
+--base-url the same workload is sent over HTTP to a running server (round
+trips are not visible from outside and are reported as null).
+
+Point DATABASE_URL at a disposable local Postgres - the run writes real rows
+(DATABASE_SSLMODE=disable if it has no SSL). Non-2xx responses are counted as
+errors per event type with the first error body kept in the JSON; note that
+handle_automated_event() currently requires a trade's first row to be ENTRY, so
+use --no-signal-created to measure the MFE/BE/EXIT insert paths rather than
+their rejection path.
+
+Usage:
+    DATABASE_URL=postgresql://postgres@127.0.0.1:5432/bench \\
+        python tools/webhook_throughput_benchmark.py --trades 50 --bars 30 --output bench.json
+    python tools/webhook_throughput_benchmark.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock, local
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+import psycopg2.extensions
+
+from tools.synthetic_event_stream import SyntheticEventStream
+
+WEBHOOK_PATH = '/api/automated-signals/webhook'
+EXPORT_PATH = '/api/indicator-export'
+DASHBOARD_PATHS = (
+    '/api/automated-signals/stats',
+    '/api/automated-signals/dashboard-data',
+    '/api/automated-signals/recent',
+    '/api/automated-signals/daily-calendar',
+)
+
+# automated_signals as first created by handle_entry_signal(); the migrations below
+# bring it up to the production column set
+BASE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS automated_signals (
+    id SERIAL PRIMARY KEY,
+    trade_id VARCHAR(100),
+    event_type VARCHAR(20),
+    direction VARCHAR(10),
+    entry_price DECIMAL(10,2),
+    stop_loss DECIMAL(10,2),
+    session VARCHAR(20),
+    bias VARCHAR(20),
+    risk_distance DECIMAL(10,2),
+    targets JSONB,
+    current_price DECIMAL(10,2),
+    mfe DECIMAL(10,4),
+    be_mfe DECIMAL(10,4),
+    no_be_mfe DECIMAL(10,4),
+    exit_price DECIMAL(10,2),
+    final_mfe DECIMAL(10,4),
+    signal_date DATE,
+    signal_time TIME,
+    timestamp TIMESTAMP DEFAULT NOW(),
+    raw_payload JSONB
+)
+"""
+SCHEMA_MIGRATIONS = (
+    'database/indicator_export_schema.sql',
+    'database/signal_contract_v1_wave1_migration.sql',
+    'database/hybrid_sync_schema.sql',
+    'database/phase5_add_telemetry_column.sql',
+    'add_mae_column.sql',
+)
+INDEX_MIGRATION = 'database/automated_signals_hot_path_indexes.sql'
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+# ----------------------------------------------------------------------
+# DB round-trip accounting
+# ----------------------------------------------------------------------
+class RoundTripCounter:
+    """
+    Patches psycopg2.connect so every connection/cursor created by the app is
+    counted per thread: connects, execute/executemany calls, commits/rollbacks.
+    """
+
+    def __init__(self):
+        self._local = local()
+        self._connect = None
+        self._cursor_classes = {}
+        self._lock = Lock()
+
+    def _counts(self):
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = self._local.counts = {'connects': 0, 'queries': 0, 'commits': 0, 'rollbacks': 0}
+        return counts
+
+    def snapshot(self):
+        return dict(self._counts())
+
+    def _counting_cursor(self, base):
+        with self._lock:
+            cls = self._cursor_classes.get(base)
+            if cls is None:
+                counter = self
+
+                class CountingCursor(base):
+                    def execute(self, query, vars=None):
+                        counter._counts()['queries'] += 1
+                        return super().execute(query, vars)
+
+                    def executemany(self, query, vars_list):
+                        counter._counts()['queries'] += 1
+                        return super().executemany(query, vars_list)
+
+                cls = self._cursor_classes[base] = CountingCursor
+            return cls
+
+    def install(self):
+        if self._connect is not None:
+            return
+        counter = self
+        self._connect = psycopg2.connect
+
+        class CountingConnection(psycopg2.extensions.connection):
+            def cursor(self, *args, **kwargs):
+                base = kwargs.get('cursor_factory') or self.cursor_factory or psycopg2.extensions.cursor
+                kwargs['cursor_factory'] = counter._counting_cursor(base)
+                return super().cursor(*args, **kwargs)
+
+            def commit(self):
+                counter._counts()['commits'] += 1
+                return super().commit()
+
+            def rollback(self):
+                counter._counts()['rollbacks'] += 1
+                return super().rollback()
+
+        def connect(*args, **kwargs):
+            counter._counts()['connects'] += 1
+            kwargs.setdefault('connection_factory', CountingConnection)
+            return counter._connect(*args, **kwargs)
+
+        psycopg2.connect = connect
+
+    def uninstall(self):
+        if self._connect is not None:
+            psycopg2.connect = self._connect
+            self._connect = None
+
+
+# ----------------------------------------------------------------------
+# Drivers
+# ----------------------------------------------------------------------
+class InProcessDriver:
+    """Flask test client per thread; exact DB round trips via RoundTripCounter"""
+
+    def __init__(self, app, counter):
+        self.app = app
+        self.counter = counter
+        self._local = local()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client
+
+    def request(self, method, path, payload=None):
+        before = self.counter.snapshot()
+        t0 = time.perf_counter()
+        if method == 'POST':
+            resp = self._client().post(path, json=payload)
+        else:
+            resp = self._client().get(path)
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        after = self.counter.snapshot()
+        return {
+            'status': resp.status_code,
+            'ms': elapsed,
+            'connects': after['connects'] - before['connects'],
+            'queries': after['queries'] - before['queries'],
+            'commits': after['commits'] - before['commits'],
+            'rollbacks': after['rollbacks'] - before['rollbacks'],
+            'error': resp.get_data(as_text=True)[:200] if resp.status_code >= 400 else None,
+        }
+
+
+class HttpDriver:
+    """Same workload against a running server; DB round trips are unknown"""
+
+    def __init__(self, base_url, token=None):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self._local = local()
+        self._requests = requests
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+            if self.token:
+                session.headers['X-Indicator-Token'] = self.token
+        return session
+
+    def request(self, method, path, payload=None):
+        t0 = time.perf_counter()
+        resp = self._session().request(method, self.base_url + path, json=payload, timeout=60)
+        return {'status': resp.status_code, 'ms': (time.perf_counter() - t0) * 1000.0,
+                'connects': None, 'queries': None, 'commits': None, 'rollbacks': None,
+                'error': resp.text[:200] if resp.status_code >= 400 else None}
+
+
+def summarize(samples, wall_seconds):
+    """p50/p95/p99 latency, throughput and mean DB round trips for one endpoint"""
+    latencies = [s['ms'] for s in samples]
+    errors = sum(1 for s in samples if s['status'] >= 400)
+
+    def mean_of(key):
+        values = [s[key] for s in samples if s.get(key) is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput_rps': round(len(samples) / wall_seconds, 1) if wall_seconds else None,
+        'latency_ms_p50': round(percentile(latencies, 50) or 0, 2),
+        'latency_ms_p95': round(percentile(latencies, 95) or 0, 2),
+        'latency_ms_p99': round(percentile(latencies, 99) or 0, 2),
+        'latency_ms_max': round(max(latencies), 2) if latencies else 0,
+        'db_connects_per_request': mean_of('connects'),
+        'db_queries_per_request': mean_of('queries'),
+        'db_commits_per_request': mean_of('commits'),
+        'db_rollbacks_per_request': mean_of('rollbacks'),
+        'first_error': next((s['error'] for s in samples if s['error']), None),
+    }
+
+
+def replay(driver, path, payloads, rate, concurrency, key=None):
+    """
+    POST payloads in order at `rate` req/s (0 = unthrottled) across `concurrency`
+    workers. Events for one trade stay on one worker so lifecycle order holds.
+    Returns {group: [samples]} grouped by key(payload) plus '_all'.
+    """
+    lanes = [[] for _ in range(max(1, concurrency))]
+    for payload in payloads:
+        lane = zlib.crc32(str(payload.get('trade_id')).encode()) % len(lanes)
+        lanes[lane].append(payload)
+
+    interval = (concurrency / rate) if rate > 0 else 0.0
+    results = []
+    lock = Lock()
+
+    def worker(batch):
+        start = time.perf_counter()
+        local_results = []
+        for n, payload in enumerate(batch):
+            sample = driver.request('POST', path, payload)
+            sample['group'] = key(payload) if key else path
+            local_results.append(sample)
+            if interval:
+                delay = start + (n + 1) * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        with lock:
+            results.extend(local_results)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(lanes)) as pool:
+        list(pool.map(worker, [lane for lane in lanes if lane]))
+    wall = time.perf_counter() - t0
+
+    grouped = {}
+    for sample in results:
+        grouped.setdefault(sample['group'], []).append(sample)
+    report = {group: summarize(samples, wall) for group, samples in sorted(grouped.items())}
+    report['_all'] = summarize(results, wall)
+    return report
+
+
+def measure_dashboard(driver, paths, repeats):
+    report = {}
+    for path in paths:
+        driver.request('GET', path)  # warm caches/imports
+        samples = []
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            samples.append(driver.request('GET', path))
+        report[path] = summarize(samples, time.perf_counter() - t0)
+    return report
+
+
+# ----------------------------------------------------------------------
+# Database setup
+# ----------------------------------------------------------------------
+def table_rows(database_url, table):
+    conn = psycopg2.connect(database_url)
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT to_regclass(%s)", (table,))
+        if cur.fetchone()[0] is None:
+            return None
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def grow_automated_signals(database_url, target_rows, events_per_trade=40):
+    """Bulk-append closed synthetic lifecycles until automated_signals has target_rows"""
+    current = table_rows(database_url, 'automated_signals')
+    if current is None or current >= target_rows:
+        return current
+    trades = (target_rows - current + events_per_trade - 1) // events_per_trade
+    last = events_per_trade - 1
+    conn = psycopg2.connect(database_url)
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO automated_signals (
+                trade_id, event_type, direction, entry_price, stop_loss, session, bias,
+                current_price, be_mfe, no_be_mfe, exit_price, final_mfe,
+                signal_date, signal_time, timestamp
+            )
+            SELECT
+                'BENCH_' || %(offset)s || '_' || t,
+                CASE WHEN s = 0 THEN 'ENTRY'
+                     WHEN s = %(last)s THEN CASE WHEN t %% 3 = 0 THEN 'EXIT_BE' ELSE 'EXIT_SL' END
+                     ELSE 'MFE_UPDATE' END,
+                CASE WHEN t %% 2 = 0 THEN 'LONG' ELSE 'SHORT' END,
+                20000 + (t %% 500), 19975 + (t %% 500),
+                CASE WHEN t %% 3 = 0 THEN 'NY AM' WHEN t %% 3 = 1 THEN 'LONDON' ELSE 'NY PM' END,
+                CASE WHEN t %% 2 = 0 THEN 'Bullish' ELSE 'Bearish' END,
+                20000 + (t %% 500) + s * 0.25, s * 0.04, s * 0.05,
+                CASE WHEN s = %(last)s THEN 20000 + (t %% 500) END,
+                CASE WHEN s = %(last)s THEN s * 0.05 END,
+                (TIMESTAMP '2024-01-01' + t * INTERVAL '10 minutes')::date,
+                (TIMESTAMP '2024-01-01' + t * INTERVAL '10 minutes')::time,
+                TIMESTAMP '2024-01-01' + t * INTERVAL '10 minutes' + s * INTERVAL '1 minute'
+            FROM generate_series(1, %(trades)s) AS t, generate_series(0, %(last)s) AS s
+        """, {'trades': trades, 'last': last, 'offset': current})
+        conn.commit()
+        cur.execute("ANALYZE automated_signals")
+        conn.commit()
+    finally:
+        conn.close()
+    return table_rows(database_url, 'automated_signals')
+
+
+def prepare_database(database_url, with_indexes=False):
+    """Create automated_signals and apply the repo migrations the webhook paths rely on"""
+    migrations = list(SCHEMA_MIGRATIONS) + ([INDEX_MIGRATION] if with_indexes else [])
+    applied = []
+    conn = psycopg2.connect(database_url)
+    try:
+        cur = conn.cursor()
+        cur.execute(BASE_TABLE_SQL)
+        conn.commit()
+        for path in migrations:
+            try:
+                with open(path, 'r') as f:
+                    cur.execute(f.read())
+                conn.commit()
+                applied.append(path)
+            except Exception as e:
+                conn.rollback()
+                print(f"WARNING: migration {path} not applied: {e}")
+    finally:
+        conn.close()
+    return applied
+
+
+# ----------------------------------------------------------------------
+# Comparison
+# ----------------------------------------------------------------------
+COMPARE_KEYS = ('latency_ms_p50', 'latency_ms_p95', 'latency_ms_p99', 'throughput_rps', 'db_queries_per_request')
+
+
+def _flatten(report):
+    rows = {}
+    for section in ('webhook', 'indicator_export'):
+        for group, stats in (report.get(section) or {}).items():
+            rows[f"{section}:{group}"] = stats
+    for size, endpoints in (report.get('dashboard') or {}).items():
+        for path, stats in endpoints.items():
+            rows[f"dashboard@{size}:{path}"] = stats
+    return rows
+
+
+def compare_reports(baseline, current):
+    """Per-endpoint deltas (percent) for the headline metrics"""
+    base_rows = _flatten(baseline)
+    diff = {}
+    for name, stats in _flatten(current).items():
+        old = base_rows.get(name)
+        if not old:
+            continue
+        entry = {}
+        for key in COMPARE_KEYS:
+            a, b = old.get(key), stats.get(key)
+            if a in (None, 0) or b is None:
+                continue
+            entry[key] = {'before': a, 'after': b, 'change_pct': round((b - a) / a * 100.0, 1)}
+        diff[name] = entry
+    return diff
+
+
+def print_comparison(diff):
+    print(f"{'endpoint':60s} {'metric':24s} {'before':>10s} {'after':>10s} {'change':>8s}")
+    for name, metrics in diff.items():
+        for key, m in metrics.items():
+            print(f"{name[:60]:60s} {key:24s} {m['before']:10} {m['after']:10} {m['change_pct']:+7.1f}%")
+
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+def build_driver(args, counter):
+    if args.base_url:
+        return HttpDriver(args.base_url, token=os.environ.get('INDICATOR_EXPORT_TOKEN'))
+    counter.install()
+    import web_server  # noqa: E402 - heavy import, only for in-process mode
+    web_server.app.testing = True
+    return InProcessDriver(web_server.app, counter)
+
+
+def run(args):
+    database_url = os.environ.get('DATABASE_URL')
+    if not args.base_url and not database_url:
+        raise SystemExit("DATABASE_URL must point at a disposable Postgres for in-process runs")
+
+    applied = prepare_database(database_url, with_indexes=args.indexes) if database_url else []
+
+    counter = RoundTripCounter()
+    driver = build_driver(args, counter)
+
+    # Fresh minute-aligned start so repeated runs don't collide with earlier trade_ids
+    start = datetime.now().replace(second=0, microsecond=0)
+    stream = SyntheticEventStream(seed=args.seed, bars=args.bars, concurrent=args.concurrent, start=start,
+                                  signal_created=not args.no_signal_created)
+
+    report = {
+        'meta': {
+            'git_revision': git_revision(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'mode': 'http' if args.base_url else 'in_process',
+            'args': vars(args),
+            'migrations': applied,
+        },
+    }
+
+    webhook_payloads = list(stream.webhook_events(args.trades))
+    report['webhook'] = replay(driver, WEBHOOK_PATH, webhook_payloads, args.rate, args.concurrency,
+                               key=lambda p: p['event_type'])
+
+    export_payloads = list(stream.export_batches(args.export_batches, args.batch_size))
+    report['indicator_export'] = replay(driver, EXPORT_PATH, export_payloads, 0, 1,
+                                        key=lambda p: p['event_type'])
+
+    report['dashboard'] = {}
+    for size in args.table_sizes:
+        rows = grow_automated_signals(database_url, size) if database_url else None
+        label = str(rows if rows is not None else size)
+        report['dashboard'][label] = measure_dashboard(driver, DASHBOARD_PATHS, args.dashboard_repeats)
+
+    counter.uninstall()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook / dashboard throughput benchmark")
+    parser.add_argument('--trades', type=int, default=20)
+    parser.add_argument('--bars', type=int, default=30, help="MFE_UPDATE events per trade")
+    parser.add_argument('--concurrent', type=int, default=5, help="Trades open at once in the stream")
+    parser.add_argument('--no-signal-created', action='store_true', help="Start lifecycles at ENTRY")
+    parser.add_argument('--rate', type=float, default=0, help="Target webhook req/s (0 = unthrottled)")
+    parser.add_argument('--concurrency', type=int, default=1, help="Parallel webhook senders")
+    parser.add_argument('--export-batches', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--table-sizes', type=lambda s: [int(x) for x in s.split(',') if x],
+                        default=[0], help="Grow automated_signals to each size and re-measure dashboards")
+    parser.add_argument('--dashboard-repeats', type=int, default=10)
+    parser.add_argument('--indexes', action='store_true', help="Apply the hot-path index migration first")
+    parser.add_argument('--base-url', help="Benchmark a running server instead of in-process")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="JSON results path (default benchmark_results/webhook_<rev>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Diff two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        print_comparison(compare_reports(baseline, current))
+        return
+
+    report = run(args)
+    output = args.output or os.path.join('benchmark_results', f"webhook_{report['meta']['git_revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+
+    for section in ('webhook', 'indicator_export'):
+        for group, stats in report[section].items():
+            print(f"{section:17s} {group:22s} n={stats['requests']:<5} err={stats['errors']:<4} "
+                  f"p50={stats['latency_ms_p50']:>8}ms p95={stats['latency_ms_p95']:>8}ms "
+                  f"p99={stats['latency_ms_p99']:>8}ms rps={stats['throughput_rps']} "
+                  f"queries/req={stats['db_queries_per_request']} commits/req={stats['db_commits_per_request']} "
+                  f"rollbacks/req={stats['db_rollbacks_per_request']}")
+    for size, endpoints in report['dashboard'].items():
+        for path, stats in endpoints.items():
+            print(f"dashboard@{size:<10} {path:42s} p50={stats['latency_ms_p50']:>8}ms "
+                  f"p95={stats['latency_ms_p95']:>8}ms queries/req={stats['db_queries_per_request']}")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
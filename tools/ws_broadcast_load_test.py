@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for the WebSocket BroadcastHub.
+
+Spins up an in-process Flask-SocketIO server with the hub wired exactly like
+web_server.py, connects hundreds of Socket.IO test clients (legacy, dashboard
+and per-trade subscribers), publishes MFE updates at a fixed rate and reports
+publish->emit latency, coalescing ratio, drops and per-client delivery.
+
+Usage:
+    python tools/ws_broadcast_load_test.py --clients 500 --trades 50 --rate 2000 --seconds 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from threading import Lock, Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, request
+from flask_socketio import SocketIO
+
+from websocket_broadcast_hub import BroadcastHub, register_broadcast_hub_handlers
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class EmitRecorder:
+    """Wraps socketio.emit to timestamp every frame the hub actually sends"""
+
+    def __init__(self, socketio):
+        self._emit = socketio.emit
+        self.lock = Lock()
+        self.latencies_ms = []
+        self.frames = 0
+        socketio.emit = self.emit
+
+    def emit(self, event, payload=None, *args, **kwargs):
+        if isinstance(payload, dict) and 'sent_at' in payload:
+            with self.lock:
+                self.latencies_ms.append((time.perf_counter() - payload['sent_at']) * 1000.0)
+                self.frames += 1
+        return self._emit(event, payload, *args, **kwargs)
+
+
+def build_server(coalesce_ms, depth, shards):
+    app = Flask(__name__)
+    socketio = SocketIO(app, async_mode='threading')
+    hub = BroadcastHub(socketio, coalesce_ms=coalesce_ms, max_queue_depth=depth, shards=shards)
+    register_broadcast_hub_handlers(socketio, hub)
+
+    @socketio.on('connect')
+    def handle_connect():
+        hub.add_connection(request.sid)
+
+    @socketio.on('disconnect')
+    def handle_disconnect():
+        hub.remove_connection(request.sid)
+
+    return app, socketio, hub
+
+
+def run(args):
+    app, socketio, hub = build_server(args.coalesce_ms, args.depth, args.shards)
+    recorder = EmitRecorder(socketio)
+    hub.start()
+
+    trade_ids = [f"LOADTEST_{i:04d}" for i in range(args.trades)]
+    rng = random.Random(args.seed)
+
+    clients = []
+    t0 = time.perf_counter()
+    for i in range(args.clients):
+        client = socketio.test_client(app)
+        kind = i % 3
+        if kind == 1:
+            client.emit('subscribe', {'dashboards': ['automated_signals']})
+        elif kind == 2:
+            client.emit('subscribe', {'trades': rng.sample(trade_ids, min(3, len(trade_ids)))})
+        client.get_received()  # discard 'subscribed' acks
+        clients.append(client)
+    connect_s = time.perf_counter() - t0
+
+    total_events = int(args.rate * args.seconds)
+    interval = 1.0 / args.rate if args.rate > 0 else 0.0
+    publish_times = []
+
+    def publisher():
+        start = time.perf_counter()
+        for n in range(total_events):
+            trade_id = trade_ids[n % len(trade_ids)]
+            t = time.perf_counter()
+            hub.publish_mfe_update(trade_id, {
+                'trade_id': trade_id,
+                'be_mfe': round(n * 0.01, 2),
+                'no_be_mfe': round(n * 0.012, 2),
+                'sent_at': t,
+            })
+            publish_times.append((time.perf_counter() - t) * 1_000_000.0)
+            target = start + (n + 1) * interval
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    t1 = time.perf_counter()
+    pub = Thread(target=publisher)
+    pub.start()
+    pub.join()
+    publish_s = time.perf_counter() - t1
+
+    hub.flush()
+    time.sleep(max(0.5, args.coalesce_ms / 1000.0 * 2))
+
+    delivered = [len(c.get_received()) for c in clients]
+    stats = hub.get_stats()
+    hub.stop()
+
+    report = {
+        'clients': args.clients,
+        'trades': args.trades,
+        'events_published': total_events,
+        'publish_seconds': round(publish_s, 3),
+        'publish_rate_eps': round(total_events / publish_s, 1) if publish_s else None,
+        'publish_call_us_p50': round(percentile(publish_times, 50) or 0, 2),
+        'publish_call_us_p99': round(percentile(publish_times, 99) or 0, 2),
+        'connect_seconds': round(connect_s, 3),
+        'frames_emitted': recorder.frames,
+        'emit_latency_ms_p50': round(percentile(recorder.latencies_ms, 50) or 0, 2),
+        'emit_latency_ms_p95': round(percentile(recorder.latencies_ms, 95) or 0, 2),
+        'emit_latency_ms_p99': round(percentile(recorder.latencies_ms, 99) or 0, 2),
+        'coalesced_updates': stats['coalesced'],
+        'dropped_frames': stats['dropped'],
+        'frames_per_client_min': min(delivered) if delivered else 0,
+        'frames_per_client_max': max(delivered) if delivered else 0,
+        'uncoalesced_frames_would_be': total_events * args.clients,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BroadcastHub load test")
+    parser.add_argument('--clients', type=int, default=300)
+    parser.add_argument('--trades', type=int, default=30)
+    parser.add_argument('--rate', type=float, default=1000.0, help="MFE updates per second")
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--coalesce-ms', type=int, default=250)
+    parser.add_argument('--depth', type=int, default=256)
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="Write JSON report to this path")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,9 @@ import json
 import threading
 import time
 
+from ml_feature_store import feature_row, get_feature_store
+from ml_training_scheduler import TrainingScheduler
+
 try:
     from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
     from sklearn.preprocessing import StandardScaler
@@ -42,7 +45,10 @@ class UnifiedMLIntelligence:
         self.is_trained = False
         self.training_data_count = 0
         self.last_training = None
-        self.auto_retrain_threshold = 50  # Retrain every 50 new trades
+        self.last_full_training = None
+        self.full_fit_samples = 0
+        self.trained_keys = np.zeros(0, dtype=np.int64)  # feature store keys the models have seen
+        self.scheduler = TrainingScheduler(db, self)
         
     def train_on_all_data(self) -> Dict:
         """Train ML models on ALL available trading data"""
@@ -51,16 +57,14 @@ class UnifiedMLIntelligence:
             return {'error': 'ML dependencies not available'}
         
         try:
-            # Get ALL training data
-            trades = self._get_all_trades()
-            
-            if len(trades) < 10:
-                return {'error': f'Insufficient data: {len(trades)} trades (need 10+)'}
+            # Get ALL training data (shared feature store)
+            matrix, rows, trade_count = self._training_rows()
+            X, y_mfe, y_success = self._training_targets(matrix, rows)
             
-            logger.info(f"🎯 Training ML on {len(trades)} trades...")
+            if trade_count < 10:
+                return {'error': f'Insufficient data: {trade_count} trades (need 10+)'}
             
-            # Prepare features and targets
-            X, y_mfe, y_success = self._prepare_training_data(trades)
+            logger.info(f"🎯 Training ML on {trade_count} trades...")
             
             if len(X) < 20:
                 return {'error': 'Insufficient valid training samples'}
@@ -95,17 +99,21 @@ class UnifiedMLIntelligence:
             success_accuracy = accuracy_score(y_success_test, success_pred)
             
             self.is_trained = True
-            self.training_data_count = len(trades)
+            self.training_data_count = trade_count
             self.last_training = datetime.now()
+            self.last_full_training = self.last_training
+            self.full_fit_samples = len(rows)
+            self.trained_keys = np.sort(matrix.frame['key'][rows])
             
             logger.info(f"✅ ML Training Complete: MAE={mfe_mae:.3f}R, Accuracy={success_accuracy*100:.1f}%")
             
             return {
                 'status': 'success',
-                'training_samples': len(trades),
+                'training_samples': trade_count,
                 'mfe_mae': float(mfe_mae),
                 'success_accuracy': float(success_accuracy * 100),
                 'models_trained': list(self.models.keys()),
+                'trees': self.tree_count(),
                 'last_training': self.last_training.isoformat()
             }
             
@@ -119,7 +127,7 @@ class UnifiedMLIntelligence:
         # Auto-train on first signal or when needed
         if not self.is_trained:
             logger.info("🎯 First signal received - training ML on all historical data...")
-            training_result = self.train_on_all_data()
+            training_result = self.scheduler.run_cycle()
             if 'error' in training_result:
                 logger.warning(f"⚠️ ML training failed: {training_result['error']}")
                 return {
@@ -129,10 +137,10 @@ class UnifiedMLIntelligence:
                     'recommendation': 'ML not trained - insufficient data'
                 }
             logger.info(f"✅ ML trained on first signal: {training_result['training_samples']} trades")
-        elif self._should_retrain():
-            logger.info("🔄 Auto-retraining ML models (24h or 50 trades threshold)...")
-            training_result = self.train_on_all_data()
-            if 'error' in training_result:
+        else:
+            # Warm start / full refit when the scheduler says one is due (at most hourly)
+            training_result = self.scheduler.run_if_due()
+            if training_result and 'error' in training_result:
                 logger.warning(f"⚠️ Auto-retrain failed: {training_result['error']}")
         
         try:
@@ -222,151 +230,105 @@ class UnifiedMLIntelligence:
             logger.error(f"Insights error: {str(e)}")
             return {'error': str(e)}
     
-    def _get_all_trades(self) -> List[Dict]:
-        """Get ALL trades from signal lab tables"""
-        
-        cursor = self.db.conn.cursor()
-        
-        # Get ALL 1M trades (including those without MFE for pattern analysis)
-        cursor.execute("""
-            SELECT date, time, bias, session, signal_type,
-                   COALESCE(mfe_none, mfe, 0) as mfe,
-                   COALESCE(be1_hit, false) as be1_hit,
-                   COALESCE(be2_hit, false) as be2_hit,
-                   COALESCE(mfe1, 0) as mfe1,
-                   COALESCE(mfe2, 0) as mfe2,
-                   news_proximity, news_event,
-                   market_context, context_quality_score
-            FROM signal_lab_trades
-            ORDER BY date DESC, time DESC
-        """)
-        
-        trades_1m = [dict(row) for row in cursor.fetchall()]
-        
-        # Get 15M trades if table exists
-        try:
-            cursor.execute("""
-                SELECT date, time, bias, session, signal_type,
-                       COALESCE(mfe_none, 0) as mfe,
-                       COALESCE(be1_hit, false) as be1_hit,
-                       COALESCE(be2_hit, false) as be2_hit,
-                       COALESCE(mfe1, 0) as mfe1,
-                       COALESCE(mfe2, 0) as mfe2,
-                       news_proximity, news_event
-                FROM signal_lab_15m_trades
-                ORDER BY date DESC, time DESC
-            """)
-            trades_15m = [dict(row) for row in cursor.fetchall()]
-        except:
-            trades_15m = []
-        
-        # Mark timeframe
-        for trade in trades_1m:
-            trade['timeframe'] = '1M'
-        for trade in trades_15m:
-            trade['timeframe'] = '15M'
-        
-        all_trades = trades_1m + trades_15m
-        
-        # Filter for trades with actual outcomes for training
-        training_trades = [t for t in all_trades if t.get('mfe', 0) != 0]
-        
-        logger.info(f"📊 Loaded {len(all_trades)} total trades ({len(training_trades)} with MFE for training)")
-        
-        return training_trades if len(training_trades) >= 20 else all_trades
+    def _training_trades(self, frame=None):
+        """Frame rows to train on: trades with an MFE outcome, or all trades while fewer than 20 have one"""
+        if frame is None:
+            frame = get_feature_store(self.db).frame()
+        has_mfe = frame['mfe'] != 0
+        selected = has_mfe if has_mfe.sum() >= 20 else np.ones(len(has_mfe), dtype=bool)
+        logger.info(f"📊 Loaded {len(has_mfe)} total trades ({int(has_mfe.sum())} with MFE for training)")
+        return selected
     
-    def _prepare_training_data(self, trades: List[Dict]):
-        """Prepare features and targets for ML training"""
-        
-        X = []
-        y_mfe = []
-        y_success = []
-        
-        for trade in trades:
-            try:
-                # Extract features
-                features = self._extract_features_from_trade(trade)
-                
-                # Target: MFE
-                mfe = float(trade.get('mfe', 0))
-                
-                # Target: Success (1R+ = success)
-                success = 1 if mfe >= 1.0 else 0
-                
-                X.append(features)
-                y_mfe.append(mfe)
-                y_success.append(success)
-                
-            except Exception as e:
-                logger.warning(f"Skipping trade due to error: {str(e)}")
-                continue
-        
-        return np.array(X), np.array(y_mfe), np.array(y_success)
+    def _training_rows(self):
+        """Feature matrix and selected rows (1M trades newest first, then 15M)"""
+        matrix = get_feature_store(self.db).matrix('unified')
+        frame = matrix.frame
+        selected = self._training_trades(frame)
+        order = np.lexsort((-frame['id'], frame['source']))
+        rows = order[(selected & matrix.valid)[order]]
+        return matrix, rows, int(selected.sum())
     
-    def _extract_features_from_trade(self, trade: Dict) -> List[float]:
-        """Extract ML features from a trade"""
-        
-        features = []
-        
-        # Bias (0=Bearish, 1=Bullish)
-        features.append(1.0 if trade.get('bias') == 'Bullish' else 0.0)
-        
-        # Session encoding
-        session = trade.get('session', 'Unknown')
-        features.append(1.0 if session == 'London' else 0.0)
-        features.append(1.0 if session == 'NY AM' else 0.0)
-        features.append(1.0 if session == 'NY PM' else 0.0)
-        
-        # Signal type encoding
-        signal_type = trade.get('signal_type') or ''
-        features.append(1.0 if 'FVG' in signal_type else 0.0)
-        features.append(1.0 if 'IFVG' in signal_type else 0.0)
-        
-        # News proximity
-        news = trade.get('news_proximity', 'None')
-        features.append(1.0 if news == 'High' else 0.0)
-        features.append(1.0 if news == 'Medium' else 0.0)
-        
-        # Timeframe
-        features.append(1.0 if trade.get('timeframe') == '1M' else 0.0)
+    def _training_targets(self, matrix, rows):
+        y_mfe = matrix.frame['mfe'][rows]
+        return matrix.X[rows], y_mfe, (y_mfe >= 1.0).astype(int)
+    
+    def _training_matrix(self):
+        """Features and targets from the shared feature store"""
+        matrix, rows, trade_count = self._training_rows()
+        return (*self._training_targets(matrix, rows), trade_count)
+    
+    def _untrained_rows(self, matrix, rows):
+        return rows[~np.isin(matrix.frame['key'][rows], self.trained_keys)]
+    
+    def pending_training_samples(self):
+        """(training rows the models have not been fit on, all training rows)"""
+        matrix, rows, _ = self._training_rows()
+        return len(self._untrained_rows(matrix, rows)), len(rows)
+    
+    def tree_count(self) -> int:
+        return max((model.n_estimators for model in self.models.values()), default=0)
+    
+    def warm_start_update(self, trees: int = 10) -> Dict:
+        """Add trees fit on the trades the models have not seen, keeping the existing ones"""
         
-        # Market context quality (if available)
-        context_quality = trade.get('context_quality_score', 0.5)
-        features.append(float(context_quality))
+        if not self.is_trained:
+            return {'error': 'Models not trained'}
         
-        return features
+        try:
+            matrix, rows, trade_count = self._training_rows()
+            new_rows = self._untrained_rows(matrix, rows)
+            if len(new_rows) == 0:
+                return {'error': 'No new training samples'}
+            X, y_mfe, y_success = self._training_targets(matrix, new_rows)
+            # The scaler stays fixed until the next full refit so existing trees keep their inputs
+            X_scaled = self.scalers['main'].transform(X)
+            
+            # Score the new trades before the models see them
+            mfe_mae = mean_absolute_error(y_mfe, self.models['mfe_predictor'].predict(X_scaled))
+            success_accuracy = accuracy_score(y_success, self.models['success_classifier'].predict(X_scaled))
+            
+            updated = []
+            regressor = self.models['mfe_predictor']
+            regressor.set_params(warm_start=True, n_estimators=regressor.n_estimators + trees)
+            regressor.fit(X_scaled, y_mfe)
+            updated.append('mfe_predictor')
+            
+            # New forest trees must see the same classes as the existing ones
+            classifier = self.models['success_classifier']
+            if np.array_equal(np.unique(y_success), classifier.classes_):
+                classifier.set_params(warm_start=True, n_estimators=classifier.n_estimators + trees)
+                classifier.fit(X_scaled, y_success)
+                updated.append('success_classifier')
+            
+            self.trained_keys = np.union1d(self.trained_keys, matrix.frame['key'][new_rows])
+            self.training_data_count = trade_count
+            self.last_training = datetime.now()
+            
+            logger.info(f"✅ ML Warm Start: +{len(new_rows)} trades, pre-fit MAE={mfe_mae:.3f}R, Accuracy={success_accuracy*100:.1f}%")
+            
+            return {
+                'status': 'success',
+                'training_samples': trade_count,
+                'new_samples': len(new_rows),
+                'mfe_mae': float(mfe_mae),
+                'success_accuracy': float(success_accuracy * 100),
+                'models_trained': updated,
+                'trees': self.tree_count(),
+                'last_training': self.last_training.isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"ML warm start error: {str(e)}")
+            return {'error': str(e)}
     
     def _extract_features(self, signal_data: Dict, market_context: Dict) -> List[float]:
-        """Extract features from live signal"""
-        
-        features = []
-        
-        # Bias
-        features.append(1.0 if signal_data.get('bias') == 'Bullish' else 0.0)
-        
-        # Session
-        session = signal_data.get('session', 'Unknown')
-        features.append(1.0 if session == 'London' else 0.0)
-        features.append(1.0 if session == 'NY AM' else 0.0)
-        features.append(1.0 if session == 'NY PM' else 0.0)
-        
-        # Signal type
-        signal_type = signal_data.get('signal_type', '')
-        features.append(1.0 if 'FVG' in signal_type else 0.0)
-        features.append(1.0 if 'IFVG' in signal_type else 0.0)
-        
-        # News (default to None)
-        features.append(0.0)  # High news
-        features.append(0.0)  # Medium news
-        
-        # Timeframe (assume 1M for live signals)
-        features.append(1.0)
-        
-        # Market context quality
-        context_quality = market_context.get('context_quality_score', 0.5)
-        features.append(float(context_quality))
-        
-        return features
+        """Extract features from live signal (news defaults to None, timeframe to 1M)"""
+        return feature_row('unified', {
+            'bias': signal_data.get('bias'),
+            'session': signal_data.get('session', 'Unknown'),
+            'signal_type': signal_data.get('signal_type', ''),
+            'context_quality_score': market_context.get('context_quality_score', 0.5),
+        }).tolist()
     
     def _generate_recommendation(self, predicted_mfe: float, success_prob: float) -> str:
         """Generate trading recommendation"""
@@ -548,32 +510,6 @@ class UnifiedMLIntelligence:
             'recommendation': 'Use BE1' if be1_hit_rate > 60 else 'Consider no BE'
         }
     
-    def _should_retrain(self) -> bool:
-        """Check if ML should retrain based on new data"""
-        
-        if not self.is_trained:
-            return True
-        
-        # Retrain if last training was more than 24 hours ago
-        if self.last_training:
-            hours_since_training = (datetime.now() - self.last_training).total_seconds() / 3600
-            if hours_since_training > 24:
-                logger.info(f"⏰ Auto-retrain: {hours_since_training:.1f} hours since last training")
-                return True
-        
-        # Retrain if we have significantly more data
-        try:
-            current_trades = self._get_all_trades()
-            new_trades = len(current_trades) - self.training_data_count
-            
-            if new_trades >= self.auto_retrain_threshold:
-                logger.info(f"📊 Auto-retrain: {new_trades} new trades since last training")
-                return True
-        except:
-            pass
-        
-        return False
-    
     def _generate_key_recommendations(self, insights: Dict) -> List[str]:
         """Generate key trading recommendations"""
         
@@ -643,19 +579,18 @@ def get_unified_ml(db):
     return _unified_ml
 
 def _auto_trainer_loop(ml_instance):
-    """Background thread that checks for retraining every hour"""
+    """Background thread that runs a training cycle every hour"""
     while True:
         try:
             time.sleep(3600)  # Check every hour
             
-            if ml_instance._should_retrain():
-                logger.info("🔄 Auto-trainer: Retraining ML models...")
-                result = ml_instance.train_on_all_data()
-                
-                if 'error' not in result:
-                    logger.info(f"✅ Auto-trainer: Training complete - {result['training_samples']} samples, {result['success_accuracy']:.1f}% accuracy")
-                else:
-                    logger.error(f"❌ Auto-trainer: Training failed - {result['error']}")
+            result = ml_instance.scheduler.run_if_due()
+            if not result or result['mode'] == 'skip':
+                continue
+            if 'error' not in result:
+                logger.info(f"✅ Auto-trainer: {result['mode']} complete - {result['training_samples']} samples, {result['success_accuracy']:.1f}% accuracy")
+            else:
+                logger.error(f"❌ Auto-trainer: {result['mode']} failed - {result['error']}")
         except Exception as e:
             logger.error(f"❌ Auto-trainer error: {str(e)}")
             time.sleep(3600)  # Wait an hour before retrying
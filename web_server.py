@@ -26,11 +26,12 @@ from csrf_protection import csrf, csrf_protect
 from ai_prompts import get_ai_system_prompt, get_chart_analysis_prompt, get_strategy_summary_prompt, get_risk_assessment_prompt
 from news_api import NewsAPI, get_market_sentiment, extract_key_levels
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
 from auth import login_required, authenticate
 from ml_insights_endpoint import get_ml_insights_response
 from gpt4_strategy_validator import validate_strategy, format_analysis_for_display
 from automated_signals_state import get_hub_data, get_trade_detail
+from automated_signals_lifecycle_cache import lifecycle_state_cache
+from signal_payload_parser import decode_json_body, event_time_utc, parse_signal_event
 
 # Register robust automated signals API routes
 import automated_signals_api_robust
@@ -257,25 +258,10 @@ def handle_automated_event(event_type, data, raw_payload_str=None):
     # --- TIMESTAMP NORMALIZATION ---
     # TradingView sends timestamps in NY time (America/New_York)
     # We must interpret them as NY, then convert to UTC for storage
-    from zoneinfo import ZoneInfo
-    ny_zone = ZoneInfo("America/New_York")
-    utc_zone = ZoneInfo("UTC")
-    
-    raw_ts = data.get("event_timestamp") or data.get("timestamp")
-    if not raw_ts:
-        raw_ts = datetime.utcnow().isoformat()
-    
-    # Parse TradingView timestamp as NY time, convert to UTC
-    try:
-        parsed_local = datetime.fromisoformat(raw_ts.replace("Z", ""))
-        if parsed_local.tzinfo is None:
-            parsed_local = parsed_local.replace(tzinfo=ny_zone)
-        event_ts_clean = parsed_local.astimezone(utc_zone).isoformat()
-    except Exception:
-        event_ts_clean = datetime.utcnow().isoformat()
+    event_ts_clean = event_time_utc(data)
     
     # Log raw and normalized payloads
-    logger.info(f"[UNIFIED] {event_type} raw_payload: {raw_payload_str[:500] if raw_payload_str else 'None'}...")
+    logger.debug("[UNIFIED] %s raw_payload: %s...", event_type, raw_payload_str[:500] if raw_payload_str else None)
     logger.info(f"[UNIFIED] {event_type} normalized: trade_id={trade_id}, be_mfe={data.get('be_mfe')}, no_be_mfe={data.get('no_be_mfe')}, mae={data.get('mae_global_R')}")
     
     # Append to in-memory trade logs
@@ -305,15 +291,12 @@ def handle_automated_event(event_type, data, raw_payload_str=None):
             # Allow CANCELLED without requiring ENTRY
             pass  # Continue to normal INSERT logic
         else:
-            # For MFE_UPDATE, BE_TRIGGERED, EXIT events - ensure an ENTRY exists
-            cursor.execute("""
-                SELECT event_type FROM automated_signals
-                WHERE trade_id = %s
-                ORDER BY id ASC
-            """, (data["trade_id"],))
-            rows = [r[0] for r in cursor.fetchall()]
+            # For MFE_UPDATE, BE_TRIGGERED, EXIT events - ensure the trade's first event is an ENTRY
+            lifecycle = lifecycle_state_cache.get(data["trade_id"], cursor)
+            if lifecycle.first_event != "ENTRY" and lifecycle.cached:
+                lifecycle = lifecycle_state_cache.get(data["trade_id"], cursor, refresh=True)
             
-            if not rows or rows[0] != "ENTRY":
+            if lifecycle.first_event != "ENTRY":
                 return {
                     "success": False,
                     "error": "Lifecycle enforcement error: No ENTRY exists for this trade_id"
@@ -466,6 +449,7 @@ def handle_automated_event(event_type, data, raw_payload_str=None):
             AND event_type IN ('MFE_UPDATE')
             AND timestamp > %s
         """, (trade_id, event_ts_clean))
+        removed_rows = max(cursor.rowcount, 0)
         
         # Ensure EXIT_SL removes any EXIT_BE duplicates
         cursor.execute("""
@@ -474,6 +458,7 @@ def handle_automated_event(event_type, data, raw_payload_str=None):
             AND event_type = 'EXIT_BE'
             AND %s = 'EXIT_SL'
         """, (trade_id, event_type))
+        removed_rows += max(cursor.rowcount, 0)
         
         # UNIFIED INSERT - all fields populated
         # Uses event_timestamp from payload (not NOW()) for accurate timing
@@ -484,7 +469,7 @@ def handle_automated_event(event_type, data, raw_payload_str=None):
         prior_event = get_prior_event(trade_id, conn)
         
         # Map Wave 1 fields with carry-forward
-        wave1_fields = map_wave1_fields(payload, event_type, trade_id, prior_event)
+        wave1_fields = map_wave1_fields(data, event_type, trade_id, prior_event)
         
         # Override direction if we have it from payload or prior
         if wave1_fields.get('direction') and not direction:
@@ -559,6 +544,7 @@ def handle_automated_event(event_type, data, raw_payload_str=None):
         
         signal_id = result[0]
         conn.commit()
+        lifecycle_state_cache.record(trade_id, event_type, removed=removed_rows)
         
         # Log success
         log_msg = f"id={signal_id} be_mfe={be_mfe} no_be_mfe={no_be_mfe} mae={mae_global_r}"
@@ -1357,6 +1343,17 @@ def inject_timestamp():
 # Railway will use threading mode (compatible with all Python versions)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
+# Room-based broadcast hub: webhook handlers enqueue, worker threads emit
+from websocket_broadcast_hub import BroadcastHub, register_broadcast_hub_handlers, trade_room
+broadcast_hub = BroadcastHub(
+    socketio,
+    coalesce_ms=int(os.environ.get("WS_COALESCE_MS", "250")),
+    max_queue_depth=int(os.environ.get("WS_MAX_QUEUE_DEPTH", "256")),
+    shards=int(os.environ.get("WS_BROADCAST_SHARDS", "4")),
+)
+broadcast_hub.start()
+register_broadcast_hub_handlers(socketio, broadcast_hub)
+
 # Initialize webhook debugger
 webhook_debugger = None
 if db_enabled and db:
@@ -1379,7 +1376,7 @@ from signal_integrity_verifier import register_signal_integrity_api
 from realtime_signal_handler import RealtimeSignalHandler
 
 # Initialize robust WebSocket handler
-robust_ws_handler = RobustWebSocketHandler(socketio, db) if db_enabled else None
+robust_ws_handler = RobustWebSocketHandler(socketio, db, hub=broadcast_hub) if db_enabled else None
 if robust_ws_handler:
     robust_ws_handler.start_health_monitor()
     register_websocket_handlers(socketio, robust_ws_handler)
@@ -1439,6 +1436,7 @@ def repair_lifecycle_endpoints():
             ))
     
     conn.commit()
+    lifecycle_state_cache.invalidate()
     cursor.close()
     conn.close()
     
@@ -1548,6 +1546,7 @@ if realtime_handler:
 # WebSocket connection handlers
 @socketio.on('connect')
 def handle_connect():
+    broadcast_hub.add_connection(request.sid)
     if realtime_handler:
         realtime_handler.active_connections += 1
         
@@ -1561,6 +1560,7 @@ def handle_connect():
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    broadcast_hub.remove_connection(request.sid)
     if realtime_handler:
         realtime_handler.active_connections -= 1
     logger.info(f"🔌 WebSocket disconnected. Active connections: {realtime_handler.active_connections if realtime_handler else 'N/A'}")
@@ -1632,7 +1632,7 @@ if ENABLE_ML and ml_available and db_enabled and db:
             from unified_ml_intelligence import get_unified_ml
             ml_engine = get_unified_ml(db)
             logger.info("🤖 Auto-training ML on server startup...")
-            result = ml_engine.train_on_all_data()
+            result = ml_engine.scheduler.run_cycle()
             logger.info(f"Training result: {result}")
             if 'error' not in result:
                 logger.info(f"✅ ML auto-trained: {result['training_samples']} samples, {result['success_accuracy']:.1f}% accuracy")
@@ -1732,6 +1732,14 @@ else:
         logger.warning("⚠️ ExecutionRouter not started: requirements not met")
     execution_router = None
 
+# Preloaded HTML/JS/CSS with precompressed variants and ETags (invalidated by mtime)
+from static_asset_cache import StaticAssetCache
+asset_cache = StaticAssetCache(path.dirname(path.abspath(__file__)))
+try:
+    asset_cache.preload()
+except Exception as e:
+    logger.error(f"Static asset cache preload failed: {e}")
+
 # Read HTML files and serve them
 def read_html_file(filename):
     try:
@@ -1742,10 +1750,7 @@ def read_html_file(filename):
             logger.warning(f"Invalid filename rejected: {safe_filename}")
             return "<h1>Trading Dashboard</h1><p>Invalid file request.</p><a href='/health'>Health Check</a>"
         
-        # Use relative path for better portability
-        file_path = path.join(path.dirname(__file__), secure_name)
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return asset_cache.get_text(secure_name)
     except (FileNotFoundError, IOError) as e:
         safe_filename = escape(str(filename)[:100]).replace(NEWLINE_CHAR, '').replace(CARRIAGE_RETURN_CHAR, '')
         safe_error = escape(str(e)[:200]).replace(NEWLINE_CHAR, '').replace(CARRIAGE_RETURN_CHAR, '')
@@ -1757,6 +1762,29 @@ def read_html_file(filename):
         logger.error(f"Unexpected error reading file {safe_filename}: {safe_error}")
         return "<h1>Trading Dashboard</h1><p>Server error. Please try again.</p><a href='/health'>Health Check</a>"
 
+def serve_html_file(filename):
+    """Serve a root HTML page from the asset cache (ETag/304 + gzip/brotli)"""
+    secure_name = secure_filename(filename)
+    if secure_name and secure_name == filename:
+        try:
+            response = asset_cache.serve(secure_name)
+            if response is not None:
+                return response
+        except Exception as e:
+            logger.error(f"Asset cache serve failed for {secure_name}: {e}")
+    # Missing/invalid file: fall back to read_html_file's error pages
+    return read_html_file(filename)
+
+def serve_root_asset(filename, mimetype):
+    """Serve a root JS/CSS file from the asset cache, falling back to send_from_directory"""
+    try:
+        response = asset_cache.serve(filename, mimetype=mimetype)
+        if response is not None:
+            return response
+    except Exception as e:
+        logger.error(f"Asset cache serve failed for {filename}: {e}")
+    return send_from_directory('.', filename, mimetype=mimetype)
+
 def get_random_video(subfolder):
     """
     Get a random video file from the specified subfolder.
@@ -2089,17 +2117,17 @@ def homepage_video():
 @login_required
 def homepage_css():
     """Homepage with CSS animations"""
-    return read_html_file('homepage_css_animated.html')
+    return serve_html_file('homepage_css_animated.html')
 
 @app.route('/video-demo')
 def video_demo():
     """Demo page to test all video background versions"""
-    return read_html_file('video_background_demo.html')
+    return serve_html_file('video_background_demo.html')
 
 @app.route('/test-google-videos')
 def test_google_videos():
     """Test Google Drive video links"""
-    return read_html_file('test_google_drive_videos.html')
+    return serve_html_file('test_google_drive_videos.html')
 
 # Video Proxy Routes - Bypass CORS for Google Drive videos
 def extract_file_id(drive_url):
@@ -2249,12 +2277,12 @@ def signal_analysis_lab():
 @app.route('/signal-analysis-5m')
 @login_required
 def signal_analysis_5m():
-    return read_html_file('signal-analysis-5m.html')
+    return serve_html_file('signal-analysis-5m.html')
 
 @app.route('/signal-analysis-15m')
 @login_required
 def signal_analysis_15m():
-    return read_html_file('signal_analysis_15m.html')
+    return serve_html_file('signal_analysis_15m.html')
 
 @app.route('/signal-lab-dashboard')
 @login_required
@@ -2265,25 +2293,25 @@ def signal_lab_dashboard():
 @login_required
 def signal_lab_v2_dashboard():
     """Signal Lab V2 Dashboard - Automated trading interface"""
-    return read_html_file('signal_lab_v2_dashboard.html')
+    return serve_html_file('signal_lab_v2_dashboard.html')
 
 @app.route('/automated-signals-option1')
 @login_required
 def automated_signals_dashboard_option1():
     """Automated Signals Dashboard - Option 1 (Trading Floor Command Center)"""
-    return read_html_file('trading_floor_command_center.html')
+    return serve_html_file('trading_floor_command_center.html')
 
 @app.route('/automated-signals-option2')
 @login_required
 def automated_signals_dashboard_option2():
     """Automated Signals Dashboard - Option 2 (Data Dense)"""
-    return read_html_file('automated_signals_dashboard_option2.html')
+    return serve_html_file('automated_signals_dashboard_option2.html')
 
 @app.route('/automated-signals-option3')
 @login_required
 def automated_signals_dashboard_option3():
     """Automated Signals Dashboard - Option 3 (Visual Focus)"""
-    return read_html_file('automated_signals_dashboard_option3.html')
+    return serve_html_file('automated_signals_dashboard_option3.html')
 
 @app.route('/automated-signals')
 @login_required
@@ -2380,7 +2408,7 @@ def automated_signals_telemetry_dashboard():
 @login_required
 def live_diagnostics_terminal():
     """Live Diagnostics Terminal - Real-time system health monitoring"""
-    return read_html_file('live_diagnostics_terminal.html')
+    return serve_html_file('live_diagnostics_terminal.html')
 
 @app.route('/automated-signals-analytics')
 @login_required
@@ -2413,12 +2441,12 @@ def automated_signals_command():
 @app.route('/1m-execution')
 @login_required
 def execution_dashboard():
-    return read_html_file('1m_execution_dashboard.html')
+    return serve_html_file('1m_execution_dashboard.html')
 
 @app.route('/diagnose-1m-signals')
 @login_required
 def diagnose_1m_signals():
-    return read_html_file('diagnose_1m_signals.html')
+    return serve_html_file('diagnose_1m_signals.html')
 
 @app.route('/ai-business-advisor')
 @login_required
@@ -2430,7 +2458,7 @@ def ai_business_advisor_page():
 @app.route('/nasdaq-ml')
 @login_required
 def nasdaq_ml():
-    return read_html_file('nasdaq_ml_dashboard.html')
+    return serve_html_file('nasdaq_ml_dashboard.html')
 
 # ============================================================================
 # SYSTEM TIME API - NY time and session information
@@ -2761,7 +2789,7 @@ def get_db_status():
 @login_required
 def webhook_monitor():
     """Webhook Signal Monitoring Dashboard"""
-    return read_html_file('webhook_monitor.html')
+    return serve_html_file('webhook_monitor.html')
 
 @app.route('/api/webhook-stats', methods=['GET'])
 @login_required
@@ -3188,28 +3216,20 @@ def get_strategy_comparison():
             'min_expectancy': 0.0
         }
         
-        result = evaluator.get_optimal_strategy(constraints)
-        
-        if 'error' in result:
-            return jsonify(result), 404
-        
-        # Get top strategies for comparison
-        cursor = db.conn.cursor()
-        cursor.execute("""
-            SELECT date, time, session, bias,
-                   COALESCE(mfe_none, mfe, 0) as mfe_none,
-                   COALESCE(mfe1, 0) as mfe1
-            FROM signal_lab_trades
-        """)
+        trades = evaluator._fetch_trades()
+        if not trades:
+            return jsonify({'error': 'No trade data available'}), 404
         
-        trades = cursor.fetchall()
-        strategies = evaluator._generate_strategy_combinations(trades)
-        evaluated = evaluator.compare_strategies(strategies)
+        # One lattice serves both rankings; only the top candidates get drawdowns
+        lattice = evaluator.build_lattice(trades)
+        optimal = evaluator.rank_strategies(lattice, constraints, limit=1)
+        if not optimal:
+            return jsonify({'error': 'No strategies meet constraints'}), 404
         
         return jsonify({
-            'strategies': evaluated[:10],  # Top 10
-            'optimal': result,
-            'total_evaluated': len(strategies)
+            'strategies': evaluator.rank_strategies(lattice, limit=10),  # Top 10
+            'optimal': optimal[0],
+            'total_evaluated': int((lattice.total_trades >= 10).sum())
         })
         
     except Exception as e:
@@ -3364,41 +3384,41 @@ def ml_dashboard_old():
                 from advanced_ml_engine import get_advanced_ml_engine
                 ml_engine = get_advanced_ml_engine(db)
                 # If we can import and create the engine, use the full dashboard
-                return read_html_file('signal_lab_dashboard.html')
+                return serve_html_file('signal_lab_dashboard.html')
             except ImportError:
                 # ML engine not available, use fallback
-                return read_html_file('ml_dashboard_fallback.html')
+                return serve_html_file('ml_dashboard_fallback.html')
         else:
             # Database not available, use fallback
-            return read_html_file('ml_dashboard_fallback.html')
+            return serve_html_file('ml_dashboard_fallback.html')
     except Exception as e:
         logger.error(f"Error loading ML dashboard: {str(e)}")
-        return read_html_file('ml_dashboard_fallback.html')
+        return serve_html_file('ml_dashboard_fallback.html')
 
 @app.route('/chart-extractor')
 @login_required
 def chart_extractor():
-    return read_html_file('chart_data_extractor.html')
+    return serve_html_file('chart_data_extractor.html')
 
 @app.route('/recover-signal-lab')
 @login_required
 def recover_signal_lab():
-    return read_html_file('recover_signal_lab_data.html')
+    return serve_html_file('recover_signal_lab_data.html')
 
 @app.route('/migrate-signal-lab')
 @login_required
 def migrate_signal_lab_page():
-    return read_html_file('recover_signal_lab_data.html')
+    return serve_html_file('recover_signal_lab_data.html')
 
 @app.route('/check-localstorage')
 @login_required
 def check_localstorage():
-    return read_html_file('check_localStorage.html')
+    return serve_html_file('check_localStorage.html')
 
 @app.route('/fix-active-trades')
 @login_required
 def fix_active_trades_page():
-    return read_html_file('fix_active_trades.html')
+    return serve_html_file('fix_active_trades.html')
 
 @app.route('/prop-portfolio')
 @login_required
@@ -3438,17 +3458,17 @@ def reporting_hub():
 @app.route('/ai-trading-master-plan')
 @login_required
 def ai_trading_master_plan():
-    return read_html_file('ai-trading-master-plan.html')
+    return serve_html_file('ai-trading-master-plan.html')
 
 @app.route('/tradingview')
 @login_required
 def tradingview():
-    return read_html_file('tradingview_debug.html')
+    return serve_html_file('tradingview_debug.html')
 
 @app.route('/trading-dashboard')
 @login_required
 def trading_dashboard():
-    return read_html_file('dashboard_clean.html')
+    return serve_html_file('dashboard_clean.html')
 
 # Serve static files (CSS, JS, images)
 @app.route('/static/<path:filename>')
@@ -3464,90 +3484,90 @@ def video_files(filename):
 @app.route('/api_integration.js')
 @login_required
 def api_integration_js():
-    return send_from_directory('.', 'api_integration.js', mimetype='application/javascript')
+    return serve_root_asset('api_integration.js', 'application/javascript')
 
 @app.route('/chatbot.js')
 @login_required
 def chatbot_js():
-    return send_from_directory('.', 'chatbot.js', mimetype='application/javascript')
+    return serve_root_asset('chatbot.js', 'application/javascript')
 
 @app.route('/trading_empire_kb.js')
 @login_required
 def trading_empire_kb_js():
-    return send_from_directory('.', 'trading_empire_kb.js', mimetype='application/javascript')
+    return serve_root_asset('trading_empire_kb.js', 'application/javascript')
 
 @app.route('/notification_system.js')
 @login_required
 def notification_system_js():
-    return send_from_directory('.', 'notification_system.js', mimetype='application/javascript')
+    return serve_root_asset('notification_system.js', 'application/javascript')
 
 @app.route('/d3_charts.js')
 @login_required
 def d3_charts_js():
-    return send_from_directory('.', 'd3_charts.js', mimetype='application/javascript')
+    return serve_root_asset('d3_charts.js', 'application/javascript')
 
 @app.route('/ai_chat.js')
 @login_required
 def ai_chat_js():
-    return send_from_directory('.', 'ai_chat.js', mimetype='application/javascript')
+    return serve_root_asset('ai_chat.js', 'application/javascript')
 
 @app.route('/websocket_client.js')
 @login_required
 def websocket_client_js():
-    return send_from_directory('.', 'websocket_client.js', mimetype='application/javascript')
+    return serve_root_asset('websocket_client.js', 'application/javascript')
 
 # Serve images from root
 @app.route('/style_preview.html')
 def style_preview():
-    return read_html_file('style_preview.html')
+    return serve_html_file('style_preview.html')
 
 @app.route('/style_preview2.html')
 def style_preview2():
-    return read_html_file('style_preview2.html')
+    return serve_html_file('style_preview2.html')
 
 @app.route('/style_preview3.html')
 def style_preview3():
-    return read_html_file('style_preview3.html')
+    return serve_html_file('style_preview3.html')
 
 @app.route('/styles')
 @login_required
 def style_selector():
-    return read_html_file('style_selector.html')
+    return serve_html_file('style_selector.html')
 
 @app.route('/style_switcher.js')
 @login_required
 def style_switcher_js():
-    return send_from_directory('.', 'style_switcher.js', mimetype='application/javascript')
+    return serve_root_asset('style_switcher.js', 'application/javascript')
 
 @app.route('/professional_styles.js')
 @login_required
 def professional_styles_js():
-    return send_from_directory('.', 'professional_styles.js', mimetype='application/javascript')
+    return serve_root_asset('professional_styles.js', 'application/javascript')
 
 @app.route('/style_preload.css')
 @login_required
 def style_preload_css():
-    return send_from_directory('.', 'style_preload.css', mimetype='text/css')
+    return serve_root_asset('style_preload.css', 'text/css')
 
 @app.route('/nighthawk_terminal.html')
 @login_required
 def nighthawk_terminal():
-    return read_html_file('nighthawk_terminal.html')
+    return serve_html_file('nighthawk_terminal.html')
 
 @app.route('/emerald_mainframe.html')
 @login_required
 def emerald_mainframe():
-    return read_html_file('emerald_mainframe.html')
+    return serve_html_file('emerald_mainframe.html')
 
 @app.route('/amber_oracle.html')
 @login_required
 def amber_oracle():
-    return read_html_file('amber_oracle.html')
+    return serve_html_file('amber_oracle.html')
 
 @app.route('/chart-showcase')
 @login_required
 def chart_showcase():
-    return read_html_file('chart_library_showcase.html')
+    return serve_html_file('chart_library_showcase.html')
 
 @app.route('/<path:filename>')
 def serve_files(filename):
@@ -8143,7 +8163,7 @@ def get_hyperparameter_status():
             'ready_to_optimize': ready_to_optimize,
             'ml_available': ml_available,
             'db_enabled': db_enabled,
-            'next_trigger': '500 samples' if sample_count < 500 else '200 new samples or 30 days',
+            'next_trigger': '500 samples' if sample_count < 500 else '200 new samples or model drift',
             'timestamp': datetime.now().isoformat()
         })
         
@@ -8595,7 +8615,7 @@ def get_ml_feature_importance():
 @login_required
 def ml_model_status_dashboard():
     """ML model status dashboard"""
-    return read_html_file('ml_model_status.html')
+    return serve_html_file('ml_model_status.html')
 
 @app.route('/api/ml-model-status', methods=['GET'])
 @login_required
@@ -8630,7 +8650,7 @@ def get_ml_model_status():
 @login_required
 def model_drift_dashboard():
     """Model drift detection dashboard"""
-    return read_html_file('model_drift_dashboard.html')
+    return serve_html_file('model_drift_dashboard.html')
 
 @app.route('/api/model-drift', methods=['GET'])
 @login_required
@@ -8644,7 +8664,7 @@ def get_model_drift():
         detector = ModelDriftDetector(db)
         
         health = detector.get_model_health_score()
-        alerts = detector.get_drift_alerts()
+        alerts = detector.get_drift_alerts(health)
         
         return jsonify({
             'health_score': health.get('health_score', 75),
@@ -9141,7 +9161,7 @@ def detect_contract_rollover():
 @login_required
 def contract_manager_dashboard():
     """Contract management dashboard"""
-    return read_html_file('contract_manager.html')
+    return serve_html_file('contract_manager.html')
 
 # ------------------------------------------------------------------------
 # Stage 13: Prop Firm Registry API (read-only, data-driven)
@@ -10075,14 +10095,14 @@ def ai_chart_analysis_extension():
 @login_required
 def market_context_dashboard():
     """Market context analysis dashboard"""
-    return read_html_file('market_context_dashboard.html')
+    return serve_html_file('market_context_dashboard.html')
 
 # ML Intelligence Dashboard - standalone route
 @app.route('/ml-intelligence')
 @login_required
 def ml_intelligence_dashboard():
     """Standalone ML Intelligence Dashboard"""
-    return read_html_file('ml_dashboard_fallback.html')
+    return serve_html_file('ml_dashboard_fallback.html')
 
 # Prop firm endpoints
 
@@ -12503,6 +12523,16 @@ def receive_realtime_price():
             "message": str(e)
         }), 500
 
+# Server-side triangles from the 1s stream (started with the price handler in __main__)
+live_triangle_pipeline = None
+
+@app.route('/api/live-triangles/status', methods=['GET'])
+def live_triangles_status():
+    """Live triangle engine state, recent triangles and parity vs indicator SIGNAL_CREATED"""
+    if live_triangle_pipeline is None:
+        return jsonify({"success": False, "error": "Live triangle pipeline not running"}), 503
+    return jsonify({"success": True, **live_triangle_pipeline.status()})
+
 # ============================================================================
 # SCHEMA DEPLOYMENT ENDPOINT
 # ============================================================================
@@ -13324,28 +13354,24 @@ def as_validate_lifecycle_transition(trade_id, new_event_type, cursor):
       * None if the transition is allowed.
       * A string error message if the transition is NOT allowed.
     """
-    # Fetch existing event types for this trade in order
+    # Lifecycle summary for this trade (cached; rejections are re-checked against the DB)
     try:
-        cursor.execute(
-            "SELECT event_type FROM automated_signals WHERE trade_id = %s ORDER BY id ASC",
-            (trade_id,)
-        )
-        rows = cursor.fetchall()
+        lifecycle = lifecycle_state_cache.get(trade_id, cursor)
+        if not lifecycle.has_entry and lifecycle.cached:
+            lifecycle = lifecycle_state_cache.get(trade_id, cursor, refresh=True)
     except Exception as e:
         # If we cannot read history, fail safe with a clear error
         return f"Lifecycle enforcement error: unable to read history for trade {trade_id}: {e}"
     
-    existing = [r[0] for r in rows] if rows else []
-    
     # No history yet
-    if not existing:
+    if not lifecycle.exists:
         # First event must be an ENTRY (or legacy strategy aliases)
         if new_event_type in ("ENTRY", "signal_created", "SIGNAL_CREATED"):
             return None
         return f"Lifecycle enforcement error: {new_event_type} cannot occur before an ENTRY for trade {trade_id}"
     
     # There is history; require at least one ENTRY before non-ENTRY events
-    if "ENTRY" not in (ev for ev in existing if ev is not None):
+    if not lifecycle.has_entry:
         # If somehow we have history but no ENTRY, only allow an ENTRY to repair it
         if new_event_type in ("ENTRY", "signal_created", "SIGNAL_CREATED"):
             return None
@@ -13617,9 +13643,9 @@ def automated_signals_webhook():
     t0 = time.time()
     
     try:
-        # 1. Get raw JSON payload
-        data_raw = request.get_json(force=True, silent=True)
-        logger.info("🟦 RAW WEBHOOK DATA RECEIVED (7G): %s", data_raw)
+        # 1. Decode the raw JSON body once
+        data_raw = decode_json_body(request.get_data(cache=True))
+        logger.debug("🟦 RAW WEBHOOK DATA RECEIVED (7G): %s", data_raw)
         
         # SPECIAL HANDLING: MFE_UPDATE_BATCH bypasses normal validation
         if data_raw and data_raw.get("event_type") == "MFE_UPDATE_BATCH":
@@ -13676,6 +13702,7 @@ def automated_signals_webhook():
                         json.dumps(signal_data)
                     ))
                     conn.commit()
+                    lifecycle_state_cache.record(signal_data.get("trade_id"), "MFE_UPDATE")
                     logger.info(f"✅ Batch INSERT committed: {signal_data.get('trade_id')}")
                     cur.close()
                     conn.close()
@@ -13687,7 +13714,7 @@ def automated_signals_webhook():
                 batch_results.append(result)
                 # Broadcast WebSocket
                 try:
-                    socketio.emit("mfe_update", {
+                    broadcast_hub.publish_mfe_update(signal_data.get("trade_id"), {
                         "trade_id": signal_data.get("trade_id"),
                         "be_mfe": signal_data.get("be_mfe"),
                         "no_be_mfe": signal_data.get("no_be_mfe"),
@@ -13700,16 +13727,14 @@ def automated_signals_webhook():
             logger.info(f"✅ Batch processed: {success_count}/{len(batch_results)} signals succeeded")
             return jsonify({"success": True, "batch_processed": len(batch_results), "succeeded": success_count}), 200
         
-        from automated_signals_state import auto_guard_webhook_payload
-        guarded, guard_error = auto_guard_webhook_payload(data_raw)
-        if guard_error:
-            logger.warning(f"[AUTO-GUARD] Payload rejected: {guard_error}")
-            return jsonify({"success": False, "error": guard_error}), 400
-        else:
-            data_raw = guarded  # Use sanitized payload moving forward
+        # 2. Guard, normalize, parse, validate and fuse in one pass (signal_payload_parser)
+        canonical, parse_error = parse_signal_event(data_raw)
+        if canonical is None:
+            logger.warning(f"[AUTO-GUARD] Payload rejected: {parse_error}")
+            return jsonify({"success": False, "error": parse_error}), 400
         
-        # 2. Filesystem dump block
-        if data_raw and data_raw.get("debug") == "dump_fs":
+        # 3. Filesystem dump block
+        if data_raw.get("debug") == "dump_fs":
             import os, inspect
             # 1. Dump filesystem
             for root, dirs, files in os.walk(".", topdown=True):
@@ -13721,37 +13746,11 @@ def automated_signals_webhook():
                 logger.warning(f"[LIVE_WEBHOOK_FILE_ERROR] {e}")
             return jsonify({"success": True, "debug": "filesystem_and_source_dumped"}), 200
         
-        # 3. Apply Phase 2A normalization
-        from signal_normalization import normalize_signal_payload, validate_normalized_payload
-        normalized_data = normalize_signal_payload(data_raw)
-        
-        # 4. Validate normalized
-        is_valid, validation_error = validate_normalized_payload(normalized_data)
-        if not is_valid:
-            logger.warning(f"[WEBHOOK] Normalization validation failed: {validation_error}")
-            data_to_parse = data_raw  # Fallback to raw payload
-        else:
-            logger.info(f"[WEBHOOK] Normalization successful: direction={normalized_data.get('direction')}, session={normalized_data.get('session')}")
-            data_to_parse = normalized_data
-        
-        # 5. Parse
-        parsed = as_parse_automated_signal_payload(data_to_parse)
-        
-        # 6. Validate parser output
-        if isinstance(parsed, dict) and parsed.get("validation_error"):
-            ve = parsed["validation_error"]
-            t1 = time.time()
-            as_log_automated_signal_event(data_raw, parsed, ve, {"error": ve}, (t1 - t0) * 1000)
-            return jsonify({"success": False, "error": ve}), 400
-        
-        validation_error = as_validate_parsed_payload(parsed)
-        if validation_error:
+        # 4. Reject parser / telemetry validation failures
+        if parse_error:
             t1 = time.time()
-            as_log_automated_signal_event(data_raw, parsed, validation_error, {"error": validation_error}, (t1 - t0) * 1000)
-            return jsonify({"success": False, "error": validation_error}), 400
-        
-        # 7. FUSE canonical payload
-        canonical = as_fuse_automated_payload_sources(data_raw, parsed)
+            as_log_automated_signal_event(data_raw, canonical.parsed(), parse_error, {"error": parse_error}, (t1 - t0) * 1000)
+            return jsonify({"success": False, "error": parse_error}), 400
         
         event_type = canonical["event_type"]
         trade_id = canonical.get("trade_id") or "UNKNOWN"
@@ -13789,22 +13788,21 @@ def automated_signals_webhook():
             try:
                 import os
                 import psycopg2
-                from automated_signals_state import enforce_strict_lifecycle_rules
-                database_url = os.environ.get('DATABASE_PUBLIC_URL') or os.environ.get('DATABASE_URL')
-                if not database_url:
-                    raise Exception("No DATABASE_URL configured")
-                conn_check = psycopg2.connect(database_url)
-                cursor_check = conn_check.cursor()
-                cursor_check.execute("""
-                    SELECT event_type FROM automated_signals
-                    WHERE trade_id = %s
-                    ORDER BY timestamp ASC
-                """, (trade_id,))
-                prior_events = [{"event_type": row[0]} for row in cursor_check.fetchall()]
-                cursor_check.close()
-                conn_check.close()
+                from automated_signals_state import check_strict_lifecycle_transition
+                # Cached lifecycle state answers most events without a connection;
+                # a miss, or a cached state that would reject, reads the DB
+                lifecycle = lifecycle_state_cache.peek(trade_id)
+                if lifecycle is None or not check_strict_lifecycle_transition(lifecycle.has_entry, event_type)[0]:
+                    database_url = os.environ.get('DATABASE_PUBLIC_URL') or os.environ.get('DATABASE_URL')
+                    if not database_url:
+                        raise Exception("No DATABASE_URL configured")
+                    conn_check = psycopg2.connect(database_url)
+                    cursor_check = conn_check.cursor()
+                    lifecycle = lifecycle_state_cache.get(trade_id, cursor_check, refresh=lifecycle is not None)
+                    cursor_check.close()
+                    conn_check.close()
                 
-                ok, e2_error = enforce_strict_lifecycle_rules(prior_events, event_type)
+                ok, e2_error = check_strict_lifecycle_transition(lifecycle.has_entry, event_type)
                 if not ok:
                     logger.error(f"[E2-LIFECYCLE-REJECT] {e2_error} trade_id={trade_id}")
                     return jsonify({"success": False, "error": e2_error}), 400
@@ -13815,7 +13813,7 @@ def automated_signals_webhook():
                 logger.error(f"[E2-ENFORCER-TRACEBACK] {error_details}")
                 return jsonify({"success": False, "error": f"Lifecycle enforcement error: {str(e2_ex)}"}), 500
         
-        # 8. Route event
+        # 5. Route event
         if canonical["event_type"] == "SIGNAL_CREATED":
             # Store SIGNAL_CREATED as-is (don't convert to ENTRY)
             result = handle_signal_created(canonical)
@@ -13835,7 +13833,7 @@ def automated_signals_webhook():
                 batch_results.append(result)
                 # Broadcast WebSocket for each signal
                 try:
-                    socketio.emit("mfe_update", {
+                    broadcast_hub.publish_mfe_update(signal_data.get("trade_id"), {
                         "trade_id": signal_data.get("trade_id"),
                         "be_mfe": signal_data.get("be_mfe"),
                         "no_be_mfe": signal_data.get("no_be_mfe"),
@@ -13849,7 +13847,7 @@ def automated_signals_webhook():
             result = handle_automated_event("MFE_UPDATE", canonical, raw_payload_str)
             # Broadcast WebSocket MFE update
             try:
-                socketio.emit("mfe_update", {
+                broadcast_hub.publish_mfe_update(canonical.get("trade_id"), {
                     "trade_id": canonical.get("trade_id"),
                     "be_mfe": canonical.get("be_mfe"),
                     "no_be_mfe": canonical.get("no_be_mfe"),
@@ -13958,9 +13956,13 @@ def handle_signal_created(data):
         ))
         
         conn.commit()
+        lifecycle_state_cache.record(trade_id, "SIGNAL_CREATED")
         cur.close()
         conn.close()
         
+        if live_triangle_pipeline is not None:
+            live_triangle_pipeline.observe_indicator_signal(trade_id, data.get("direction"))
+        
         logger.info(f"✅ SIGNAL_CREATED stored: {trade_id}")
         return {"success": True, "trade_id": trade_id}
         
@@ -14007,6 +14009,7 @@ def handle_cancelled_signal(data):
         ))
         
         conn.commit()
+        lifecycle_state_cache.record(trade_id, "CANCELLED")
         cur.close()
         conn.close()
         
@@ -14330,13 +14333,14 @@ def handle_entry_signal(data):
         lifecycle_state = 'ACTIVE'  # Default for new ENTRY
         lifecycle_seq = 1  # Default for new ENTRY
         conn.commit()
+        lifecycle_state_cache.record(trade_id, "ENTRY")
         
         log_event_insert(prefix, trade_id, f"direction={direction} entry={entry_price} sl={stop_loss}")
         logger.info(f"✅ Entry signal stored: ID {signal_id}, Trade {trade_id}, Direction {direction}")
         
         # Broadcast to WebSocket clients for Activity Feed
         try:
-            socketio.emit('signal_received', {
+            broadcast_hub.publish_trade_event('signal_received', trade_id, {
                 'trade_id': trade_id,
                 'direction': bias or direction,
                 'entry_price': entry_price,
@@ -14344,13 +14348,13 @@ def handle_entry_signal(data):
                 'session': session,
                 'timestamp': datetime.now().isoformat()
             })
-            logger.info(f"📡 WebSocket broadcast: signal_received for {trade_id}")
+            logger.debug(f"📡 WebSocket broadcast: signal_received for {trade_id}")
         except Exception as ws_error:
             logger.warning(f"WebSocket broadcast failed: {ws_error}")
         
         # Broadcast lifecycle event for real-time animations
         try:
-            socketio.emit('trade_lifecycle', {
+            broadcast_hub.publish_trade_event('trade_lifecycle', trade_id, {
                 'trade_id': trade_id,
                 'event_type': 'ENTRY',
                 'lifecycle_state': lifecycle_state,
@@ -14359,8 +14363,8 @@ def handle_entry_signal(data):
                 'be_mfe': be_mfe,
                 'no_be_mfe': no_be_mfe,
                 'exit_type': None
-            }, namespace='/')
-            logger.info(f"📡 WebSocket broadcast: trade_lifecycle ENTRY for {trade_id}")
+            })
+            logger.debug(f"📡 WebSocket broadcast: trade_lifecycle ENTRY for {trade_id}")
         except Exception as ws_error:
             logger.warning(f"WebSocket lifecycle broadcast failed: {ws_error}")
         
@@ -14447,19 +14451,7 @@ def handle_mfe_update(data):
         mae_global_r = data.get("mae_global_R")
         
         # Extract payload timestamp (NEVER use NOW())
-        raw_ts = data.get("event_timestamp") or data.get("timestamp")
-        if not raw_ts:
-            raw_ts = datetime.utcnow().isoformat()
-        # Parse as NY time, convert to UTC
-        ny_zone = ZoneInfo("America/New_York")
-        utc_zone = ZoneInfo("UTC")
-        try:
-            parsed_local = datetime.fromisoformat(raw_ts.replace("Z", ""))
-            if parsed_local.tzinfo is None:
-                parsed_local = parsed_local.replace(tzinfo=ny_zone)
-            event_ts_clean = parsed_local.astimezone(utc_zone).isoformat()
-        except:
-            event_ts_clean = datetime.utcnow().isoformat()
+        event_ts_clean = event_time_utc(data)
         
         logger.info(f"📊 MFE INSERT: trade_id={trade_id}, be_mfe={be_mfe}, no_be_mfe={no_be_mfe}, mae_global={mae_global_r}, price={current_price}")
         
@@ -14488,26 +14480,27 @@ def handle_mfe_update(data):
             logger.warning(f"Could not write to server.log: {log_err}")
         
         conn.commit()
+        lifecycle_state_cache.record(trade_id, "MFE_UPDATE")
         
         log_event_insert(prefix, trade_id, f"be_mfe={be_mfe} no_be_mfe={no_be_mfe}")
         logger.info(f"✅ MFE update stored: Trade {trade_id}, BE={be_mfe}R, No BE={no_be_mfe}R @ {current_price}")
         
         # Broadcast to WebSocket clients for Activity Feed
         try:
-            socketio.emit('mfe_update', {
+            broadcast_hub.publish_mfe_update(trade_id, {
                 'trade_id': trade_id,
                 'be_mfe': be_mfe,
                 'no_be_mfe': no_be_mfe,
                 'current_price': current_price,
                 'timestamp': datetime.now().isoformat()
             })
-            logger.info(f"📡 WebSocket broadcast: mfe_update for {trade_id}")
+            logger.debug(f"📡 WebSocket broadcast: mfe_update for {trade_id}")
         except Exception as ws_error:
             logger.warning(f"WebSocket broadcast failed: {ws_error}")
         
         # Broadcast lifecycle event for real-time animations
         try:
-            socketio.emit('trade_lifecycle', {
+            broadcast_hub.publish('trade_lifecycle', {
                 'trade_id': trade_id,
                 'event_type': 'MFE_UPDATE',
                 'lifecycle_state': 'ACTIVE',
@@ -14516,8 +14509,8 @@ def handle_mfe_update(data):
                 'be_mfe': be_mfe,
                 'no_be_mfe': no_be_mfe,
                 'exit_type': None
-            }, namespace='/')
-            logger.info(f"📡 WebSocket broadcast: trade_lifecycle MFE_UPDATE for {trade_id}")
+            }, rooms={trade_room(trade_id)}, coalesce_key=('trade_lifecycle_mfe', trade_id))
+            logger.debug(f"📡 WebSocket broadcast: trade_lifecycle MFE_UPDATE for {trade_id}")
         except Exception as ws_error:
             logger.warning(f"WebSocket lifecycle broadcast failed: {ws_error}")
         
@@ -14630,6 +14623,7 @@ def handle_cancelled_signal(data):
         ))
         
         conn.commit()
+        lifecycle_state_cache.record(trade_id, "CANCELLED")
         
         # Log to server.log for diagnosis
         try:
@@ -14643,14 +14637,14 @@ def handle_cancelled_signal(data):
         
         # Broadcast to WebSocket clients for Activity Feed
         try:
-            socketio.emit('signal_cancelled', {
+            broadcast_hub.publish_trade_event('signal_cancelled', trade_id, {
                 'trade_id': trade_id,
                 'direction': direction,
                 'session': session,
                 'reason': exit_reason,
                 'timestamp': datetime.now().isoformat()
             })
-            logger.info(f"📡 WebSocket broadcast: signal_cancelled for {trade_id}")
+            logger.debug(f"📡 WebSocket broadcast: signal_cancelled for {trade_id}")
         except Exception as ws_error:
             logger.warning(f"WebSocket broadcast failed: {ws_error}")
         
@@ -14708,18 +14702,7 @@ def handle_be_trigger(data):
             return {"success": False, "error": validation_error}
         
         # Extract payload timestamp (NEVER use NOW()) - parse as NY, convert to UTC
-        raw_ts = data.get("event_timestamp") or data.get("timestamp")
-        if not raw_ts:
-            raw_ts = datetime.utcnow().isoformat()
-        ny_zone = ZoneInfo("America/New_York")
-        utc_zone = ZoneInfo("UTC")
-        try:
-            parsed_local = datetime.fromisoformat(raw_ts.replace("Z", ""))
-            if parsed_local.tzinfo is None:
-                parsed_local = parsed_local.replace(tzinfo=ny_zone)
-            event_ts_clean = parsed_local.astimezone(utc_zone).isoformat()
-        except:
-            event_ts_clean = datetime.utcnow().isoformat()
+        event_ts_clean = event_time_utc(data)
         
         # Serialize raw payload for storage
         raw_payload_json = json.dumps(data)
@@ -14737,6 +14720,7 @@ def handle_be_trigger(data):
             
         signal_id = result[0]
         conn.commit()
+        lifecycle_state_cache.record(trade_id, "BE_TRIGGERED")
         
         # Log to server.log for diagnosis
         try:
@@ -14822,14 +14806,10 @@ def handle_exit_signal(data, exit_type):
         # Check for ENTRY or MFE_UPDATE (since MFE_UPDATE overwrites ENTRY event_type)
         # ==========================================
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 1
-            FROM automated_signals
-            WHERE trade_id = %s
-              AND event_type IN ('ENTRY', 'MFE_UPDATE')
-            LIMIT 1
-        """, (trade_id,))
-        trade_exists = cursor.fetchone()
+        # One compact read (EXIT happens once per trade, so always from the DB) that also
+        # refreshes the lifecycle cache for the validation below
+        lifecycle = lifecycle_state_cache.get(trade_id, cursor, refresh=True)
+        trade_exists = lifecycle.has_entry or 'MFE_UPDATE' in lifecycle.event_types
         
         if not trade_exists:
             logger.warning(f"⚠️ EXIT ignored for trade_id={trade_id} — no active trade found")
@@ -14842,23 +14822,10 @@ def handle_exit_signal(data, exit_type):
             }
         
         # Compute next lifecycle sequence for this trade (count existing events)
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM automated_signals
-            WHERE trade_id = %s
-        """, (trade_id,))
-        seq_row = cursor.fetchone()
-        next_lifecycle_seq = (seq_row[0] or 1) + 1
+        next_lifecycle_seq = (lifecycle.seq or 1) + 1
         
         # Lifecycle enforcement: ignore duplicate EXITs
-        cursor.execute("""
-            SELECT 1
-            FROM automated_signals
-            WHERE trade_id = %s
-              AND event_type LIKE 'EXIT_%%'
-            LIMIT 1
-        """, (trade_id,))
-        exit_exists = cursor.fetchone()
+        exit_exists = lifecycle.has_exit
         
         if exit_exists:
             logger.warning(f"⚠️ EXIT ignored for trade_id={trade_id} — trade already has an EXIT event")
@@ -14878,18 +14845,7 @@ def handle_exit_signal(data, exit_type):
             return {"success": False, "error": validation_error}
         
         # Extract payload timestamp (NEVER use NOW()) - parse as NY, convert to UTC
-        raw_ts = data.get("event_timestamp") or data.get("timestamp")
-        if not raw_ts:
-            raw_ts = datetime.utcnow().isoformat()
-        ny_zone = ZoneInfo("America/New_York")
-        utc_zone = ZoneInfo("UTC")
-        try:
-            parsed_local = datetime.fromisoformat(raw_ts.replace("Z", ""))
-            if parsed_local.tzinfo is None:
-                parsed_local = parsed_local.replace(tzinfo=ny_zone)
-            event_ts_clean = parsed_local.astimezone(utc_zone).isoformat()
-        except:
-            event_ts_clean = datetime.utcnow().isoformat()
+        event_ts_clean = event_time_utc(data)
         
         # Serialize raw payload for storage
         raw_payload_json = json.dumps(data)
@@ -14963,13 +14919,14 @@ def handle_exit_signal(data, exit_type):
         lifecycle_seq = next_lifecycle_seq
         
         conn.commit()
+        lifecycle_state_cache.record(trade_id, canonical_exit_event)
         
         log_event_insert(prefix, trade_id, f"be_mfe={final_be_mfe} no_be_mfe={final_no_be_mfe} mae={mae_global_r}")
         logger.info(f"✅ Exit signal stored: Trade {trade_id}, Type {exit_type}, BE MFE {final_be_mfe}R, No BE MFE {final_no_be_mfe}R")
         
         # Broadcast to WebSocket clients for Activity Feed
         try:
-            socketio.emit('signal_resolved', {
+            broadcast_hub.publish_trade_event('signal_resolved', trade_id, {
                 'trade_id': trade_id,
                 'exit_type': exit_type,
                 'be_mfe': final_be_mfe,
@@ -14977,13 +14934,13 @@ def handle_exit_signal(data, exit_type):
                 'exit_price': exit_price if exit_price > 0 else None,
                 'timestamp': datetime.now().isoformat()
             })
-            logger.info(f"📡 WebSocket broadcast: signal_resolved for {trade_id}")
+            logger.debug(f"📡 WebSocket broadcast: signal_resolved for {trade_id}")
         except Exception as ws_error:
             logger.warning(f"WebSocket broadcast failed: {ws_error}")
         
         # Broadcast lifecycle event for real-time animations
         try:
-            socketio.emit('trade_lifecycle', {
+            broadcast_hub.publish_trade_event('trade_lifecycle', trade_id, {
                 'trade_id': trade_id,
                 'event_type': canonical_exit_event,  # Use EXIT_BE or EXIT_SL
                 'lifecycle_state': lifecycle_state,
@@ -14992,8 +14949,8 @@ def handle_exit_signal(data, exit_type):
                 'be_mfe': final_be_mfe,
                 'no_be_mfe': final_no_be_mfe,
                 'exit_type': exit_type
-            }, namespace='/')
-            logger.info(f"📡 WebSocket broadcast: trade_lifecycle {canonical_exit_event} for {trade_id}")
+            })
+            logger.debug(f"📡 WebSocket broadcast: trade_lifecycle {canonical_exit_event} for {trade_id}")
         except Exception as ws_error:
             logger.warning(f"WebSocket lifecycle broadcast failed: {ws_error}")
         
@@ -17021,6 +16978,7 @@ def bulk_delete_automated_signals():
         
         deleted_count = cursor.rowcount
         conn.commit()
+        lifecycle_state_cache.invalidate(trade_ids)
         cursor.close()
         conn.close()
         
@@ -17253,10 +17211,25 @@ def automated_signals_cancelled():
             conn.close()
 
 
+from automated_signals_stats import (
+    COUNTER_FIELDS as STATS_COUNTER_FIELDS, StatsCounterReconciler, build_dashboard_stats,
+    stats_cache as automated_signals_stats_cache, DEFAULT_RECONCILE_INTERVAL_SECONDS,
+)
+
+_stats_reconcile_interval = int(os.environ.get('STATS_RECONCILE_INTERVAL_SECONDS', DEFAULT_RECONCILE_INTERVAL_SECONDS))
+if db_enabled and os.environ.get('DATABASE_URL') and _stats_reconcile_interval > 0:
+    stats_counter_reconciler = StatsCounterReconciler(
+        os.environ.get('DATABASE_URL'),
+        interval=_stats_reconcile_interval,
+        on_reconciled=automated_signals_stats_cache.invalidate
+    ).start()
+    logger.info(f"✅ Stats counter reconciliation scheduled every {_stats_reconcile_interval}s")
+
+
 @app.route('/api/automated-signals/stats-live', methods=['GET'])
 @app.route('/api/automated-signals/stats', methods=['GET'])
 def get_automated_signals_stats():
-    """Get statistics for automated signals dashboard - NO CACHING"""
+    """Get statistics for automated signals dashboard (trigger-maintained counters behind a short TTL cache)"""
     # Add cache-busting headers
     response_headers = {
         'Cache-Control': 'no-cache, no-store, must-revalidate',
@@ -17282,44 +17255,20 @@ def get_automated_signals_stats():
                 "error": "DATABASE_URL not configured"
             }), 200
         
-        # Use EXACT same connection method as debug endpoint
-        conn = psycopg2.connect(database_url)
-        cursor = conn.cursor()
-        
-        # Get total count first
-        cursor.execute("SELECT COUNT(*) FROM automated_signals")
-        total = cursor.fetchone()[0]
-        
-        # Count ENTRY events
-        cursor.execute("SELECT COUNT(*) FROM automated_signals WHERE event_type = 'ENTRY'")
-        entries = cursor.fetchone()[0]
-        
-        # Count EXIT events
-        cursor.execute("SELECT COUNT(*) FROM automated_signals WHERE event_type LIKE 'EXIT_%'")
-        exits = cursor.fetchone()[0]
-        
-        # Get average MFE
-        cursor.execute("SELECT AVG(final_mfe) FROM automated_signals WHERE final_mfe IS NOT NULL")
-        avg_mfe_result = cursor.fetchone()[0]
-        avg_mfe = float(avg_mfe_result) if avg_mfe_result else 0.0
-        
-        active_count = entries - exits
-        
-        cursor.close()
-        conn.close()
+        # Counters are exact (updated in the webhook's transaction); the cache only
+        # collapses concurrent dashboard polls into one read per TTL window
+        snapshot = automated_signals_stats_cache.get()
+        if snapshot is None:
+            return jsonify({
+                "success": True,
+                "stats": build_dashboard_stats(dict.fromkeys(STATS_COUNTER_FIELDS, 0)),
+                "message": "Table not initialized"
+            }), 200
+        stats = build_dashboard_stats(snapshot)
         
         response = jsonify({
             "success": True,
-            "stats": {
-                "total_signals": total,
-                "active_count": active_count,
-                "completed_count": exits,
-                "pending_count": 0,
-                "win_count": 0,
-                "win_rate": 0.0,
-                "avg_mfe": round(avg_mfe, 2),
-                "success_rate": 0.0
-            },
+            "stats": stats,
             "error": "0"
         })
         
@@ -17392,6 +17341,7 @@ def delete_trades_bulk():
         rows_deleted = cursor.rowcount
         
         conn.commit()
+        lifecycle_state_cache.invalidate(trade_ids)
         cursor.close()
         conn.close()
         
@@ -17731,8 +17681,16 @@ if __name__ == '__main__':
     # Start real-time price handler for 1-second TradingView data
     try:
         from realtime_price_webhook_handler import start_realtime_price_handler
-        start_realtime_price_handler()
+        price_handler = start_realtime_price_handler()
         logger.info("🚀 Real-time price handler started for 1-second TradingView data")
+        
+        if os.environ.get('LIVE_TRIANGLES_ENABLED', 'true').lower() == 'true':
+            from services.live_triangle_engine import start_live_triangle_pipeline, json_safe
+            live_triangle_pipeline = start_live_triangle_pipeline(
+                price_handler, database_url=os.environ.get('DATABASE_URL') if db_enabled else None)
+            live_triangle_pipeline.subscribe(
+                lambda triangle: broadcast_hub.publish('live_triangle', json_safe(triangle)))
+            logger.info("🔺 Live triangle pipeline subscribed to 1-second prices")
     except ImportError:
         logger.warning("⚠️ Real-time price handler not available")
     except Exception as e:
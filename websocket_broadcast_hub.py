@@ -0,0 +1,345 @@
+"""
+Sharded WebSocket Broadcast Hub
+Room-based fan-out with per-connection outbound queues and MFE coalescing.
+
+Webhook handlers call publish()/publish_mfe_update() which only enqueue and
+return immediately; a dispatcher thread coalesces and fans out frames, and a
+fixed set of shard threads drain per-connection queues via socketio.emit(to=sid).
+
+Rooms:
+- "all"                    legacy clients that never subscribed (old behaviour)
+- "dashboard:<name>"       every event for a dashboard
+- "trade:<trade_id>"       events for a single trade
+"""
+
+import logging
+import time
+import zlib
+from collections import deque
+from threading import Condition, Lock, Thread
+
+logger = logging.getLogger(__name__)
+
+ALL_ROOM = "all"
+DEFAULT_DASHBOARD = "automated_signals"
+
+DEFAULT_COALESCE_MS = 250
+DEFAULT_MAX_QUEUE_DEPTH = 256
+DEFAULT_SHARDS = 4
+
+
+def trade_room(trade_id):
+    return f"trade:{trade_id}"
+
+
+def dashboard_room(name):
+    return f"dashboard:{name}"
+
+
+class _Connection:
+    """Outbound state for one socket (owned by a single shard)"""
+
+    __slots__ = ('sid', 'queue', 'rooms', 'dropped', 'sent')
+
+    def __init__(self, sid, max_depth):
+        self.sid = sid
+        self.queue = deque(maxlen=max_depth)
+        self.rooms = set()
+        self.dropped = 0
+        self.sent = 0
+
+
+class _Shard:
+    """Drains the outbound queues of the connections hashed to it"""
+
+    def __init__(self, hub, index):
+        self.hub = hub
+        self.index = index
+        self.cond = Condition()
+        self.ready = deque()  # connections with pending frames
+        self.thread = None
+
+    def notify(self, conn):
+        with self.cond:
+            self.ready.append(conn)
+            self.cond.notify()
+
+    def run(self):
+        while self.hub.running:
+            with self.cond:
+                while not self.ready and self.hub.running:
+                    self.cond.wait(timeout=1.0)
+                pending = list(self.ready)
+                self.ready.clear()
+
+            seen = set()
+            for conn in pending:
+                if conn.sid in seen:
+                    continue
+                seen.add(conn.sid)
+                while conn.queue:
+                    try:
+                        event, payload, namespace = conn.queue.popleft()
+                    except IndexError:
+                        break
+                    try:
+                        self.hub.socketio.emit(event, payload, to=conn.sid, namespace=namespace)
+                        conn.sent += 1
+                    except Exception as e:
+                        logger.debug(f"Emit to {conn.sid} failed: {e}")
+
+
+class BroadcastHub:
+    """
+    Off-request-path broadcaster for Socket.IO.
+    - publish(): enqueue an event for one or more rooms
+    - publish_mfe_update(): coalesce MFE updates per trade within coalesce_ms
+    - add_connection()/remove_connection()/subscribe()/unsubscribe(): membership
+    """
+
+    def __init__(self, socketio, coalesce_ms=DEFAULT_COALESCE_MS,
+                 max_queue_depth=DEFAULT_MAX_QUEUE_DEPTH, shards=DEFAULT_SHARDS):
+        self.socketio = socketio
+        self.coalesce_window = coalesce_ms / 1000.0
+        self.max_queue_depth = max_queue_depth
+        self.running = False
+
+        self._lock = Lock()
+        self._connections = {}  # sid -> _Connection
+        self._rooms = {}        # room -> set(sid)
+
+        self._ingress_cond = Condition()
+        self._ingress = deque()
+        self._pending = {}      # coalesce key -> [deadline, event, payload, rooms, namespace, merged_count]
+        self._flush_requested = False
+
+        self._shards = [_Shard(self, i) for i in range(max(1, shards))]
+        self._dispatcher = None
+
+        self.stats = {'published': 0, 'coalesced': 0, 'frames_queued': 0, 'dropped': 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._dispatcher = Thread(target=self._dispatch_loop, name="ws-hub-dispatch", daemon=True)
+        self._dispatcher.start()
+        for shard in self._shards:
+            shard.thread = Thread(target=shard.run, name=f"ws-hub-shard-{shard.index}", daemon=True)
+            shard.thread.start()
+        logger.info(f"BroadcastHub started ({len(self._shards)} shards, coalesce={int(self.coalesce_window * 1000)}ms, depth={self.max_queue_depth})")
+
+    def stop(self):
+        self.running = False
+        with self._ingress_cond:
+            self._ingress_cond.notify_all()
+        for shard in self._shards:
+            with shard.cond:
+                shard.cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Membership
+    # ------------------------------------------------------------------
+    def _shard_for(self, sid):
+        return self._shards[zlib.crc32(str(sid).encode()) % len(self._shards)]
+
+    def add_connection(self, sid):
+        """Register a socket; it receives everything until it subscribes"""
+        with self._lock:
+            if sid in self._connections:
+                return
+            self._connections[sid] = _Connection(sid, self.max_queue_depth)
+            self._join(sid, ALL_ROOM)
+
+    def remove_connection(self, sid):
+        with self._lock:
+            conn = self._connections.pop(sid, None)
+            if conn is None:
+                return
+            for room in conn.rooms:
+                members = self._rooms.get(room)
+                if members is not None:
+                    members.discard(sid)
+                    if not members:
+                        del self._rooms[room]
+
+    def _join(self, sid, room):
+        self._rooms.setdefault(room, set()).add(sid)
+        self._connections[sid].rooms.add(room)
+
+    def _leave(self, sid, room):
+        members = self._rooms.get(room)
+        if members is not None:
+            members.discard(sid)
+            if not members:
+                del self._rooms[room]
+        self._connections[sid].rooms.discard(room)
+
+    def subscribe(self, sid, rooms):
+        """Join rooms; the first explicit subscription drops the legacy 'all' room"""
+        with self._lock:
+            if sid not in self._connections:
+                self._connections[sid] = _Connection(sid, self.max_queue_depth)
+            conn = self._connections[sid]
+            if ALL_ROOM in conn.rooms:
+                self._leave(sid, ALL_ROOM)
+            for room in rooms:
+                self._join(sid, room)
+            return sorted(conn.rooms)
+
+    def unsubscribe(self, sid, rooms):
+        with self._lock:
+            if sid not in self._connections:
+                return []
+            for room in rooms:
+                self._leave(sid, room)
+            return sorted(self._connections[sid].rooms)
+
+    def room_size(self, room):
+        with self._lock:
+            return len(self._rooms.get(room, ()))
+
+    # ------------------------------------------------------------------
+    # Publishing (request path: enqueue only)
+    # ------------------------------------------------------------------
+    def publish(self, event, payload, rooms=None, dashboard=DEFAULT_DASHBOARD, namespace='/', coalesce_key=None):
+        """
+        Queue an event for the dashboard room, any extra rooms, and legacy clients.
+        Events sharing a coalesce_key within the window are merged into one frame.
+        """
+        target_rooms = set(rooms or ())
+        target_rooms.add(ALL_ROOM)
+        if dashboard:
+            target_rooms.add(dashboard_room(dashboard))
+        with self._ingress_cond:
+            self._ingress.append((event, payload, frozenset(target_rooms), namespace, coalesce_key, time.monotonic()))
+            self._ingress_cond.notify()
+        self.stats['published'] += 1
+
+    def publish_mfe_update(self, trade_id, payload, dashboard=DEFAULT_DASHBOARD, namespace='/'):
+        """MFE updates for the same trade inside the window collapse to the latest values"""
+        rooms = {trade_room(trade_id)} if trade_id else None
+        self.publish('mfe_update', payload, rooms=rooms, dashboard=dashboard, namespace=namespace,
+                     coalesce_key=('mfe_update', trade_id) if trade_id else None)
+
+    def publish_trade_event(self, event, trade_id, payload, dashboard=DEFAULT_DASHBOARD, namespace='/'):
+        """Lifecycle/signal events go to the trade room as well as the dashboard"""
+        rooms = {trade_room(trade_id)} if trade_id else None
+        self.publish(event, payload, rooms=rooms, dashboard=dashboard, namespace=namespace)
+
+    # ------------------------------------------------------------------
+    # Dispatcher
+    # ------------------------------------------------------------------
+    def _dispatch_loop(self):
+        while self.running:
+            with self._ingress_cond:
+                if not self._ingress:
+                    timeout = self._next_deadline_in()
+                    self._ingress_cond.wait(timeout=timeout if timeout is not None else 1.0)
+                batch = list(self._ingress)
+                self._ingress.clear()
+
+            for event, payload, rooms, namespace, key, received in batch:
+                if key is None:
+                    self._fan_out(event, payload, rooms, namespace)
+                    continue
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = [received + self.coalesce_window, event, dict(payload), rooms, namespace, 1]
+                else:
+                    entry[2].update(payload)
+                    entry[3] = entry[3] | rooms
+                    entry[5] += 1
+                    self.stats['coalesced'] += 1
+
+            if self._flush_requested:
+                self._flush_requested = False
+                self._flush_due(float('inf'))
+            else:
+                self._flush_due(time.monotonic())
+
+    def _next_deadline_in(self):
+        if not self._pending:
+            return None
+        earliest = min(entry[0] for entry in self._pending.values())
+        return max(0.0, earliest - time.monotonic())
+
+    def _flush_due(self, now):
+        if not self._pending:
+            return
+        due = [key for key, entry in self._pending.items() if entry[0] <= now]
+        for key in due:
+            _, event, payload, rooms, namespace, merged = self._pending.pop(key)
+            if merged > 1:
+                payload['coalesced'] = merged
+            self._fan_out(event, payload, rooms, namespace)
+
+    def flush(self):
+        """Close all coalescing windows on the next dispatcher pass (shutdown/tests)"""
+        with self._ingress_cond:
+            self._flush_requested = True
+            self._ingress_cond.notify()
+
+    def _fan_out(self, event, payload, rooms, namespace):
+        with self._lock:
+            sids = set()
+            for room in rooms:
+                sids.update(self._rooms.get(room, ()))
+            targets = [self._connections[sid] for sid in sids if sid in self._connections]
+
+        frame = (event, payload, namespace)
+        for conn in targets:
+            if len(conn.queue) == conn.queue.maxlen:
+                # deque(maxlen) drops the oldest frame; slow clients lose stale updates first
+                conn.dropped += 1
+                self.stats['dropped'] += 1
+            conn.queue.append(frame)
+            self.stats['frames_queued'] += 1
+            self._shard_for(conn.sid).notify(conn)
+
+    def get_stats(self):
+        with self._lock:
+            connections = len(self._connections)
+            rooms = len(self._rooms)
+            max_depth = max((len(c.queue) for c in self._connections.values()), default=0)
+        return {
+            **self.stats,
+            'connections': connections,
+            'rooms': rooms,
+            'max_outbound_depth': max_depth,
+            'pending_coalesce': len(self._pending),
+            'shards': len(self._shards),
+        }
+
+
+def register_broadcast_hub_handlers(socketio, hub):
+    """Socket events for room subscriptions (connect/disconnect are wired by the caller)"""
+    from flask import request
+    from flask_socketio import emit
+
+    @socketio.on('subscribe')
+    def handle_subscribe(data):
+        rooms = _rooms_from_request(data)
+        joined = hub.subscribe(request.sid, rooms)
+        emit('subscribed', {'rooms': joined})
+
+    @socketio.on('unsubscribe')
+    def handle_unsubscribe(data):
+        rooms = _rooms_from_request(data)
+        remaining = hub.unsubscribe(request.sid, rooms)
+        emit('subscribed', {'rooms': remaining})
+
+    logger.info("Broadcast hub socket handlers registered")
+
+
+def _rooms_from_request(data):
+    """Accept {'dashboards': [...], 'trades': [...], 'rooms': [...]}"""
+    if not isinstance(data, dict):
+        return []
+    rooms = [dashboard_room(d) for d in data.get('dashboards', []) if d]
+    rooms += [trade_room(t) for t in data.get('trades', []) if t]
+    rooms += [r for r in data.get('rooms', []) if isinstance(r, str) and r.startswith(('dashboard:', 'trade:'))]
+    return rooms
@@ -21,9 +21,11 @@ class RobustWebSocketHandler:
     - Message queuing
     """
     
-    def __init__(self, socketio, db):
+    def __init__(self, socketio, db, hub=None):
         self.socketio = socketio
         self.db = db
+        # Optional BroadcastHub: when set, broadcasts are queued off the request thread
+        self.hub = hub
         self.active_connections = 0
         self.connection_lock = Lock()
         self.last_signal = None
@@ -133,10 +135,13 @@ class RobustWebSocketHandler:
             # Add to message queue
             self._add_to_queue(signal_data)
             
-            # Broadcast to all clients
-            self.socketio.emit('signal_update', signal_data)
+            if self.hub:
+                trade_id = signal_data.get('trade_id') if isinstance(signal_data, dict) else None
+                self.hub.publish_trade_event('signal_update', trade_id, signal_data)
+            else:
+                self.socketio.emit('signal_update', signal_data)
             
-            logger.info(f"Signal broadcasted to {self.active_connections} clients")
+            logger.debug(f"Signal broadcasted to {self.active_connections} clients")
             
         except Exception as e:
             logger.error(f"Signal broadcast failed: {e}", exc_info=True)
@@ -151,8 +156,11 @@ class RobustWebSocketHandler:
                 'timestamp': datetime.now(pytz.UTC).isoformat()
             }
             
-            self.socketio.emit('mfe_update', update_data)
-            logger.info(f"MFE update broadcasted for trade {trade_id}")
+            if self.hub:
+                self.hub.publish_mfe_update(trade_id, update_data)
+            else:
+                self.socketio.emit('mfe_update', update_data)
+            logger.debug(f"MFE update broadcasted for trade {trade_id}")
             
         except Exception as e:
             logger.error(f"MFE broadcast failed: {e}", exc_info=True)
@@ -167,8 +175,11 @@ class RobustWebSocketHandler:
                 'timestamp': datetime.now(pytz.UTC).isoformat()
             }
             
-            self.socketio.emit('trade_completed', completion_event)
-            logger.info(f"Trade completion broadcasted for {trade_id}")
+            if self.hub:
+                self.hub.publish_trade_event('trade_completed', trade_id, completion_event)
+            else:
+                self.socketio.emit('trade_completed', completion_event)
+            logger.debug(f"Trade completion broadcasted for {trade_id}")
             
         except Exception as e:
             logger.error(f"Completion broadcast failed: {e}", exc_info=True)
@@ -189,13 +200,16 @@ class RobustWebSocketHandler:
     
     def get_connection_stats(self):
         """Get connection statistics"""
-        return {
+        stats = {
             'active_connections': self.active_connections,
             'health_status': self.health_status,
             'queue_size': len(self.message_queue),
             'last_signal': self.last_signal is not None,
             'timestamp': datetime.now(pytz.UTC).isoformat()
         }
+        if self.hub:
+            stats['broadcast_hub'] = self.hub.get_stats()
+        return stats
 
 
 def register_websocket_handlers(socketio, handler):